@@ -1348,4 +1348,5 @@ AGGRESSIVE_MOVES = {
 
 # Endgame thresholds
 ENDGAME_MAX_POKEMON = 3  # Consider endgame when both sides have <= 3 Pokemon
-ENDGAME_SOLVE_DEPTH = 4  # Max depth for minimax search
+ENDGAME_SOLVE_DEPTH = 4  # Max depth (turns) for the endgame search
+ENDGAME_TIME_CAP_MS = 100  # Time cap for the endgame search
@@ -0,0 +1,256 @@
+"""
+Interned ids for moves, species, items, abilities and types.
+
+Each name gets a dense integer id, so hot paths can key on ints and read move
+and species attributes from arrays instead of normalizing strings and going
+through `all_move_json` / `pokedex` every time:
+
+    moves = move_table()
+    i = move_id("Close Combat")
+    if i != UNKNOWN_ID and moves.category[i] != STATUS_CATEGORY:
+        power = moves.base_power[i]
+
+Move and species ids are fixed by the data files; items and abilities are
+open sets and get an id the first time they are seen. Type ids are
+`POKEMON_TYPE_INDICES`, the indices of the type chart.
+
+The tables are built on first use. `apply_mods` edits the data in place for
+older generations and calls `reset_tables()` afterwards.
+"""
+
+import threading
+
+import numpy as np
+
+import constants
+from data import all_move_json, pokedex
+from fp.helpers import POKEMON_TYPE_INDICES, normalize_name
+
+UNKNOWN_ID = -1
+
+PHYSICAL_CATEGORY = 0
+SPECIAL_CATEGORY = 1
+STATUS_CATEGORY = 2
+_CATEGORY_IDS = {
+    constants.PHYSICAL: PHYSICAL_CATEGORY,
+    constants.SPECIAL: SPECIAL_CATEGORY,
+}
+
+TYPELESS_ID = POKEMON_TYPE_INDICES["typeless"]
+# type id -> name; "???" shares typeless' id
+_type_names: dict[int, str] = {}
+for _name, _i in POKEMON_TYPE_INDICES.items():
+    _type_names.setdefault(_i, _name)
+TYPE_NAMES = tuple(_type_names[i] for i in range(len(_type_names)))
+
+# column order of SpeciesTable.base_stats
+STAT_ORDER = (
+    constants.HITPOINTS,
+    constants.ATTACK,
+    constants.DEFENSE,
+    constants.SPECIAL_ATTACK,
+    constants.SPECIAL_DEFENSE,
+    constants.SPEED,
+)
+
+
+class Interner:
+    """Dense ids for normalized names, in order of first appearance."""
+
+    def __init__(self, names=(), frozen: bool = False):
+        self._ids: dict[str, int] = {}
+        self._names: list[str] = []
+        self._lock = threading.Lock()
+        for name in names:
+            self._add(normalize_name(name))
+        self.frozen = frozen
+
+    def _add(self, name: str) -> int:
+        i = self._ids.get(name)
+        if i is None:
+            i = self._ids[name] = len(self._names)
+            self._names.append(name)
+        return i
+
+    def id(self, name: str) -> int:
+        """Id of `name`; a frozen interner returns UNKNOWN_ID for new names."""
+        if not name:
+            return UNKNOWN_ID
+        i = self._ids.get(name)
+        if i is not None:
+            return i
+        name = normalize_name(name)
+        i = self._ids.get(name)
+        if i is not None or self.frozen:
+            return UNKNOWN_ID if i is None else i
+        with self._lock:
+            return self._add(name)
+
+    def name(self, i: int) -> str:
+        return self._names[i]
+
+    def __contains__(self, name) -> bool:
+        return isinstance(name, str) and normalize_name(name) in self._ids
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+def type_id(type_name: str) -> int:
+    if not type_name:
+        return TYPELESS_ID
+    return POKEMON_TYPE_INDICES.get(normalize_name(type_name), TYPELESS_ID)
+
+
+class MoveTable:
+    """
+    One row per move id: base power, category, type, priority, accuracy
+    (a fraction; 1.0 for moves that never miss), fixed damage (Dragon
+    Rage's 40; `level_damage` for Seismic Toss and Night Shade) and a
+    bitmask of move flags (`flag_mask("contact")` etc).
+    """
+
+    def __init__(self, move_json: dict):
+        self.ids = Interner(sorted(move_json), frozen=True)
+        self.flag_bits: dict[str, int] = {}
+        n = len(self.ids)
+        self.base_power = np.zeros(n, dtype=np.float64)
+        self.category = np.full(n, STATUS_CATEGORY, dtype=np.int8)
+        self.type = np.full(n, TYPELESS_ID, dtype=np.int8)
+        self.priority = np.zeros(n, dtype=np.int8)
+        self.accuracy = np.ones(n, dtype=np.float64)
+        self.never_misses = np.zeros(n, dtype=bool)
+        self.fixed_damage = np.zeros(n, dtype=np.float64)
+        self.level_damage = np.zeros(n, dtype=bool)
+        self.flags = np.zeros(n, dtype=np.int64)
+
+        for i in range(n):
+            move = move_json[self.ids.name(i)]
+            self.base_power[i] = move.get(constants.BASE_POWER, 0) or 0
+            self.category[i] = _CATEGORY_IDS.get(
+                move.get(constants.CATEGORY), STATUS_CATEGORY
+            )
+            self.type[i] = type_id(move.get(constants.TYPE))
+            self.priority[i] = move.get(constants.PRIORITY, 0) or 0
+            accuracy = move.get(constants.ACCURACY, True)
+            if accuracy is True:
+                self.never_misses[i] = True
+            else:
+                self.accuracy[i] = float(accuracy) / 100.0
+            damage = move.get("damage")
+            if isinstance(damage, (int, float)) and damage > 0:
+                self.fixed_damage[i] = damage
+            elif isinstance(damage, str) and normalize_name(damage) == "level":
+                self.level_damage[i] = True
+            mask = 0
+            for flag in move.get("flags") or {}:
+                mask |= self._flag_bit(flag)
+            self.flags[i] = mask
+
+    def _flag_bit(self, flag: str) -> int:
+        bit = self.flag_bits.get(flag)
+        if bit is None:
+            bit = self.flag_bits[flag] = 1 << len(self.flag_bits)
+        return bit
+
+    def flag_mask(self, *flags: str) -> int:
+        """Bitmask of the named flags; flags no move has contribute nothing."""
+        mask = 0
+        for flag in flags:
+            mask |= self.flag_bits.get(flag, 0)
+        return mask
+
+    def has_flag(self, move: int, flag: str) -> bool:
+        return move != UNKNOWN_ID and bool(self.flags[move] & self.flag_mask(flag))
+
+
+class SpeciesTable:
+    """
+    One row per species id: base stats (columns in STAT_ORDER), both types
+    (the second is typeless for mono-typed species), weight and the ids of
+    the species' possible abilities.
+    """
+
+    def __init__(self, dex: dict, abilities: Interner):
+        self.ids = Interner(sorted(dex), frozen=True)
+        n = len(self.ids)
+        self.base_stats = np.zeros((n, len(STAT_ORDER)), dtype=np.int16)
+        self.types = np.full((n, 2), TYPELESS_ID, dtype=np.int8)
+        self.weight = np.zeros(n, dtype=np.float64)
+        self.abilities: list[frozenset] = []
+
+        for i in range(n):
+            entry = dex[self.ids.name(i)]
+            base_stats = entry.get(constants.BASESTATS) or {}
+            for column, stat in enumerate(STAT_ORDER):
+                self.base_stats[i, column] = base_stats.get(stat, 0) or 0
+            for column, name in enumerate((entry.get(constants.TYPES) or [])[:2]):
+                self.types[i, column] = type_id(name)
+            self.weight[i] = entry.get(constants.WEIGHT, 0) or 0
+            self.abilities.append(
+                frozenset(
+                    abilities.id(a)
+                    for a in (entry.get(constants.ABILITIES) or {}).values()
+                    if isinstance(a, str)
+                )
+            )
+
+    def stat(self, species: int, stat: str) -> int:
+        return int(self.base_stats[species, STAT_ORDER.index(stat)])
+
+
+_items = Interner()
+_abilities = Interner()
+_moves: MoveTable | None = None
+_species: SpeciesTable | None = None
+_tables_lock = threading.Lock()
+
+
+def move_table() -> MoveTable:
+    global _moves
+    if _moves is None:
+        with _tables_lock:
+            if _moves is None:
+                _moves = MoveTable(all_move_json)
+    return _moves
+
+
+def species_table() -> SpeciesTable:
+    global _species
+    if _species is None:
+        with _tables_lock:
+            if _species is None:
+                _species = SpeciesTable(pokedex, _abilities)
+    return _species
+
+
+def reset_tables():
+    """Rebuild the move and species tables on next use (after data mods)."""
+    global _moves, _species
+    with _tables_lock:
+        _moves = None
+        _species = None
+
+
+def move_id(name: str) -> int:
+    return move_table().ids.id(name)
+
+
+def species_id(name: str) -> int:
+    return species_table().ids.id(name)
+
+
+def item_id(name: str) -> int:
+    return _items.id(name)
+
+
+def ability_id(name: str) -> int:
+    return _abilities.id(name)
+
+
+def item_name(i: int) -> str:
+    return _items.name(i)
+
+
+def ability_name(i: int) -> str:
+    return _abilities.name(i)
@@ -4,6 +4,7 @@ import logging
 import constants
 from data import all_move_json
 from data import pokedex
+from data.ids import reset_tables
 from fp.helpers import (
     DAMAGE_MULTIPICATION_ARRAY,
     POKEMON_TYPE_INDICES,
@@ -162,3 +163,4 @@ def apply_mods(game_mode):
         apply_gen_7_mods()
     elif "gen8" in game_mode:
         apply_gen_8_mods()
+    reset_tables()
@@ -1,7 +1,13 @@
 from __future__ import annotations
 
+import bisect
+import contextvars
+import itertools
 import ntpath
+import threading
 from dataclasses import dataclass
+from collections.abc import Mapping
+from types import MappingProxyType, SimpleNamespace
 
 import requests
 from dateutil import relativedelta
@@ -16,6 +22,15 @@ from typing import Optional
 
 import constants
 from data import all_move_json, pokedex
+from data.set_cache import (
+    KIND_MOVESETS,
+    KIND_SETS,
+    KIND_STATS,
+    MappedSetCache,
+    compiled_cache_path,
+    source_fingerprint,
+    write_set_cache,
+)
 from fp.helpers import calculate_stats
 from fp.helpers import normalize_name
 
@@ -39,6 +54,22 @@ EFFECTIVENESS = "effectiveness"
 TEAMMATES = "teammates"
 RAW_COUNT = "raw_count"
 
+# Bump when the layout of compiled store entries changes
+SET_STORE_VERSION = 1
+# Memory-map compiled caches (see data/scripts/compile_set_caches.py) when present
+COMPILED_SET_CACHES_ENABLED = str(
+    os.getenv("COMPILED_SET_CACHES_ENABLED", "1")
+).lower() not in {"0", "false", "no", "off"}
+# Order in which a smogon stats summary is laid out in a compiled cache
+SMOGON_SUMMARY_KEYS = (
+    SPREADS_STRING,
+    ITEM_STRING,
+    MOVES_STRING,
+    ABILITY_STRING,
+    TERA_TYPE_STRING,
+    EFFECTIVENESS,
+)
+
 if typing.TYPE_CHECKING:
     from fp.battle import Pokemon
 
@@ -297,11 +328,351 @@ class PokemonMoveset:
         return len(self.moves)
 
 
+_store_generation = itertools.count(1)
+
+
+class SpeciesSetStore:
+    """
+    Load-once, species-indexed sets for one source (a smogon stats file,
+    a team-datasets mode, a battle factory tier, ...).
+
+    The raw data is exposed read-only and compiled entries are tuples that
+    are built at most once per species, so a store can be shared by every
+    battle in the process. `version` identifies the layout and the load.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        raw: dict,
+        compile_fn=None,
+        summary_fn=None,
+        meta: dict = None,
+    ):
+        self.key = key
+        self.version = (SET_STORE_VERSION, next(_store_generation))
+        self.raw = MappingProxyType(raw)
+        self.meta = MappingProxyType(meta or {})
+        self.sorted_species = tuple(sorted(raw))
+        self._compile_fn = compile_fn
+        self._compiled = {}
+        self._summary_fn = summary_fn
+        self._summaries = {}
+
+    def __contains__(self, species: str) -> bool:
+        return species in self.raw
+
+    def summary(self, species: str):
+        """Battle-independent digest of a raw entry, built once per species."""
+        summary = self._summaries.get(species)
+        if summary is None and species in self.raw:
+            summary = self._summary_fn(species, self.raw[species])
+            summary = self._summaries.setdefault(species, summary)
+        return summary
+
+    def species_with_prefix(self, prefix: str) -> tuple[str, ...]:
+        start = bisect.bisect_left(self.sorted_species, prefix)
+        end = start
+        while end < len(self.sorted_species) and self.sorted_species[end].startswith(
+            prefix
+        ):
+            end += 1
+        return self.sorted_species[start:end]
+
+    def sets(self, species: str) -> tuple:
+        compiled = self._compiled.get(species)
+        if compiled is None:
+            if self._compile_fn is None or species not in self.raw:
+                return ()
+            compiled = tuple(self._compile_fn(species, self.raw[species]))
+            # a concurrent compile of the same species is harmless; keep the first
+            compiled = self._compiled.setdefault(species, compiled)
+        return compiled
+
+    def all_sets(self) -> dict[str, tuple]:
+        return {species: self.sets(species) for species in self.raw}
+
+
+class _LazySpeciesMapping(Mapping):
+    """Read-only species mapping whose values are decoded on first access."""
+
+    def __init__(self, species: tuple, decode_fn):
+        self._species = species
+        self._members = frozenset(species)
+        self._decode_fn = decode_fn
+        self._decoded = {}
+
+    def __getitem__(self, species):
+        if species not in self._members:
+            raise KeyError(species)
+        value = self._decoded.get(species)
+        if value is None:
+            value = self._decoded.setdefault(species, self._decode_fn(species))
+        return value
+
+    def __contains__(self, species) -> bool:
+        return species in self._members
+
+    def __iter__(self):
+        return iter(self._species)
+
+    def __len__(self) -> int:
+        return len(self._species)
+
+
+class MappedSetStore(SpeciesSetStore):
+    """
+    `SpeciesSetStore` served from a compiled cache file (see `data.set_cache`).
+    Nothing is parsed up front; a species is decoded from the mapped file the
+    first time it is looked up. Compiled files do not keep the raw JSON, so
+    `raw` maps each species to its compiled entry (its summary for stats).
+    """
+
+    def __init__(self, key: str, cache: MappedSetCache, kind: int, compile_fn=None):
+        self.key = key
+        self.version = (SET_STORE_VERSION, next(_store_generation))
+        self.cache = cache
+        self.kind = kind
+        self.sorted_species = cache.species
+        self._compile_fn = compile_fn
+        self._compiled = {}
+        self._summaries = {}
+        if kind == KIND_STATS:
+            self.raw = _LazySpeciesMapping(cache.species, self.summary)
+            self.meta = MappingProxyType(
+                {
+                    "all_pkmn_counts": _LazySpeciesMapping(
+                        cache.species, self._decode_counts
+                    )
+                }
+            )
+        else:
+            self.raw = _LazySpeciesMapping(cache.species, self.sets)
+            self.meta = MappingProxyType({})
+
+    def __contains__(self, species: str) -> bool:
+        return species in self.cache
+
+    def _decode_counts(self, species: str) -> dict:
+        raw_count, teammates = self.cache.read_counts(species)
+        return {RAW_COUNT: raw_count, TEAMMATES: teammates}
+
+    def summary(self, species: str):
+        summary = self._summaries.get(species)
+        if summary is None and self.kind == KIND_STATS and species in self.cache:
+            summary = self.cache.read_stats(species, SMOGON_SUMMARY_KEYS)
+            summary = self._summaries.setdefault(species, summary)
+        return summary
+
+    def sets(self, species: str) -> tuple:
+        compiled = self._compiled.get(species)
+        if compiled is not None:
+            return compiled
+        if species not in self.cache:
+            return ()
+        if self.kind == KIND_SETS:
+            compiled = tuple(
+                PredictedPokemonSet(
+                    pkmn_set=PokemonSet(
+                        ability=ability,
+                        item=item,
+                        nature=nature,
+                        evs=evs,
+                        count=_as_count(count),
+                        level=level,
+                        tera_type=tera_type,
+                    ),
+                    pkmn_moveset=PokemonMoveset(moves=moves),
+                )
+                for count, tera_type, ability, item, nature, level, evs, moves in (
+                    self.cache.read_sets(species)
+                )
+            )
+        elif self.kind == KIND_MOVESETS:
+            compiled = tuple(
+                PokemonMoveset(moves=tuple(moves), count=_as_count(count))
+                for count, moves in self.cache.read_movesets(species)
+            )
+        elif self._compile_fn is not None:
+            compiled = tuple(self._compile_fn(species, None))
+        else:
+            return ()
+        return self._compiled.setdefault(species, compiled)
+
+
+def _as_count(count: float):
+    # counts are stored as doubles; keep whole counts as ints like the JSON path
+    return int(count) if count.is_integer() else count
+
+
+_set_stores: dict[str, SpeciesSetStore] = {}
+_set_stores_lock = threading.Lock()
+
+
+def _open_compiled_store(key: str, cache_kind, sources, compile_fn):
+    if not COMPILED_SET_CACHES_ENABLED or cache_kind is None:
+        return None
+    path = compiled_cache_path(key)
+    if not os.path.exists(path) or not all(os.path.exists(p) for p in sources):
+        return None
+    try:
+        cache = MappedSetCache(path, cache_kind, source_fingerprint(sources))
+    except (OSError, ValueError) as e:
+        logger.info(f"Ignoring compiled set cache {path}: {e}")
+        return None
+    return MappedSetStore(key, cache, cache_kind, compile_fn=compile_fn)
+
+
+def get_set_store(
+    key: str,
+    load_fn,
+    compile_fn=None,
+    summary_fn=None,
+    cache_kind=None,
+    sources=(),
+) -> SpeciesSetStore:
+    """
+    Return the process-wide store for `key`, loading it only the first time.
+
+    A compiled cache for `key` that is up to date with the `sources` files is
+    memory-mapped; otherwise `load_fn` is called and returns the raw species
+    dict, or a (raw, meta) tuple.
+    """
+    store = _set_stores.get(key)
+    if store is not None:
+        return store
+    with _set_stores_lock:
+        store = _set_stores.get(key)
+        if store is None:
+            store = _open_compiled_store(key, cache_kind, sources, compile_fn)
+        if store is None:
+            loaded = load_fn()
+            raw, meta = loaded if isinstance(loaded, tuple) else (loaded, None)
+            store = SpeciesSetStore(
+                key, raw, compile_fn=compile_fn, summary_fn=summary_fn, meta=meta
+            )
+        if _set_stores.setdefault(key, store) is store:
+            logger.info(f"Loaded set store {key} (version {store.version})")
+    return _set_stores[key]
+
+
+def compile_set_store(
+    key: str,
+    load_fn,
+    compile_fn=None,
+    summary_fn=None,
+    cache_kind=None,
+    sources=(),
+) -> str:
+    """
+    Build the compiled cache for a store from its JSON sources and return the
+    path written. Takes the same arguments as `get_set_store`.
+    """
+    loaded = load_fn()
+    raw, meta = loaded if isinstance(loaded, tuple) else (loaded, None)
+    store = SpeciesSetStore(
+        key, raw, compile_fn=compile_fn, summary_fn=summary_fn, meta=meta
+    )
+    entries = {}
+    for species in store.sorted_species:
+        if cache_kind == KIND_SETS:
+            entries[species] = (
+                [
+                    (
+                        s.pkmn_set.count,
+                        s.pkmn_set.tera_type,
+                        s.pkmn_set.ability,
+                        s.pkmn_set.item,
+                        s.pkmn_set.nature,
+                        s.pkmn_set.level,
+                        s.pkmn_set.evs,
+                        s.pkmn_moveset.moves,
+                    )
+                    for s in store.sets(species)
+                ],
+                None,
+            )
+        elif cache_kind == KIND_MOVESETS:
+            entries[species] = (
+                [(m.count, m.moves) for m in store.sets(species)],
+                None,
+            )
+        elif cache_kind == KIND_STATS:
+            counts = store.meta["all_pkmn_counts"][species]
+            entries[species] = (
+                store.summary(species),
+                (counts[RAW_COUNT], counts[TEAMMATES]),
+            )
+        else:
+            raise ValueError(f"Store {key} has no compiled cache kind")
+
+    path = compiled_cache_path(key)
+    write_set_cache(
+        path,
+        cache_kind,
+        source_fingerprint(sources),
+        entries,
+        stats_keys=SMOGON_SUMMARY_KEYS,
+    )
+    return path
+
+
+def clear_set_stores():
+    """Drop every loaded store; the next lookup reloads from the cache files."""
+    with _set_stores_lock:
+        _set_stores.clear()
+
+
 class PokemonSets:
+    """
+    Per-battle view over one or more `SpeciesSetStore`s.
+
+    The module-level instances are shared by every battle, so the attributes
+    listed in `_VIEW_DEFAULTS` live in a view object held in a ContextVar:
+    `initialize` gives the calling battle task a fresh view, and one battle's
+    initialization never replaces another battle's sets.
+    """
+
+    _VIEW_DEFAULTS = {
+        "pkmn_mode": lambda: "uninitialized",
+        "raw_pkmn_sets": dict,
+        "pkmn_sets": dict,
+    }
+
     raw_pkmn_sets: dict[str, list]
     pkmn_sets: dict[str, list]
     pkmn_mode: str
 
+    def __init__(self):
+        object.__setattr__(
+            self, "_view_var", contextvars.ContextVar(f"{type(self).__name__}_view")
+        )
+        object.__setattr__(self, "_default_view", self._new_view())
+
+    def _new_view(self) -> SimpleNamespace:
+        return SimpleNamespace(**{k: f() for k, f in self._VIEW_DEFAULTS.items()})
+
+    def _current_view(self) -> SimpleNamespace:
+        return self._view_var.get(self._default_view)
+
+    def _begin_view(self) -> SimpleNamespace:
+        view = self._new_view()
+        self._view_var.set(view)
+        return view
+
+    def __getattr__(self, name):
+        if name in type(self)._VIEW_DEFAULTS:
+            return getattr(self._current_view(), name)
+        raise AttributeError(
+            f"'{type(self).__name__}' object has no attribute '{name}'"
+        )
+
+    def __setattr__(self, name, value):
+        if name in type(self)._VIEW_DEFAULTS:
+            setattr(self._current_view(), name, value)
+        else:
+            object.__setattr__(self, name, value)
+
     def initialize(self, pkmn_mode: str, pkmn_names: set[str]): ...
 
     def predict_set(self, pkmn: Pokemon) -> Optional[PredictedPokemonSet]: ...
@@ -354,52 +725,61 @@ class PokemonSets:
 
 
 class _RandomBattleSets(PokemonSets):
-    def __init__(self):
-        self.raw_pkmn_sets = {}
-        self.pkmn_sets = {}
-        self.pkmn_mode = "uninitialized"
-
     def _load_raw_sets(self, generation):
         if generation.endswith("blitz"):
             generation = generation[:-5]
-        self.raw_pkmn_sets = get_randbats_sets_file(f"{generation}randombattle")
-
-    def _initialize_pkmn_sets(self):
-        for pkmn, sets in self.raw_pkmn_sets.items():
-            self.pkmn_sets[pkmn] = []
-            for set_, count in sets.items():
-                set_split = set_.split(",")
-                level = int(set_split[0])
-                item = set_split[1]
-                ability = set_split[2]
-                moves = set_split[3:7]
-                tera_type = None
-                if len(set_split) > 7:
-                    tera_type = set_split[7]
-                self.pkmn_sets[pkmn].append(
-                    PredictedPokemonSet(
-                        pkmn_set=PokemonSet(
-                            ability=ability,
-                            item=item,
-                            nature="serious",
-                            evs=(85, 85, 85, 85, 85, 85),
-                            count=count,
-                            tera_type=tera_type,
-                            level=level,
-                        ),
-                        pkmn_moveset=PokemonMoveset(moves=moves),
-                    )
+        return get_set_store(**self._store_spec(f"{generation}randombattle"))
+
+    def _store_spec(self, pkmn_randbats_mode: str) -> dict:
+        return dict(
+            key=f"randbats:{pkmn_randbats_mode}",
+            load_fn=lambda: get_randbats_sets_file(pkmn_randbats_mode),
+            compile_fn=self._compile_pkmn_sets,
+            cache_kind=KIND_SETS,
+            sources=(os.path.join(PKMN_SETS_CACHE_DIR, f"{pkmn_randbats_mode}.json"),),
+        )
+
+    @staticmethod
+    def _compile_pkmn_sets(pkmn: str, sets: dict) -> list[PredictedPokemonSet]:
+        compiled = []
+        for set_, count in sets.items():
+            set_split = set_.split(",")
+            level = int(set_split[0])
+            item = set_split[1]
+            ability = set_split[2]
+            moves = set_split[3:7]
+            tera_type = None
+            if len(set_split) > 7:
+                tera_type = set_split[7]
+            compiled.append(
+                PredictedPokemonSet(
+                    pkmn_set=PokemonSet(
+                        ability=ability,
+                        item=item,
+                        nature="serious",
+                        evs=(85, 85, 85, 85, 85, 85),
+                        count=count,
+                        tera_type=tera_type,
+                        level=level,
+                    ),
+                    pkmn_moveset=PokemonMoveset(moves=moves),
                 )
-            self.pkmn_sets[pkmn].sort(key=lambda x: x.pkmn_set.count, reverse=True)
+            )
+        compiled.sort(key=lambda x: x.pkmn_set.count, reverse=True)
+        return compiled
 
     def initialize(self, pkmn_mode: str, _pkmn_names=None):
         # pkmn_names unused here since randombattles don't have team preview
-        # always load entire JSON into memory
-        self.raw_pkmn_sets = {}
-        self.pkmn_sets = {}
+        # always expose every pkmn in the store
+        self._begin_view()
         self.pkmn_mode = pkmn_mode
-        self._load_raw_sets(pkmn_mode)
-        self._initialize_pkmn_sets()
+        store = self._load_raw_sets(pkmn_mode)
+        self.raw_pkmn_sets = store.raw
+        # each battle gets its own list per species: reverse damage checks
+        # prune sets in place and must not touch the shared store's tuples
+        self.pkmn_sets = _LazySpeciesMapping(
+            store.sorted_species, lambda pkmn: list(store.sets(pkmn))
+        )
 
     def predict_set(
         self, pkmn: Pokemon, match_traits=True
@@ -462,16 +842,16 @@ class _RandomBattleSets(PokemonSets):
 
 
 class _TeamDatasets(PokemonSets):
-    def __init__(self):
-        self.raw_pkmn_sets = {}
-        self.raw_pkmn_moves = {}
-        self.pkmn_sets = {}
-        self.movepool_data = {}
-        self.pkmn_mode = "uninitialized"
-
-    def _get_sets_dict(self):
-        ps_sets = get_ps_sets_file(self.pkmn_mode)
-        full_sets = get_pkmn_sets_file(self.pkmn_mode, "pokemon_full_sets.json")
+    _VIEW_DEFAULTS = {
+        **PokemonSets._VIEW_DEFAULTS,
+        "raw_pkmn_moves": dict,
+        "movepool_data": dict,
+    }
+
+    def _get_sets_dict(self, pkmn_mode=None):
+        pkmn_mode = pkmn_mode or self.pkmn_mode
+        ps_sets = get_ps_sets_file(pkmn_mode)
+        full_sets = get_pkmn_sets_file(pkmn_mode, "pokemon_full_sets.json")
         for pkmn, sets in ps_sets.items():
             if pkmn not in full_sets:
                 full_sets[pkmn] = sets
@@ -483,67 +863,115 @@ class _TeamDatasets(PokemonSets):
                         full_sets[pkmn][set_] += count
         return full_sets
 
-    def _get_moves_dict(self):
-        return get_pkmn_sets_file(self.pkmn_mode, "replay_moves.json")
+    def _get_moves_dict(self, pkmn_mode=None):
+        return get_pkmn_sets_file(pkmn_mode or self.pkmn_mode, "replay_moves.json")
+
+    def _get_battle_factory_sets_dict(self, tier_name, pkmn_mode=None):
+        return get_pkmn_sets_file(pkmn_mode or self.pkmn_mode, "factory-sets.json")[
+            tier_name
+        ]
+
+    def _sets_store_spec(self) -> dict:
+        pkmn_mode = self.pkmn_mode
+        mode_dir = os.path.join(PKMN_SETS_CACHE_DIR, pkmn_mode)
+        return dict(
+            key=f"team-sets:{pkmn_mode}",
+            load_fn=lambda: self._get_sets_dict(pkmn_mode),
+            compile_fn=self._compile_pkmn_sets,
+            cache_kind=KIND_SETS,
+            sources=(
+                os.path.join(mode_dir, "showdown_sets.json"),
+                os.path.join(mode_dir, "pokemon_full_sets.json"),
+            ),
+        )
+
+    def _moves_store_spec(self) -> dict:
+        pkmn_mode = self.pkmn_mode
+        return dict(
+            key=f"team-moves:{pkmn_mode}",
+            load_fn=lambda: self._get_moves_dict(pkmn_mode),
+            compile_fn=self._compile_pkmn_movesets,
+            cache_kind=KIND_MOVESETS,
+            sources=(
+                os.path.join(PKMN_SETS_CACHE_DIR, pkmn_mode, "replay_moves.json"),
+            ),
+        )
 
-    def _get_battle_factory_sets_dict(self, tier_name):
-        return get_pkmn_sets_file(self.pkmn_mode, "factory-sets.json")[tier_name]
+    def _battle_factory_store_spec(self, tier_name: str) -> dict:
+        pkmn_mode = self.pkmn_mode
+        return dict(
+            key=f"factory-sets:{pkmn_mode}:{tier_name}",
+            load_fn=lambda: self._get_battle_factory_sets_dict(tier_name, pkmn_mode),
+            compile_fn=self._compile_pkmn_sets,
+            cache_kind=KIND_SETS,
+            sources=(
+                os.path.join(PKMN_SETS_CACHE_DIR, pkmn_mode, "factory-sets.json"),
+            ),
+        )
+
+    def _sets_store(self) -> SpeciesSetStore:
+        return get_set_store(**self._sets_store_spec())
+
+    def _moves_store(self) -> SpeciesSetStore:
+        return get_set_store(**self._moves_store_spec())
 
     def _load_battle_factory_team_datasets(self, pkmn_names: set[str], tier_name: str):
-        sets_dict = self._get_battle_factory_sets_dict(tier_name)
+        store = get_set_store(**self._battle_factory_store_spec(tier_name))
         for pkmn in pkmn_names:
-            try:
-                self.raw_pkmn_sets[pkmn] = sets_dict[pkmn]
-            except KeyError:
+            if pkmn not in store:
                 logger.warning("No pokemon sets for {}".format(pkmn))
+                continue
+            self.raw_pkmn_sets[pkmn] = store.raw[pkmn]
+            self.pkmn_sets[pkmn] = list(store.sets(pkmn))
 
     def _load_team_datasets(self, pkmn_names: set[str], get_all_pkmn: bool):
-        sets_dict = self._get_sets_dict()
-        all_pkmn_moves = self._get_moves_dict()
-        iter_list = all_pkmn_moves.keys() if get_all_pkmn else pkmn_names
+        sets_store = self._sets_store()
+        moves_store = self._moves_store()
+        iter_list = moves_store.raw.keys() if get_all_pkmn else pkmn_names
         for pkmn in iter_list:
-            if pkmn not in sets_dict:
-                sets_dict[pkmn] = {}
-            self.raw_pkmn_sets[pkmn] = sets_dict[pkmn]
-            self.raw_pkmn_moves[pkmn] = []
-            for moves_str, count in all_pkmn_moves.get(pkmn, {}).items():
-                moves = moves_str.split("|")
-                self.raw_pkmn_moves[pkmn].append(
-                    PokemonMoveset(moves=tuple(moves), count=count)
-                )
+            self.raw_pkmn_sets[pkmn] = sets_store.raw.get(pkmn, {})
+            self.pkmn_sets[pkmn] = list(sets_store.sets(pkmn))
+            self.raw_pkmn_moves[pkmn] = list(moves_store.sets(pkmn))
 
-    def _add_to_pkmn_sets(self, raw_sets: dict[str, list]):
-        for pkmn, sets in raw_sets.items():
-            self.pkmn_sets[pkmn] = []
-            for set_, count in sets.items():
-                set_split = set_.split("|")
-                tera_type = set_split[0] or "typeless"
-                ability = set_split[1]
-                item = set_split[2]
-                nature = set_split[3]
-                evs = tuple(int(i) for i in set_split[4].split(","))
-                moves = set_split[5:]
-
-                self.pkmn_sets[pkmn].append(
-                    PredictedPokemonSet(
-                        pkmn_set=PokemonSet(
-                            ability=ability,
-                            item=item,
-                            nature=nature,
-                            evs=evs,
-                            count=count,
-                            tera_type=tera_type,
-                        ),
-                        pkmn_moveset=PokemonMoveset(moves=moves),
-                    )
+    @staticmethod
+    def _compile_pkmn_movesets(pkmn: str, movesets: dict) -> list[PokemonMoveset]:
+        return [
+            PokemonMoveset(moves=tuple(moves_str.split("|")), count=count)
+            for moves_str, count in movesets.items()
+        ]
+
+    @staticmethod
+    def _compile_pkmn_sets(pkmn: str, sets: dict) -> list[PredictedPokemonSet]:
+        compiled = []
+        for set_, count in sets.items():
+            set_split = set_.split("|")
+            tera_type = set_split[0] or "typeless"
+            ability = set_split[1]
+            item = set_split[2]
+            nature = set_split[3]
+            evs = tuple(int(i) for i in set_split[4].split(","))
+            moves = set_split[5:]
+
+            compiled.append(
+                PredictedPokemonSet(
+                    pkmn_set=PokemonSet(
+                        ability=ability,
+                        item=item,
+                        nature=nature,
+                        evs=evs,
+                        count=count,
+                        tera_type=tera_type,
+                    ),
+                    pkmn_moveset=PokemonMoveset(moves=moves),
                 )
-            self.pkmn_sets[pkmn].sort(key=lambda x: x.pkmn_set.count, reverse=True)
+            )
+        compiled.sort(key=lambda x: x.pkmn_set.count, reverse=True)
+        return compiled
 
     def initialize(
         self, pkmn_mode: str, pkmn_names: set[str], battle_factory_tier_name=None
     ):
-        self.raw_pkmn_sets = {}
-        self.pkmn_sets = {}
+        self._begin_view()
         self.pkmn_mode = pkmn_mode
         get_all_pkmn = any(
             g in pkmn_mode
@@ -560,20 +988,26 @@ class _TeamDatasets(PokemonSets):
             )
         else:
             self._load_team_datasets(pkmn_names, get_all_pkmn)
-        self._add_to_pkmn_sets(self.raw_pkmn_sets)
 
     def add_new_pokemon(self, pkmn_name: str):
-        sets_dict = self._get_sets_dict()
-        all_pkmn_moves = self._get_moves_dict()
-        if pkmn_name not in sets_dict:
+        sets_store = self._sets_store()
+        if pkmn_name not in sets_store:
             return
-        self.raw_pkmn_moves[pkmn_name] = []
-        for moves_str, count in all_pkmn_moves.get(pkmn_name, {}).items():
-            moves = moves_str.split("|")
-            self.raw_pkmn_moves[pkmn_name].append(
-                PokemonMoveset(moves=tuple(moves), count=count)
-            )
-        self._add_to_pkmn_sets({pkmn_name: sets_dict[pkmn_name]})
+        moves_store = self._moves_store()
+        # replace the view's dicts rather than mutating them: a search running
+        # in the executor may be iterating over the current ones
+        self.raw_pkmn_sets = {
+            **self.raw_pkmn_sets,
+            pkmn_name: sets_store.raw[pkmn_name],
+        }
+        self.raw_pkmn_moves = {
+            **self.raw_pkmn_moves,
+            pkmn_name: list(moves_store.sets(pkmn_name)),
+        }
+        self.pkmn_sets = {
+            **self.pkmn_sets,
+            pkmn_name: list(sets_store.sets(pkmn_name)),
+        }
 
     def get_all_remaining_sets(self, pkmn: Pokemon) -> list[PredictedPokemonSet]:
         if not self.pkmn_sets:
@@ -645,12 +1079,11 @@ class _TeamDatasets(PokemonSets):
 
 
 class _SmogonSets(PokemonSets):
-    def __init__(self):
-        self.current_pkmn_sets_url = ""
-        self.raw_pkmn_sets = {}
-        self.all_pkmn_counts = {}
-        self.pkmn_sets = {}
-        self.pkmn_mode = "uninitialized"
+    _VIEW_DEFAULTS = {
+        **PokemonSets._VIEW_DEFAULTS,
+        "current_pkmn_sets_url": str,
+        "all_pkmn_counts": dict,
+    }
 
     def _smogon_predicted_move_set_makes_sense(
         self, predicted_set: PredictedPokemonSet
@@ -674,10 +1107,19 @@ class _SmogonSets(PokemonSets):
                     return False
         return True
 
-    def _pokemon_is_similar(self, normalized_name, list_of_pkmn_names):
-        return any(normalized_name.startswith(n) for n in list_of_pkmn_names) or any(
-            n.startswith(normalized_name) for n in list_of_pkmn_names
-        )
+    def _similar_species(self, store: SpeciesSetStore, pkmn_names) -> list[str]:
+        """
+        Species in `store` that are named in `pkmn_names`, or that one of those
+        names is a prefix of (or has as a prefix). Uses the store's sorted index
+        instead of scanning every species.
+        """
+        similar = set()
+        for name in pkmn_names:
+            similar.update(store.species_with_prefix(name))
+            for end in range(1, len(name)):
+                if name[:end] in store:
+                    similar.add(name[:end])
+        return sorted(similar)
 
     def _get_smogon_stats_json(self, smogon_stats_url):
         cache_file_name = ntpath.basename(smogon_stats_url)
@@ -700,103 +1142,127 @@ class _SmogonSets(PokemonSets):
 
         return infos
 
-    def _get_pokemon_information(self, smogon_stats_url, pkmn_names) -> dict:
-        infos = self._get_smogon_stats_json(smogon_stats_url)
-        self.all_pkmn_counts.clear()
-
-        final_infos = {}
-        for pkmn_name, pkmn_information in infos.items():
+    def _load_smogon_stats(self, smogon_stats_url):
+        infos = {}
+        all_pkmn_counts = {}
+        for pkmn_name, pkmn_information in self._get_smogon_stats_json(
+            smogon_stats_url
+        ).items():
             normalized_name = normalize_name(pkmn_name)
-            self.all_pkmn_counts[normalized_name] = {}
-            self.all_pkmn_counts[normalized_name][RAW_COUNT] = pkmn_information[
-                "Raw count"
-            ]
-            self.all_pkmn_counts[normalized_name][TEAMMATES] = {}
-            for teammate_name, teammate_count in pkmn_information["Teammates"].items():
-                self.all_pkmn_counts[normalized_name][TEAMMATES][
-                    normalize_name(teammate_name)
-                ] = teammate_count
-
-            # if `pkmn_names` is provided, only find data on pkmn in that list
-            if (
-                pkmn_names
-                and normalized_name not in pkmn_names
-                and not self._pokemon_is_similar(normalized_name, pkmn_names)
-            ):
-                continue
-            else:
-                logger.debug(
-                    "Adding {} to sets lookup for this battle".format(normalized_name)
-                )
+            infos[normalized_name] = pkmn_information
+            all_pkmn_counts[normalized_name] = {
+                RAW_COUNT: pkmn_information["Raw count"],
+                TEAMMATES: {
+                    normalize_name(teammate_name): teammate_count
+                    for teammate_name, teammate_count in pkmn_information[
+                        "Teammates"
+                    ].items()
+                },
+            }
+        return infos, {"all_pkmn_counts": MappingProxyType(all_pkmn_counts)}
+
+    def _stats_store_spec(self, smogon_stats_url) -> dict:
+        # stats are cached by file name (see `_get_smogon_stats_json`)
+        cache_file_name = ntpath.basename(smogon_stats_url)
+        return dict(
+            key=f"smogon:{cache_file_name}",
+            load_fn=lambda: self._load_smogon_stats(smogon_stats_url),
+            compile_fn=lambda species, _raw: self._compile_pkmn_sets(
+                self._stats_store(smogon_stats_url).summary(species)
+            ),
+            summary_fn=self._summarize_pokemon_information,
+            cache_kind=KIND_STATS,
+            sources=(os.path.join(SMOGON_CACHE_DIR, cache_file_name),),
+        )
+
+    def _stats_store(self, smogon_stats_url) -> SpeciesSetStore:
+        return get_set_store(**self._stats_store_spec(smogon_stats_url))
+
+    @staticmethod
+    def _summarize_pokemon_information(_normalized_name, pkmn_information) -> dict:
+        spreads = []
+        items = []
+        moves = []
+        abilities = []
+        tera_types = []
+        total_count = pkmn_information["Raw count"]
+
+        for spread, count in sorted(
+            pkmn_information["Spreads"].items(), key=lambda x: x[1], reverse=True
+        ):
+            percentage = count / total_count
+            if percentage > 0:
+                nature, evs = [normalize_name(i) for i in spread.split(":")]
+                evs = evs.replace("/", ",")
+                for sp in spreads:
+                    if spreads_are_alike(sp, (nature, evs)):
+                        sp[2] += percentage
+                        break
+                else:
+                    spreads.append([nature, evs, percentage])
 
-            spreads = []
-            items = []
-            moves = []
-            abilities = []
-            tera_types = []
-            matchup_effectiveness = {}
-            total_count = pkmn_information["Raw count"]
-            final_infos[normalized_name] = {}
-
-            for counter_name, counter_information in pkmn_information[
-                "Checks and Counters"
-            ].items():
-                counter_name = normalize_name(counter_name)
-                if counter_name in pkmn_names:
-                    matchup_effectiveness[counter_name] = round(
-                        1 - counter_information[1], 2
+        for item, count in pkmn_information["Items"].items():
+            if count > 0:
+                items.append((item, count / total_count))
+
+        for move, count in pkmn_information["Moves"].items():
+            if count > 0 and move and move.lower() != "nothing":
+                if move.startswith(constants.HIDDEN_POWER):
+                    move = (
+                        f"{move}{constants.HIDDEN_POWER_ACTIVE_MOVE_BASE_DAMAGE_STRING}"
                     )
+                moves.append((move, count / total_count))
+
+        for ability, count in pkmn_information["Abilities"].items():
+            if count > 0:
+                abilities.append((ability, count / total_count))
+
+        for tera_type, count in pkmn_information["Tera Types"].items():
+            if tera_type == "nothing":
+                tera_type = "typeless"
+            if count > 0:
+                tera_types.append((tera_type, count / total_count))
+
+        return {
+            SPREADS_STRING: sorted(spreads, key=lambda x: x[2], reverse=True)[:20],
+            ITEM_STRING: sorted(items, key=lambda x: x[1], reverse=True)[:10],
+            MOVES_STRING: sorted(moves, key=lambda x: x[1], reverse=True)[:100],
+            ABILITY_STRING: sorted(abilities, key=lambda x: x[1], reverse=True),
+            TERA_TYPE_STRING: sorted(tera_types, key=lambda x: x[1], reverse=True)[:6],
+            # checks and counters against every species; filtered per battle
+            EFFECTIVENESS: {
+                normalize_name(counter_name): round(1 - counter_information[1], 2)
+                for counter_name, counter_information in pkmn_information[
+                    "Checks and Counters"
+                ].items()
+            },
+        }
 
-            for spread, count in sorted(
-                pkmn_information["Spreads"].items(), key=lambda x: x[1], reverse=True
-            ):
-                percentage = count / total_count
-                if percentage > 0:
-                    nature, evs = [normalize_name(i) for i in spread.split(":")]
-                    evs = evs.replace("/", ",")
-                    for sp in spreads:
-                        if spreads_are_alike(sp, (nature, evs)):
-                            sp[2] += percentage
-                            break
-                    else:
-                        spreads.append([nature, evs, percentage])
-
-            for item, count in pkmn_information["Items"].items():
-                if count > 0:
-                    items.append((item, count / total_count))
-
-            for move, count in pkmn_information["Moves"].items():
-                if count > 0 and move and move.lower() != "nothing":
-                    if move.startswith(constants.HIDDEN_POWER):
-                        move = f"{move}{constants.HIDDEN_POWER_ACTIVE_MOVE_BASE_DAMAGE_STRING}"
-                    moves.append((move, count / total_count))
-
-            for ability, count in pkmn_information["Abilities"].items():
-                if count > 0:
-                    abilities.append((ability, count / total_count))
-
-            for tera_type, count in pkmn_information["Tera Types"].items():
-                if tera_type == "nothing":
-                    tera_type = "typeless"
-                if count > 0:
-                    tera_types.append((tera_type, count / total_count))
-
-            final_infos[normalized_name][SPREADS_STRING] = sorted(
-                spreads, key=lambda x: x[2], reverse=True
-            )[:20]
-            final_infos[normalized_name][ITEM_STRING] = sorted(
-                items, key=lambda x: x[1], reverse=True
-            )[:10]
-            final_infos[normalized_name][MOVES_STRING] = sorted(
-                moves, key=lambda x: x[1], reverse=True
-            )[:100]
-            final_infos[normalized_name][ABILITY_STRING] = sorted(
-                abilities, key=lambda x: x[1], reverse=True
+    def _get_pokemon_information(self, smogon_stats_url, pkmn_names) -> dict:
+        store = self._stats_store(smogon_stats_url)
+        self.all_pkmn_counts = store.meta["all_pkmn_counts"]
+
+        # if `pkmn_names` is provided, only find data on pkmn in that list
+        if pkmn_names:
+            species = self._similar_species(store, pkmn_names)
+        else:
+            species = store.sorted_species
+            pkmn_names = set()
+
+        final_infos = {}
+        for normalized_name in species:
+            logger.debug(
+                "Adding {} to sets lookup for this battle".format(normalized_name)
             )
-            final_infos[normalized_name][TERA_TYPE_STRING] = sorted(
-                tera_types, key=lambda x: x[1], reverse=True
-            )[:6]
-            final_infos[normalized_name][EFFECTIVENESS] = matchup_effectiveness
+            summary = store.summary(normalized_name)
+            final_infos[normalized_name] = {
+                **summary,
+                EFFECTIVENESS: {
+                    counter_name: effectiveness
+                    for counter_name, effectiveness in summary[EFFECTIVENESS].items()
+                    if counter_name in pkmn_names
+                },
+            }
 
         return final_infos
 
@@ -837,47 +1303,45 @@ class _SmogonSets(PokemonSets):
 
         return True
 
+    def _compile_pkmn_sets(self, pkmn_information: dict) -> list[PokemonSet]:
+        compiled = []
+        for spread in pkmn_information[SPREADS_STRING]:
+            for ability in pkmn_information[ABILITY_STRING]:
+                for item in pkmn_information[ITEM_STRING]:
+                    for tera_type in pkmn_information[TERA_TYPE_STRING]:
+                        pkmn_set = PokemonSet(
+                            ability=ability[0],
+                            item=item[0],
+                            nature=spread[0],
+                            evs=tuple(int(i) for i in spread[1].split(",")),
+                            tera_type=tera_type[0],
+                            count=(ability[1] * item[1] * spread[2] * tera_type[1]),
+                        )
+                        if self._pokemon_set_makes_sense(pkmn_set):
+                            compiled.append(pkmn_set)
+        compiled.sort(key=lambda x: x.count, reverse=True)
+        return compiled
+
     def _initialize(self, raw_pkmn_sets: dict):
-        for pkmn, sets in raw_pkmn_sets.items():
-            self.pkmn_sets[pkmn] = []
-            for spread in sets[SPREADS_STRING]:
-                for ability in sets[ABILITY_STRING]:
-                    for item in sets[ITEM_STRING]:
-                        for tera_type in sets[TERA_TYPE_STRING]:
-                            pkmn_set = PokemonSet(
-                                ability=ability[0],
-                                item=item[0],
-                                nature=spread[0],
-                                evs=tuple(int(i) for i in spread[1].split(",")),
-                                tera_type=tera_type[0],
-                                count=(ability[1] * item[1] * spread[2] * tera_type[1]),
-                            )
-                            if self._pokemon_set_makes_sense(pkmn_set):
-                                self.pkmn_sets[pkmn].append(pkmn_set)
-            self.pkmn_sets[pkmn].sort(key=lambda x: x.count, reverse=True)
+        # always build into a new dict; see `_TeamDatasets.add_new_pokemon`
+        store = self._stats_store(self.current_pkmn_sets_url)
+        self.pkmn_sets = dict(self.pkmn_sets)
+        for pkmn in raw_pkmn_sets:
+            self.pkmn_sets[pkmn] = list(store.sets(pkmn))
 
     def initialize(self, pkmn_mode: str, pkmn_names: set[str]):
+        self._begin_view()
         self.pkmn_mode = pkmn_mode
         smogon_stats_url = self._get_smogon_stats_file_name(pkmn_mode)
-        if self.current_pkmn_sets_url != smogon_stats_url:
-            self.raw_pkmn_sets = self._get_pokemon_information(
-                smogon_stats_url, pkmn_names
-            )
-            self.current_pkmn_sets_url = smogon_stats_url
-        else:
-            new_pkmn_names = [p for p in pkmn_names if p not in self.raw_pkmn_sets]
-            if new_pkmn_names:
-                self.raw_pkmn_sets = self._get_pokemon_information(
-                    smogon_stats_url, pkmn_names
-                )
-
+        self.raw_pkmn_sets = self._get_pokemon_information(smogon_stats_url, pkmn_names)
+        self.current_pkmn_sets_url = smogon_stats_url
         self._initialize(self.raw_pkmn_sets)
 
     def add_new_pokemon(self, pkmn_name: str):
         pkmn_information = self._get_pokemon_information(
             self.current_pkmn_sets_url, {pkmn_name}
         )
-        self.raw_pkmn_sets.update(pkmn_information)
+        self.raw_pkmn_sets = {**self.raw_pkmn_sets, **pkmn_information}
         self._initialize(pkmn_information)
 
     def get_all_remaining_sets(self, pkmn: Pokemon) -> list[PredictedPokemonSet]:
@@ -0,0 +1,68 @@
+"""
+Compiles the cached JSON sets and smogon stats into the binary format read by
+`data.set_cache`. Run it after the JSON caches are downloaded or refreshed:
+
+    python data/scripts/compile_set_caches.py
+
+Stores whose JSON sources change later are detected as stale and fall back to
+the JSON files until this is run again.
+"""
+
+import json
+import os
+import sys
+import time
+
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+)
+
+from data.pkmn_sets import (  # noqa: E402
+    PKMN_SETS_CACHE_DIR,
+    SMOGON_CACHE_DIR,
+    RandomBattleTeamDatasets,
+    SmogonSets,
+    TeamDatasets,
+    compile_set_store,
+)
+
+
+def store_specs():
+    for file_name in sorted(os.listdir(PKMN_SETS_CACHE_DIR)):
+        path = os.path.join(PKMN_SETS_CACHE_DIR, file_name)
+        if file_name.endswith("randombattle.json"):
+            yield RandomBattleTeamDatasets._store_spec(file_name[: -len(".json")])
+        elif os.path.isdir(path):
+            TeamDatasets.pkmn_mode = file_name
+            if os.path.exists(os.path.join(path, "pokemon_full_sets.json")):
+                yield TeamDatasets._sets_store_spec()
+            if os.path.exists(os.path.join(path, "replay_moves.json")):
+                yield TeamDatasets._moves_store_spec()
+            factory_sets = os.path.join(path, "factory-sets.json")
+            if os.path.exists(factory_sets):
+                with open(factory_sets) as f:
+                    tier_names = list(json.load(f))
+                for tier_name in tier_names:
+                    yield TeamDatasets._battle_factory_store_spec(tier_name)
+
+    for file_name in sorted(os.listdir(SMOGON_CACHE_DIR)):
+        if file_name.endswith(".json"):
+            yield SmogonSets._stats_store_spec(file_name)
+
+
+def main():
+    for spec in store_specs():
+        start = time.perf_counter()
+        path = compile_set_store(**spec)
+        print(
+            "{:<40} -> {} ({:.1f} KiB, {:.2f}s)".format(
+                spec["key"],
+                os.path.relpath(path),
+                os.path.getsize(path) / 1024,
+                time.perf_counter() - start,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,379 @@
+"""
+Compiled, memory-mapped set caches.
+
+The JSON caches under `data/pkmn_sets_cache` and `data/smogon_stats_cache`
+are compiled (see `data/scripts/compile_set_caches.py`) into one binary file
+per set store:
+
+    header      magic, format version, kind, source fingerprint, counts
+    strings     interned move/item/ability/nature/type/species names
+    index       per species: name id and (offset, length) of each section
+    records     fixed-width structs, addressed through the index
+
+Files are opened with `mmap`, so every bot process on the host shares the
+same pages, and a species' records are only decoded when it is looked up.
+Readers return plain tuples; `data.pkmn_sets` turns them into set objects.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+
+PWD = os.path.dirname(os.path.abspath(__file__))
+COMPILED_SETS_CACHE_DIR = os.path.join(PWD, "compiled_sets_cache")
+
+SET_CACHE_MAGIC = b"FPSETS"
+# Bump whenever the layout below changes; older files are ignored
+SET_CACHE_FORMAT_VERSION = 1
+
+# What the sections of a species entry hold, per kind:
+#   KIND_SETS       a: sets
+#   KIND_MOVESETS   a: movesets
+#   KIND_STATS      a: smogon stats summary   b: usage/teammate counts
+KIND_SETS = 1
+KIND_MOVESETS = 2
+KIND_STATS = 3
+
+# magic, version, kind, source fingerprint, n strings, strings blob size, n species
+_HEADER = struct.Struct("<6sHH16sIII")
+# name id, then (offset, length) of sections a and b
+_INDEX_ENTRY = struct.Struct("<IIIII")
+# count, tera type, ability, item, nature, level, evs, number of moves
+_SET = struct.Struct("<dHHHHB6HB")
+# count, number of moves
+_MOVESET = struct.Struct("<dB")
+# nature, evs, weight
+_SPREAD = struct.Struct("<H6Hd")
+# name id, weight
+_WEIGHTED = struct.Struct("<Hd")
+_LENGTH = struct.Struct("<H")
+_RAW_COUNT = struct.Struct("<d")
+_STRING_OFFSET = struct.Struct("<I")
+
+_MAX_STRINGS = 0xFFFF
+
+
+def source_fingerprint(paths) -> bytes:
+    """Identifies the JSON files a compiled cache was built from."""
+    digest = hashlib.blake2b(digest_size=16)
+    for path in paths:
+        st = os.stat(path)
+        digest.update(
+            f"{os.path.abspath(path)}:{st.st_size}:{st.st_mtime_ns};".encode()
+        )
+    return digest.digest()
+
+
+def compiled_cache_path(store_key: str) -> str:
+    file_name = "".join(c if c.isalnum() or c in "-_." else "-" for c in store_key)
+    return os.path.join(COMPILED_SETS_CACHE_DIR, f"{file_name}.bin")
+
+
+class _StringTable:
+    def __init__(self):
+        self.ids = {None: 0}
+        self.strings = [""]
+
+    def id(self, s) -> int:
+        string_id = self.ids.get(s)
+        if string_id is None:
+            string_id = len(self.strings)
+            if string_id > _MAX_STRINGS:
+                raise ValueError("Too many distinct strings for a set cache")
+            self.ids[s] = string_id
+            self.strings.append(s)
+        return string_id
+
+
+def _pack_ids(ids) -> bytes:
+    return struct.pack(f"<{len(ids)}H", *ids)
+
+
+def _encode_weighted(pairs, strings: _StringTable) -> bytes:
+    out = [_LENGTH.pack(len(pairs))]
+    for name, weight in pairs:
+        out.append(_WEIGHTED.pack(strings.id(name), weight))
+    return b"".join(out)
+
+
+def _encode_sets(sets, strings: _StringTable) -> bytes:
+    """sets: (count, tera_type, ability, item, nature, level, evs, moves)"""
+    out = [_LENGTH.pack(len(sets))]
+    for count, tera_type, ability, item, nature, level, evs, moves in sets:
+        out.append(
+            _SET.pack(
+                count,
+                strings.id(tera_type),
+                strings.id(ability),
+                strings.id(item),
+                strings.id(nature),
+                level or 0,
+                *evs,
+                len(moves),
+            )
+        )
+        out.append(_pack_ids([strings.id(mv) for mv in moves]))
+    return b"".join(out)
+
+
+def _encode_movesets(movesets, strings: _StringTable) -> bytes:
+    """movesets: (count, moves)"""
+    out = [_LENGTH.pack(len(movesets))]
+    for count, moves in movesets:
+        out.append(_MOVESET.pack(count, len(moves)))
+        out.append(_pack_ids([strings.id(mv) for mv in moves]))
+    return b"".join(out)
+
+
+def _encode_stats(summary: dict, keys, strings: _StringTable) -> bytes:
+    """summary: {spreads: [(nature, evs_string, weight)], <key>: [(name, weight)]}"""
+    spreads_key, *weighted_keys, effectiveness_key = keys
+    spreads = summary[spreads_key]
+    out = [_LENGTH.pack(len(spreads))]
+    for nature, evs, weight in spreads:
+        out.append(
+            _SPREAD.pack(strings.id(nature), *(int(v) for v in evs.split(",")), weight)
+        )
+    for key in weighted_keys:
+        out.append(_encode_weighted(summary[key], strings))
+    out.append(_encode_weighted(list(summary[effectiveness_key].items()), strings))
+    return b"".join(out)
+
+
+def _encode_counts(raw_count, teammates: dict, strings: _StringTable) -> bytes:
+    return _RAW_COUNT.pack(raw_count) + _encode_weighted(
+        list(teammates.items()), strings
+    )
+
+
+def write_set_cache(
+    path: str,
+    kind: int,
+    fingerprint: bytes,
+    entries: dict,
+    stats_keys=None,
+):
+    """
+    entries: species -> (section_a, section_b) where, per kind,
+        KIND_SETS:     (sets, None)
+        KIND_MOVESETS: (movesets, None)
+        KIND_STATS:    (summary, (raw_count, teammates))
+    `stats_keys` orders the summary keys for KIND_STATS: the spreads key,
+    the weighted-list keys, then the effectiveness key.
+    """
+    strings = _StringTable()
+    records = []
+    index = []
+    offset = 0
+
+    def add(blob):
+        nonlocal offset
+        if blob is None:
+            return 0, 0
+        start = offset
+        records.append(blob)
+        offset += len(blob)
+        return start, len(blob)
+
+    for species in sorted(entries):
+        section_a, section_b = entries[species]
+        if kind == KIND_SETS:
+            a = _encode_sets(section_a, strings)
+            b = None
+        elif kind == KIND_MOVESETS:
+            a = _encode_movesets(section_a, strings)
+            b = None
+        elif kind == KIND_STATS:
+            a = _encode_stats(section_a, stats_keys, strings)
+            b = _encode_counts(*section_b, strings)
+        else:
+            raise ValueError(f"Unknown set cache kind: {kind}")
+        index.append((strings.id(species), *add(a), *add(b)))
+
+    encoded = [s.encode("utf-8") for s in strings.strings]
+    string_offsets = [0]
+    for s in encoded:
+        string_offsets.append(string_offsets[-1] + len(s))
+    strings_blob = b"".join(encoded)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(
+            _HEADER.pack(
+                SET_CACHE_MAGIC,
+                SET_CACHE_FORMAT_VERSION,
+                kind,
+                fingerprint,
+                len(encoded),
+                len(strings_blob),
+                len(index),
+            )
+        )
+        f.write(b"".join(_STRING_OFFSET.pack(o) for o in string_offsets))
+        f.write(strings_blob)
+        f.write(b"".join(_INDEX_ENTRY.pack(*entry) for entry in index))
+        for blob in records:
+            f.write(blob)
+    # readers that already mapped the old file keep their pages
+    os.replace(tmp_path, path)
+
+
+class MappedSetCache:
+    """Read-only view of a compiled set cache file."""
+
+    def __init__(self, path: str, kind: int, fingerprint: bytes = None):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.path = path
+        try:
+            self._read_header(kind, fingerprint)
+        except Exception:
+            self._mm.close()
+            raise
+
+    def _read_header(self, kind: int, fingerprint: bytes):
+        if len(self._mm) < _HEADER.size:
+            raise ValueError(f"Truncated set cache: {self.path}")
+        (
+            magic,
+            version,
+            file_kind,
+            file_fingerprint,
+            n_strings,
+            strings_size,
+            n_species,
+        ) = _HEADER.unpack_from(self._mm, 0)
+        if magic != SET_CACHE_MAGIC or version != SET_CACHE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported set cache format: {self.path}")
+        if file_kind != kind:
+            raise ValueError(f"Set cache {self.path} has kind {file_kind}, not {kind}")
+        if fingerprint is not None and file_fingerprint != fingerprint:
+            raise ValueError(f"Set cache {self.path} is stale")
+
+        self._string_offsets_at = _HEADER.size
+        self._strings_at = self._string_offsets_at + (n_strings + 1) * 4
+        index_at = self._strings_at + strings_size
+        self._records_at = index_at + n_species * _INDEX_ENTRY.size
+        self._strings = [None] * n_strings
+
+        self._index = {}
+        for i in range(n_species):
+            entry = _INDEX_ENTRY.unpack_from(self._mm, index_at + i * _INDEX_ENTRY.size)
+            self._index[self.string(entry[0])] = entry[1:]
+        self.species = tuple(self._index)  # written in sorted order
+
+    def close(self):
+        self._mm.close()
+
+    def __contains__(self, species: str) -> bool:
+        return species in self._index
+
+    def string(self, string_id: int):
+        if string_id == 0:
+            return None
+        s = self._strings[string_id]
+        if s is None:
+            start, end = struct.unpack_from(
+                "<II", self._mm, self._string_offsets_at + string_id * 4
+            )
+            s = self._mm[self._strings_at + start : self._strings_at + end].decode(
+                "utf-8"
+            )
+            self._strings[string_id] = s
+        return s
+
+    def _strings_at_offset(self, offset: int, n: int) -> list:
+        return [self.string(i) for i in struct.unpack_from(f"<{n}H", self._mm, offset)]
+
+    def _section(self, species: str, section: int):
+        entry = self._index.get(species)
+        if entry is None:
+            return None
+        start, length = entry[2 * section], entry[2 * section + 1]
+        if length == 0:
+            return None
+        return self._records_at + start
+
+    def _read_weighted(self, offset: int):
+        (n,) = _LENGTH.unpack_from(self._mm, offset)
+        offset += _LENGTH.size
+        pairs = []
+        for _ in range(n):
+            string_id, weight = _WEIGHTED.unpack_from(self._mm, offset)
+            pairs.append((self.string(string_id), weight))
+            offset += _WEIGHTED.size
+        return pairs, offset
+
+    def read_sets(self, species: str) -> list:
+        """[(count, tera_type, ability, item, nature, level, evs, moves), ...]"""
+        offset = self._section(species, 0)
+        if offset is None:
+            return []
+        (n,) = _LENGTH.unpack_from(self._mm, offset)
+        offset += _LENGTH.size
+        sets = []
+        for _ in range(n):
+            values = _SET.unpack_from(self._mm, offset)
+            offset += _SET.size
+            n_moves = values[-1]
+            moves = self._strings_at_offset(offset, n_moves)
+            offset += 2 * n_moves
+            sets.append(
+                (
+                    values[0],
+                    self.string(values[1]),
+                    self.string(values[2]),
+                    self.string(values[3]),
+                    self.string(values[4]),
+                    values[5] or None,
+                    values[6:12],
+                    moves,
+                )
+            )
+        return sets
+
+    def read_movesets(self, species: str) -> list:
+        """[(count, moves), ...]"""
+        offset = self._section(species, 0)
+        if offset is None:
+            return []
+        (n,) = _LENGTH.unpack_from(self._mm, offset)
+        offset += _LENGTH.size
+        movesets = []
+        for _ in range(n):
+            count, n_moves = _MOVESET.unpack_from(self._mm, offset)
+            offset += _MOVESET.size
+            movesets.append((count, self._strings_at_offset(offset, n_moves)))
+            offset += 2 * n_moves
+        return movesets
+
+    def read_stats(self, species: str, keys) -> dict:
+        """The summary written for KIND_STATS, keyed like `stats_keys`."""
+        offset = self._section(species, 0)
+        if offset is None:
+            return None
+        spreads_key, *weighted_keys, effectiveness_key = keys
+        (n,) = _LENGTH.unpack_from(self._mm, offset)
+        offset += _LENGTH.size
+        spreads = []
+        for _ in range(n):
+            nature_id, *evs, weight = _SPREAD.unpack_from(self._mm, offset)
+            spreads.append([self.string(nature_id), ",".join(map(str, evs)), weight])
+            offset += _SPREAD.size
+        summary = {spreads_key: spreads}
+        for key in weighted_keys:
+            summary[key], offset = self._read_weighted(offset)
+        effectiveness, offset = self._read_weighted(offset)
+        summary[effectiveness_key] = dict(effectiveness)
+        return summary
+
+    def read_counts(self, species: str):
+        """(raw_count, {teammate: count})"""
+        offset = self._section(species, 1)
+        if offset is None:
+            return None
+        (raw_count,) = _RAW_COUNT.unpack_from(self._mm, offset)
+        teammates, _ = self._read_weighted(offset + _RAW_COUNT.size)
+        return raw_count, dict(teammates)
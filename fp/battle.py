@@ -1,3 +1,4 @@
+import pickle
 from collections import defaultdict
 from collections import namedtuple
 
@@ -57,6 +58,128 @@ boost_multiplier_lookup = {
 }
 
 
+# Compact snapshot layout used by `to_state`/`from_state` (and pickling).
+# "value" fields are immutable or only ever replaced wholesale, so a snapshot
+# can share them; container fields are rebuilt so clones never alias state.
+_POKEMON_VALUE_FIELDS = (
+    "name",
+    "nickname",
+    "base_name",
+    "level",
+    "nature",
+    "evs",
+    "base_stats",
+    "max_hp",
+    "hp",
+    "substitute_hit",
+    "ability",
+    "types",
+    "item",
+    "removed_item",
+    "unknown_forme",
+    "zoroark_disguised_as",
+    "hp_at_switch_in",
+    "status_at_switch_in",
+    "terastallized",
+    "tera_type",
+    "forme_changed",
+    "original_ability",
+    "fainted",
+    "reviving",
+    "status",
+    "rest_turns",
+    "sleep_turns",
+    "knocked_off",
+    "can_mega_evo",
+    "can_ultra_burst",
+    "can_dynamax",
+    "can_terastallize",
+    "is_mega",
+    "mega_name",
+    "can_have_choice_item",
+    "item_inferred",
+    "gen_3_consecutive_sleep_talks",
+    "sample_weight",
+)
+_POKEMON_SET_FIELDS = (
+    "hidden_power_possibilities",
+    "moves_used_since_switch_in",
+    "impossible_items",
+    "impossible_abilities",
+)
+_POKEMON_COUNTER_FIELDS = (
+    "boosts",
+    "volatile_status_durations",
+    "opponent_move_uses",
+)
+_POKEMON_KNOWN_FIELDS = frozenset(
+    _POKEMON_VALUE_FIELDS
+    + _POKEMON_SET_FIELDS
+    + _POKEMON_COUNTER_FIELDS
+    + ("speed_range", "stats", "volatile_statuses", "moves")
+)
+
+_BATTLER_VALUE_FIELDS = (
+    "name",
+    "trapped",
+    "baton_passing",
+    "shed_tailing",
+    "wish",
+    "future_sight",
+    "account_name",
+    "team_dict",
+    "team_plan",
+)
+_BATTLER_KNOWN_FIELDS = frozenset(
+    _BATTLER_VALUE_FIELDS
+    + (
+        "active",
+        "reserve",
+        "side_conditions",
+        "last_selected_move",
+        "last_used_move",
+    )
+)
+
+_BATTLE_VALUE_FIELDS = (
+    "battle_tag",
+    "worker_id",
+    "weather",
+    "weather_turns_remaining",
+    "weather_source",
+    "field",
+    "field_turns_remaining",
+    "trick_room",
+    "trick_room_turns_remaining",
+    "gravity",
+    "team_preview",
+    "turn",
+    "started",
+    "rqid",
+    "force_switch",
+    "wait",
+    "battle_type",
+    "pokemon_format",
+    "generation",
+    "time_remaining",
+    "request_json",
+)
+_BATTLE_KNOWN_FIELDS = frozenset(
+    _BATTLE_VALUE_FIELDS + ("user", "opponent", "msg_list")
+)
+
+
+def _extra_state(attrs: dict, known_fields: frozenset) -> tuple:
+    # attributes attached outside __init__ (e.g. `index`, `gameplan`)
+    return tuple((k, v) for k, v in attrs.items() if k not in known_fields)
+
+
+def _counter(items) -> defaultdict:
+    d = defaultdict(int)
+    d.update(items)
+    return d
+
+
 class Battle:
     def __init__(self, battle_tag):
         self.battle_tag = battle_tag
@@ -179,6 +302,67 @@ class Battle:
             "opponent": _snapshot_battler(self.opponent),
         }
 
+    def to_state(self) -> tuple:
+        """
+        Compact, picklable snapshot of the whole battle (see `from_state`).
+        Much cheaper than `deepcopy` and safe to ship to worker processes.
+        """
+        attrs = self.__dict__
+        return (
+            tuple(attrs.get(f) for f in _BATTLE_VALUE_FIELDS),
+            self.user.to_state(),
+            self.opponent.to_state(),
+            tuple(self.msg_list),
+            _extra_state(attrs, _BATTLE_KNOWN_FIELDS),
+        )
+
+    def _load_state(self, state: tuple):
+        values, user, opponent, msg_list, extra = state
+        attrs = self.__dict__
+        attrs.update(zip(_BATTLE_VALUE_FIELDS, values))
+        self.user = Battler.from_state(user)
+        self.opponent = Battler.from_state(opponent)
+        self.msg_list = list(msg_list)
+        attrs.update(extra)
+
+    @classmethod
+    def from_state(cls, state: tuple) -> "Battle":
+        battle = cls.__new__(cls)
+        battle._load_state(state)
+        return battle
+
+    def clone(self) -> "Battle":
+        """
+        Independent copy of the battle. Every Battler/Pokemon/Move and their
+        mutable containers are rebuilt; read-only payloads (request_json,
+        team_dict, team_plan) are shared.
+        """
+        return Battle.from_state(self.to_state())
+
+    def fork_opponent(self) -> "Battle":
+        """
+        Copy-on-write copy used for world sampling: only the opponent side is
+        rebuilt. The user side, message log and request payload are shared
+        with this battle and must be treated as read-only by the caller.
+        """
+        battle = Battle.__new__(Battle)
+        battle.__dict__.update(self.__dict__)
+        battle.opponent = Battler.from_state(self.opponent.to_state())
+        return battle
+
+    def to_bytes(self) -> bytes:
+        return pickle.dumps(self.to_state(), protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Battle":
+        return cls.from_state(pickle.loads(data))
+
+    def __getstate__(self):
+        return self.to_state()
+
+    def __setstate__(self, state):
+        self._load_state(state)
+
     def mega_evolve_possible(self):
         return (
             any(g in self.generation for g in constants.MEGA_EVOLVE_GENERATIONS)
@@ -238,7 +422,7 @@ class Battler:
     def __init__(self):
         self.active = None
         self.reserve = []
-        self.side_conditions = defaultdict(lambda: 0)
+        self.side_conditions = defaultdict(int)
 
         self.name = None
         self.trapped = False
@@ -259,6 +443,49 @@ class Battler:
         self.last_selected_move = LastUsedMove("", "", 0)
         self.last_used_move = LastUsedMove("", "", 0)
 
+    def to_state(self) -> tuple:
+        attrs = self.__dict__
+        return (
+            tuple(attrs.get(f) for f in _BATTLER_VALUE_FIELDS),
+            self.active.to_state() if self.active is not None else None,
+            tuple(p.to_state() for p in self.reserve),
+            tuple(self.side_conditions.items()),
+            tuple(self.last_selected_move),
+            tuple(self.last_used_move),
+            _extra_state(attrs, _BATTLER_KNOWN_FIELDS),
+        )
+
+    def _load_state(self, state: tuple):
+        (
+            values,
+            active,
+            reserve,
+            side_conditions,
+            last_selected_move,
+            last_used_move,
+            extra,
+        ) = state
+        attrs = self.__dict__
+        attrs.update(zip(_BATTLER_VALUE_FIELDS, values))
+        self.active = Pokemon.from_state(active) if active is not None else None
+        self.reserve = [Pokemon.from_state(p) for p in reserve]
+        self.side_conditions = _counter(side_conditions)
+        self.last_selected_move = LastUsedMove(*last_selected_move)
+        self.last_used_move = LastUsedMove(*last_used_move)
+        attrs.update(extra)
+
+    @classmethod
+    def from_state(cls, state: tuple) -> "Battler":
+        battler = cls.__new__(cls)
+        battler._load_state(state)
+        return battler
+
+    def __getstate__(self):
+        return self.to_state()
+
+    def __setstate__(self, state):
+        self._load_state(state)
+
     def possible_mega_evolutions(self):
         result = {}
         for pkmn in self.reserve + [self.active]:
@@ -717,8 +944,8 @@ class Pokemon:
         self.opponent_move_uses = defaultdict(int)
         self.status = None
         self.volatile_statuses = []
-        self.volatile_status_durations = defaultdict(lambda: 0)
-        self.boosts = defaultdict(lambda: 0)
+        self.volatile_status_durations = defaultdict(int)
+        self.boosts = defaultdict(int)
         self.rest_turns = 0
         self.sleep_turns = 0
         self.knocked_off = False
@@ -735,6 +962,54 @@ class Pokemon:
         self.impossible_abilities = set()
         self.sample_weight = 1.0
 
+    def to_state(self) -> tuple:
+        attrs = self.__dict__
+        return (
+            tuple(attrs.get(f) for f in _POKEMON_VALUE_FIELDS),
+            tuple(frozenset(attrs.get(f) or ()) for f in _POKEMON_SET_FIELDS),
+            tuple(tuple((attrs.get(f) or {}).items()) for f in _POKEMON_COUNTER_FIELDS),
+            tuple(self.speed_range),
+            tuple(self.stats.items()),
+            tuple(self.volatile_statuses),
+            tuple(m.to_state() for m in self.moves),
+            _extra_state(attrs, _POKEMON_KNOWN_FIELDS),
+        )
+
+    def _load_state(self, state: tuple):
+        (
+            values,
+            sets,
+            counters,
+            speed_range,
+            stats,
+            volatile_statuses,
+            moves,
+            extra,
+        ) = state
+        attrs = self.__dict__
+        attrs.update(zip(_POKEMON_VALUE_FIELDS, values))
+        for f, v in zip(_POKEMON_SET_FIELDS, sets):
+            attrs[f] = set(v)
+        for f, v in zip(_POKEMON_COUNTER_FIELDS, counters):
+            attrs[f] = _counter(v)
+        self.speed_range = StatRange(*speed_range)
+        self.stats = dict(stats)
+        self.volatile_statuses = list(volatile_statuses)
+        self.moves = [Move.from_state(m) for m in moves]
+        attrs.update(extra)
+
+    @classmethod
+    def from_state(cls, state: tuple) -> "Pokemon":
+        pkmn = cls.__new__(cls)
+        pkmn._load_state(state)
+        return pkmn
+
+    def __getstate__(self):
+        return self.to_state()
+
+    def __setstate__(self, state):
+        self._load_state(state)
+
     def get_mega_pkmn_info(self) -> list[tuple[str, str]]:
         # For avoiding Legends ZA megas: omit mega pokemon in the pokedex that have "gen": 9
         # Come back and undo this when Legends ZA megas are available in standard formats
@@ -926,6 +1201,15 @@ class Move:
         self.can_z = False
         self.current_pp = self.max_pp
 
+    def to_state(self) -> tuple:
+        return (self.name, self.max_pp, self.disabled, self.can_z, self.current_pp)
+
+    @classmethod
+    def from_state(cls, state: tuple) -> "Move":
+        mv = cls.__new__(cls)
+        mv.name, mv.max_pp, mv.disabled, mv.can_z, mv.current_pp = state
+        return mv
+
     def __eq__(self, other):
         return self.name == other.name
 
@@ -1,5 +1,10 @@
 import re
+import os
 import json
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy, copy
 import logging
 
@@ -17,7 +22,10 @@ from fp.battle import Pokemon, Battler, Battle
 from fp.battle import LastUsedMove
 from fp.battle import DamageDealt
 from fp.battle import StatRange
-from fp.search.poke_engine_helpers import poke_engine_get_damage_rolls
+from fp.search.poke_engine_helpers import (
+    poke_engine_get_damage_rolls,
+    poke_engine_get_damage_rolls_batch,
+)
 from fp.helpers import normalize_name, type_effectiveness_modifier
 from fp.helpers import get_pokemon_info_from_condition
 from fp.helpers import calculate_stats
@@ -28,10 +36,17 @@ from fp.helpers import (
 )
 from fp.battle import boost_multiplier_lookup
 from fp.movepool_tracker import record_move
+from fp.search.features import invalidate_features, protocol_invalidations
+from fp.protocol import ProtocolEvent, TurnEvents, parse_line, turn_events
 
 
 logger = logging.getLogger(__name__)
 
+# Threads running the reverse damage calc checks of `async_update_battle`
+DATASET_CHECK_WORKERS = max(1, int(os.getenv("DATASET_CHECK_WORKERS", "2")))
+_dataset_check_executor: ThreadPoolExecutor | None = None
+_dataset_check_executor_lock = threading.Lock()
+
 MOVE_END_STRINGS = {"move", "switch", "upkeep", "-miss", ""}
 ITEMS_REVEALED_ON_SWITCH_IN = [
     # boosterenergy technically only revealed if pkmn has quarkdrive/protosynthesis
@@ -197,17 +212,18 @@ def is_opponent(battle, split_msg):
 
 
 def get_move_information(m):
-    # Given a |move| line from the PS protocol, extract the user of the move and the move object
+    # Given a |move| line from the PS protocol (or its parsed event), extract
+    # the user of the move and the move object
+    split_move_line = m.parts if isinstance(m, ProtocolEvent) else m.split("|")
     try:
-        split_move_line = m.split("|")
         return split_move_line[2], all_move_json[normalize_name(split_move_line[3])]
     except KeyError:
         logger.warning(
             "Unknown move {} - using standard 0 priority move".format(
-                normalize_name(m.split("|")[3])
+                normalize_name(split_move_line[3])
             )
         )
-        return m.split("|")[2], {constants.ID: "unknown", constants.PRIORITY: 0}
+        return split_move_line[2], {constants.ID: "unknown", constants.PRIORITY: 0}
 
 
 def request(battle, split_msg):
@@ -227,6 +243,7 @@ def request(battle, split_msg):
             battle.wait = False
 
         battle.request_json = battle_json
+        invalidate_features(battle, protocol_invalidations(["request"]))
 
 
 def _parse_time_left_seconds(text: str) -> int | None:
@@ -2795,6 +2812,22 @@ def noinit(battle, split_msg):
         logger.info("Renamed battle to {}".format(battle.battle_tag))
 
 
+def _events(lines):
+    """Events of `lines`, which may be already parsed."""
+    if isinstance(lines, TurnEvents):
+        return lines
+    return (parse_line(line, i) for i, line in enumerate(lines))
+
+
+def _switched_or_cant_move(events: TurnEvents) -> bool:
+    """A switch, a `cant` or a confusion self-hit happened in `events`."""
+    return (
+        events.has("switch")
+        or events.has("cant")
+        or any(e.line.endswith("confusion") for e in events.of("-activate"))
+    )
+
+
 def check_speed_ranges(battle, msg_lines):
     """
     Intention:
@@ -2825,33 +2858,25 @@ def check_speed_ranges(battle, msg_lines):
     if battle.user.active is None or battle.opponent.active is None:
         return
 
-    for ln in msg_lines:
-        # If either side switched this turn - don't do this check
-        if ln.startswith("|switch|"):
-            return
-
-        # if anyone got `cant` or hit themselves in confusion
-        # skip this check as we don't know if they used a priority move
-        if ln.startswith("|cant|") or (
-            ln.startswith("|-activate|") and ln.endswith("confusion")
-        ):
-            return
-
-        # If anyone used a custapberry, skip this check
-        if ln.startswith("|-enditem|") and (
-            "custapberry" in normalize_name(ln) or "Custap Berry" in ln
-        ):
-            return
+    events = turn_events(msg_lines)
+    # If either side switched this turn - don't do this check
+    # if anyone got `cant` or hit themselves in confusion
+    # skip this check as we don't know if they used a priority move
+    if _switched_or_cant_move(events):
+        return
 
-        # If anyone had quick claw activate, skip this check
-        if "quickclaw" in normalize_name(ln) or "Quick Claw" in ln:
-            return
+    # If anyone used a custapberry, skip this check
+    if any(
+        "custapberry" in normalize_name(e.line) or "Custap Berry" in e.line
+        for e in events.of("-enditem")
+    ):
+        return
 
-        # If anyone had quick claw activate, skip this check
-        if "quickdraw" in normalize_name(ln) or "Quick Draw" in ln:
-            return
+    # If anyone had quick claw or quick draw activate, skip this check
+    if events.mentions("Quick Claw", "Quick Draw"):
+        return
 
-    moves = [get_move_information(m) for m in msg_lines if m.startswith("|move|")]
+    moves = [get_move_information(e) for e in events.of("move")]
     number_of_moves = len(moves)
     if number_of_moves not in [1, 2]:
         return
@@ -2899,14 +2924,10 @@ def check_speed_ranges(battle, msg_lines):
     ):
         return
 
-    battle_copy = deepcopy(battle)
-    battle_copy_for_stats = deepcopy(battle_copy)
-    battle_copy.user.active.status = battle_copy_for_stats.user.active.stats
-
     speed_threshold = int(
-        boost_multiplier_lookup[battle_copy.user.active.boosts[constants.SPEED]]
-        * battle_copy.user.active.stats[constants.SPEED]
-        / boost_multiplier_lookup[battle_copy.opponent.active.boosts[constants.SPEED]]
+        boost_multiplier_lookup[battle.user.active.boosts[constants.SPEED]]
+        * battle.user.active.stats[constants.SPEED]
+        / boost_multiplier_lookup[battle.opponent.active.boosts[constants.SPEED]]
     )
 
     if "protosynthesisspe" in battle.opponent.active.volatile_statuses:
@@ -3056,26 +3077,24 @@ def check_choicescarf_from_ability_order(battle, msg_lines):
     if can_have_speed_modified(battle, opp):
         return
 
+    events = turn_events(msg_lines)
     switched_sides = set()
+    for event in events.of("switch"):
+        if len(event.parts) >= 3:
+            side_id = _side_id_from_protocol_ident(event.parts[2])
+            if side_id:
+                switched_sides.add(side_id)
+
     ability_events = []
-    for idx, ln in enumerate(msg_lines):
-        if ln.startswith("|switch|"):
-            split_ln = ln.split("|")
-            if len(split_ln) >= 3:
-                side_id = _side_id_from_protocol_ident(split_ln[2])
-                if side_id:
-                    switched_sides.add(side_id)
-        if not ln.startswith("|-ability|"):
+    for event in events.of("-ability"):
+        if len(event.parts) < 4:
             continue
-        split_ln = ln.split("|")
-        if len(split_ln) < 4:
-            continue
-        side_id = _side_id_from_protocol_ident(split_ln[2])
+        side_id = _side_id_from_protocol_ident(event.parts[2])
         if side_id not in {battle.user.name, battle.opponent.name}:
             continue
-        ability = normalize_name(split_ln[3])
+        ability = normalize_name(event.parts[3])
         if ability in ABILITIES_SAFE_FOR_SPEED_ORDER_INFERENCE:
-            ability_events.append((idx, side_id, ability))
+            ability_events.append((event.index, side_id, ability))
 
     if battle.user.name not in switched_sides or battle.opponent.name not in switched_sides:
         return
@@ -3089,7 +3108,7 @@ def check_choicescarf_from_ability_order(battle, msg_lines):
     if opp_event[0] >= user_event[0]:
         return
 
-    battle_copy = deepcopy(battle)
+    battle_copy = battle.clone()
     # Compute opponent's max plausible speed WITHOUT scarf.
     battle_copy.opponent.active.set_spread("jolly", "0,0,0,0,0,252")
     if battle_copy.opponent.active.item == constants.UNKNOWN_ITEM:
@@ -3112,17 +3131,16 @@ def check_choicescarf_from_ability_order(battle, msg_lines):
 
 
 def check_choicescarf(battle, msg_lines):
+    events = turn_events(msg_lines)
     # If either side switched this turn - don't do this check
-    if any(
-        battle.generation in ["gen1", "gen2", "gen3"]
-        or ln.startswith("|switch|")
-        or ln.startswith("|cant|")
-        or (ln.startswith("|-activate|") and ln.endswith("confusion"))
-        for ln in msg_lines
-    ) or battle.user.last_selected_move.move.startswith("switch "):
+    if (
+        (len(events) and battle.generation in ["gen1", "gen2", "gen3"])
+        or _switched_or_cant_move(events)
+        or battle.user.last_selected_move.move.startswith("switch ")
+    ):
         return
 
-    moves = [get_move_information(m) for m in msg_lines if m.startswith("|move|")]
+    moves = [get_move_information(e) for e in events.of("move")]
     number_of_moves = len(moves)
 
     # if the bot went first we cannot ever infer a choicescarf
@@ -3140,7 +3158,6 @@ def check_choicescarf(battle, msg_lines):
     if moves[0][1][constants.PRIORITY] != moves[1][1][constants.PRIORITY]:
         return
 
-    battle_copy = deepcopy(battle)
     if (
         battle.opponent.active is None
         or battle.opponent.active.item != constants.UNKNOWN_ITEM
@@ -3153,12 +3170,13 @@ def check_choicescarf(battle, msg_lines):
             battle, battle.user.active, moves[1][1][constants.ID]
         )
         or (
-            battle_copy.user.active.ability == "unburden"
-            and battle_copy.user.active.item is None
+            battle.user.active.ability == "unburden"
+            and battle.user.active.item is None
         )
     ):
         return
 
+    battle_copy = battle.clone()
     if battle.battle_type == BattleType.RANDOM_BATTLE:
         battle_copy.opponent.active.set_spread(
             "serious", "85,85,85,85,85,85"
@@ -3201,8 +3219,8 @@ def get_damage_dealt(battle, split_msg, next_messages):
         attacking_side = battle.user
         defending_side = battle.opponent
 
-    for line in next_messages:
-        next_line_split = line.split("|")
+    for event in _events(next_messages):
+        next_line_split = event.parts
         # if one of these strings appears in index 1 then
         # exit out since we are done with this pokemon's move
         if len(next_line_split) < 2 or next_line_split[1] in MOVE_END_STRINGS:
@@ -3255,7 +3273,8 @@ def get_damage_dealt(battle, split_msg, next_messages):
 
 
 def _do_check(
-    battle,
+    known_ability,
+    known_item,
     battle_copy,
     possibilites,
     check_type,
@@ -3266,43 +3285,54 @@ def _do_check(
 ):
     actual_damage_dealt = damage_dealt.percent_damage * battle_copy.user.active.max_hp
 
-    indicies_to_remove = []
-    num_starting_possibilites = len(possibilites)
-    for i in range(num_starting_possibilites):
-        p = possibilites[i]
+    # the engine state is built once for all candidates; only the opponent's
+    # active ability, item and spread vary
+    candidates = []
+    for p in possibilites:
         if isinstance(p, PredictedPokemonSet):
             p = p.pkmn_set
+        candidates.append(
+            (
+                known_ability or p.ability,
+                p.item if known_item == constants.UNKNOWN_ITEM else known_item,
+                p.nature,
+                tuple(p.evs),
+            )
+        )
 
-        if not battle.opponent.active.ability:
-            battle_copy.opponent.active.ability = p.ability
-        if battle.opponent.active.item == constants.UNKNOWN_ITEM:
-            battle_copy.opponent.active.item = p.item
-        battle_copy.opponent.active.set_spread(
-            p.nature, ",".join(str(x) for x in p.evs)
+    if check_type == "damage_received":
+        if bot_went_first:
+            opponent_move = constants.DO_NOTHING_MOVE
+        else:
+            opponent_move = battle_copy.opponent.last_used_move.move
+        rolls = poke_engine_get_damage_rolls_batch(
+            battle_copy, candidates, damage_dealt.move, opponent_move, bot_went_first
         )
+    elif check_type == "damage_dealt":
+        rolls = poke_engine_get_damage_rolls_batch(
+            battle_copy,
+            candidates,
+            battle_copy.user.last_selected_move.move,
+            damage_dealt.move,
+            bot_went_first,
+        )
+    else:
+        raise ValueError("Invalid check_type: {}".format(check_type))
 
+    indicies_to_remove = []
+    num_starting_possibilites = len(possibilites)
+    for i in range(num_starting_possibilites):
+        p = possibilites[i]
         if check_type == "damage_received":
+            damage = rolls[i][0]
+            battle_copy.opponent.active.set_spread(
+                candidates[i][2], list(candidates[i][3])
+            )
             actual_damage_dealt = (
                 damage_dealt.percent_damage * battle_copy.opponent.active.max_hp
             )
-
-            if bot_went_first:
-                opponent_move = constants.DO_NOTHING_MOVE
-            else:
-                opponent_move = battle_copy.opponent.last_used_move.move
-
-            damage, _ = poke_engine_get_damage_rolls(
-                battle_copy, damage_dealt.move, opponent_move, bot_went_first
-            )
-        elif check_type == "damage_dealt":
-            _, damage = poke_engine_get_damage_rolls(
-                battle_copy,
-                battle_copy.user.last_selected_move.move,
-                damage_dealt.move,
-                bot_went_first,
-            )
         else:
-            raise ValueError("Invalid check_type: {}".format(check_type))
+            damage = rolls[i][1]
 
         if damage_dealt.crit:
             max_damage = damage[1]
@@ -3336,6 +3366,20 @@ def update_dataset_possibilities(
     damage_dealt,
     check_type,
 ):
+    check = prepare_dataset_check(battle, damage_dealt, check_type)
+    if check is not None:
+        check()
+
+
+def prepare_dataset_check(battle, damage_dealt, check_type):
+    """
+    Snapshot what the reverse damage calc of `damage_dealt` needs and return
+    a callable running it against the current set possibilities, or None if
+    the damage tells nothing about the opponent's set.
+
+    The callable only reads the snapshot, so it can run after `battle` has
+    moved on, e.g. in `run_dataset_checks`.
+    """
     if (
         battle.wait
         or battle.generation in {"gen1", "gen2"}
@@ -3420,32 +3464,46 @@ def update_dataset_possibilities(
     logger.debug(f"{check_lower_bound=}")
     logger.debug(f"{bot_went_first=}")
 
-    _do_check(
-        battle,
-        battle_copy,
-        possibilites,
-        check_type,
-        damage_dealt,
-        bot_went_first,
-        check_lower_bound,
-        allow_emptying=allow_emptying,
-    )
+    known_ability = battle.opponent.active.ability
+    known_item = battle.opponent.active.item
 
-    if smogon_possibilities is not None:
+    def check():
         _do_check(
-            battle,
+            known_ability,
+            known_item,
             battle_copy,
-            smogon_possibilities,
+            possibilites,
             check_type,
             damage_dealt,
             bot_went_first,
             check_lower_bound,
-            allow_emptying=False,  # never completely empty smogon stats
+            allow_emptying=allow_emptying,
         )
 
+        if smogon_possibilities is not None:
+            _do_check(
+                known_ability,
+                known_item,
+                battle_copy,
+                smogon_possibilities,
+                check_type,
+                damage_dealt,
+                bot_went_first,
+                check_lower_bound,
+                allow_emptying=False,  # never completely empty smogon stats
+            )
+
+    return check
+
+
+def run_dataset_checks(checks):
+    for check in checks:
+        check()
+
 
 def check_heavydutyboots(battle, msg_lines):
     side_to_check = battle.opponent
+    events = turn_events(msg_lines)
 
     if (
         battle.generation not in ["gen8", "gen9"]
@@ -3460,8 +3518,8 @@ def check_heavydutyboots(battle, msg_lines):
 
     if side_to_check.side_conditions[constants.STEALTH_ROCK] > 0:
         pkmn_took_stealthrock_damage = False
-        for line in msg_lines:
-            split_line = line.split("|")
+        for event in events.of("-damage"):
+            split_line = event.parts
 
             # |-damage|p2a: Weedle|88/100|[from] Stealth Rock
             if (
@@ -3495,8 +3553,8 @@ def check_heavydutyboots(battle, msg_lines):
         and side_to_check.active.ability != "levitate"
     ):
         pkmn_took_spikes_damage = False
-        for line in msg_lines:
-            split_line = line.split("|")
+        for event in events.of("-damage"):
+            split_line = event.parts
 
             # |-damage|p2a: Weedle|88/100|[from] Spikes
             if (
@@ -3533,8 +3591,8 @@ def check_heavydutyboots(battle, msg_lines):
         and side_to_check.active.ability not in constants.IMMUNE_TO_POISON_ABILITIES
     ):
         pkmn_took_toxicspikes_poison = False
-        for line in msg_lines:
-            split_line = line.split("|")
+        for event in events:
+            split_line = event.parts
 
             # a pokemon can be toxic-ed from sources other than toxicspikes
             # stopping at one of these strings ensures those other sources aren't considered
@@ -3574,8 +3632,8 @@ def check_heavydutyboots(battle, msg_lines):
         ]
     ):
         pkmn_was_affected_by_stickyweb = False
-        for line in msg_lines:
-            split_line = line.split("|")
+        for event in events.of("-activate"):
+            split_line = event.parts
 
             # |-activate|p2a: Gengar|move: Sticky Web
             if (
@@ -3632,8 +3690,8 @@ def check_rocky_helmet(battle, split_msg, msg_lines):
     took_helmet_damage = False
     valid_hit = True
     
-    for line in msg_lines:
-        s = line.split("|")
+    for event in _events(msg_lines):
+        s = event.parts
         if len(s) < 2:
             continue
             
@@ -3650,7 +3708,7 @@ def check_rocky_helmet(battle, split_msg, msg_lines):
         if s[1] in ["-miss", "-fail", "-immune", "cant"]:
              valid_hit = False
              break
-        if s[1] == "-activate" and "Protect" in line:
+        if s[1] == "-activate" and "Protect" in event.line:
              valid_hit = False
              break
 
@@ -3664,7 +3722,7 @@ def check_rocky_helmet(battle, split_msg, msg_lines):
          opponent.impossible_items.add("rockyhelmet")
 
 
-def update_battle(battle: Battle, msg: str):
+def update_battle(battle: Battle, msg: str, dataset_checks: list | None = None):
     msg_lines = msg.split("\n")
     for line in msg_lines:
         split_msg = line.split("|")
@@ -3674,7 +3732,7 @@ def update_battle(battle: Battle, msg: str):
         action = split_msg[1].strip()
         if action == "request":
             request(battle, split_msg)
-            process_battle_updates(battle)
+            process_battle_updates(battle, dataset_checks)
             return not battle.wait
         else:
             battle.msg_list.append(line)
@@ -3682,92 +3740,138 @@ def update_battle(battle: Battle, msg: str):
     return False
 
 
-def process_battle_updates(battle: Battle):
-    msg_lines = battle.msg_list
-    check_speed_ranges(battle, msg_lines)
-    for i, line in enumerate(msg_lines):
-        split_msg = line.split("|")
-        if len(split_msg) < 2:
-            continue
+# Protocol action -> handler applying it to the battle
+BATTLE_MODIFIERS = {
+    "switch": switch,
+    "faint": faint,
+    "-fail": fail,
+    "drag": drag,
+    "-heal": heal_or_damage,
+    "-damage": heal_or_damage,
+    "-sethp": sethp,
+    "move": move,
+    "-setboost": setboost,
+    "-boost": boost,
+    "-unboost": unboost,
+    "-status": status,
+    "-activate": activate,
+    "-anim": anim,
+    "-prepare": prepare,
+    "-start": start_volatile_status,
+    "-singlemove": start_volatile_status,
+    "-end": end_volatile_status,
+    "-curestatus": curestatus,
+    "-cureteam": cureteam,
+    "-weather": weather,
+    "-fieldstart": fieldstart,
+    "-fieldend": fieldend,
+    "-sidestart": sidestart,
+    "-sideend": sideend,
+    "-swapsideconditions": swapsideconditions,
+    "-item": set_item,
+    "-enditem": remove_item,
+    "-immune": immune,
+    "-ability": update_ability,
+    "detailschange": form_change,
+    "replace": illusion_end,
+    "-formechange": form_change,
+    "-transform": transform,
+    "-mega": mega,
+    "-terastallize": terastallize,
+    "-zpower": zpower,
+    "-clearnegativeboost": clearnegativeboost,
+    "-clearboost": clearboost,
+    "-clearallboost": clearallboost,
+    "-singleturn": singleturn,
+    "-mustrecharge": mustrecharge,
+    "upkeep": upkeep,
+    "cant": cant,
+    "inactive": inactive,
+    "inactiveoff": inactiveoff,
+    "turn": turn,
+    "noinit": noinit,
+}
 
-        action = split_msg[1].strip()
 
-        battle_modifiers_lookup = {
-            "switch": switch,
-            "faint": faint,
-            "-fail": fail,
-            "drag": drag,
-            "-heal": heal_or_damage,
-            "-damage": heal_or_damage,
-            "-sethp": sethp,
-            "move": move,
-            "-setboost": setboost,
-            "-boost": boost,
-            "-unboost": unboost,
-            "-status": status,
-            "-activate": activate,
-            "-anim": anim,
-            "-prepare": prepare,
-            "-start": start_volatile_status,
-            "-singlemove": start_volatile_status,
-            "-end": end_volatile_status,
-            "-curestatus": curestatus,
-            "-cureteam": cureteam,
-            "-weather": weather,
-            "-fieldstart": fieldstart,
-            "-fieldend": fieldend,
-            "-sidestart": sidestart,
-            "-sideend": sideend,
-            "-swapsideconditions": swapsideconditions,
-            "-item": set_item,
-            "-enditem": remove_item,
-            "-immune": immune,
-            "-ability": update_ability,
-            "detailschange": form_change,
-            "replace": illusion_end,
-            "-formechange": form_change,
-            "-transform": transform,
-            "-mega": mega,
-            "-terastallize": terastallize,
-            "-zpower": zpower,
-            "-clearnegativeboost": clearnegativeboost,
-            "-clearboost": clearboost,
-            "-clearallboost": clearallboost,
-            "-singleturn": singleturn,
-            "-mustrecharge": mustrecharge,
-            "upkeep": upkeep,
-            "cant": cant,
-            "inactive": inactive,
-            "inactiveoff": inactiveoff,
-            "turn": turn,
-            "noinit": noinit,
-        }
-
-        function_to_call = battle_modifiers_lookup.get(action)
+def _check_dataset_possibilities(battle, damage_dealt, check_type, dataset_checks):
+    if dataset_checks is None:
+        update_dataset_possibilities(battle, damage_dealt, check_type)
+        return
+    check = prepare_dataset_check(battle, damage_dealt, check_type)
+    if check is not None:
+        dataset_checks.append(check)
+
+
+def process_battle_updates(battle: Battle, dataset_checks: list | None = None):
+    """
+    Apply the held protocol lines to `battle`.
+
+    Reverse damage calc checks of the candidate sets run inline unless a
+    `dataset_checks` list is given; they are then appended to it, in order,
+    for the caller to run with `run_dataset_checks`.
+    """
+    events = TurnEvents(battle.msg_list)
+    check_speed_ranges(battle, events)
+    for event in events:
+        action = event.action
+        if action is None:
+            continue
+        split_msg = event.parts
+
+        function_to_call = BATTLE_MODIFIERS.get(action)
         if function_to_call is not None:
             function_to_call(battle, split_msg)
 
         if action == "move" and is_opponent(battle, split_msg):
             if normalize_name(split_msg[3].strip()) == constants.HIDDEN_POWER:
-                check_opponent_hiddenpower(battle, msg_lines[i + 1])
-            check_choicescarf(battle, msg_lines)
-            damage_dealt = get_damage_dealt(battle, split_msg, msg_lines[i + 1 :])
+                check_opponent_hiddenpower(battle, events[event.index + 1].line)
+            check_choicescarf(battle, events)
+            damage_dealt = get_damage_dealt(battle, split_msg, events.after(event.index))
             if damage_dealt:
-                update_dataset_possibilities(battle, damage_dealt, "damage_dealt")
+                _check_dataset_possibilities(
+                    battle, damage_dealt, "damage_dealt", dataset_checks
+                )
 
         elif action == "move" and not is_opponent(battle, split_msg):
-            damage_dealt = get_damage_dealt(battle, split_msg, msg_lines[i + 1 :])
+            damage_dealt = get_damage_dealt(battle, split_msg, events.after(event.index))
             if damage_dealt:
-                update_dataset_possibilities(battle, damage_dealt, "damage_received")
+                _check_dataset_possibilities(
+                    battle, damage_dealt, "damage_received", dataset_checks
+                )
 
-            check_rocky_helmet(battle, split_msg, msg_lines[i + 1 :])
+            check_rocky_helmet(battle, split_msg, events.after(event.index))
 
         elif action == "switch" and is_opponent(battle, split_msg):
-            check_heavydutyboots(battle, msg_lines[i + 1 :])
+            check_heavydutyboots(battle, events.after(event.index))
 
-    check_choicescarf_from_ability_order(battle, msg_lines)
+    check_choicescarf_from_ability_order(battle, events)
     battle.msg_list.clear()
+    invalidate_features(battle, protocol_invalidations(events.actions()))
+
+
+def _get_dataset_check_executor():
+    global _dataset_check_executor
+    with _dataset_check_executor_lock:
+        if _dataset_check_executor is None:
+            _dataset_check_executor = ThreadPoolExecutor(
+                max_workers=DATASET_CHECK_WORKERS,
+                thread_name_prefix="dataset-check",
+            )
+        return _dataset_check_executor
 
 
 async def async_update_battle(battle, msg):
-    return update_battle(battle, msg)
+    dataset_checks = []
+    action_required = update_battle(battle, msg, dataset_checks)
+    if dataset_checks:
+        # a sweep over every candidate set can take a while; keep the event
+        # loop free for the other battles' messages
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        await loop.run_in_executor(
+            _get_dataset_check_executor(),
+            ctx.run,
+            run_dataset_checks,
+            dataset_checks,
+        )
+    return action_required
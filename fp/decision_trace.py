@@ -1,11 +1,53 @@
+"""
+Decision traces
+
+`async_pick_move` records one trace per decision. Traces are handed to a
+`TraceSink`, whose writer thread drains a bounded queue in batches and
+appends them as compact JSON lines to one file per battle
+(`{battle_tag}.jsonl`, or `.jsonl.gz` with DECISION_TRACE_COMPRESS), so
+serializing and writing a trace never happens on the event loop. When the
+queue is full, traces are dropped and counted rather than blocking a decision.
+
+A battle file that grows past DECISION_TRACE_ROTATE_BYTES is continued in a
+new segment (`{battle_tag}.1.jsonl`, ...); segments are never renamed or
+rewritten, only appended to, so readers can tail them by byte offset with
+`read_traces`.
+"""
+
+import atexit
+import gzip
 import json
 import logging
 import os
-import time
+import queue
+import re
+import threading
+import zlib
 from datetime import datetime
+from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_TRACE_DIR = "logs/decision_traces"
+TRACE_SUFFIX = ".jsonl"
+COMPRESSED_TRACE_SUFFIX = ".jsonl.gz"
+# Traces waiting for the writer; past this, new traces are dropped.
+TRACE_QUEUE_SIZE = max(1, int(os.getenv("DECISION_TRACE_QUEUE_SIZE", "1024")))
+# Most traces the writer appends per batch.
+TRACE_BATCH_SIZE = max(1, int(os.getenv("DECISION_TRACE_BATCH_SIZE", "64")))
+# Size at which a battle's trace file is continued in a new segment.
+TRACE_ROTATE_BYTES = max(
+    4096, int(os.getenv("DECISION_TRACE_ROTATE_BYTES", str(8 * 1024 * 1024)))
+)
+TRACE_COMPRESS = os.getenv("DECISION_TRACE_COMPRESS", "0").strip().lower() in (
+    "1",
+    "true",
+    "yes",
+    "on",
+)
+
+_UNSAFE_FILENAME_CHARS = re.compile(r"[^A-Za-z0-9_.-]")
+
 
 def _make_json_safe(value):
     if isinstance(value, dict):
@@ -42,21 +84,233 @@ def validate_trace_schema(trace: dict) -> bool:
     return required.issubset(set(trace.keys()))
 
 
-def write_decision_trace(trace: dict, base_dir: str | None = None) -> str | None:
-    if not trace:
-        return None
-    target_dir = base_dir or os.getenv("DECISION_TRACE_DIR", "logs/decision_traces")
+def trace_files(trace_dir) -> list[Path]:
+    """Per-battle trace segments in `trace_dir`, oldest first."""
+    trace_dir = Path(trace_dir)
+    if not trace_dir.is_dir():
+        return []
+    files = []
+    for path in trace_dir.iterdir():
+        if path.name.endswith((TRACE_SUFFIX, COMPRESSED_TRACE_SUFFIX)):
+            try:
+                files.append((path.stat().st_mtime, path.name, path))
+            except OSError:
+                continue
+    return [path for _mtime, _name, path in sorted(files)]
+
+
+def read_traces(path, offset: int = 0) -> tuple[list[tuple[int, dict | None]], int]:
+    """
+    The traces appended to trace segment `path` from byte `offset` on, as
+    `(offset, trace)` pairs (`trace` is None for a line that does not parse),
+    and the offset to resume from. A partly written record at the end of the
+    file is left for the next read.
+    """
     try:
-        os.makedirs(target_dir, exist_ok=True)
-        tag = trace.get("battle_tag", "battle")
-        turn = trace.get("turn", "x")
-        stamp = int(time.time() * 1000)
-        filename = f"{tag}_turn{turn}_{stamp}.json"
-        path = os.path.join(target_dir, filename)
-        safe_trace = _make_json_safe(trace)
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(safe_trace, f, indent=2, sort_keys=True)
-        return path
-    except Exception as e:
-        logger.debug(f"Decision trace write failed: {e}")
-        return None
+        with open(path, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+    except OSError:
+        return [], offset
+
+    lines: list[tuple[int, bytes]] = []
+    if str(path).endswith(COMPRESSED_TRACE_SUFFIX):
+        # every batch is a complete gzip member
+        while data:
+            member = zlib.decompressobj(wbits=31)
+            try:
+                text = member.decompress(data)
+            except zlib.error:
+                break
+            if not member.eof:
+                break
+            # the lines of a member are only reachable from its start
+            lines.extend((offset, line) for line in text.splitlines())
+            consumed = len(data) - len(member.unused_data)
+            offset += consumed
+            data = member.unused_data
+    else:
+        end = data.rfind(b"\n") + 1
+        position = offset
+        for line in data[:end].splitlines(keepends=True):
+            lines.append((position, line))
+            position += len(line)
+        offset += end
+
+    traces = []
+    for line_offset, line in lines:
+        if not line.strip():
+            continue
+        try:
+            trace = json.loads(line)
+        except ValueError:
+            trace = None
+        traces.append((line_offset, trace if isinstance(trace, dict) else None))
+    return traces, offset
+
+
+class TraceSink:
+    """
+    Appends decision traces to per-battle JSONL segments in `trace_dir`
+    from a writer thread. `submit` never blocks; `flush` waits for every
+    trace submitted so far to be written.
+    """
+
+    def __init__(
+        self,
+        trace_dir,
+        *,
+        queue_size: int = TRACE_QUEUE_SIZE,
+        batch_size: int = TRACE_BATCH_SIZE,
+        rotate_bytes: int = TRACE_ROTATE_BYTES,
+        compress: bool = TRACE_COMPRESS,
+    ):
+        self.trace_dir = Path(trace_dir)
+        self.batch_size = batch_size
+        self.rotate_bytes = rotate_bytes
+        self.suffix = COMPRESSED_TRACE_SUFFIX if compress else TRACE_SUFFIX
+        self.written = 0
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        # battle file stem -> segment currently appended to
+        self._segments: dict[str, int] = {}
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def submit(self, trace: dict) -> bool:
+        """
+        Queue `trace` for writing. The sink serializes it later on the
+        writer thread, so the caller must not modify it afterwards.
+        """
+        if self._closed:
+            return False
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until every queued trace is written; False on timeout."""
+        if self._thread is None:
+            return True
+        with self._queue.all_tasks_done:
+            return self._queue.all_tasks_done.wait_for(
+                lambda: not self._queue.unfinished_tasks, timeout
+            )
+
+    def close(self, timeout: float | None = 5.0):
+        """Write what is queued, then stop the writer."""
+        self._closed = True
+        self.flush(timeout)
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+        }
+
+    def _ensure_writer(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="decision-trace-writer", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                logger.debug(f"Decision trace write failed: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write_batch(self, batch: list[dict]):
+        by_battle: dict[str, list[str]] = {}
+        for trace in batch:
+            stem = _UNSAFE_FILENAME_CHARS.sub(
+                "_", str(trace.get("battle_tag") or "battle")
+            )
+            line = json.dumps(
+                _make_json_safe(trace),
+                sort_keys=True,
+                separators=(",", ":"),
+                default=str,
+            )
+            by_battle.setdefault(stem, []).append(line + "\n")
+
+        self.trace_dir.mkdir(parents=True, exist_ok=True)
+        for stem, lines in by_battle.items():
+            data = "".join(lines).encode("utf-8")
+            if self.suffix == COMPRESSED_TRACE_SUFFIX:
+                data = gzip.compress(data, compresslevel=6)
+            with open(self._segment_path(stem), "ab") as f:
+                f.write(data)
+            self.written += len(lines)
+
+    def _segment_path(self, stem: str) -> Path:
+        segment = self._segments.get(stem, 0)
+        while True:
+            name = (
+                f"{stem}{self.suffix}"
+                if not segment
+                else f"{stem}.{segment}{self.suffix}"
+            )
+            path = self.trace_dir / name
+            try:
+                size = path.stat().st_size
+            except OSError:
+                size = 0
+            if size < self.rotate_bytes:
+                self._segments[stem] = segment
+                return path
+            segment += 1
+
+
+_sinks: dict[str, TraceSink] = {}
+_sinks_lock = threading.Lock()
+
+
+def get_trace_sink(base_dir: str | None = None) -> TraceSink:
+    target_dir = base_dir or os.getenv("DECISION_TRACE_DIR", DEFAULT_TRACE_DIR)
+    sink = _sinks.get(target_dir)
+    if sink is None:
+        with _sinks_lock:
+            sink = _sinks.get(target_dir)
+            if sink is None:
+                sink = _sinks[target_dir] = TraceSink(target_dir)
+    return sink
+
+
+def shutdown_trace_sinks():
+    """Write out every queued trace; called at exit."""
+    with _sinks_lock:
+        sinks = list(_sinks.values())
+        _sinks.clear()
+    for sink in sinks:
+        sink.close()
+
+
+atexit.register(shutdown_trace_sinks)
+
+
+def write_decision_trace(trace: dict, base_dir: str | None = None) -> bool:
+    """Queue `trace` for the background writer; False if it was dropped."""
+    if not trace:
+        return False
+    return get_trace_sink(base_dir).submit(trace)
@@ -4,16 +4,31 @@ Gameplan integration module for run_battle.py.
 Stores and retrieves gameplans during battles for decision layer reference.
 """
 
+import asyncio
 import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict
 from fp.matchup_analyzer import Gameplan, analyze_matchup_from_battle
 
 logger = logging.getLogger(__name__)
 
+# Hard deadline for a background gameplan generation (seconds)
+GAMEPLAN_DEADLINE_SEC = max(0.1, float(os.getenv("GAMEPLAN_DEADLINE_SEC", "20")))
+# Threads running gameplan generations (LLM requests)
+GAMEPLAN_WORKERS = max(1, int(os.getenv("GAMEPLAN_WORKERS", "2")))
+
 # In-memory storage for active gameplans
 # battle_tag -> Gameplan
 _active_gameplans: Dict[str, Gameplan] = {}
 
+# battle_tag -> background generation still running
+_pending_gameplans: Dict[str, asyncio.Task] = {}
+
+_gameplan_executor: ThreadPoolExecutor | None = None
+_gameplan_executor_lock = threading.Lock()
+
 
 def store_gameplan(battle_tag: str, gameplan: Gameplan) -> None:
     """Store a gameplan for an active battle."""
@@ -28,6 +43,9 @@ def get_gameplan(battle_tag: str) -> Optional[Gameplan]:
 
 def clear_gameplan(battle_tag: str) -> None:
     """Clear the gameplan for a finished battle."""
+    pending = _pending_gameplans.pop(battle_tag, None)
+    if pending is not None:
+        pending.cancel()
     if battle_tag in _active_gameplans:
         del _active_gameplans[battle_tag]
         logger.debug(f"Cleared gameplan for {battle_tag}")
@@ -57,6 +75,75 @@ def generate_and_store_gameplan(battle_tag: str, battle) -> Optional[Gameplan]:
         return None
 
 
+def _get_gameplan_executor() -> ThreadPoolExecutor:
+    global _gameplan_executor
+    with _gameplan_executor_lock:
+        if _gameplan_executor is None:
+            _gameplan_executor = ThreadPoolExecutor(
+                max_workers=GAMEPLAN_WORKERS,
+                thread_name_prefix="gameplan",
+            )
+        return _gameplan_executor
+
+
+def start_gameplan_generation(battle_tag: str, battle) -> asyncio.Task:
+    """
+    Generate the battle's gameplan on a worker thread, from a snapshot of
+    `battle`, without blocking the event loop.
+
+    The returned task resolves to the Gameplan, or to None on failure or
+    once GAMEPLAN_DEADLINE_SEC has passed. Decisions go ahead without a
+    gameplan meanwhile: `battle.gameplan` is None until one is ready, then
+    it is set and stored (see get_gameplan).
+    """
+    battle.gameplan = None
+    snapshot = battle.clone()
+    task = asyncio.get_running_loop().create_task(
+        _generate_gameplan(battle_tag, battle, snapshot)
+    )
+    _pending_gameplans[battle_tag] = task
+    return task
+
+
+async def _generate_gameplan(battle_tag: str, battle, snapshot) -> Optional[Gameplan]:
+    loop = asyncio.get_running_loop()
+    try:
+        gameplan = await asyncio.wait_for(
+            loop.run_in_executor(
+                _get_gameplan_executor(),
+                analyze_matchup_from_battle,
+                snapshot,
+                GAMEPLAN_DEADLINE_SEC,
+            ),
+            GAMEPLAN_DEADLINE_SEC,
+        )
+    except asyncio.TimeoutError:
+        logger.warning(
+            f"Gameplan for {battle_tag} not ready after {GAMEPLAN_DEADLINE_SEC}s - playing without one"
+        )
+        return None
+    except Exception as e:
+        logger.error(f"Error generating gameplan for {battle_tag}: {e}")
+        return None
+    finally:
+        if _pending_gameplans.get(battle_tag) is asyncio.current_task():
+            del _pending_gameplans[battle_tag]
+
+    if gameplan is None:
+        logger.warning(f"Failed to generate gameplan for {battle_tag}")
+        return None
+
+    store_gameplan(battle_tag, gameplan)
+    # Store gameplan in battle object for access by decision layer
+    battle.gameplan = gameplan
+    logger.info(f"🎮 GAMEPLAN GENERATED: {gameplan.our_strategy}")
+    logger.info(f"📌 OUR WIN CONDITION: {gameplan.win_condition}")
+    logger.info(f"⚔️ OPPONENT WIN CONDITION: {gameplan.opponent_win_condition}")
+    logger.info(f"🔄 KEY PIVOTS: {', '.join(gameplan.key_pivot_triggers)}")
+    logger.info(f"💡 BACKUP PLAN: {gameplan.backup_plan or 'None'}")
+    return gameplan
+
+
 def get_active_gameplan_count() -> int:
     """Get the number of active gameplans."""
     return len(_active_gameplans)
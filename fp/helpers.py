@@ -1,5 +1,6 @@
 import logging
 import math
+from functools import lru_cache
 import constants
 from config import FoulPlayConfig
 
@@ -49,6 +50,7 @@ def get_pokemon_info_from_condition(condition_string: str):
         return hp, maxhp, None
 
 
+@lru_cache(maxsize=16384)
 def normalize_name(name):
     return (
         name.replace(" ", "")
@@ -223,16 +225,62 @@ DAMAGE_MULTIPICATION_ARRAY = [
 ]
 
 
-def type_effectiveness_modifier(attacking_move_type, defending_types):
-    modifier = 1
-    attacking_type_index = POKEMON_TYPE_INDICES[attacking_move_type]
-    for pkmn_type in defending_types:
-        defending_type_index = POKEMON_TYPE_INDICES[pkmn_type]
-        modifier *= DAMAGE_MULTIPICATION_ARRAY[attacking_type_index][
-            defending_type_index
+TYPE_COUNT = len(DAMAGE_MULTIPICATION_ARRAY)
+TYPELESS_INDEX = POKEMON_TYPE_INDICES["typeless"]
+
+# DEFENSIVE_TYPE_TABLE[type1][type2][attacking_type] is the multiplier of an
+# attacking type against a (type1, type2) defender, all by POKEMON_TYPE_INDICES.
+# Mono-types use typeless as type2 and a terastallized defender is looked up
+# as (tera_type, typeless); the typeless column is 1 for every attacking type.
+DEFENSIVE_TYPE_TABLE = tuple(
+    tuple(
+        tuple(
+            DAMAGE_MULTIPICATION_ARRAY[attacking][type1]
+            * DAMAGE_MULTIPICATION_ARRAY[attacking][type2]
+            for attacking in range(TYPE_COUNT)
+        )
+        for type2 in range(TYPE_COUNT)
+    )
+    for type1 in range(TYPE_COUNT)
+)
+
+
+@lru_cache(maxsize=1024)
+def _defensive_type_profile(defending_types: tuple) -> tuple:
+    if len(defending_types) <= 2:
+        type1, type2 = (defending_types + ("typeless", "typeless"))[:2]
+        return DEFENSIVE_TYPE_TABLE[POKEMON_TYPE_INDICES[type1]][
+            POKEMON_TYPE_INDICES[type2]
         ]
+    # three types (e.g. after Trick-or-Treat / Forest's Curse)
+    profile = [1] * TYPE_COUNT
+    for pkmn_type in defending_types:
+        column = DEFENSIVE_TYPE_TABLE[POKEMON_TYPE_INDICES[pkmn_type]][TYPELESS_INDEX]
+        profile = [a * b for a, b in zip(profile, column)]
+    return tuple(profile)
+
+
+def defensive_type_profile(defending_types) -> tuple:
+    """
+    Multiplier of every attacking type, indexed by POKEMON_TYPE_INDICES,
+    against `defending_types`.
+    """
+    return _defensive_type_profile(tuple(defending_types))
 
-    return modifier
+
+def type_effectiveness_modifier(attacking_move_type, defending_types):
+    attacking_type_index = POKEMON_TYPE_INDICES[attacking_move_type]
+    if len(defending_types) == 2:
+        type1, type2 = defending_types
+        return DEFENSIVE_TYPE_TABLE[POKEMON_TYPE_INDICES[type1]][
+            POKEMON_TYPE_INDICES[type2]
+        ][attacking_type_index]
+    if len(defending_types) == 1:
+        for pkmn_type in defending_types:
+            return DEFENSIVE_TYPE_TABLE[POKEMON_TYPE_INDICES[pkmn_type]][
+                TYPELESS_INDEX
+            ][attacking_type_index]
+    return defensive_type_profile(defending_types)[attacking_type_index]
 
 
 def is_neutral_effectiveness(move_type, defending_pokemon_types):
@@ -9,6 +9,8 @@ import json
 import hashlib
 import os
 import logging
+import threading
+from collections import OrderedDict
 from typing import Dict, List, Optional, Set
 from dataclasses import dataclass, asdict
 from pathlib import Path
@@ -32,6 +34,10 @@ OLLAMA_MODEL = "qwen2.5-coder:3b"
 # Timeout for LLM requests (seconds)
 OLLAMA_TIMEOUT = int(os.getenv("MATCHUP_ANALYZER_TIMEOUT", "30"))
 
+# Gameplans kept in memory in front of the on-disk index
+GAMEPLAN_LRU_SIZE = max(1, int(os.getenv("GAMEPLAN_LRU_SIZE", "256")))
+GAMEPLAN_INDEX_NAME = "gameplans.jsonl"
+
 
 @dataclass
 class Gameplan:
@@ -69,29 +75,128 @@ def _hash_team(team_data: List[Dict]) -> str:
     return hashlib.sha256(combined.encode()).hexdigest()[:16]
 
 
+class GameplanCache:
+    """
+    Gameplans by (our team hash, opponent team hash).
+
+    An in-memory LRU sits in front of one append-only JSON-lines index in
+    `directory`, one {"key", "gameplan"} record per line. The file is
+    scanned once for the byte offset of each key (later lines win) and
+    records are read by seeking to them. Per-pair JSON files written by
+    older versions are read on a miss and appended to the index.
+    """
+
+    def __init__(self, directory: Path, lru_size: int = GAMEPLAN_LRU_SIZE):
+        self.directory = Path(directory)
+        self.path = self.directory / GAMEPLAN_INDEX_NAME
+        self.lru_size = lru_size
+        self._lru: "OrderedDict[str, Gameplan]" = OrderedDict()
+        self._offsets: Optional[Dict[str, int]] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(our_hash: str, opp_hash: str) -> str:
+        return f"{our_hash}_vs_{opp_hash}"
+
+    def _load_offsets(self) -> Dict[str, int]:
+        if self._offsets is not None:
+            return self._offsets
+        offsets = {}
+        try:
+            with open(self.path, "rb") as f:
+                offset = 0
+                for line in f:
+                    try:
+                        offsets[json.loads(line)["key"]] = offset
+                    except (ValueError, KeyError, TypeError):
+                        pass  # torn or foreign line
+                    offset += len(line)
+        except FileNotFoundError:
+            pass
+        self._offsets = offsets
+        return offsets
+
+    def _read_index(self, key: str) -> Optional[Gameplan]:
+        offset = self._load_offsets().get(key)
+        if offset is None:
+            return None
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            return Gameplan.from_dict(json.loads(f.readline())["gameplan"])
+
+    def _read_legacy(self, key: str) -> Optional[Gameplan]:
+        legacy = self.directory / f"{key}.json"
+        if not legacy.exists():
+            return None
+        with open(legacy, "r") as f:
+            gameplan = Gameplan.from_dict(json.load(f))
+        self._append(key, gameplan)
+        return gameplan
+
+    def _append(self, key: str, gameplan: Gameplan) -> None:
+        offsets = self._load_offsets()
+        record = json.dumps({"key": key, "gameplan": gameplan.to_dict()}) + "\n"
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a+b") as f:
+            offset = f.seek(0, os.SEEK_END)
+            if offset:
+                f.seek(offset - 1)
+                if f.read(1) != b"\n":
+                    # finish a torn line so the record starts a line of its own
+                    f.write(b"\n")
+                    offset += 1
+            f.write(record.encode())
+        offsets[key] = offset
+
+    def _remember(self, key: str, gameplan: Gameplan) -> None:
+        self._lru[key] = gameplan
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def get(self, our_hash: str, opp_hash: str) -> Optional[Gameplan]:
+        key = self._key(our_hash, opp_hash)
+        with self._lock:
+            gameplan = self._lru.get(key)
+            if gameplan is not None:
+                self._lru.move_to_end(key)
+                return gameplan
+            try:
+                gameplan = self._read_index(key) or self._read_legacy(key)
+            except Exception as e:
+                logger.warning(f"Failed to load cached gameplan: {e}")
+                return None
+            if gameplan is not None:
+                self._remember(key, gameplan)
+            return gameplan
+
+    def put(
+        self, our_hash: str, opp_hash: str, gameplan: Gameplan, persist: bool = True
+    ) -> None:
+        key = self._key(our_hash, opp_hash)
+        with self._lock:
+            self._remember(key, gameplan)
+            if not persist:
+                return
+            try:
+                self._append(key, gameplan)
+            except Exception as e:
+                logger.warning(f"Failed to save gameplan cache: {e}")
+
+
+_gameplan_cache = GameplanCache(CACHE_DIR)
+
+
 def _load_cached_gameplan(our_hash: str, opp_hash: str) -> Optional[Gameplan]:
     """Load a cached gameplan if it exists."""
-    cache_file = CACHE_DIR / f"{our_hash}_vs_{opp_hash}.json"
-    if not cache_file.exists():
-        return None
-    
-    try:
-        with open(cache_file, "r") as f:
-            data = json.load(f)
-        return Gameplan.from_dict(data)
-    except Exception as e:
-        logger.warning(f"Failed to load cached gameplan: {e}")
-        return None
+    return _gameplan_cache.get(our_hash, opp_hash)
 
 
-def _save_gameplan_cache(our_hash: str, opp_hash: str, gameplan: Gameplan) -> None:
-    """Save a gameplan to cache."""
-    cache_file = CACHE_DIR / f"{our_hash}_vs_{opp_hash}.json"
-    try:
-        with open(cache_file, "w") as f:
-            json.dump(gameplan.to_dict(), f, indent=2)
-    except Exception as e:
-        logger.warning(f"Failed to save gameplan cache: {e}")
+def _save_gameplan_cache(
+    our_hash: str, opp_hash: str, gameplan: Gameplan, persist: bool = True
+) -> None:
+    """Save a gameplan to cache; `persist=False` keeps it in memory only."""
+    _gameplan_cache.put(our_hash, opp_hash, gameplan, persist)
 
 
 def _build_analysis_prompt(our_team: TeamAnalysis, our_team_data: List[Dict], 
@@ -161,8 +266,9 @@ Output ONLY valid JSON (no markdown, no explanation):
     return prompt
 
 
-def _call_ollama(prompt: str) -> Optional[str]:
+def _call_ollama(prompt: str, timeout: Optional[float] = None) -> Optional[str]:
     """Call Ollama API to generate gameplan."""
+    timeout = OLLAMA_TIMEOUT if timeout is None else min(timeout, OLLAMA_TIMEOUT)
     try:
         response = requests.post(
             f"{OLLAMA_API_URL}/api/generate",
@@ -175,7 +281,7 @@ def _call_ollama(prompt: str) -> Optional[str]:
                     "num_predict": 512,  # Limit response length
                 }
             },
-            timeout=OLLAMA_TIMEOUT
+            timeout=timeout
         )
         
         if response.status_code != 200:
@@ -186,7 +292,7 @@ def _call_ollama(prompt: str) -> Optional[str]:
         return result.get("response", "").strip()
     
     except requests.exceptions.Timeout:
-        logger.warning(f"Ollama request timed out after {OLLAMA_TIMEOUT}s")
+        logger.warning(f"Ollama request timed out after {timeout}s")
         return None
     except Exception as e:
         logger.error(f"Ollama API error: {e}")
@@ -254,7 +360,7 @@ def _create_fallback_gameplan(our_team: TeamAnalysis, opp_team: TeamAnalysis) ->
 
 
 def analyze_matchup(our_team_data: List[Dict], opponent_team_data: List[Dict], 
-                    use_cache: bool = True) -> Gameplan:
+                    use_cache: bool = True, timeout: Optional[float] = None) -> Gameplan:
     """
     Analyze a team matchup and generate a strategic gameplan.
     
@@ -262,6 +368,7 @@ def analyze_matchup(our_team_data: List[Dict], opponent_team_data: List[Dict],
         our_team_data: List of dicts with our Pokemon (species, moves, item, ability, evs)
         opponent_team_data: List of dicts with opponent Pokemon (same format)
         use_cache: Whether to use cached results if available
+        timeout: Cap on the LLM request timeout (seconds)
     
     Returns:
         Gameplan object with strategic recommendations
@@ -285,7 +392,7 @@ def analyze_matchup(our_team_data: List[Dict], opponent_team_data: List[Dict],
     
     # Build prompt and call LLM
     prompt = _build_analysis_prompt(our_team, our_team_data, opp_team, opponent_team_data)
-    response = _call_ollama(prompt)
+    response = _call_ollama(prompt, timeout)
     
     if response:
         gameplan = _parse_gameplan_json(response)
@@ -296,19 +403,21 @@ def analyze_matchup(our_team_data: List[Dict], opponent_team_data: List[Dict],
                 _save_gameplan_cache(our_hash, opp_hash, gameplan)
             return gameplan
     
-    # Fallback if LLM fails
+    # Fallback if LLM fails. Not written to disk, so a later process asks
+    # the LLM again (e.g. after a request cut short by the deadline).
     gameplan = _create_fallback_gameplan(our_team, opp_team)
     if use_cache:
-        _save_gameplan_cache(our_hash, opp_hash, gameplan)
+        _save_gameplan_cache(our_hash, opp_hash, gameplan, persist=False)
     return gameplan
 
 
-def analyze_matchup_from_battle(battle) -> Optional[Gameplan]:
+def analyze_matchup_from_battle(battle, timeout: Optional[float] = None) -> Optional[Gameplan]:
     """
     Convenience function to analyze a matchup from a Battle object.
     
     Args:
         battle: Battle object with user and opponent teams
+        timeout: Cap on the LLM request timeout (seconds)
     
     Returns:
         Gameplan object, or None if team data unavailable
@@ -330,8 +439,8 @@ def analyze_matchup_from_battle(battle) -> Optional[Gameplan]:
             pkmn_dict = {
                 "species": pkmn.name,
                 "moves": [m.name for m in pkmn.moves if m.name],
-                "item": getattr(pkmn, "item", ""),
-                "ability": getattr(pkmn, "ability", ""),
+                "item": getattr(pkmn, "item", "") or "",
+                "ability": getattr(pkmn, "ability", "") or "",
             }
             opp_team_data.append(pkmn_dict)
     
@@ -339,7 +448,7 @@ def analyze_matchup_from_battle(battle) -> Optional[Gameplan]:
         logger.warning("Opponent team data not available for matchup analysis")
         return None
     
-    return analyze_matchup(our_team_data, opp_team_data)
+    return analyze_matchup(our_team_data, opp_team_data, timeout=timeout)
 
 
 if __name__ == "__main__":
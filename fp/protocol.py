@@ -0,0 +1,106 @@
+"""
+Showdown Protocol Events
+
+`process_battle_updates` applies a batch of protocol lines (normally one
+turn) to a Battle. `TurnEvents` tokenizes the batch once: every line becomes
+a `ProtocolEvent` holding its split fields, and events are indexed by action.
+The inference checks in `battle_modifier` then look up the events they need
+(the turn's moves, the `-damage` lines after a switch) instead of re-splitting
+and rescanning every line of the turn for each check.
+"""
+
+from bisect import bisect_left
+from dataclasses import dataclass
+from operator import attrgetter
+
+from fp.helpers import normalize_name
+
+_INDEX = attrgetter("index")
+
+
+@dataclass(slots=True)
+class ProtocolEvent:
+    index: int  # position of the line in its batch
+    line: str
+    # line.split("|"); the same list is passed to the battle_modifier handler
+    parts: list[str]
+    # parts[1] stripped; None for lines without one
+    action: str | None
+
+
+def parse_line(line: str, index: int = 0) -> ProtocolEvent:
+    parts = line.split("|")
+    action = parts[1].strip() if len(parts) >= 2 else None
+    return ProtocolEvent(index, line, parts, action)
+
+
+class TurnEvents:
+    """
+    The events of a batch of protocol lines, in order, indexed by action.
+    `after(i)` is a view of the events following line `i` that shares the
+    parsed events and the index.
+    """
+
+    def __init__(self, lines=()):
+        self._events: list[ProtocolEvent] = []
+        self._by_action: dict[str, list[ProtocolEvent]] = {}
+        self.start = 0
+        for index, line in enumerate(lines):
+            event = parse_line(line, index)
+            self._events.append(event)
+            if event.action is not None:
+                self._by_action.setdefault(event.action, []).append(event)
+
+    def after(self, index: int) -> "TurnEvents":
+        view = TurnEvents.__new__(TurnEvents)
+        view._events = self._events
+        view._by_action = self._by_action
+        view.start = max(index + 1, self.start)
+        return view
+
+    def __iter__(self):
+        events = self._events
+        return (events[i] for i in range(self.start, len(events)))
+
+    def __len__(self) -> int:
+        return max(len(self._events) - self.start, 0)
+
+    def __getitem__(self, i: int) -> ProtocolEvent:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self._events[self.start + i]
+
+    def of(self, action: str) -> list[ProtocolEvent]:
+        """Events with `action`, in order."""
+        events = self._by_action.get(action, [])
+        if self.start and events:
+            events = events[bisect_left(events, self.start, key=_INDEX) :]
+        return events
+
+    def has(self, action: str) -> bool:
+        events = self._by_action.get(action)
+        return bool(events) and events[-1].index >= self.start
+
+    def actions(self) -> set[str]:
+        if not self.start:
+            return set(self._by_action)
+        return {e.action for e in self if e.action is not None}
+
+    def mentions(self, *needles: str) -> bool:
+        """
+        Whether any line contains one of `needles`, either verbatim or after
+        normalizing both (e.g. "quickclaw" matches "item: Quick Claw").
+        """
+        text = "\n".join(e.line for e in self)
+        # unmemoized: every batch is different
+        normalized = normalize_name.__wrapped__(text)
+        return any(n in text or normalize_name(n) in normalized for n in needles)
+
+
+def turn_events(lines) -> TurnEvents:
+    """`lines` as TurnEvents: parsed events pass through, strings are parsed."""
+    if isinstance(lines, TurnEvents):
+        return lines
+    return TurnEvents(lines)
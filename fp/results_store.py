@@ -0,0 +1,325 @@
+"""
+Battle Results Store
+
+Every finished battle is one row in an SQLite database in WAL mode
+(`battle_results.db` next to run.py, or BATTLE_RESULTS_DB). Recording a result
+is a single-row insert. WAL lets the bot keep appending while the analysis
+scripts read from other processes. Readers query by team, result and time
+window through the indexes instead of re-parsing the whole history.
+
+Rows read back as the dicts `battle_stats.json` used to hold (battle_id,
+timestamp, team_file, result, replay_id, plus any extra fields recorded).
+`battle_stats.json` is now a snapshot: `export_snapshot` writes it (the
+player machines commit it to share results), and a store merges in the
+battles of the snapshot next to it whenever that file has changed since the
+last merge. Battles are identified by (battle_id, timestamp), so merging the
+same battles twice adds nothing.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DB_NAME = "battle_results.db"
+LEGACY_STATS_NAME = "battle_stats.json"
+DEFAULT_RESULTS_DB = Path(
+    os.getenv("BATTLE_RESULTS_DB", str(PROJECT_ROOT / RESULTS_DB_NAME))
+)
+# How long a connection waits for another process's write lock.
+BUSY_TIMEOUT_SEC = 5.0
+
+_SCHEMA_VERSION = 1
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS battles (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    battle_id TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    ts REAL NOT NULL,
+    team_file TEXT NOT NULL,
+    result TEXT NOT NULL,
+    replay_id TEXT NOT NULL,
+    extra TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS battles_battle ON battles (battle_id, timestamp);
+CREATE INDEX IF NOT EXISTS battles_ts ON battles (ts);
+CREATE INDEX IF NOT EXISTS battles_team_ts ON battles (team_file, ts);
+CREATE INDEX IF NOT EXISTS battles_result_ts ON battles (result, ts);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+_COLUMNS = ("battle_id", "timestamp", "team_file", "result", "replay_id")
+_INSERT = (
+    "INSERT OR IGNORE INTO battles "
+    "(battle_id, timestamp, ts, team_file, result, replay_id, extra) VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+# meta key: signature of the snapshot file last merged or exported
+_SNAPSHOT_KEY = "snapshot_signature"
+
+
+def _epoch(value) -> float | None:
+    """`value` (datetime, ISO string or epoch seconds) as epoch seconds."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _row_to_battle(row) -> dict:
+    battle = dict(zip(_COLUMNS, row[:5]))
+    if row[5]:
+        try:
+            battle.update(json.loads(row[5]))
+        except ValueError:
+            pass
+    return battle
+
+
+def _file_signature(path: Path) -> str | None:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+class BattleResultsStore:
+    """
+    Append-only battle results in SQLite. One connection per store, shared
+    by the threads of a process.
+    """
+
+    def __init__(self, path=DEFAULT_RESULTS_DB, snapshot=None):
+        self.path = Path(path)
+        self.snapshot = (
+            Path(snapshot)
+            if snapshot is not None
+            else self.path.with_name(LEGACY_STATS_NAME)
+        )
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.path),
+            timeout=BUSY_TIMEOUT_SEC,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # with WAL, NORMAL keeps the database consistent after a crash and
+        # only fsyncs at checkpoints
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._ensure_schema()
+        self._merge_snapshot()
+
+    def _ensure_schema(self):
+        with self._lock:
+            if (
+                self._conn.execute("PRAGMA user_version").fetchone()[0]
+                >= _SCHEMA_VERSION
+            ):
+                return
+            # IF NOT EXISTS: another process may have created it meanwhile
+            self._conn.executescript(
+                f"BEGIN IMMEDIATE;{_SCHEMA}PRAGMA user_version={_SCHEMA_VERSION};COMMIT;"
+            )
+
+    def _merge_snapshot(self):
+        signature = _file_signature(self.snapshot)
+        if signature is None:
+            return
+        with self._lock:
+            if self._meta(_SNAPSHOT_KEY) == signature:
+                return
+            try:
+                data = json.loads(self.snapshot.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                logger.warning("Failed to read %s: %s", self.snapshot, e)
+                return
+            battles = data.get("battles", []) if isinstance(data, dict) else data
+            if not isinstance(battles, list):
+                battles = []
+            rows = [
+                self._row(b)
+                for b in battles
+                if isinstance(b, dict) and b.get("battle_id")
+            ]
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                before = self._conn.total_changes
+                self._conn.executemany(_INSERT, rows)
+                added = self._conn.total_changes - before
+                self._set_meta(_SNAPSHOT_KEY, signature)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        if added:
+            logger.info(
+                "Merged %d battles from %s into %s", added, self.snapshot, self.path
+            )
+
+    def _meta(self, key: str) -> str | None:
+        row = self._conn.execute(
+            "SELECT value FROM meta WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value)
+        )
+
+    @staticmethod
+    def _row(battle: dict) -> tuple:
+        timestamp = battle.get("timestamp") or battle.get("time") or ""
+        ts = _epoch(timestamp)
+        if ts is None:
+            ts = 0.0
+        extra = {k: v for k, v in battle.items() if k not in _COLUMNS}
+        return (
+            str(battle["battle_id"]),
+            timestamp,
+            ts,
+            battle.get("team_file") or "unknown",
+            battle.get("result") or "",
+            str(battle.get("replay_id", battle["battle_id"]) or ""),
+            json.dumps(extra, ensure_ascii=False) if extra else None,
+        )
+
+    def record(
+        self,
+        battle_id: str,
+        team_file: str,
+        result: str,
+        *,
+        replay_id: str | None = None,
+        timestamp: datetime | None = None,
+        **extra,
+    ) -> dict:
+        """Append one finished battle; returns it as read back by `battles`."""
+        battle = {
+            "battle_id": battle_id or "unknown",
+            "timestamp": (timestamp or datetime.now(timezone.utc)).isoformat(),
+            "team_file": team_file or "unknown",
+            "result": result,
+            "replay_id": replay_id if replay_id is not None else (battle_id or ""),
+            **extra,
+        }
+        with self._lock:
+            self._conn.execute(_INSERT, self._row(battle))
+        return battle
+
+    @staticmethod
+    def _where(team_file, result, since, until) -> tuple[str, list]:
+        clauses, params = [], []
+        if team_file is not None:
+            clauses.append("team_file = ?")
+            params.append(team_file)
+        if result is not None:
+            clauses.append("result = ?")
+            params.append(result)
+        for bound, op in ((since, ">="), (until, "<")):
+            if bound is None:
+                continue
+            epoch = _epoch(bound)
+            if epoch is None:
+                raise ValueError(f"Not a time: {bound!r}")
+            clauses.append(f"ts {op} ?")
+            params.append(epoch)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def battles(
+        self,
+        *,
+        team_file: str | None = None,
+        result: str | None = None,
+        since=None,
+        until=None,
+        limit: int | None = None,
+    ) -> list[dict]:
+        """
+        Battles matching every given filter, oldest first. `since`/`until`
+        bound the time window (inclusive/exclusive); `limit` keeps the
+        newest `limit` battles.
+        """
+        where, params = self._where(team_file, result, since, until)
+        query = (
+            "SELECT battle_id, timestamp, team_file, result, replay_id, extra "
+            f"FROM battles{where} ORDER BY ts DESC, id DESC"
+        )
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(max(0, int(limit)))
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [_row_to_battle(row) for row in reversed(rows)]
+
+    def recent(self, n: int) -> list[dict]:
+        """The newest `n` battles, oldest first."""
+        return self.battles(limit=n)
+
+    def count(self, *, team_file=None, result=None, since=None, until=None) -> int:
+        where, params = self._where(team_file, result, since, until)
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT COUNT(*) FROM battles{where}", params
+            ).fetchone()[0]
+
+    def team_records(self, *, since=None, until=None) -> dict[str, dict[str, int]]:
+        """{team_file: {result: battles}} over the time window."""
+        where, params = self._where(None, None, since, until)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT team_file, result, COUNT(*) FROM battles{where} GROUP BY team_file, result",
+                params,
+            ).fetchall()
+        records: dict[str, dict[str, int]] = {}
+        for team_file, result, n in rows:
+            records.setdefault(team_file, {})[result] = n
+        return records
+
+    def export_snapshot(self, path=None) -> int:
+        """
+        Write every battle to `path` (default: the store's snapshot) in the
+        `battle_stats.json` format; returns the number of battles.
+        """
+        path = Path(path) if path is not None else self.snapshot
+        battles = self.battles()
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(
+            json.dumps({"battles": battles}, indent=2, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        os.replace(tmp, path)
+        if path == self.snapshot:
+            # nothing in it to merge back
+            with self._lock:
+                self._set_meta(_SNAPSHOT_KEY, _file_signature(path))
+        return len(battles)
+
+    def integrity_check(self) -> str:
+        """SQLite's quick_check: "ok" unless the database is damaged."""
+        with self._lock:
+            return self._conn.execute("PRAGMA quick_check").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -4,7 +4,6 @@ import asyncio
 import contextvars
 import time
 from collections import OrderedDict
-from copy import deepcopy
 import logging
 from logging.handlers import RotatingFileHandler
 import re
@@ -19,7 +18,8 @@ from data.pkmn_sets import SmogonSets
 # ---------------------------------------------------------------------------
 # Limits for how many files to keep per category.
 LOG_KEEP_BATTLE_FILES = int(os.getenv("LOG_KEEP_BATTLE_FILES", "60"))
-LOG_KEEP_TRACE_FILES = int(os.getenv("LOG_KEEP_TRACE_FILES", "500"))
+# Trace files hold a whole battle each (or a segment of one), not one turn.
+LOG_KEEP_TRACE_FILES = int(os.getenv("LOG_KEEP_TRACE_FILES", "60"))
 LOG_KEEP_STDOUT_FILES = int(os.getenv("LOG_KEEP_STDOUT_FILES", "3"))
 
 
@@ -75,11 +75,11 @@ def cleanup_old_logs(log_dir: str = "logs", trace_dir: str | None = None):
             except OSError:
                 pass
 
-    # --- 3. Decision trace JSON files ---
+    # --- 3. Decision trace files (per-battle JSONL segments, legacy per-turn JSON) ---
     if os.path.isdir(trace_dir):
         traces = []
         for fname in os.listdir(trace_dir):
-            if not fname.endswith(".json"):
+            if not fname.endswith((".json", ".jsonl", ".jsonl.gz")):
                 continue
             path = os.path.join(trace_dir, fname)
             try:
@@ -119,7 +119,13 @@ from config import FoulPlayConfig, SaveReplay
 from fp.battle import LastUsedMove, Pokemon, Battle
 from fp.battle_modifier import async_update_battle, process_battle_updates
 from fp.helpers import normalize_name
-from fp.search.main import find_best_move
+from fp.search.main import clear_search_time_bank, find_best_move
+from fp.search.features import bind_features, clear_features  # noqa: E402
+from fp.search.scheduler import (  # noqa: E402
+    DecisionQueueTimeout,
+    decision_deadline,
+    get_decision_scheduler,
+)
 from fp.decision_trace import write_decision_trace, build_trace_base
 from fp.movepool_tracker import get_threat_category, ThreatCategory
 from fp.opponent_model import OPPONENT_MODEL
@@ -131,7 +137,7 @@ from fp.websocket_client import PSWebsocketClient
 from streaming.state_store import write_active_battles, read_active_battles, write_status, update_daily_stats
 from fp.team_analysis import analyze_team
 from fp.playstyle_config import PlaystyleConfig, Playstyle, HAZARD_MOVES, PIVOT_MOVES
-from fp.gameplan_integration import generate_and_store_gameplan, get_gameplan, clear_gameplan
+from fp.gameplan_integration import start_gameplan_generation, get_gameplan, clear_gameplan
 from constants_pkg.strategy import SETUP_MOVES
 
 logger = logging.getLogger(__name__)
@@ -156,7 +162,12 @@ ACTIVE_BATTLES_WRITE_INTERVAL_SEC = float(os.getenv("ACTIVE_BATTLES_WRITE_INTERV
 # How often (seconds) the battle loop refreshes active_battles.json heartbeat.
 ACTIVE_BATTLES_HEARTBEAT_SEC = float(os.getenv("ACTIVE_BATTLES_HEARTBEAT_SEC", "30.0"))
 # Hard cap for move selection (seconds). If exceeded, use fallback move.
+# The clock starts when the decision gets a search slot.
 DECISION_TIMEOUT_SEC = int(os.getenv("DECISION_TIMEOUT_SEC", "25"))
+# How long a decision may wait for a search slot behind other battles (seconds, 0 = no limit).
+DECISION_QUEUE_TIMEOUT_SEC = max(0, int(os.getenv("DECISION_QUEUE_TIMEOUT_SEC", "30")))
+# Showdown clock kept back for sending the move once the search is done (seconds).
+DECISION_CLOCK_MARGIN_SEC = 5
 TRACE_DECISIONS = os.getenv("DECISION_TRACE", "1").strip().lower() not in (
     "0",
     "false",
@@ -932,22 +943,33 @@ def extract_battle_factory_tier_from_msg(msg):
 
 
 async def async_pick_move(battle):
-    battle_copy = deepcopy(battle)
+    battle_copy = battle.clone()
     setattr(battle_copy, "_isolation_copy", True)
+    features = None
     if not battle_copy.team_preview:
         try:
             battle_copy.user.update_from_request_json(battle_copy.request_json)
         except Exception as e:
             logger.warning(f"Failed to update battle copy from request_json: {e}")
+        # board features the heuristic passes share, kept across turns
+        features = bind_features(battle_copy, battle)
 
-    loop = asyncio.get_event_loop()
     best_move = None
     trace = None
     trace_reason = None
+    scheduled = None
     try:
-        # Run move search in the default executor, but enforce a hard timeout.
+        # Run move search on the decision scheduler, but enforce a hard timeout.
         # This prevents rare hangs from stalling the battle loop indefinitely.
-        future = loop.run_in_executor(None, find_best_move, battle_copy)
+        # The search runs in this battle's context so it sees the battle's
+        # set views (data.pkmn_sets) and worker id rather than the defaults.
+        # Battles closest to running out of clock are searched first.
+        scheduled = get_decision_scheduler().submit(
+            find_best_move,
+            battle_copy,
+            deadline=decision_deadline(battle_copy.time_remaining),
+            label=battle_copy.battle_tag,
+        )
         timeout = DECISION_TIMEOUT_SEC
         try:
             opp = battle_copy.opponent.active
@@ -959,12 +981,24 @@ async def async_pick_move(battle):
             pass
         if battle_copy.time_remaining is not None and battle_copy.time_remaining < 30:
             timeout = min(timeout, max(5, int(timeout * 0.6)))
-        if timeout > 0:
-            best_move = await asyncio.wait_for(future, timeout=timeout)
-        else:
-            best_move = await future
+        # Queueing has its own allowance, bounded by what the battle's clock
+        # leaves once the search itself has had its time.
+        queue_timeout = DECISION_QUEUE_TIMEOUT_SEC
+        if battle_copy.time_remaining is not None:
+            queue_timeout = min(
+                queue_timeout,
+                max(1, int(battle_copy.time_remaining) - timeout - DECISION_CLOCK_MARGIN_SEC),
+            )
+        best_move = await scheduled.result(timeout, queue_timeout)
         if isinstance(best_move, tuple) and len(best_move) == 2:
             best_move, trace = best_move
+    except DecisionQueueTimeout:
+        logger.warning(
+            "No search slot within %ss - using fallback move.",
+            queue_timeout,
+        )
+        best_move = _fallback_decision(battle_copy)
+        trace_reason = "queue_timeout"
     except asyncio.TimeoutError:
         logger.warning(
             "Decision timeout after %ss - using fallback move.",
@@ -1129,6 +1163,10 @@ async def async_pick_move(battle):
     formatted = format_decision(battle_copy, best_move)
     if TRACE_DECISIONS and trace is not None:
         trace["formatted_choice"] = formatted
+        if scheduled is not None:
+            trace["scheduler"] = scheduled.metrics()
+        if features is not None:
+            trace["features"] = features.stats()
         write_decision_trace(trace)
     return formatted
 
@@ -1315,7 +1353,7 @@ def _is_invalid_choice_message(msg: str) -> bool:
 
 
 async def handle_team_preview(battle, ps_websocket_client):
-    battle_copy = deepcopy(battle)
+    battle_copy = battle.clone()
     battle_copy.user.active = Pokemon.get_dummy()
     battle_copy.opponent.active = Pokemon.get_dummy()
     battle_copy.team_preview = True
@@ -2019,19 +2057,10 @@ async def pokemon_battle(
         "slot": (worker_id + 1) if worker_id is not None else None,
     })
 
-    # Generate pre-battle gameplan for strategic decision-making
-    gameplan = generate_and_store_gameplan(battle_tag, battle)
-    if gameplan:
-        # Store gameplan in battle object for access by decision layer
-        battle.gameplan = gameplan
-        logger.info(f"🎮 GAMEPLAN GENERATED: {gameplan.our_strategy}")
-        logger.info(f"📌 OUR WIN CONDITION: {gameplan.win_condition}")
-        logger.info(f"⚔️ OPPONENT WIN CONDITION: {gameplan.opponent_win_condition}")
-        logger.info(f"🔄 KEY PIVOTS: {', '.join(gameplan.key_pivot_triggers)}")
-        logger.info(f"💡 BACKUP PLAN: {gameplan.backup_plan or 'None'}")
-    else:
-        battle.gameplan = None
-        logger.warning(f"Failed to generate gameplan for {battle_tag}")
+    # Generate the pre-battle gameplan in the background: the LLM call must
+    # not stall the loop (and every other battle on it). Turn 1 is played
+    # without a gameplan if it is not ready; battle.gameplan is set on arrival.
+    start_gameplan_generation(battle_tag, battle)
 
     timeout_strikes = 0
     message_timeout = MESSAGE_TIMEOUT_SEC
@@ -2352,8 +2381,10 @@ async def pokemon_battle(
         logger.exception("Unhandled exception in battle loop for %s", battle_tag)
         raise
     finally:
-        # Clean up gameplan from memory
+        # Clean up gameplan, banked search time and features from memory
         clear_gameplan(battle_tag)
+        clear_search_time_bank(battle_tag)
+        clear_features(battle_tag)
         await _finalize_battle_runtime(
             ps_websocket_client,
             battle_tag,
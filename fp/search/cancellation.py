@@ -0,0 +1,94 @@
+"""
+Cooperative Cancellation for Decisions
+
+A decision abandoned by its caller (the hard timeout in `async_pick_move`)
+cannot be interrupted from outside its thread, so the search checks a
+cancellation token at its phase boundaries: between heuristic passes, per
+sampled world, and between MCTS slices. `check_cancelled` raises
+`SearchCancelled`, which like `asyncio.CancelledError` is not an
+`Exception`, so the search's broad fallback handlers let it through.
+
+The token of the running decision lives in a ContextVar, set by the
+decision scheduler. `cancellation_stats` counts cancelled decisions and the
+MCTS worker time they did not spend.
+"""
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+
+class SearchCancelled(BaseException):
+    """The running decision was abandoned by its caller."""
+
+
+class CancellationToken:
+    __slots__ = ("_event", "reason")
+
+    def __init__(self):
+        self._event = threading.Event()
+        self.reason = ""
+
+    def cancel(self, reason: str = "cancelled"):
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise SearchCancelled(self.reason)
+
+
+_current_token: ContextVar[Optional[CancellationToken]] = ContextVar(
+    "cancellation_token", default=None
+)
+
+
+def current_cancel_token() -> Optional[CancellationToken]:
+    return _current_token.get()
+
+
+@contextmanager
+def cancellation_scope(token: CancellationToken):
+    """Make `token` the running decision's token for the duration of the block."""
+    reset = _current_token.set(token)
+    try:
+        yield token
+    finally:
+        _current_token.reset(reset)
+
+
+def check_cancelled():
+    """Raise `SearchCancelled` if the running decision has been abandoned."""
+    token = _current_token.get()
+    if token is not None:
+        token.raise_if_cancelled()
+
+
+_stats_lock = threading.Lock()
+_stats = {"cancelled": 0, "cpu_seconds_saved": 0.0}
+
+
+def record_cancelled():
+    """Count a decision that stopped at a cancellation check."""
+    with _stats_lock:
+        _stats["cancelled"] += 1
+
+
+def record_cpu_saved(cpu_seconds: float):
+    """Count worker time a cancelled search did not spend."""
+    with _stats_lock:
+        _stats["cpu_seconds_saved"] += max(0.0, float(cpu_seconds))
+
+
+def cancellation_stats() -> dict:
+    with _stats_lock:
+        return {
+            "cancelled": _stats["cancelled"],
+            "cpu_seconds_saved": round(_stats["cpu_seconds_saved"], 3),
+        }
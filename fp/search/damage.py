@@ -0,0 +1,299 @@
+"""
+Shared Damage Estimation for Fouler-Play
+
+One simplified damage calculator used by every heuristic module (eval,
+forced lines, opponent prediction, endgame and KO-line detection).
+
+Inside a `damage_cache()` scope (one per decision, see `find_best_move`)
+results are memoized on the inputs the formula actually reads: the move,
+the attacking and defending stats and boosts for the move's category,
+types, tera state, level and HP. The formula reads no field state, so
+weather and terrain are not part of the key. Outside a scope every call
+computes directly.
+"""
+
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache, wraps
+from typing import Optional
+
+import constants
+from fp.helpers import (
+    POKEMON_TYPE_INDICES,
+    defensive_type_profile,
+    normalize_name,
+)
+from data.ids import (
+    PHYSICAL_CATEGORY,
+    SPECIAL_CATEGORY,
+    TYPE_NAMES,
+    UNKNOWN_ID,
+    move_table,
+)
+
+logger = logging.getLogger(__name__)
+
+_VALID_TYPES = set(POKEMON_TYPE_INDICES)
+
+# Moves that deal a fraction of the defender's current HP despite 0 BP.
+_HALF_HP_DAMAGE_MOVES = {
+    "superfang",
+    "ruination",
+    "naturesmadness",
+    "naturefury",
+}
+
+# (attacking stat, defending stat) per damage category
+_CATEGORY_STATS = {
+    constants.PHYSICAL: (constants.ATTACK, constants.DEFENSE),
+    constants.SPECIAL: (constants.SPECIAL_ATTACK, constants.SPECIAL_DEFENSE),
+}
+# the same, per `data.ids` category id
+_CATEGORY_ID_STATS = {
+    PHYSICAL_CATEGORY: _CATEGORY_STATS[constants.PHYSICAL],
+    SPECIAL_CATEGORY: _CATEGORY_STATS[constants.SPECIAL],
+}
+
+
+def _normalize_type_name(value: object) -> str | None:
+    if not isinstance(value, str):
+        return None
+    return _valid_type_name(value)
+
+
+@lru_cache(maxsize=256)
+def _valid_type_name(value: str) -> str | None:
+    normalized = normalize_name(value)
+    if normalized in _VALID_TYPES:
+        return normalized
+    return None
+
+
+def _sanitize_type_list(values) -> list[str]:
+    if not values:
+        return []
+    cleaned: list[str] = []
+    for value in values:
+        normalized = _normalize_type_name(value)
+        if normalized:
+            cleaned.append(normalized)
+    return cleaned
+
+
+def _get_effective_types(pokemon) -> list[str]:
+    """Get a Pokemon's effective types, accounting for Terastallization."""
+    base_types = _sanitize_type_list(getattr(pokemon, "types", []) or [])
+    tera_type = _normalize_type_name(getattr(pokemon, "tera_type", None))
+    if getattr(pokemon, "terastallized", False) and tera_type:
+        return [tera_type]
+    return base_types
+
+
+@lru_cache(maxsize=1024)
+def _effective_defensive_profile(types: tuple, tera_type, terastallized: bool) -> tuple:
+    tera = _normalize_type_name(tera_type)
+    if terastallized and tera:
+        return defensive_type_profile((tera,))
+    return defensive_type_profile(_sanitize_type_list(types))
+
+
+def defensive_profile(pokemon) -> tuple:
+    """
+    Multiplier of every attacking type, indexed by POKEMON_TYPE_INDICES,
+    against the Pokemon's effective (tera-aware) types.
+    """
+    types = getattr(pokemon, "types", None) or ()
+    tera_type = getattr(pokemon, "tera_type", None)
+    terastallized = bool(getattr(pokemon, "terastallized", False))
+    try:
+        return _effective_defensive_profile(tuple(types), tera_type, terastallized)
+    except TypeError:
+        # unhashable attribute (e.g. a test double)
+        return defensive_type_profile(_get_effective_types(pokemon))
+
+
+def max_effectiveness(attacking_types, defender, default=1.0) -> float:
+    """Best multiplier among `attacking_types` against `defender`."""
+    profile = defensive_profile(defender)
+    return max(
+        (profile[POKEMON_TYPE_INDICES[t]] for t in attacking_types), default=default
+    )
+
+
+class DamageCache:
+    """Memo of damage estimates for a single decision."""
+
+    __slots__ = ("entries", "matchups", "hits", "misses")
+
+    def __init__(self):
+        self.entries: dict[tuple, float] = {}
+        # matchup matrices and per-side arrays, see fp.search.matchup
+        self.matchups: dict[tuple, tuple] = {}
+        self.hits = 0
+        self.misses = 0
+
+
+_decision_cache: ContextVar[Optional[DamageCache]] = ContextVar(
+    "damage_cache", default=None
+)
+
+
+@contextmanager
+def damage_cache():
+    """
+    Share damage estimates for the duration of the block.
+
+    Nested scopes reuse the outermost cache, so every heuristic called while
+    making one decision sees the same memo.
+    """
+    cache = _decision_cache.get()
+    if cache is not None:
+        yield cache
+        return
+    cache = DamageCache()
+    token = _decision_cache.set(cache)
+    try:
+        yield cache
+    finally:
+        _decision_cache.reset(token)
+        logger.debug(
+            f"Damage cache: {cache.hits} hits, {cache.misses} misses "
+            f"({len(cache.entries)} entries)"
+        )
+
+
+def with_damage_cache(fn):
+    """Decorator running `fn` inside a `damage_cache()` scope."""
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        with damage_cache():
+            return fn(*args, **kwargs)
+
+    return wrapper
+
+
+def _stats_value(pokemon, stat: str):
+    stats = getattr(pokemon, "stats", None)
+    return stats.get(stat, 100) if isinstance(stats, dict) else 100
+
+
+def _boost_value(pokemon, stat: str) -> int:
+    return (getattr(pokemon, "boosts", {}) or {}).get(stat, 0)
+
+
+def _damage_key(attacker, defender, move: int, category: int) -> tuple:
+    atk_stat, def_stat = _CATEGORY_ID_STATS[category]
+    return (
+        move,
+        _stats_value(attacker, atk_stat),
+        _boost_value(attacker, atk_stat),
+        tuple(getattr(attacker, "types", None) or ()),
+        getattr(attacker, "tera_type", None),
+        bool(getattr(attacker, "terastallized", False)),
+        getattr(attacker, "level", None),
+        _stats_value(defender, def_stat),
+        _boost_value(defender, def_stat),
+        tuple(getattr(defender, "types", None) or ()),
+        getattr(defender, "tera_type", None),
+        bool(getattr(defender, "terastallized", False)),
+        getattr(defender, "max_hp", None),
+        getattr(defender, "hp", None),
+    )
+
+
+def estimate_damage_ratio(attacker, defender, move_name: str) -> float:
+    """
+    Estimate damage as fraction of defender's max HP (simplified, level 100).
+    Can exceed 1.0 for overkill; fixed-damage moves are capped at 1.0.
+    """
+    if attacker is None or defender is None:
+        return 0.0
+
+    moves = move_table()
+    move = moves.ids.id(move_name)
+    if move == UNKNOWN_ID:
+        return 0.0
+    category = int(moves.category[move])
+    if category not in _CATEGORY_ID_STATS:
+        return 0.0
+
+    cache = _decision_cache.get()
+    if cache is None:
+        return _compute_damage_ratio(attacker, defender, moves, move)
+
+    try:
+        key = _damage_key(attacker, defender, move, category)
+        damage = cache.entries.get(key)
+    except TypeError:
+        # unhashable attribute (e.g. a test double); skip the memo
+        return _compute_damage_ratio(attacker, defender, moves, move)
+
+    if damage is None:
+        cache.misses += 1
+        damage = _compute_damage_ratio(attacker, defender, moves, move)
+        cache.entries[key] = damage
+    else:
+        cache.hits += 1
+    return damage
+
+
+def _compute_damage_ratio(attacker, defender, moves, move: int) -> float:
+    type_index = int(moves.type[move])
+    base_power = float(moves.base_power[move])
+
+    defender_max_hp = max(float(getattr(defender, "max_hp", 1) or 1), 1.0)
+    effectiveness = defensive_profile(defender)[type_index]
+    if effectiveness == 0:
+        return 0.0
+
+    # Fixed-damage moves (e.g., Seismic Toss, Night Shade) should not be
+    # treated like 0-BP status moves. They are often critical progress lines.
+    if moves.fixed_damage[move] > 0:
+        return min(float(moves.fixed_damage[move]) / defender_max_hp, 1.0)
+    if moves.level_damage[move]:
+        raw_level = getattr(attacker, "level", None)
+        if isinstance(raw_level, (int, float)) and raw_level > 0:
+            level = float(raw_level)
+        else:
+            level = 100.0
+        return min(level / defender_max_hp, 1.0)
+
+    if moves.ids.name(move) in _HALF_HP_DAMAGE_MOVES:
+        current_hp = max(float(getattr(defender, "hp", 0) or 0), 0.0)
+        return min((0.5 * current_hp) / defender_max_hp, 1.0)
+
+    if base_power == 0:
+        return 0.0
+
+    atk_stat, def_stat = _CATEGORY_ID_STATS[int(moves.category[move])]
+    atk = _stats_value(attacker, atk_stat)
+    def_ = _stats_value(defender, def_stat)
+    atk_boost = _boost_value(attacker, atk_stat)
+    def_boost = _boost_value(defender, def_stat)
+
+    # Apply stat boosts
+    if atk_boost > 0:
+        atk *= (2 + atk_boost) / 2
+    elif atk_boost < 0:
+        atk *= 2 / (2 - atk_boost)
+
+    if def_boost > 0:
+        def_ *= (2 + def_boost) / 2
+    elif def_boost < 0:
+        def_ *= 2 / (2 - def_boost)
+
+    # STAB — Tera type also grants STAB
+    attacker_types = _sanitize_type_list(getattr(attacker, "types", []) or [])
+    attacker_tera = _normalize_type_name(getattr(attacker, "tera_type", None))
+    if getattr(attacker, "terastallized", False) and attacker_tera:
+        if attacker_tera not in attacker_types:
+            attacker_types.append(attacker_tera)
+    stab = 1.5 if TYPE_NAMES[type_index] in attacker_types else 1.0
+
+    damage = (
+        (((2 * 100 / 5 + 2) * base_power * atk / def_) / 50 + 2) * effectiveness * stab
+    )
+
+    return damage / defender_max_hp
@@ -4,16 +4,29 @@ Phase 4.1 Implementation
 
 Solves deterministic endgame scenarios (1v1, 2v1, etc.)
 to find optimal plays without relying on MCTS.
+
+`solve_endgame` searches fully-revealed endgames of up to
+ENDGAME_MAX_POKEMON a side with `EndgameSearch`: expectiminimax over
+poke-engine damage rolls with alpha-beta pruning, a transposition table and
+iterative deepening under ENDGAME_TIME_CAP_MS. A proven win is played
+without running MCTS.
 """
 
 import logging
+import time
 from dataclasses import dataclass
 from typing import Optional, Tuple
 
 import constants
-from fp.battle import Battle
-from fp.helpers import type_effectiveness_modifier
+from constants_pkg.strategy import (
+    ENDGAME_MAX_POKEMON,
+    ENDGAME_SOLVE_DEPTH,
+    ENDGAME_TIME_CAP_MS,
+)
 from data import all_move_json
+from fp.battle import Battle
+from fp.search.cancellation import check_cancelled
+from fp.search.damage import estimate_damage_ratio
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +39,8 @@ class EndgameResult:
     is_deterministic: bool
     depth_searched: int
     explanation: str = ""
+    nodes: int = 0
+    elapsed_ms: float = 0.0
 
 
 def is_endgame(battle: Battle, max_pokemon: int = 3) -> bool:
@@ -64,7 +79,7 @@ def get_speed(pokemon) -> int:
 
     # Apply paralysis
     status = getattr(pokemon, "status", None)
-    if status == constants.PARALYSIS:
+    if status == constants.PARALYZED:
         multiplier *= 0.5
 
     return int(base_speed * multiplier)
@@ -75,88 +90,6 @@ def can_outspeed(our_pokemon, opp_pokemon) -> bool:
     return get_speed(our_pokemon) > get_speed(opp_pokemon)
 
 
-def estimate_damage(attacker, defender, move_name: str) -> float:
-    """
-    Rough damage estimate as fraction of defender HP.
-    Returns 0.0 to 1.0+ (can exceed 1.0 for overkill).
-    """
-    if attacker is None or defender is None:
-        return 0.0
-
-    move_data = all_move_json.get(move_name, {})
-    base_power = move_data.get(constants.BASE_POWER, 0)
-
-    if base_power == 0:
-        return 0.0
-
-    move_type = move_data.get(constants.TYPE, "normal")
-    category = move_data.get(constants.CATEGORY, "Status")
-
-    # Get attack/defense stats
-    if category == constants.PHYSICAL:
-        if hasattr(attacker, "stats") and isinstance(attacker.stats, dict):
-            atk = attacker.stats.get(constants.ATTACK, 100)
-        else:
-            atk = 100
-        if hasattr(defender, "stats") and isinstance(defender.stats, dict):
-            def_ = defender.stats.get(constants.DEFENSE, 100)
-        else:
-            def_ = 100
-
-        # Apply boosts
-        atk_boost = (getattr(attacker, "boosts", {}) or {}).get(constants.ATTACK, 0)
-        def_boost = (getattr(defender, "boosts", {}) or {}).get(constants.DEFENSE, 0)
-
-    elif category == constants.SPECIAL:
-        if hasattr(attacker, "stats") and isinstance(attacker.stats, dict):
-            atk = attacker.stats.get(constants.SPECIAL_ATTACK, 100)
-        else:
-            atk = 100
-        if hasattr(defender, "stats") and isinstance(defender.stats, dict):
-            def_ = defender.stats.get(constants.SPECIAL_DEFENSE, 100)
-        else:
-            def_ = 100
-
-        # Apply boosts
-        atk_boost = (getattr(attacker, "boosts", {}) or {}).get(constants.SPECIAL_ATTACK, 0)
-        def_boost = (getattr(defender, "boosts", {}) or {}).get(constants.SPECIAL_DEFENSE, 0)
-    else:
-        return 0.0
-
-    # Apply stat boosts
-    if atk_boost > 0:
-        atk *= (2 + atk_boost) / 2
-    elif atk_boost < 0:
-        atk *= 2 / (2 - atk_boost)
-
-    if def_boost > 0:
-        def_ *= (2 + def_boost) / 2
-    elif def_boost < 0:
-        def_ *= 2 / (2 - def_boost)
-
-    # Type effectiveness
-    defender_types = getattr(defender, "types", []) or []
-    effectiveness = type_effectiveness_modifier(move_type, defender_types)
-
-    if effectiveness == 0:
-        return 0.0
-
-    # STAB
-    attacker_types = getattr(attacker, "types", []) or []
-    stab = 1.5 if move_type in attacker_types else 1.0
-
-    # Simplified damage formula
-    # Real formula: ((2*L/5+2)*P*A/D)/50+2) * modifiers
-    # Simplified assuming level 100
-    damage = (((2 * 100 / 5 + 2) * base_power * atk / def_) / 50 + 2) * effectiveness * stab
-
-    # Normalize to HP ratio
-    defender_max_hp = getattr(defender, "max_hp", 1) or 1
-    damage_ratio = damage / defender_max_hp
-
-    return damage_ratio
-
-
 def can_ko(attacker, defender) -> Tuple[bool, Optional[str], float]:
     """
     Check if attacker can KO defender.
@@ -178,7 +111,7 @@ def can_ko(attacker, defender) -> Tuple[bool, Optional[str], float]:
         if hasattr(move, "current_pp") and move.current_pp <= 0:
             continue
 
-        damage = estimate_damage(attacker, defender, move_name)
+        damage = estimate_damage_ratio(attacker, defender, move_name)
         if damage > best_damage:
             best_damage = damage
             best_move = move_name
@@ -251,61 +184,713 @@ def solve_1v1(our_pokemon, opp_pokemon) -> EndgameResult:
     return EndgameResult(our_best_move, 0.5, False, 1, "Complex situation")
 
 
-def solve_endgame(battle: Battle, max_depth: int = 4) -> Optional[EndgameResult]:
+# =============================================================================
+# ENDGAME SEARCH
+# =============================================================================
+
+# Opponent team size needed before their team counts as fully revealed
+FULL_TEAM_SIZE = 6
+
+_EXACT, _LOWER, _UPPER = 0, 1, 2
+# Leaf estimates stay strictly inside (0, 1) so 1.0 and 0.0 only come from
+# positions searched to the end
+_LEAF_MIN, _LEAF_MAX = 0.01, 0.99
+# Non-KO damage rolls beyond this many are kept as their lowest, highest and
+# mean outcome. Remaining HP never helps the side that lost it in this model,
+# so the extremes keep a proof sound while the mean keeps the expectation.
+_MAX_SURVIVOR_OUTCOMES = 3
+
+# Opponent items and abilities that change nothing the search leaves out:
+# they act through the damage rolls, the speed stat, or effects (status,
+# boosts, hazards) that are not modelled for either side. Anything else,
+# including an unrevealed item or ability, could refute a "proven" win
+# (Focus Sash, Sturdy, Leftovers, Regenerator, Intimidate...).
+_MODELLED_ITEMS = frozenset(
+    {
+        "",
+        "assaultvest",
+        "choiceband",
+        "choicescarf",
+        "choicespecs",
+        "covertcloak",
+        "eviolite",
+        "expertbelt",
+        "heavydutyboots",
+        "muscleband",
+        "protectivepads",
+        "safetygoggles",
+        "wiseglasses",
+    }
+)
+_MODELLED_ABILITIES = frozenset(
+    {
+        "noability",
+        "adaptability",
+        "bigpecks",
+        "clearbody",
+        "filter",
+        "fullmetalbody",
+        "goodasgold",
+        "heatproof",
+        "hugepower",
+        "hypercutter",
+        "immunity",
+        "infiltrator",
+        "innerfocus",
+        "insomnia",
+        "ironfist",
+        "keeneye",
+        "levitate",
+        "limber",
+        "magicguard",
+        "moldbreaker",
+        "oblivious",
+        "overcoat",
+        "owntempo",
+        "pressure",
+        "prismarmor",
+        "purepower",
+        "sharpness",
+        "shielddust",
+        "solidrock",
+        "strongjaw",
+        "technician",
+        "teravolt",
+        "thickfat",
+        "tintedlens",
+        "toughclaws",
+        "turboblaze",
+        "unaware",
+        "vitalspirit",
+        "waterveil",
+        "whitesmoke",
+    }
+)
+
+# Damage our side takes outside the modelled moves: `_act` only applies the
+# move's damage to the target, so residual status chip, Life Orb and the
+# like, recoil and weather chip could make us faint on a turn the search
+# counts as survived.
+_CHIP_STATUSES = frozenset({constants.BURN, constants.POISON, constants.TOXIC})
+_SELF_DAMAGING_ITEMS = frozenset(
+    {"lifeorb", "blacksludge", "stickybarb", "flameorb", "toxicorb"}
+)
+# self-damaging moves whose move data does not say so
+_SELF_DAMAGING_MOVES = frozenset({"steelbeam"})
+_CHIP_WEATHER = frozenset({constants.SAND, constants.HAIL})
+# Our held items that restrict our later actions; the search lets every
+# Pokemon pick any move each turn.
+_LOCKING_ITEMS = frozenset({"choiceband", "choicescarf", "choicespecs"})
+# Moves that fail outside a condition the search does not track: the
+# target attacking, the user's first turn out, or the user not being hit.
+_CONDITIONAL_MOVES = frozenset(
+    {
+        "suckerpunch",
+        "thunderclap",
+        "fakeout",
+        "firstimpression",
+        "focuspunch",
+        "upperhand",
+    }
+)
+
+
+class _SearchTimeout(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class EndgameMove:
+    name: str
+    priority: int
+    accuracy: float
+    heal: float  # fraction of max HP restored to the user
+    status: bool = False  # status category: no damage of its own
+    # Effects `_act` leaves out that can only make the move worse for its
+    # user (self stat drops, recharge, lock-in, failing conditions): ours
+    # are left out of our actions...
+    overrated: bool = False
+    # ...or better for its user (drain, secondary effects): the opponent's
+    # keep a win from being proven
+    underrated: bool = False
+
+
+@dataclass
+class _TTEntry:
+    depth: int
+    value: float
+    flag: int
+    best: tuple | None
+
+
+def _endgame_move(name: str) -> EndgameMove:
+    move_data = all_move_json.get(name, {})
+    accuracy = move_data.get(constants.ACCURACY, True)
+    heal = move_data.get("heal") or (0, 1)
+    return EndgameMove(
+        name=name,
+        priority=int(move_data.get(constants.PRIORITY, 0) or 0),
+        accuracy=1.0 if accuracy is True else float(accuracy) / 100.0,
+        heal=heal[0] / heal[1],
+        status=move_data.get(constants.CATEGORY) == constants.STATUS,
+        overrated=bool(move_data.get("self")) or name in _CONDITIONAL_MOVES,
+        underrated=bool(move_data.get("drain") or move_data.get("secondary")),
+    )
+
+
+def _usable_moves(pokemon) -> list[str]:
+    moves = []
+    for move in getattr(pokemon, "moves", []) or []:
+        if getattr(move, "disabled", False):
+            continue
+        if getattr(move, "current_pp", 1) <= 0:
+            continue
+        moves.append(move.name if hasattr(move, "name") else str(move))
+    return moves
+
+
+def _effective_speed(pokemon) -> int:
+    speed = get_speed(pokemon)
+    if getattr(pokemon, "item", None) == "choicescarf":
+        speed = int(speed * 1.5)
+    return speed
+
+
+def _alive_team(battler) -> list:
+    team = (
+        [battler.active] + list(battler.reserve)
+        if battler.active
+        else list(battler.reserve)
+    )
+    return [p for p in team if p is not None and p.hp > 0]
+
+
+def _unmodelled_traits(pokemon) -> list[str]:
+    """The Pokemon's item and ability, where the search does not model them."""
+    traits = []
+    item = getattr(pokemon, "item", None)
+    if item not in _MODELLED_ITEMS:
+        traits.append(f"item {item or 'unknown'}")
+    ability = getattr(pokemon, "ability", None)
+    if ability not in _MODELLED_ABILITIES:
+        traits.append(f"ability {ability or 'unknown'}")
+    return traits
+
+
+def _self_damaging_move(name: str) -> bool:
+    move_data = all_move_json.get(name, {})
+    heal = move_data.get("heal")
+    return bool(
+        name in _SELF_DAMAGING_MOVES
+        or move_data.get("recoil")
+        or move_data.get("crash")
+        or move_data.get("struggleRecoil")
+        or (heal and heal[0] < 0)
+    )
+
+
+def _unmodelled_own_traits(pokemon, moves: list[str]) -> list[str]:
     """
-    Attempt to solve an endgame position.
-    Returns None if too complex or not an endgame.
+    What could damage our Pokemon beyond the opponent's modelled moves, or
+    keep it from acting as the search assumes.
+    """
+    sources = []
+    status = getattr(pokemon, "status", None)
+    if status in _CHIP_STATUSES:
+        sources.append(f"status {status}")
+    item = getattr(pokemon, "item", None)
+    if item in _SELF_DAMAGING_ITEMS or item in _LOCKING_ITEMS:
+        sources.append(f"item {item}")
+    sources += [f"move {m}" for m in moves if _self_damaging_move(m)]
+    return sources
+
+
+def endgame_fully_revealed(battle: Battle) -> bool:
+    """Every opponent Pokemon and every move of the living ones is known."""
+    if battle.user.active is None or battle.opponent.active is None:
+        return False
+    known = [battle.opponent.active] + list(battle.opponent.reserve)
+    if len([p for p in known if p is not None]) < FULL_TEAM_SIZE:
+        return False
+    return all(
+        len(getattr(p, "moves", []) or []) >= 4 for p in _alive_team(battle.opponent)
+    )
+
+
+class EndgameSearch:
     """
-    if not is_endgame(battle):
+    Simultaneous-move expectiminimax over a small, fully-known endgame.
+
+    Each turn we pick an action, then the opponent picks the reply that is
+    worst for us (so a value of 1.0 is a win against any modelled reply).
+    Chance nodes cover move accuracy, speed ties and damage rolls: a KO, and
+    the HP left by the surviving rolls (their lowest, highest and mean when
+    there are many). Both sides can attack, use a healing move or switch;
+    after a faint the side picks its replacement. Other effects (status,
+    boosts, protection, hazards, items) are not modelled; moves that only
+    have such effects are left out of the actions, and
+    `unmodelled_replies` lists the opponent's. Our moves that the model
+    would overrate (`EndgameMove.overrated`) are left out too, and the
+    opponent's it would underrate count as unmodelled replies.
+
+    A position is (our active, their active, our HPs, their HPs). Values
+    are cached in a transposition table keyed on it and reused across the
+    iterations of the iterative deepening in `solve`.
+    """
+
+    def __init__(
+        self,
+        our_team: list,
+        opp_team: list,
+        our_moves: list[list[str]],
+        opp_moves: list[list[str]],
+        damage: dict[tuple, tuple],
+        trick_room: bool = False,
+    ):
+        self.max_hp = (
+            tuple(max(int(p.max_hp), 1) for p in our_team),
+            tuple(max(int(p.max_hp), 1) for p in opp_team),
+        )
+        self.names = (
+            tuple(p.name for p in our_team),
+            tuple(p.name for p in opp_team),
+        )
+        self.speeds = (
+            tuple(_effective_speed(p) for p in our_team),
+            tuple(_effective_speed(p) for p in opp_team),
+        )
+        self.moves = (
+            tuple(tuple(_endgame_move(m) for m in moves) for moves in our_moves),
+            tuple(tuple(_endgame_move(m) for m in moves) for moves in opp_moves),
+        )
+        # opponent moves the search cannot play: any of them might refute a win
+        self.unmodelled_replies = sorted(
+            {
+                move.name
+                for moves in self.moves[1]
+                for move in moves
+                if (move.status and move.heal <= 0) or move.underrated
+            }
+        )
+        # (side, attacker, move, defender) -> damage rolls in HP
+        self.damage = damage
+        self.trick_room = trick_room
+        self.tt: dict[tuple, _TTEntry] = {}
+        self._hits: dict[tuple, tuple] = {}
+        self.nodes = 0
+        self.deadline = None
+
+    # ---- positions ---------------------------------------------------------
+
+    @staticmethod
+    def _terminal(state) -> float | None:
+        _, _, our_hps, opp_hps = state
+        if not any(opp_hps):
+            return 1.0
+        if not any(our_hps):
+            return 0.0
         return None
 
-    our_pokemon = [p for p in [battle.user.active] + battle.user.reserve if p and p.hp > 0]
-    opp_pokemon = [p for p in [battle.opponent.active] + battle.opponent.reserve if p and p.hp > 0]
+    def _leaf(self, state) -> float:
+        _, _, our_hps, opp_hps = state
+        ours = sum(hp / m for hp, m in zip(our_hps, self.max_hp[0]))
+        theirs = sum(hp / m for hp, m in zip(opp_hps, self.max_hp[1]))
+        size = max(len(our_hps), len(opp_hps))
+        value = 0.5 + 0.5 * (ours - theirs) / size
+        return min(_LEAF_MAX, max(_LEAF_MIN, value))
+
+    def _actions(self, side: int, state) -> list[tuple]:
+        active = state[side]
+        hps = state[2 + side]
+        # moves that neither damage nor heal are left out of the model, and
+        # so are our moves the model would overrate
+        actions = [
+            ("move", move)
+            for move in self.moves[side][active]
+            if not (side == 0 and move.overrated)
+            and (
+                move.heal > 0
+                or any(
+                    any(self.damage.get((side, active, move.name, d), ()))
+                    for d in range(len(self.max_hp[1 - side]))
+                )
+            )
+        ]
+        actions += [("switch", i) for i, hp in enumerate(hps) if hp > 0 and i != active]
+        return actions or [("pass", None)]
+
+    # ---- turn resolution ---------------------------------------------------
+
+    def _hit(self, side: int, attacker: int, move: EndgameMove, defender: int, hp: int):
+        """[(probability, defender HP after the hit)] over the damage rolls."""
+        key = (side, attacker, move.name, defender, hp)
+        outcomes = self._hits.get(key)
+        if outcomes is None:
+            rolls = self.damage.get((side, attacker, move.name, defender), ()) or (0,)
+            p_roll = move.accuracy / len(rolls)
+            merged: dict[int, float] = {}
+            kos = sum(1 for r in rolls if r >= hp)
+            if kos:
+                merged[0] = p_roll * kos
+            survivors = sorted(hp - r for r in rolls if r < hp)
+            if len(survivors) > _MAX_SURVIVOR_OUTCOMES:
+                middle = survivors[1:-1]
+                mean = int(round(sum(middle) / len(middle)))
+                buckets = [(survivors[0], 1), (mean, len(middle)), (survivors[-1], 1)]
+            else:
+                buckets = [(after, 1) for after in survivors]
+            for after, n in buckets:
+                merged[after] = merged.get(after, 0.0) + p_roll * n
+            if move.accuracy < 1:
+                merged[hp] = merged.get(hp, 0.0) + 1 - move.accuracy
+            outcomes = self._hits[key] = tuple(
+                (p, after) for after, p in merged.items()
+            )
+        return outcomes
+
+    def _act(self, side: int, move: EndgameMove, state) -> list[tuple]:
+        actives = state[:2]
+        hps = [list(state[2]), list(state[3])]
+        attacker = actives[side]
+        if hps[side][attacker] <= 0:
+            return [(1.0, state)]
+        if move.heal > 0:
+            max_hp = self.max_hp[side][attacker]
+            hps[side][attacker] = min(
+                max_hp, hps[side][attacker] + int(max_hp * move.heal)
+            )
+            return [(1.0, (actives[0], actives[1], tuple(hps[0]), tuple(hps[1])))]
+        target_side = 1 - side
+        defender = actives[target_side]
+        results = []
+        for p, hp in self._hit(
+            side, attacker, move, defender, hps[target_side][defender]
+        ):
+            after = [list(hps[0]), list(hps[1])]
+            after[target_side][defender] = hp
+            results.append(
+                (p, (actives[0], actives[1], tuple(after[0]), tuple(after[1])))
+            )
+        return results
+
+    def _goes_first(self, our_move: EndgameMove, opp_move: EndgameMove, state) -> float:
+        """Probability that our move resolves before theirs."""
+        if our_move.priority != opp_move.priority:
+            return 1.0 if our_move.priority > opp_move.priority else 0.0
+        ours = self.speeds[0][state[0]]
+        theirs = self.speeds[1][state[1]]
+        if ours == theirs:
+            return 0.5
+        return 1.0 if (ours > theirs) != self.trick_room else 0.0
+
+    def _resolve(self, state, ours: tuple, theirs: tuple) -> list[tuple]:
+        """[(probability, position)] after both sides' actions this turn."""
+        our_active, opp_active = state[0], state[1]
+        if ours[0] == "switch":
+            our_active = ours[1]
+        if theirs[0] == "switch":
+            opp_active = theirs[1]
+        state = (our_active, opp_active, state[2], state[3])
+
+        movers = [
+            (side, a[1]) for side, a in ((0, ours), (1, theirs)) if a[0] == "move"
+        ]
+        if len(movers) == 2:
+            p_first = self._goes_first(movers[0][1], movers[1][1], state)
+            orders = [
+                (p, o)
+                for p, o in ((p_first, movers), (1 - p_first, movers[::-1]))
+                if p > 0
+            ]
+        else:
+            orders = [(1.0, movers)]
+
+        merged: dict[tuple, float] = {}
+        for p_order, order in orders:
+            outcomes = [(p_order, state)]
+            for side, move in order:
+                outcomes = [
+                    (p * q, after)
+                    for p, before in outcomes
+                    for q, after in self._act(side, move, before)
+                ]
+            for p, after in outcomes:
+                merged[after] = merged.get(after, 0.0) + p
+        return [(p, s) for s, p in merged.items()]
+
+    # ---- search ------------------------------------------------------------
+
+    def _tick(self):
+        self.nodes += 1
+        if self.nodes & 255 == 0:
+            check_cancelled()
+            if self.deadline is not None and time.perf_counter() > self.deadline:
+                raise _SearchTimeout()
+
+    def _after_turn(self, state, depth: int) -> float:
+        """Value once the turn is over: replacements after faints, then the next turn."""
+        terminal = self._terminal(state)
+        if terminal is not None:
+            return terminal
+        for side in (0, 1):
+            if state[2 + side][state[side]] > 0:
+                continue
+            replacements = [i for i, hp in enumerate(state[2 + side]) if hp > 0]
+            values = []
+            for i in replacements:
+                replaced = (
+                    (i, state[1], state[2], state[3])
+                    if side == 0
+                    else (state[0], i, state[2], state[3])
+                )
+                values.append(self._after_turn(replaced, depth))
+            return max(values) if side == 0 else min(values)
+        return self._turn(state, depth, 0.0, 1.0)[0]
+
+    def _turn(
+        self, state, depth: int, alpha: float, beta: float
+    ) -> tuple[float, tuple | None]:
+        self._tick()
+        terminal = self._terminal(state)
+        if terminal is not None:
+            return terminal, None
+        if depth == 0:
+            return self._leaf(state), None
+
+        entry = self.tt.get(state)
+        if entry is not None and entry.depth >= depth:
+            if entry.flag == _EXACT:
+                return entry.value, entry.best
+            if entry.flag == _LOWER and entry.value >= beta:
+                return entry.value, entry.best
+            if entry.flag == _UPPER and entry.value <= alpha:
+                return entry.value, entry.best
+
+        ours = self._actions(0, state)
+        if entry is not None and entry.best in ours:
+            ours.remove(entry.best)
+            ours.insert(0, entry.best)
+        theirs = self._actions(1, state)
+
+        original_alpha = alpha
+        best_value, best = -1.0, None
+        for action in ours:
+            # their best reply to `action`; stop once it is no better than
+            # an action we already have
+            value = 2.0
+            for reply in theirs:
+                expected = sum(
+                    p * self._after_turn(after, depth - 1)
+                    for p, after in self._resolve(state, action, reply)
+                )
+                value = min(value, expected)
+                if value <= max(alpha, best_value):
+                    break
+            if value > best_value:
+                best_value, best = value, action
+            alpha = max(alpha, best_value)
+            if best_value >= beta:
+                break
+
+        if best_value >= beta:
+            flag = _LOWER
+        elif best_value <= original_alpha:
+            flag = _UPPER
+        else:
+            flag = _EXACT
+        self.tt[state] = _TTEntry(depth, best_value, flag, best)
+        return best_value, best
+
+    def _root(
+        self, state, depth: int, force_switch: bool, keep_active: bool
+    ) -> tuple[float, tuple | None]:
+        if not force_switch:
+            return self._turn(state, depth, 0.0, 1.0)
+        best_value, best = -1.0, None
+        for i, hp in enumerate(state[2]):
+            if hp <= 0 or (keep_active and i == state[0]):
+                continue
+            value = self._after_turn((i, state[1], state[2], state[3]), depth)
+            if value > best_value:
+                best_value, best = value, ("switch", i)
+        return best_value, best
+
+    def choice(self, action: tuple | None) -> str | None:
+        if action is None or action[0] == "pass":
+            return None
+        if action[0] == "switch":
+            return f"switch {self.names[0][action[1]]}"
+        return action[1].name
+
+    def solve(
+        self,
+        state,
+        max_depth: int,
+        time_cap_ms: float,
+        force_switch: bool = False,
+        active_fainted: bool = False,
+    ) -> tuple[float, tuple | None, int]:
+        """
+        Iterative deepening up to `max_depth` turns within `time_cap_ms`.
+        With `force_switch` we only pick who comes in; `active_fainted`
+        means state's active is a placeholder that may be picked too.
+        Returns (value, best action, depth completed); depth 0 means no
+        iteration finished in time.
+        """
+        self.deadline = time.perf_counter() + time_cap_ms / 1000.0
+        result = (0.5, None, 0)
+        for depth in range(1, max_depth + 1):
+            try:
+                value, best = self._root(state, depth, force_switch, not active_fainted)
+            except _SearchTimeout:
+                break
+            result = (value, best, depth)
+            if value in (0.0, 1.0):
+                break  # proven
+        return result
 
-    our_alive = len(our_pokemon)
-    opp_alive = len(opp_pokemon)
 
-    logger.debug(f"Endgame analysis: {our_alive}v{opp_alive}")
+def _with_actives(battle: Battle, our_name: str, opp_name: str) -> Battle:
+    """Copy of `battle` with the named Pokemon active on each side."""
+    matchup = battle.clone()
+    for battler, name in ((matchup.user, our_name), (matchup.opponent, opp_name)):
+        team = (
+            [battler.active] + battler.reserve
+            if battler.active
+            else list(battler.reserve)
+        )
+        battler.active = next(p for p in team if p is not None and p.name == name)
+        battler.reserve = [p for p in team if p is not battler.active]
+    return matchup
 
-    # 1v1 is solvable
-    if our_alive == 1 and opp_alive == 1:
-        result = solve_1v1(our_pokemon[0], opp_pokemon[0])
-        logger.info(f"1v1 endgame: {result.explanation}")
-        return result
 
-    # 2v1 - we're up
-    if our_alive == 2 and opp_alive == 1:
-        # Check if current active can handle it
-        active_result = solve_1v1(battle.user.active, opp_pokemon[0])
-        if active_result.expected_outcome >= 0.8:
-            logger.info(f"2v1 endgame (active wins): {active_result.explanation}")
-            return active_result
-
-        # Consider switching to backup
-        backup = [p for p in our_pokemon if p != battle.user.active][0] if our_pokemon else None
-        if backup:
-            backup_result = solve_1v1(backup, opp_pokemon[0])
-            if backup_result.expected_outcome > active_result.expected_outcome:
-                switch_move = f"switch {backup.name}"
-                return EndgameResult(
-                    switch_move, backup_result.expected_outcome, False, 2,
-                    f"Switch to {backup.name} is better matchup"
+def build_damage_table(
+    battle: Battle, our_team, opp_team, our_moves, opp_moves, damage_rolls
+) -> dict[tuple, tuple]:
+    """
+    Damage rolls of every move of every living Pokemon into every living
+    opposing Pokemon: {(side, attacker, move, defender): rolls}. One
+    `damage_rolls` call covers one move of each side.
+    """
+    table = {}
+    for i, ours in enumerate(our_team):
+        for j, theirs in enumerate(opp_team):
+            matchup = _with_actives(battle, ours.name, theirs.name)
+            we_first = _effective_speed(ours) > _effective_speed(theirs)
+            for k in range(max(len(our_moves[i]), len(opp_moves[j]))):
+                our_move = (
+                    our_moves[i][k % len(our_moves[i])] if our_moves[i] else "splash"
+                )
+                opp_move = (
+                    opp_moves[j][k % len(opp_moves[j])] if opp_moves[j] else "splash"
                 )
+                our_rolls, opp_rolls = damage_rolls(
+                    matchup, our_move, opp_move, we_first
+                )
+                table[(0, i, our_move, j)] = tuple(int(r) for r in our_rolls or ())
+                table[(1, j, opp_move, i)] = tuple(int(r) for r in opp_rolls or ())
+    return table
 
-        return EndgameResult(
-            active_result.best_move, 0.7, False, 1,
-            "2v1 advantage, staying in"
-        )
 
-    # 1v2 - we're down
-    if our_alive == 1 and opp_alive == 2:
-        result = solve_1v1(our_pokemon[0], battle.opponent.active)
-        # Reduce expected outcome since we need to beat 2
-        result.expected_outcome *= 0.5
-        result.explanation = f"1v2 disadvantage: {result.explanation}"
-        logger.info(f"1v2 endgame: {result.explanation}")
-        return result
+def solve_endgame(
+    battle: Battle,
+    max_depth: int = ENDGAME_SOLVE_DEPTH,
+    time_cap_ms: float = ENDGAME_TIME_CAP_MS,
+    damage_rolls=None,
+) -> Optional[EndgameResult]:
+    """
+    Search a fully-revealed endgame of up to ENDGAME_MAX_POKEMON a side.
+    Returns None when the position is not one, or when no search depth
+    finished in time. The result is deterministic when the search proves a
+    win against every opponent reply and nothing it leaves out (unmodelled
+    opponent moves and traits, our residual or self-inflicted damage) could
+    refute it.
+
+    `damage_rolls(battle, our_move, opp_move, we_went_first)` returns each
+    side's damage rolls; poke-engine's by default.
+    """
+    if not is_endgame(battle, ENDGAME_MAX_POKEMON) or not endgame_fully_revealed(
+        battle
+    ):
+        return None
+    if damage_rolls is None:
+        try:
+            from fp.search.poke_engine_helpers import poke_engine_get_damage_rolls
+        except ImportError:
+            return None
+        damage_rolls = poke_engine_get_damage_rolls
+
+    started = time.perf_counter()
+    our_team = _alive_team(battle.user)
+    opp_team = _alive_team(battle.opponent)
+    our_moves = [_usable_moves(p) for p in our_team]
+    opp_moves = [_usable_moves(p) for p in opp_team]
+    damage = build_damage_table(
+        battle, our_team, opp_team, our_moves, opp_moves, damage_rolls
+    )
+
+    search = EndgameSearch(
+        our_team,
+        opp_team,
+        our_moves,
+        opp_moves,
+        damage,
+        trick_room=bool(battle.trick_room),
+    )
+    active_fainted = battle.user.active not in our_team
+    our_active = 0 if active_fainted else our_team.index(battle.user.active)
+    state = (
+        our_active,
+        opp_team.index(battle.opponent.active),
+        tuple(int(p.hp) for p in our_team),
+        tuple(int(p.hp) for p in opp_team),
+    )
+    remaining_ms = time_cap_ms - (time.perf_counter() - started) * 1000.0
+    value, best, depth = search.solve(
+        state,
+        max_depth,
+        remaining_ms,
+        force_switch=bool(battle.force_switch) or active_fainted,
+        active_fainted=active_fainted,
+    )
+    elapsed_ms = (time.perf_counter() - started) * 1000.0
+    if depth == 0:
+        logger.debug(f"Endgame search found nothing in {elapsed_ms:.0f}ms")
+        return None
 
-    # More complex endgames - return None to let MCTS handle
-    logger.debug("Complex endgame, deferring to MCTS")
-    return None
+    best_move = search.choice(best)
+    unmodelled = [f"move {m}" for m in search.unmodelled_replies]
+    for pkmn in opp_team:
+        unmodelled += [f"{pkmn.name} {trait}" for trait in _unmodelled_traits(pkmn)]
+    for pkmn, moves in zip(our_team, our_moves):
+        unmodelled += [
+            f"our {pkmn.name} {source}"
+            for source in _unmodelled_own_traits(pkmn, moves)
+        ]
+    if battle.weather in _CHIP_WEATHER:
+        unmodelled.append(f"weather {battle.weather}")
+    proven = value == 1.0 and best_move is not None and not unmodelled
+    if proven:
+        explanation = f"Forced win in {depth} turn(s)"
+    elif value == 1.0:
+        explanation = (
+            f"Win in {depth} turn(s) against modelled replies; not proven "
+            f"(unmodelled: {', '.join(unmodelled)})"
+        )
+    elif value == 0.0:
+        explanation = f"Lost against best play within {depth} turn(s)"
+    else:
+        explanation = f"Unresolved at depth {depth}"
+    logger.debug(
+        f"Endgame {len(our_team)}v{len(opp_team)}: {explanation} "
+        f"({search.nodes} nodes, {len(search.tt)} positions, {elapsed_ms:.0f}ms)"
+    )
+    return EndgameResult(
+        best_move,
+        value,
+        proven,
+        depth,
+        explanation,
+        nodes=search.nodes,
+        elapsed_ms=round(elapsed_ms, 1),
+    )
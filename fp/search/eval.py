@@ -12,9 +12,17 @@ import logging
 
 import constants
 from fp.battle import Battle
-from fp.helpers import POKEMON_TYPE_INDICES, normalize_name, type_effectiveness_modifier
+from fp.helpers import POKEMON_TYPE_INDICES, normalize_name
 from fp.playstyle_config import RECOVERY_MOVES, PIVOT_MOVES, HAZARD_MOVES
 from fp.movepool_tracker import get_threat_category, ThreatCategory
+from fp.search.damage import (
+    _HALF_HP_DAMAGE_MOVES,
+    _get_effective_types,
+    defensive_profile,
+    max_effectiveness,
+    with_damage_cache,
+)
+from fp.search.matchup import MatchupMatrix, matchup_matrix
 from fp.search.opponent_predict import predict_opponent_action, predict_after_ko_switchin
 from fp.search.speed_order import assess_speed_order
 from constants_pkg.strategy import (
@@ -63,18 +71,6 @@ SETUP_MOVES_SET = {
 }
 
 
-_VALID_TYPES = set(POKEMON_TYPE_INDICES)
-
-# Fixed-damage move support.
-# These moves have base power 0 but still represent meaningful progress.
-_HALF_HP_DAMAGE_MOVES = {
-    "superfang",
-    "ruination",
-    "naturesmadness",
-    "naturefury",
-}
-
-
 def _is_contact_move(move_name: str, move_data: dict | None = None) -> bool:
     data = move_data if isinstance(move_data, dict) else all_move_json.get(move_name, {})
     flags = data.get("flags", {}) if isinstance(data, dict) else {}
@@ -122,35 +118,6 @@ def _is_damaging_move(move_name: str, move_data: dict | None = None) -> bool:
     return bool(base_power and base_power > 0) or _is_fixed_damage_move(move_name, data)
 
 
-def _normalize_type_name(value: object) -> str | None:
-    if not isinstance(value, str):
-        return None
-    normalized = normalize_name(value)
-    if normalized in _VALID_TYPES:
-        return normalized
-    return None
-
-
-def _sanitize_type_list(values) -> list[str]:
-    if not values:
-        return []
-    cleaned: list[str] = []
-    for value in values:
-        normalized = _normalize_type_name(value)
-        if normalized:
-            cleaned.append(normalized)
-    return cleaned
-
-
-def _get_effective_types(pokemon) -> list:
-    """Get a Pokemon's effective types, accounting for Terastallization."""
-    base_types = _sanitize_type_list(getattr(pokemon, "types", []) or [])
-    tera_type = _normalize_type_name(getattr(pokemon, "tera_type", None))
-    if getattr(pokemon, "terastallized", False) and tera_type:
-        return [tera_type]
-    return base_types
-
-
 def _get_our_moves(battle: Battle) -> list[tuple[str, dict]]:
     """Get list of (move_name, move_data) for our active Pokemon's usable moves."""
     active = battle.user.active
@@ -169,85 +136,6 @@ def _get_our_moves(battle: Battle) -> list[tuple[str, dict]]:
     return result
 
 
-def _estimate_damage_ratio(attacker, defender, move_name: str) -> float:
-    """
-    Estimate damage as fraction of defender's max HP.
-    Uses the simplified formula from endgame.py as primary method.
-    """
-    if attacker is None or defender is None:
-        return 0.0
-
-    move_data = all_move_json.get(move_name, {})
-    move_type = _normalize_type_name(move_data.get(constants.TYPE, "normal")) or "normal"
-    category = move_data.get(constants.CATEGORY, "Status")
-    base_power = move_data.get(constants.BASE_POWER, 0)
-
-    if category not in (constants.PHYSICAL, constants.SPECIAL):
-        return 0.0
-
-    defender_max_hp = max(float(getattr(defender, "max_hp", 1) or 1), 1.0)
-    defender_types = _get_effective_types(defender)
-    effectiveness = type_effectiveness_modifier(move_type, defender_types)
-    if effectiveness == 0:
-        return 0.0
-
-    # Fixed-damage moves (e.g., Seismic Toss, Night Shade) should not be
-    # treated like 0-BP status moves. They are often critical progress lines.
-    fixed_damage = move_data.get("damage")
-    if isinstance(fixed_damage, (int, float)) and fixed_damage > 0:
-        return min(float(fixed_damage) / defender_max_hp, 1.0)
-    if isinstance(fixed_damage, str) and normalize_name(fixed_damage) == "level":
-        raw_level = getattr(attacker, "level", None)
-        if isinstance(raw_level, (int, float)) and raw_level > 0:
-            level = float(raw_level)
-        else:
-            level = 100.0
-        return min(level / defender_max_hp, 1.0)
-
-    norm = normalize_name(move_name)
-    if norm in _HALF_HP_DAMAGE_MOVES:
-        current_hp = max(float(getattr(defender, "hp", 0) or 0), 0.0)
-        return min((0.5 * current_hp) / defender_max_hp, 1.0)
-
-    if base_power == 0:
-        return 0.0
-
-    if category == constants.PHYSICAL:
-        atk = attacker.stats.get(constants.ATTACK, 100) if isinstance(attacker.stats, dict) else 100
-        def_ = defender.stats.get(constants.DEFENSE, 100) if isinstance(defender.stats, dict) else 100
-        atk_boost = (getattr(attacker, "boosts", {}) or {}).get(constants.ATTACK, 0)
-        def_boost = (getattr(defender, "boosts", {}) or {}).get(constants.DEFENSE, 0)
-    else:
-        atk = attacker.stats.get(constants.SPECIAL_ATTACK, 100) if isinstance(attacker.stats, dict) else 100
-        def_ = defender.stats.get(constants.SPECIAL_DEFENSE, 100) if isinstance(defender.stats, dict) else 100
-        atk_boost = (getattr(attacker, "boosts", {}) or {}).get(constants.SPECIAL_ATTACK, 0)
-        def_boost = (getattr(defender, "boosts", {}) or {}).get(constants.SPECIAL_DEFENSE, 0)
-
-    # Apply stat boosts
-    if atk_boost > 0:
-        atk *= (2 + atk_boost) / 2
-    elif atk_boost < 0:
-        atk *= 2 / (2 - atk_boost)
-
-    if def_boost > 0:
-        def_ *= (2 + def_boost) / 2
-    elif def_boost < 0:
-        def_ *= 2 / (2 - def_boost)
-
-    # STAB — Tera type also grants STAB
-    attacker_types = _sanitize_type_list(getattr(attacker, "types", []) or [])
-    attacker_tera = _normalize_type_name(getattr(attacker, "tera_type", None))
-    if getattr(attacker, "terastallized", False) and attacker_tera:
-        if attacker_tera not in attacker_types:
-            attacker_types.append(attacker_tera)
-    stab = 1.5 if move_type in attacker_types else 1.0
-
-    # Simplified damage formula (level 100)
-    damage = (((2 * 100 / 5 + 2) * base_power * atk / def_) / 50 + 2) * effectiveness * stab
-
-    return damage / defender_max_hp
-
-
 def _apply_switch_progress_cap(
     scores: dict[str, float],
     moves: list[tuple[str, dict]],
@@ -303,44 +191,10 @@ def _opponent_best_damage(battle: Battle) -> float:
     if opp is None or our is None:
         return 0.0
 
-    best = 0.0
-    opp_moves = getattr(opp, "moves", []) or []
-    for move in opp_moves:
-        move_name = move.name if hasattr(move, "name") else str(move)
-        dmg = _estimate_damage_ratio(opp, our, move_name)
-        if dmg > best:
-            best = dmg
-
     # If opponent has no revealed moves, estimate from STAB using actual stats.
     # The old flat 0.12 multiplier catastrophically underestimates damage when
     # there's a stat mismatch (e.g. physical Fighting STAB vs Blissey's 10 base Def).
-    opp_eff_types = _get_effective_types(opp)
-    if not opp_moves and opp_eff_types:
-        our_eff_types = _get_effective_types(our)
-        our_max_hp = max(float(getattr(our, "max_hp", 1) or 1), 1.0)
-        opp_stats = getattr(opp, "stats", {})
-        our_stats = getattr(our, "stats", {})
-        opp_atk = opp_stats.get(constants.ATTACK, 100) if isinstance(opp_stats, dict) else 100
-        opp_spa = opp_stats.get(constants.SPECIAL_ATTACK, 100) if isinstance(opp_stats, dict) else 100
-        our_def = our_stats.get(constants.DEFENSE, 100) if isinstance(our_stats, dict) else 100
-        our_spd = our_stats.get(constants.SPECIAL_DEFENSE, 100) if isinstance(our_stats, dict) else 100
-
-        # Use 85 BP assumed STAB move, check both physical and special
-        assumed_bp = 85
-        for t in opp_eff_types:
-            eff = type_effectiveness_modifier(t, our_eff_types)
-            if eff == 0:
-                continue
-            stab = 1.5
-            phys_dmg = (((42 * assumed_bp * opp_atk / max(our_def, 1)) / 50 + 2)
-                        * eff * stab) / our_max_hp
-            spec_dmg = (((42 * assumed_bp * opp_spa / max(our_spd, 1)) / 50 + 2)
-                        * eff * stab) / our_max_hp
-            estimated = max(phys_dmg, spec_dmg)
-            if estimated > best:
-                best = estimated
-
-    return best
+    return matchup_matrix(battle).best_damage(opp, our, assume_stab=True)
 
 
 def _opponent_can_ko_us(battle: Battle) -> bool:
@@ -407,8 +261,7 @@ def _hazard_cost(battle: Battle, pokemon=None) -> float:
 
     # Stealth Rock
     if sc.get(constants.STEALTH_ROCK, 0) > 0:
-        pkmn_types = _get_effective_types(pokemon)
-        sr_eff = type_effectiveness_modifier("rock", pkmn_types)
+        sr_eff = defensive_profile(pokemon)[POKEMON_TYPE_INDICES["rock"]]
         cost += 0.125 * sr_eff
 
     # Spikes (up to 3 layers)
@@ -425,47 +278,15 @@ def _hazard_cost(battle: Battle, pokemon=None) -> float:
     return cost
 
 
-def _opponent_best_damage_to(opp, target) -> float:
+def _opponent_best_damage_to(opp, target, matrix: MatchupMatrix | None = None) -> float:
     """Estimate opponent's best damage to a specific target as fraction of target's max HP."""
     if opp is None or target is None:
         return 0.0
-
-    best = 0.0
-    opp_moves = getattr(opp, "moves", []) or []
-    for move in opp_moves:
-        move_name = move.name if hasattr(move, "name") else str(move)
-        dmg = _estimate_damage_ratio(opp, target, move_name)
-        if dmg > best:
-            best = dmg
+    if matrix is None:
+        matrix = MatchupMatrix([target], [opp])
 
     # STAB fallback when no moves are revealed (mirrors _opponent_best_damage)
-    if not opp_moves:
-        opp_eff_types = _get_effective_types(opp)
-        target_eff_types = _get_effective_types(target)
-        if opp_eff_types:
-            target_max_hp = max(float(getattr(target, "max_hp", 1) or 1), 1.0)
-            opp_stats = getattr(opp, "stats", {})
-            target_stats = getattr(target, "stats", {})
-            opp_atk = opp_stats.get(constants.ATTACK, 100) if isinstance(opp_stats, dict) else 100
-            opp_spa = opp_stats.get(constants.SPECIAL_ATTACK, 100) if isinstance(opp_stats, dict) else 100
-            t_def = target_stats.get(constants.DEFENSE, 100) if isinstance(target_stats, dict) else 100
-            t_spd = target_stats.get(constants.SPECIAL_DEFENSE, 100) if isinstance(target_stats, dict) else 100
-
-            assumed_bp = 85
-            for t in opp_eff_types:
-                eff = type_effectiveness_modifier(t, target_eff_types)
-                if eff == 0:
-                    continue
-                stab = 1.5
-                phys = (((42 * assumed_bp * opp_atk / max(t_def, 1)) / 50 + 2)
-                        * eff * stab) / target_max_hp
-                spec = (((42 * assumed_bp * opp_spa / max(t_spd, 1)) / 50 + 2)
-                        * eff * stab) / target_max_hp
-                estimated = max(phys, spec)
-                if estimated > best:
-                    best = estimated
-
-    return best
+    return matrix.best_damage(opp, target, assume_stab=True)
 
 
 def _is_wrong_wall(battle: Battle) -> bool:
@@ -582,7 +403,9 @@ def _find_opponent_reserve(battle: Battle, name: str):
     return None
 
 
-def _score_switch(battle: Battle, target_name: str) -> float:
+def _score_switch(
+    battle: Battle, target_name: str, matrix: MatchupMatrix | None = None
+) -> float:
     """Score a switch to a specific Pokemon.
 
     Uses three layers of information:
@@ -606,6 +429,7 @@ def _score_switch(battle: Battle, target_name: str) -> float:
     if target is None or target.hp <= 0:
         return 0.0
 
+    matrix = matrix or matchup_matrix(battle)
     score = 0.0
     target_types = _get_effective_types(target)
     opp_types = _get_effective_types(opp)
@@ -613,19 +437,14 @@ def _score_switch(battle: Battle, target_name: str) -> float:
     # Check current active's type matchup vs opponent to boost switching from bad matchups
     our_active = battle.user.active
     if our_active is not None and opp_types:
-        our_types = _get_effective_types(our_active)
         # Check if our current mon is weak to opponent's STAB
-        worst_stab_vs_us = max(
-            type_effectiveness_modifier(t, our_types) for t in opp_types
-        )
+        worst_stab_vs_us = max_effectiveness(opp_types, our_active)
         if worst_stab_vs_us >= 2.0:
             # We're weak to their STAB — boost switching
             score += 0.25
         
         # Check if target resists better than we do
-        worst_stab_vs_target = max(
-            type_effectiveness_modifier(t, target_types) for t in opp_types
-        )
+        worst_stab_vs_target = max_effectiveness(opp_types, target)
         if worst_stab_vs_us > worst_stab_vs_target:
             # Target takes less from their STAB — reward switch
             score += 0.15
@@ -636,13 +455,14 @@ def _score_switch(battle: Battle, target_name: str) -> float:
         normalize_name(m.name if hasattr(m, "name") else str(m)) for m in opp_moves
     }
     if opp_moves:
-        opp_best_dmg = _opponent_best_damage_to(opp, target)
+        opp_best_dmg = _opponent_best_damage_to(opp, target, matrix)
         target_hp_ratio = target.hp / max(target.max_hp, 1)
+        ko_turns = matrix.ko_turns(opp, target)
 
-        if opp_best_dmg >= target_hp_ratio:
+        if ko_turns <= 1:
             # Opponent can KO this target — terrible switch
             score -= 0.5
-        elif opp_best_dmg >= target_hp_ratio * 0.5:
+        elif ko_turns <= 2:
             # Opponent can 2HKO — risky switch
             score -= 0.2
         elif opp_best_dmg < 0.15:
@@ -675,7 +495,7 @@ def _score_switch(battle: Battle, target_name: str) -> float:
                 has_contact_threat = True
                 best_contact_damage = max(
                     best_contact_damage,
-                    _estimate_damage_ratio(opp, target, mv_name),
+                    matrix.damage(opp, target, mv_name),
                 )
 
             opp_hp_ratio = opp.hp / max(opp.max_hp, 1)
@@ -687,9 +507,7 @@ def _score_switch(battle: Battle, target_name: str) -> float:
     else:
         # FALLBACK: No revealed moves, use STAB type matchup
         if opp_types:
-            worst_stab_eff = max(
-                type_effectiveness_modifier(t, target_types) for t in opp_types
-            )
+            worst_stab_eff = max_effectiveness(opp_types, target)
             if worst_stab_eff <= 0.5:
                 score += 0.4  # double resist
             elif worst_stab_eff <= 1.0:
@@ -780,9 +598,7 @@ def _score_switch(battle: Battle, target_name: str) -> float:
     # Can we threaten the opponent offensively?
     best_off = 0.0
     if target_types and opp_types:
-        best_off = max(
-            type_effectiveness_modifier(t, opp_types) for t in target_types
-        )
+        best_off = max_effectiveness(target_types, opp)
         if best_off >= 2.0:
             score += 0.15
         elif best_off >= 1.0:
@@ -805,17 +621,14 @@ def _score_switch(battle: Battle, target_name: str) -> float:
         )
         if contrary_off_boosts >= 1:
             # Check: does target resist opponent's STAB?
-            worst_stab_into_target = max(
-                (type_effectiveness_modifier(t, target_types) for t in opp_types),
-                default=1.0,
-            )
+            worst_stab_into_target = max_effectiveness(opp_types, target)
             # Check: can target threaten opponent? (best STAB eff > 1.0 or direct dmg calc)
             target_can_threaten = best_off >= 1.0
             if not target_can_threaten:
                 # Fallback: check actual damage from target's moves
                 for tmove in getattr(target, "moves", []) or []:
                     tmove_name = tmove.name if hasattr(tmove, "name") else str(tmove)
-                    if _estimate_damage_ratio(target, opp, tmove_name) > 0.15:
+                    if matrix.damage(target, opp, tmove_name) > 0.15:
                         target_can_threaten = True
                         break
 
@@ -952,6 +765,7 @@ def _score_hazard_move(battle: Battle, move_name: str) -> float:
     return 0.1 * early_multiplier
 
 
+@with_damage_cache
 def evaluate_position(battle: Battle) -> dict[str, float]:
     """
     Evaluate all legal moves for the current position.
@@ -973,13 +787,15 @@ def evaluate_position(battle: Battle) -> dict[str, float]:
     if our is None:
         return scores
 
+    matrix = matchup_matrix(battle)
+
     # Forced switch turns have only one legal action type.
     # Keep scoring strictly legal here so downstream selection never needs to
     # recover from illegal move choices.
     if battle.force_switch:
         for pkmn in battle.user.reserve:
             if pkmn.hp > 0:
-                scores[f"switch {pkmn.name}"] = _score_switch(battle, pkmn.name)
+                scores[f"switch {pkmn.name}"] = _score_switch(battle, pkmn.name, matrix)
         total = sum(scores.values())
         if total > 0:
             scores = {k: v / total for k, v in scores.items()}
@@ -1033,7 +849,7 @@ def evaluate_position(battle: Battle) -> dict[str, float]:
     our_best_damage = 0.0
     for mn, md in moves:
         if _is_damaging_move(mn, md):
-            dmg = _estimate_damage_ratio(our, opp, mn)
+            dmg = matrix.damage(our, opp, mn)
             our_best_damage = max(our_best_damage, dmg)
 
     # "Bad matchup" = our best attack does less than 10% to them
@@ -1084,7 +900,7 @@ def evaluate_position(battle: Battle) -> dict[str, float]:
 
         if _is_damaging_move(move_name, move_data):
             # === DAMAGING MOVE ===
-            dmg_ratio = _estimate_damage_ratio(our, opp, move_name)
+            dmg_ratio = matrix.damage(our, opp, move_name)
 
             # Base score
             score = dmg_ratio
@@ -1110,7 +926,7 @@ def evaluate_position(battle: Battle) -> dict[str, float]:
                     score -= blended_penalty
 
                     # Partial credit for damage to predicted switch-in
-                    dmg_to_switchin = _estimate_damage_ratio(
+                    dmg_to_switchin = matrix.damage(
                         our, predicted_switchin, move_name
                     )
                     score += sc * dmg_to_switchin * 0.5
@@ -1126,7 +942,7 @@ def evaluate_position(battle: Battle) -> dict[str, float]:
                         battle, after_ko_target_name
                     )
                     if after_ko_target is not None:
-                        dmg_to_next = _estimate_damage_ratio(
+                        dmg_to_next = matrix.damage(
                             our, after_ko_target, move_name
                         )
                         score += dmg_to_next * 0.05
@@ -1260,7 +1076,7 @@ def evaluate_position(battle: Battle) -> dict[str, float]:
         our_best_dmg_ratio = 0.0
         for move_name, move_data in moves:
             if _is_damaging_move(move_name, move_data):
-                dmg = _estimate_damage_ratio(our, opp, move_name)
+                dmg = matrix.damage(our, opp, move_name)
                 our_best_dmg_ratio = max(our_best_dmg_ratio, dmg)
 
         opp_hp_ratio = opp.hp / max(opp.max_hp, 1)
@@ -1453,7 +1269,7 @@ def evaluate_position(battle: Battle) -> dict[str, float]:
                 norm = normalize_name(move_name)
                 # Boost damaging moves that hit the predicted MB switch-in
                 if _is_damaging_move(move_name):
-                    dmg_to_mb = _estimate_damage_ratio(our, mb_reserve_mon, move_name)
+                    dmg_to_mb = matrix.damage(our, mb_reserve_mon, move_name)
                     if dmg_to_mb > 0.15:
                         scores[move_name] *= 1.0 + dmg_to_mb
                 # Boost pivots (chip + bring in a counter)
@@ -1534,7 +1350,7 @@ def evaluate_position(battle: Battle) -> dict[str, float]:
         for pkmn in battle.user.reserve:
             if pkmn.hp > 0:
                 switch_name = f"switch {pkmn.name}"
-                sw_score = _score_switch(battle, pkmn.name)
+                sw_score = _score_switch(battle, pkmn.name, matrix)
 
                 # Wrong wall: strongly boost switches to get to the right wall
                 if wrong_wall:
@@ -1565,7 +1381,7 @@ def evaluate_position(battle: Battle) -> dict[str, float]:
                     our_best_dmg_ratio = 0.0
                     for move_name, move_data in moves:
                         if _is_damaging_move(move_name, move_data):
-                            dmg = _estimate_damage_ratio(our, opp, move_name)
+                            dmg = matrix.damage(our, opp, move_name)
                             our_best_dmg_ratio = max(our_best_dmg_ratio, dmg)
                     opp_hp_ratio = opp.hp / max(opp.max_hp, 1) if opp else 1.0
                     if our_best_dmg_ratio < 0.20 * opp_hp_ratio:
@@ -1577,7 +1393,7 @@ def evaluate_position(battle: Battle) -> dict[str, float]:
         for pkmn in battle.user.reserve:
             if pkmn.hp > 0:
                 switch_name = f"switch {pkmn.name}"
-                scores[switch_name] = _score_switch(battle, pkmn.name)
+                scores[switch_name] = _score_switch(battle, pkmn.name, matrix)
 
     if not battle.force_switch:
         _apply_switch_progress_cap(
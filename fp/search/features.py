@@ -0,0 +1,291 @@
+"""
+Per-Battle Feature Store
+
+Board features read by several heuristic passes and by `evaluate_position`
+(speed order, immediate survival risk, team material) are computed once and
+shared instead of being rescanned by every pass.
+
+Each battle keeps one store. `async_pick_move` binds it to the decision's
+copy of the live battle (`bind_features`); only that copy reads and fills
+it, so sampled worlds and other copies always compute directly. Every
+feature declares the parts of the board it reads (the groups below). When
+protocol lines are applied to the live battle, `battle_modifier` invalidates
+the groups those lines touch, so features whose inputs did not change carry
+over to the next decision. Any invalidation also unbinds the store: the
+bound copy no longer mirrors the live battle.
+"""
+
+import threading
+from functools import wraps
+
+# Board parts a feature can depend on
+ACTIVE = "active"  # who is active, types, forme, tera
+HP = "hp"
+BOOSTS = "boosts"
+STATUS = "status"
+VOLATILES = "volatiles"
+SIDE_CONDITIONS = "side_conditions"  # hazards, screens, tailwind
+FIELD = "field"  # weather, terrain, trick room, gravity
+REVEALS = "reveals"  # moves, items, abilities, speed ranges, set candidates
+
+ALL_GROUPS = frozenset(
+    {ACTIVE, HP, BOOSTS, STATUS, VOLATILES, SIDE_CONDITIONS, FIELD, REVEALS}
+)
+
+_SWITCH_GROUPS = frozenset({ACTIVE, HP, BOOSTS, STATUS, VOLATILES, REVEALS})
+
+# Groups each protocol action can change. Actions missing here, and not in
+# NO_FEATURE_ACTIONS, invalidate everything.
+PROTOCOL_INVALIDATIONS = {
+    "switch": _SWITCH_GROUPS,
+    "drag": _SWITCH_GROUPS,
+    "replace": _SWITCH_GROUPS,
+    "faint": frozenset({ACTIVE, HP}),
+    "detailschange": frozenset({ACTIVE, REVEALS}),
+    "-formechange": frozenset({ACTIVE, REVEALS}),
+    "-mega": frozenset({ACTIVE, REVEALS}),
+    "-terastallize": frozenset({ACTIVE, REVEALS}),
+    "-transform": frozenset({ACTIVE, BOOSTS, REVEALS}),
+    "-damage": frozenset({HP, REVEALS}),
+    "-heal": frozenset({HP, REVEALS}),
+    "-sethp": frozenset({HP}),
+    "-boost": frozenset({BOOSTS}),
+    "-unboost": frozenset({BOOSTS}),
+    "-setboost": frozenset({BOOSTS}),
+    "-clearboost": frozenset({BOOSTS}),
+    "-clearallboost": frozenset({BOOSTS}),
+    "-clearnegativeboost": frozenset({BOOSTS}),
+    "-status": frozenset({STATUS}),
+    "-curestatus": frozenset({STATUS}),
+    "-cureteam": frozenset({STATUS}),
+    "-start": frozenset({VOLATILES, ACTIVE}),  # typechange starts here
+    "-end": frozenset({VOLATILES, ACTIVE}),
+    "-singlemove": frozenset({VOLATILES}),
+    "-singleturn": frozenset({VOLATILES}),
+    "-mustrecharge": frozenset({VOLATILES}),
+    "-prepare": frozenset({VOLATILES}),
+    "-weather": frozenset({FIELD}),
+    "-fieldstart": frozenset({FIELD}),
+    "-fieldend": frozenset({FIELD}),
+    "-sidestart": frozenset({SIDE_CONDITIONS}),
+    "-sideend": frozenset({SIDE_CONDITIONS}),
+    "-swapsideconditions": frozenset({SIDE_CONDITIONS}),
+    "move": frozenset({REVEALS, VOLATILES}),
+    "cant": frozenset({REVEALS, VOLATILES}),
+    "-item": frozenset({REVEALS}),
+    "-enditem": frozenset({REVEALS}),
+    "-ability": frozenset({REVEALS}),
+    "-endability": frozenset({REVEALS}),
+    "-activate": frozenset({REVEALS, VOLATILES}),
+    "-immune": frozenset({REVEALS}),
+    "-fail": frozenset({REVEALS}),
+    # speed ranges are inferred from each turn's move order
+    "turn": frozenset({REVEALS}),
+    # the request refreshes our side: HP, status, moves, items, stats
+    "request": frozenset({ACTIVE, HP, STATUS, REVEALS}),
+}
+
+# Actions that never change what a feature reads
+NO_FEATURE_ACTIONS = frozenset(
+    {
+        "",
+        "j",
+        "l",
+        "n",
+        "c",
+        "chat",
+        "raw",
+        "t:",
+        "upkeep",
+        "inactive",
+        "inactiveoff",
+        "-hint",
+        "-message",
+        "-anim",
+        "-nothing",
+        "-notarget",
+        "-miss",
+        "-crit",
+        "-supereffective",
+        "-resisted",
+        "-center",
+        "-combine",
+        "-waiting",
+        "-zpower",
+        "-hitcount",
+        "-ohko",
+        "-primal",
+        "noinit",
+        "player",
+        "teamsize",
+        "gametype",
+        "gen",
+        "tier",
+        "rule",
+        "rated",
+        "clearpoke",
+        "poke",
+        "teampreview",
+        "start",
+        "title",
+        "badge",
+        "html",
+        "uhtml",
+        "timer",
+        "debug",
+        "seed",
+        "split",
+    }
+)
+
+
+def protocol_invalidations(actions) -> frozenset:
+    """Groups invalidated by applying protocol lines with these actions."""
+    groups = set()
+    for action in actions:
+        if action in NO_FEATURE_ACTIONS:
+            continue
+        invalidated = PROTOCOL_INVALIDATIONS.get(action)
+        if invalidated is None:
+            return ALL_GROUPS
+        groups |= invalidated
+    return frozenset(groups)
+
+
+class FeatureStore:
+    """Computed features of one battle, each with the groups it depends on."""
+
+    def __init__(self):
+        self.entries: dict[tuple, tuple[frozenset, object]] = {}
+        # the live battle the entries describe, and the decision copy of it
+        # that may read and fill them
+        self.source = None
+        self.owner = None
+        # protocol updates have been applied since the last bind
+        self.synced = False
+        self.hits = 0
+        self.misses = 0
+        self.carried_over = 0
+        self._lock = threading.Lock()
+
+    def bind(self, battle, source):
+        with self._lock:
+            # entries survive only if every change since the last decision
+            # came through `invalidate`
+            if source is not self.source or not self.synced:
+                self.entries.clear()
+            self.source = source
+            self.owner = battle
+            self.synced = False
+            self.hits = self.misses = 0
+            self.carried_over = len(self.entries)
+
+    def get(self, battle, key: tuple, groups: frozenset, compute):
+        with self._lock:
+            owned = self.owner is battle
+            if owned:
+                entry = self.entries.get(key)
+                if entry is not None:
+                    self.hits += 1
+                    return entry[1]
+                self.misses += 1
+        value = compute()
+        if owned:
+            with self._lock:
+                # an invalidation while computing means `value` may be stale
+                if self.owner is battle:
+                    self.entries[key] = (groups, value)
+        return value
+
+    def invalidate(self, source, groups):
+        groups = frozenset(groups)
+        with self._lock:
+            self.owner = None
+            if source is not self.source:
+                self.entries.clear()
+                self.synced = False
+                return
+            self.synced = True
+            if not groups:
+                return
+            stale = [k for k, (deps, _) in self.entries.items() if deps & groups]
+            for key in stale:
+                del self.entries[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "carried_over": self.carried_over,
+            }
+
+
+_stores: dict[str, FeatureStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_feature_store(battle_tag: str) -> FeatureStore:
+    with _stores_lock:
+        store = _stores.get(battle_tag)
+        if store is None:
+            store = _stores[battle_tag] = FeatureStore()
+        return store
+
+
+def bind_features(battle, source) -> FeatureStore:
+    """
+    Make `battle`, a decision copy of the live battle `source`, the one
+    battle that reads and fills the feature store.
+    """
+    store = get_feature_store(battle.battle_tag)
+    store.bind(battle, source)
+    return store
+
+
+def invalidate_features(battle, groups):
+    """
+    Drop the features of the live `battle` that depend on any of `groups`;
+    called after protocol updates are applied to it.
+    """
+    with _stores_lock:
+        store = _stores.get(battle.battle_tag)
+    if store is not None:
+        store.invalidate(battle, groups)
+
+
+def clear_features(battle_tag: str):
+    """Drop the feature store of a finished battle."""
+    with _stores_lock:
+        _stores.pop(battle_tag, None)
+
+
+def battle_feature(*groups: str):
+    """
+    Decorator for `fn(battle, *args)` board features: inside a decision
+    bound with `bind_features`, the result is computed once per (args,
+    board state of `groups`). `args` must be hashable.
+    """
+    depends_on = frozenset(groups)
+    unknown = depends_on - ALL_GROUPS
+    if unknown:
+        raise ValueError(f"Unknown feature groups: {sorted(unknown)}")
+
+    def decorator(fn):
+        name = fn.__qualname__
+
+        @wraps(fn)
+        def wrapper(battle, *args):
+            tag = getattr(battle, "battle_tag", None)
+            with _stores_lock:
+                store = _stores.get(tag) if tag is not None else None
+            if store is None:
+                return fn(battle, *args)
+            return store.get(
+                battle, (name, args), depends_on, lambda: fn(battle, *args)
+            )
+
+        return wrapper
+
+    return decorator
@@ -20,9 +20,16 @@ from typing import Optional
 
 import constants
 from fp.battle import Battle
-from fp.helpers import POKEMON_TYPE_INDICES, normalize_name, type_effectiveness_modifier
+from fp.helpers import POKEMON_TYPE_INDICES, normalize_name
 from fp.movepool_tracker import get_threat_category, ThreatCategory
 from fp.playstyle_config import RECOVERY_MOVES
+from fp.search.damage import (
+    _get_effective_types,
+    defensive_profile,
+    estimate_damage_ratio,
+    max_effectiveness,
+)
+from fp.search.matchup import matchup_matrix
 from fp.search.speed_order import assess_speed_order
 from data import all_move_json
 
@@ -42,37 +49,6 @@ _HAZARD_SET = {"stealthrock", "spikes", "toxicspikes", "stickyweb"}
 _STATUS_SET = {"toxic", "willowisp", "thunderwave", "spore", "sleeppowder"}
 
 
-_VALID_TYPES = set(POKEMON_TYPE_INDICES)
-
-
-def _normalize_type_name(value: object) -> str | None:
-    if not isinstance(value, str):
-        return None
-    normalized = normalize_name(value)
-    if normalized in _VALID_TYPES:
-        return normalized
-    return None
-
-
-def _sanitize_type_list(values) -> list[str]:
-    if not values:
-        return []
-    cleaned: list[str] = []
-    for value in values:
-        normalized = _normalize_type_name(value)
-        if normalized:
-            cleaned.append(normalized)
-    return cleaned
-
-
-def _get_effective_types(pokemon) -> list[str]:
-    base_types = _sanitize_type_list(getattr(pokemon, "types", []) or [])
-    tera_type = _normalize_type_name(getattr(pokemon, "tera_type", None))
-    if getattr(pokemon, "terastallized", False) and tera_type:
-        return [tera_type]
-    return base_types
-
-
 @dataclass
 class ForcedLine:
     """A detected forced line of play."""
@@ -82,58 +58,6 @@ class ForcedLine:
     line_type: str  # "guaranteed_ko", "forced_switch", "phaze", "stay_in"
 
 
-def _estimate_damage(attacker, defender, move_name: str) -> float:
-    """Estimate damage as fraction of defender's max HP."""
-    if attacker is None or defender is None:
-        return 0.0
-
-    move_data = all_move_json.get(move_name, {})
-    base_power = move_data.get(constants.BASE_POWER, 0)
-    if base_power == 0:
-        return 0.0
-
-    move_type = _normalize_type_name(move_data.get(constants.TYPE, "normal")) or "normal"
-    category = move_data.get(constants.CATEGORY, "Status")
-
-    if category == constants.PHYSICAL:
-        atk = attacker.stats.get(constants.ATTACK, 100) if isinstance(attacker.stats, dict) else 100
-        def_ = defender.stats.get(constants.DEFENSE, 100) if isinstance(defender.stats, dict) else 100
-        atk_boost = (getattr(attacker, "boosts", {}) or {}).get(constants.ATTACK, 0)
-        def_boost = (getattr(defender, "boosts", {}) or {}).get(constants.DEFENSE, 0)
-    elif category == constants.SPECIAL:
-        atk = attacker.stats.get(constants.SPECIAL_ATTACK, 100) if isinstance(attacker.stats, dict) else 100
-        def_ = defender.stats.get(constants.SPECIAL_DEFENSE, 100) if isinstance(defender.stats, dict) else 100
-        atk_boost = (getattr(attacker, "boosts", {}) or {}).get(constants.SPECIAL_ATTACK, 0)
-        def_boost = (getattr(defender, "boosts", {}) or {}).get(constants.SPECIAL_DEFENSE, 0)
-    else:
-        return 0.0
-
-    if atk_boost > 0:
-        atk *= (2 + atk_boost) / 2
-    elif atk_boost < 0:
-        atk *= 2 / (2 - atk_boost)
-    if def_boost > 0:
-        def_ *= (2 + def_boost) / 2
-    elif def_boost < 0:
-        def_ *= 2 / (2 - def_boost)
-
-    defender_types = _get_effective_types(defender)
-    effectiveness = type_effectiveness_modifier(move_type, defender_types)
-    if effectiveness == 0:
-        return 0.0
-
-    attacker_types = _sanitize_type_list(getattr(attacker, "types", []) or [])
-    attacker_tera = _normalize_type_name(getattr(attacker, "tera_type", None))
-    if getattr(attacker, "terastallized", False) and attacker_tera:
-        if attacker_tera not in attacker_types:
-            attacker_types.append(attacker_tera)
-    stab = 1.5 if move_type in attacker_types else 1.0
-
-    damage = (((2 * 100 / 5 + 2) * base_power * atk / def_) / 50 + 2) * effectiveness * stab
-    defender_max_hp = getattr(defender, "max_hp", 1) or 1
-    return damage / defender_max_hp
-
-
 def _get_usable_moves(pokemon) -> list[str]:
     """Get list of usable move names for a pokemon."""
     if pokemon is None:
@@ -178,7 +102,7 @@ def _revealed_switch_punish_exists(
         if is_fainted or getattr(target, "hp", 0) <= 0:
             continue
 
-        incoming = _estimate_damage(our, target, move_name)
+        incoming = estimate_damage_ratio(our, target, move_name)
         target_hp_ratio = target.hp / max(target.max_hp, 1)
 
         # If our click still chunks this switch-in, it's usually productive.
@@ -193,7 +117,7 @@ def _revealed_switch_punish_exists(
         punish = 0.0
         punish_move = ""
         for m in revealed_moves:
-            d = _estimate_damage(target, our, m)
+            d = estimate_damage_ratio(target, our, m)
             if d > punish:
                 punish = d
                 punish_move = m
@@ -233,6 +157,7 @@ def _best_switch_into_resist(battle: Battle) -> Optional[str]:
         except Exception:
             pass
 
+    matrix = matchup_matrix(battle)
     best_target = None
     best_score = -999.0
 
@@ -248,7 +173,7 @@ def _best_switch_into_resist(battle: Battle) -> Optional[str]:
             # Use revealed moves: find worst damage to this target
             worst_dmg = 0.0
             for move_name in opp_moves:
-                dmg = _estimate_damage(opp, pkmn, move_name)
+                dmg = matrix.damage(opp, pkmn, move_name)
                 worst_dmg = max(worst_dmg, dmg)
             pkmn_hp_ratio = pkmn.hp / max(pkmn.max_hp, 1)
             # Score: lower damage taken = better. Penalize hard if they KO us.
@@ -258,9 +183,7 @@ def _best_switch_into_resist(battle: Battle) -> Optional[str]:
                 score = -worst_dmg
         elif opp_types:
             # Fallback: STAB type matchup
-            worst_eff = max(
-                type_effectiveness_modifier(t, target_types) for t in opp_types
-            )
+            worst_eff = max_effectiveness(opp_types, pkmn)
             score = -worst_eff
         else:
             score = 0.0
@@ -331,7 +254,7 @@ def detect_forced_line(battle: Battle) -> Optional[ForcedLine]:
     # === LINE 1: Guaranteed KO ===
     # We outspeed (or have priority) AND can OHKO
     for move_name in our_moves:
-        dmg = _estimate_damage(our, opp, move_name)
+        dmg = estimate_damage_ratio(our, opp, move_name)
         if dmg >= opp_hp_ratio:
             has_prio = _has_priority_move(move_name)
             if guaranteed_move_first or has_prio:
@@ -361,14 +284,14 @@ def detect_forced_line(battle: Battle) -> Optional[ForcedLine]:
     opp_moves = _get_usable_moves(opp)
     opp_best_dmg = 0.0
     for move_name in opp_moves:
-        d = _estimate_damage(opp, our, move_name)
+        d = estimate_damage_ratio(opp, our, move_name)
         opp_best_dmg = max(opp_best_dmg, d)
 
     # If no revealed moves, estimate conservatively
     if not opp_moves and opp_types:
-        our_types = _get_effective_types(our)
+        our_profile = defensive_profile(our)
         for t in opp_types:
-            eff = type_effectiveness_modifier(t, our_types)
+            eff = our_profile[POKEMON_TYPE_INDICES[t]]
             opp_best_dmg = max(opp_best_dmg, 0.3 * 1.5 * eff)
 
     if opp_best_dmg >= our_hp_ratio:
@@ -376,7 +299,7 @@ def detect_forced_line(battle: Battle) -> Optional[ForcedLine]:
         our_best_dmg = 0.0
         our_best_move = None
         for move_name in our_moves:
-            d = _estimate_damage(our, opp, move_name)
+            d = estimate_damage_ratio(our, opp, move_name)
             if d > our_best_dmg:
                 our_best_dmg = d
                 our_best_move = move_name
@@ -426,7 +349,7 @@ def detect_forced_line(battle: Battle) -> Optional[ForcedLine]:
         our_best_dmg = 0.0
         our_best_move = None
         for move_name in our_moves:
-            d = _estimate_damage(our, opp, move_name)
+            d = estimate_damage_ratio(our, opp, move_name)
             if d > our_best_dmg:
                 our_best_dmg = d
                 our_best_move = move_name
@@ -503,7 +426,7 @@ def detect_forced_line(battle: Battle) -> Optional[ForcedLine]:
     # and they have reserves → they're switching, use the free turn
     our_best_dmg_for_switch = 0.0
     for move_name in our_moves:
-        d = _estimate_damage(our, opp, move_name)
+        d = estimate_damage_ratio(our, opp, move_name)
         our_best_dmg_for_switch = max(our_best_dmg_for_switch, d)
 
     if (opp_best_dmg < 0.12 and our_best_dmg_for_switch > 0.40
@@ -2,7 +2,7 @@ import logging
 
 import constants
 from data.pkmn_sets import PredictedPokemonSet
-from fp.battle import Pokemon
+from fp.battle import Battle, Pokemon
 
 logger = logging.getLogger(__name__)
 
@@ -75,3 +75,58 @@ def populate_pkmn_from_set(
             elif mv.name == known_move.name:
                 mv.current_pp = known_move.current_pp
                 break
+
+
+def _sampled_pokemon_fingerprint(pkmn: Pokemon) -> tuple:
+    return (
+        pkmn.name,
+        pkmn.level,
+        pkmn.item,
+        pkmn.ability,
+        pkmn.nature,
+        tuple(pkmn.evs),
+        tuple(sorted(pkmn.stats.items())),
+        pkmn.hp,
+        pkmn.max_hp,
+        pkmn.tera_type,
+        pkmn.terastallized,
+        pkmn.mega_name,
+        tuple((mv.name, mv.current_pp) for mv in pkmn.moves),
+    )
+
+
+def world_fingerprint(battle: Battle) -> tuple:
+    """
+    Canonical key of a sampled world: everything sampling fills in on the
+    opponent's side (species, spread, item, ability, tera, mega, moves).
+    Worlds are forked from one battle, so the rest of the state is shared.
+    """
+    opponent = battle.opponent
+    return tuple(
+        _sampled_pokemon_fingerprint(pkmn) if pkmn is not None else None
+        for pkmn in [opponent.active] + list(opponent.reserve)
+    )
+
+
+def merge_duplicate_worlds(
+    sampled_battles: list[tuple[Battle, float]],
+) -> list[tuple[Battle, float]]:
+    """
+    Collapse identical sampled worlds into the first one drawn, summing their
+    weights. Searching a world once with the merged weight aggregates to the
+    same policy as searching each copy.
+    """
+    merged: dict[tuple, list] = {}
+    for sampled_battle, weight in sampled_battles:
+        try:
+            key = world_fingerprint(sampled_battle)
+            hash(key)
+        except Exception:
+            # unhashable sampled attribute; keep the world as its own entry
+            key = ("unkeyed", id(sampled_battle))
+        entry = merged.get(key)
+        if entry is None:
+            merged[key] = [sampled_battle, float(weight)]
+        else:
+            entry[1] += float(weight)
+    return [(b, w) for b, w in merged.values()]
@@ -3,8 +3,6 @@ import os
 import random
 import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
-from copy import deepcopy
 from dataclasses import dataclass, field, asdict
 from enum import Enum
 from pathlib import Path
@@ -220,10 +218,34 @@ from config import FoulPlayConfig
 from .standard_battles import prepare_battles
 from .random_battles import prepare_random_battles
 
-from poke_engine import monte_carlo_tree_search
 from fp.search.eval import evaluate_position, _opponent_best_damage as _eval_opponent_best_damage
+from fp.search.cancellation import (
+    check_cancelled,
+    current_cancel_token,
+    record_cpu_saved,
+)
+from fp.search.damage import estimate_damage_ratio, with_damage_cache
+from fp.search.features import (
+    ACTIVE,
+    ALL_GROUPS,
+    HP,
+    SIDE_CONDITIONS,
+    battle_feature,
+)
 from fp.search.forced_lines import detect_forced_line
 from fp.search.poke_engine_helpers import battle_to_poke_engine_state
+from fp.search.helpers import merge_duplicate_worlds
+from fp.search.profiler import profile_decision, stage
+from fp.search.parallel_mcts import (
+    MCTS_ANYTIME_ENABLED,
+    PolicyConvergence,
+    anytime_probe_schedule,
+    anytime_search_ms,
+    get_mcts_pool,
+    mcts_sample_waves,
+    run_mcts_samples,
+)
+from fp.search.scheduler import current_search_budget_scale
 from fp.search.speed_order import assess_speed_order
 from fp.playstyle_config import PlaystyleConfig, Playstyle, HAZARD_MOVES
 from fp.helpers import normalize_name, type_effectiveness_modifier
@@ -517,20 +539,42 @@ def _should_activate_mcts_blend(
     return (len(reasons) > 0), reasons
 
 
+def _capped_search_time(
+    search_time_ms: int, cap_ms: int, anytime: bool
+) -> tuple[int, bool]:
+    """
+    Per-sample search time held to the wall-clock `cap_ms`, and whether an
+    anytime probe still fits in front of it. An unconverged probe is
+    discarded, so when the probe would push the turn past the cap it is
+    skipped and the single search keeps the whole cap.
+    """
+    search_time_ms = min(search_time_ms, cap_ms)
+    if anytime and search_time_ms > anytime_search_ms(cap_ms, anytime=True):
+        anytime = False
+    return search_time_ms, anytime
+
+
 def _run_mcts_policy_pass(
     sampled_battles: list[tuple[Battle, float]],
     *,
     per_sample_ms: int,
     max_samples: int,
     legal_moves: set[str] | None = None,
+    anytime: bool = False,
 ) -> tuple[dict[str, float], dict]:
     """
     Run bounded MCTS on up to max_samples sampled states and aggregate visit policy.
+    Samples are searched concurrently on the shared MCTS worker pool.
+
+    With `anytime`, a short probe (`anytime_probe_schedule`) runs first and
+    the pass stops there once the probe's policy has converged
+    (`PolicyConvergence`). Otherwise the probe's visits are dropped and each
+    sample gets one full `per_sample_ms` search: poke-engine cannot resume a
+    tree, so summing shallow searches would be weaker than one deep search.
     """
     selected_samples = sorted(
         list(sampled_battles or []), key=lambda x: float(x[1]), reverse=True
     )[: max(1, int(max_samples))]
-    aggregated: dict[str, float] = {}
     meta = {
         "samples_attempted": len(selected_samples),
         "samples_succeeded": 0,
@@ -543,63 +587,135 @@ def _run_mcts_policy_pass(
         for lm in legal_moves:
             legal_norm_to_move[normalize_name(lm)] = lm
 
-    # Timeout per sample: MCTS search time + 5s buffer for state conversion
-    timeout_sec = (int(per_sample_ms) / 1000.0) + 5.0
-
+    # Convert every sample up front; the pool then searches them concurrently
+    state_strings: list[str] = []
+    state_weights: list[float] = []
     for idx, (sample_battle, sample_weight) in enumerate(selected_samples):
+        check_cancelled()
         try:
-            state = battle_to_poke_engine_state(sample_battle)
-            # Run MCTS with timeout to prevent hangs on pathological states
-            with ThreadPoolExecutor(max_workers=1) as mcts_executor:
-                future = mcts_executor.submit(
-                    monte_carlo_tree_search, state, int(per_sample_ms)
+            state_strings.append(battle_to_poke_engine_state(sample_battle).to_string())
+            state_weights.append(float(sample_weight))
+        except Exception as e:
+            meta["samples_failed"] += 1
+            logger.warning("MCTS sample %s state conversion failed: %s", idx, e)
+
+    # engine visits per sample, accumulated over probe slices
+    sample_visits: list[dict[str, float]] = [{} for _ in state_strings]
+    sample_total_visits = [0] * len(state_strings)
+
+    def add_result(idx: int, total_visits: int, options):
+        sample_total_visits[idx] += total_visits
+        visits_by_move = sample_visits[idx]
+        for move_choice, visits in options:
+            if visits > 0:
+                visits_by_move[move_choice] = visits_by_move.get(move_choice, 0.0) + visits
+
+    def policies():
+        return _sample_policies(
+            sample_visits,
+            sample_total_visits,
+            state_weights,
+            legal_moves,
+            legal_norm_to_move,
+        )
+
+    convergence = PolicyConvergence()
+    pool = get_mcts_pool()
+    meta["pool_workers"] = pool.workers
+    probe = anytime_probe_schedule(per_sample_ms) if anytime else []
+    planned_ms = sum(probe) + int(per_sample_ms)
+    spent_ms = 0
+    cancel_token = current_cancel_token()
+
+    def search(search_ms: int):
+        nonlocal spent_ms
+        for idx, result, error in run_mcts_samples(
+            state_strings, search_ms, pool=pool, cancel_token=cancel_token
+        ):
+            if error is not None:
+                logger.warning(
+                    "MCTS sample %s failed (budget=%sms): %s",
+                    idx,
+                    search_ms,
+                    error,
                 )
-                try:
-                    result = future.result(timeout=timeout_sec)
-                except (FuturesTimeoutError, TimeoutError):
-                    meta["samples_failed"] += 1
-                    logger.warning(
-                        "MCTS sample %s timed out after %.1fs (budget=%sms), skipping",
-                        idx,
-                        timeout_sec,
-                        per_sample_ms,
-                    )
-                    continue
-            total_visits = int(getattr(result, "total_visits", 0) or 0)
+                continue
+
+            total_visits, options = result
             if total_visits <= 0:
-                meta["samples_failed"] += 1
                 continue
+            add_result(idx, total_visits, options)
+        spent_ms += search_ms
+
+        if cancel_token is not None and cancel_token.cancelled:
+            record_cpu_saved((planned_ms - spent_ms) * len(state_strings) / 1000.0)
+            cancel_token.raise_if_cancelled()
+
+    converged = False
+    probe_slices_run = 0
+    for probe_ms in probe:
+        search(probe_ms)
+        probe_slices_run += 1
+        if convergence.update(policies()):
+            converged = True
+            break
 
-            meta["samples_succeeded"] += 1
-            meta["total_visits"] += total_visits
+    if not converged:
+        if probe_slices_run:
+            sample_visits[:] = [{} for _ in state_strings]
+            sample_total_visits[:] = [0] * len(state_strings)
+        search(int(per_sample_ms))
 
-            for option in getattr(result, "side_one", []) or []:
-                move_choice = str(getattr(option, "move_choice", "") or "")
-                if not move_choice:
-                    continue
-                if legal_moves and move_choice not in legal_moves:
-                    mapped = legal_norm_to_move.get(normalize_name(move_choice))
-                    if mapped:
-                        move_choice = mapped
-                    else:
-                        continue
-                visits = float(getattr(option, "visits", 0) or 0.0)
-                if visits <= 0:
-                    continue
-                contribution = float(sample_weight) * (visits / float(total_visits))
-                aggregated[move_choice] = aggregated.get(move_choice, 0.0) + contribution
-        except Exception as e:
-            meta["samples_failed"] += 1
-            logger.warning(
-                "MCTS sample %s failed (budget=%sms): %s",
-                idx,
-                per_sample_ms,
-                e,
-            )
+    aggregated: dict[str, float] = {}
+    for policy, sample_weight in policies():
+        for move_choice, share in policy.items():
+            aggregated[move_choice] = aggregated.get(move_choice, 0.0) + sample_weight * share
+
+    succeeded = sum(1 for visits in sample_total_visits if visits > 0)
+    meta["samples_succeeded"] = succeeded
+    meta["samples_failed"] += len(state_strings) - succeeded
+    meta["total_visits"] = sum(sample_total_visits)
+    if anytime:
+        meta["anytime"] = {
+            "probe_ms": sum(probe),
+            "probe_slices_run": probe_slices_run,
+            "stopped_early": converged,
+            "saved_ms": max(int(per_sample_ms) - spent_ms, 0),
+            "convergence": dict(convergence.last),
+        }
 
     return _normalize_policy_weights(aggregated), meta
 
 
+def _sample_policies(
+    sample_visits: list[dict[str, float]],
+    sample_total_visits: list[int],
+    sample_weights: list[float],
+    legal_moves: set[str] | None = None,
+    legal_norm_to_move: dict[str, str] | None = None,
+) -> list[tuple[dict[str, float], float]]:
+    """
+    Per-sample visit shares (of all the sample's visits) over legal moves,
+    paired with the sample weight.
+    """
+    policies = []
+    for visits_by_move, total_visits, weight in zip(
+        sample_visits, sample_total_visits, sample_weights
+    ):
+        if total_visits <= 0:
+            continue
+        policy: dict[str, float] = {}
+        for move_choice, visits in visits_by_move.items():
+            if legal_moves and move_choice not in legal_moves:
+                mapped = (legal_norm_to_move or {}).get(normalize_name(move_choice))
+                if not mapped:
+                    continue
+                move_choice = mapped
+            policy[move_choice] = policy.get(move_choice, 0.0) + visits / float(total_visits)
+        policies.append((policy, weight))
+    return policies
+
+
 def _choose_from_weighted_policy(
     policy: dict[str, float],
     *,
@@ -1095,6 +1211,28 @@ def _check_ability_or_pokemon(
     return pokemon_name in pokemon_set or (base_name and base_name in pokemon_set)
 
 
+@battle_feature(ACTIVE, HP)
+def _team_material(battle: Battle) -> tuple[int, int, float, float]:
+    """
+    (our alive count, opponent alive count, our HP total, opponent HP total),
+    HP totals as sums of HP fractions.
+    """
+
+    def _side_material(battler) -> tuple[int, float]:
+        team = ([battler.active] if battler.active else []) + list(
+            getattr(battler, "reserve", []) or []
+        )
+        alive = [p for p in team if p is not None and getattr(p, "hp", 0) > 0]
+        return len(alive), sum(
+            getattr(p, "hp", 0) / max(getattr(p, "max_hp", 1), 1) for p in alive
+        )
+
+    our_alive, our_hp = _side_material(battle.user)
+    opp_alive, opp_hp = _side_material(battle.opponent)
+    return our_alive, opp_alive, our_hp, opp_hp
+
+
+@battle_feature(ACTIVE, HP, SIDE_CONDITIONS)
 def calculate_momentum(battle: Battle) -> tuple[float, str]:
     """
     Calculate momentum score for the battle.
@@ -1102,18 +1240,12 @@ def calculate_momentum(battle: Battle) -> tuple[float, str]:
     Positive = we have advantage, Negative = opponent has advantage.
     """
     momentum = 0.0
+    our_alive, opp_alive, our_hp, opp_hp = _team_material(battle)
 
     # HP advantage (sum of HP percentages)
-    our_pokemon = [battle.user.active] + battle.user.reserve if battle.user.active else battle.user.reserve
-    opp_pokemon = [battle.opponent.active] + battle.opponent.reserve if battle.opponent.active else battle.opponent.reserve
-
-    our_hp = sum(p.hp / max(p.max_hp, 1) for p in our_pokemon if p and p.hp > 0)
-    opp_hp = sum(p.hp / max(p.max_hp, 1) for p in opp_pokemon if p and p.hp > 0)
     momentum += (our_hp - opp_hp) * 0.5
 
     # Pokemon count advantage
-    our_alive = sum(1 for p in our_pokemon if p and p.hp > 0)
-    opp_alive = sum(1 for p in opp_pokemon if p and p.hp > 0)
     momentum += (our_alive - opp_alive) * 1.5
 
     # Hazard advantage (hazards on opponent = good for us)
@@ -1153,25 +1285,7 @@ def _estimate_board_advantage(
     if battle is None:
         return 0.0, False
 
-    our_team = ([battle.user.active] if battle.user.active else []) + list(
-        getattr(battle.user, "reserve", []) or []
-    )
-    opp_team = ([battle.opponent.active] if battle.opponent.active else []) + list(
-        getattr(battle.opponent, "reserve", []) or []
-    )
-
-    our_alive = sum(1 for p in our_team if p is not None and getattr(p, "hp", 0) > 0)
-    opp_alive = sum(1 for p in opp_team if p is not None and getattr(p, "hp", 0) > 0)
-    our_hp_total = sum(
-        getattr(p, "hp", 0) / max(getattr(p, "max_hp", 1), 1)
-        for p in our_team
-        if p is not None and getattr(p, "hp", 0) > 0
-    )
-    opp_hp_total = sum(
-        getattr(p, "hp", 0) / max(getattr(p, "max_hp", 1), 1)
-        for p in opp_team
-        if p is not None and getattr(p, "hp", 0) > 0
-    )
+    our_alive, opp_alive, our_hp_total, opp_hp_total = _team_material(battle)
 
     score = 0.0
     score += (our_alive - opp_alive) * 1.10
@@ -1429,17 +1543,12 @@ def find_ko_line(battle: Battle) -> dict | None:
     if not move_names:
         return None
 
-    try:
-        from fp.search.endgame import estimate_damage
-    except Exception:
-        return None
-
     speed_assessment = assess_speed_order(battle)
     guaranteed_move_first = speed_assessment.guaranteed_move_first
 
     best_one_shot = None
     for move_name in move_names:
-        damage = estimate_damage(our, opp, move_name)
+        damage = estimate_damage_ratio(our, opp, move_name)
         if damage >= 1.0 and (guaranteed_move_first or move_name in PRIORITY_MOVES):
             if best_one_shot is None or damage > best_one_shot["damage"]:
                 best_one_shot = {
@@ -1454,7 +1563,7 @@ def find_ko_line(battle: Battle) -> dict | None:
     best_two_shot = None
     if guaranteed_move_first:
         for move_name in move_names:
-            damage = estimate_damage(our, opp, move_name)
+            damage = estimate_damage_ratio(our, opp, move_name)
             if damage >= 0.5:
                 if best_two_shot is None or damage > best_two_shot["damage"]:
                     best_two_shot = {
@@ -2127,8 +2236,7 @@ def detect_opponent_abilities(battle: Battle) -> OpponentAbilityState:
     state.momentum, state.momentum_level = calculate_momentum(battle)
 
     # Count our alive Pokemon
-    our_pokemon = [battle.user.active] + battle.user.reserve if battle.user.active else battle.user.reserve
-    state.our_alive_count = sum(1 for p in our_pokemon if p and p.hp > 0)
+    state.our_alive_count = _team_material(battle)[0]
 
     return state
 
@@ -3945,6 +4053,7 @@ def _find_switch_target(battle: Battle | None, move: str):
     return None
 
 
+@battle_feature(*ALL_GROUPS)
 def _assess_immediate_survival_risk(battle: Battle | None) -> dict[str, float | bool]:
     """
     Estimate whether staying in is likely to get KOed before we can act.
@@ -5355,108 +5464,120 @@ def select_move_from_eval_scores(
 
     blended_policy = dict(eval_scores)
 
-    blended_policy = apply_heuristic_bias(
-        blended_policy,
-        battle,
-        ability_state,
-        trace_events=trace_events,
-    )
-
-    # Hard filter: remove moves that are blocked by opponent abilities
-    if ability_state:
-        blended_policy = filter_blocked_moves(
+    with stage("heuristic_bias"):
+        blended_policy = apply_heuristic_bias(
             blended_policy,
+            battle,
             ability_state,
-            battle=battle,
             trace_events=trace_events,
         )
 
+    # Hard filter: remove moves that are blocked by opponent abilities
+    if ability_state:
+        with stage("filter_blocked_moves"):
+            blended_policy = filter_blocked_moves(
+                blended_policy,
+                ability_state,
+                battle=battle,
+                trace_events=trace_events,
+            )
+
     # Apply ability-based penalties before sorting
     if ability_state:
-        blended_policy = apply_ability_penalties(
-            blended_policy,
-            ability_state,
-            trace_events=trace_events,
-            battle=battle,
-        )
+        with stage("ability_penalties"):
+            blended_policy = apply_ability_penalties(
+                blended_policy,
+                ability_state,
+                trace_events=trace_events,
+                battle=battle,
+            )
 
     # Apply switch-specific penalties (Phase 2.1)
     if ability_state and battle is not None:
-        blended_policy = apply_switch_penalties(
+        with stage("switch_penalties"):
+            blended_policy = apply_switch_penalties(
+                blended_policy,
+                battle,
+                ability_state,
+                playstyle=playstyle,
+                trace_events=trace_events,
+            )
+
+    # KO-line bias: punish non-damaging moves if a KO line is available
+    if ability_state:
+        with stage("ko_line_bias"):
+            blended_policy = apply_ko_line_bias(
+                blended_policy,
+                ability_state,
+                trace_events=trace_events,
+            )
+
+    with stage("threat_switch_bias"):
+        blended_policy = apply_threat_switch_bias(
             blended_policy,
             battle,
             ability_state,
-            playstyle=playstyle,
             trace_events=trace_events,
         )
-
-    # KO-line bias: punish non-damaging moves if a KO line is available
-    if ability_state:
-        blended_policy = apply_ko_line_bias(
+    with stage("hazard_maintenance_bias"):
+        blended_policy = apply_hazard_maintenance_bias(
             blended_policy,
+            battle,
             ability_state,
             trace_events=trace_events,
         )
 
-    blended_policy = apply_threat_switch_bias(
-        blended_policy,
-        battle,
-        ability_state,
-        trace_events=trace_events,
-    )
-    blended_policy = apply_hazard_maintenance_bias(
-        blended_policy,
-        battle,
-        ability_state,
-        trace_events=trace_events,
-    )
-
     # Pre-orb status safety: protect Toxic Orb activation (Poison Heal)
     if battle is not None:
-        blended_policy = apply_pre_orb_status_safety(
-            blended_policy,
-            battle,
-            trace_events=trace_events,
-        )
+        with stage("pre_orb_status_safety"):
+            blended_policy = apply_pre_orb_status_safety(
+                blended_policy,
+                battle,
+                trace_events=trace_events,
+            )
 
     # Preemptive item-denial bonus (gen9ou only)
     if battle is not None and playstyle is not None:
-        blended_policy = apply_preemptive_item_punish(
-            blended_policy,
-            battle,
-            playstyle,
-            decision_profile,
-        )
+        with stage("preemptive_item_punish"):
+            blended_policy = apply_preemptive_item_punish(
+                blended_policy,
+                battle,
+                playstyle,
+                decision_profile,
+            )
 
     # Team strategy / playstyle bias
     if battle is not None and playstyle is not None:
         team_plan = getattr(battle.user, "team_plan", None)
-        blended_policy = apply_team_strategy_bias(
-            blended_policy,
-            battle,
-            team_plan,
-            playstyle,
-        )
+        with stage("team_strategy_bias"):
+            blended_policy = apply_team_strategy_bias(
+                blended_policy,
+                battle,
+                team_plan,
+                playstyle,
+            )
         # NOTE: Removed duplicate apply_threat_switch_bias() call here.
         # Threat safety is already enforced at line 5369 (FIRST PASS).
         # Re-applying here after team_strategy_bias causes override ping-pong
         # where threat logic contradicts earlier decisions. Single-pass is correct.
         # See FOULER_PLAY_MAINTENANCE.md Phase 1.
-        blended_policy = apply_hazard_maintenance_bias(
+        with stage("hazard_maintenance_bias"):
+            blended_policy = apply_hazard_maintenance_bias(
+                blended_policy,
+                battle,
+                ability_state,
+                trace_events=trace_events,
+            )
+
+    # Final cleanup: down-weight explicitly odd/waste-turn choices.
+    with stage("oddity_penalties"):
+        blended_policy = apply_oddity_penalties(
             blended_policy,
             battle,
             ability_state,
             trace_events=trace_events,
         )
 
-    # Final cleanup: down-weight explicitly odd/waste-turn choices.
-    blended_policy = apply_oddity_penalties(
-        blended_policy,
-        battle,
-        ability_state,
-        trace_events=trace_events,
-    )
-
     # Hard legality filter: never keep switch options when trapped.
     # This prevents illegal /switch submissions in partial-trap turns.
     if battle is not None and not getattr(battle, "force_switch", False):
@@ -5527,7 +5648,8 @@ def select_move_from_eval_scores(
         and not getattr(battle, "force_switch", False)
         and not sorted_policy[0][0].startswith("switch ")
     ):
-        survival = _assess_immediate_survival_risk(battle)
+        with stage("survival_risk"):
+            survival = _assess_immediate_survival_risk(battle)
         if bool(survival.get("risk", False)):
             top_move, top_weight = sorted_policy[0]
             incoming_pressure = None
@@ -5589,7 +5711,8 @@ def select_move_from_eval_scores(
             last_selected_raw = str(
                 getattr(getattr(getattr(battle, "user", None), "last_selected_move", None), "move", "") or ""
             ).lower()
-            advantage_score, ahead = _estimate_board_advantage(battle, ability_state)
+            with stage("board_advantage"):
+                advantage_score, ahead = _estimate_board_advantage(battle, ability_state)
             if ahead:
                 tie_ratio = min(tie_ratio, 0.88 if advantage_score < 1.35 else 0.84)
             if turn_number > 1 and last_selected_raw.startswith("switch "):
@@ -5714,7 +5837,8 @@ def select_move_from_eval_scores(
     # Conversion lock: if we are ahead and already have the best non-switch line,
     # do not re-randomize into a close defensive switch.
     if battle is not None and considered and not getattr(battle, "force_switch", False):
-        advantage_score, ahead = _estimate_board_advantage(battle, ability_state)
+        with stage("board_advantage"):
+            advantage_score, ahead = _estimate_board_advantage(battle, ability_state)
         if ahead:
             best_move, best_weight = sorted_policy[0]
             if not best_move.startswith("switch "):
@@ -5829,6 +5953,37 @@ MAX_DECISION_TIME_SECONDS = 20  # Reduced from 30 to avoid timeout losses
 # When in time pressure (<60s remaining), use a much tighter budget
 MAX_DECISION_TIME_PRESSURE_SECONDS = 6  # Reduced from 8 for more safety margin
 
+# Wall-clock search time saved by anytime early stops, per battle, spent on
+# later high-stakes turns. Capped so one calm stretch can't stall a turn.
+MCTS_TIME_BANK_MAX_MS = max(0, int(os.getenv("MCTS_TIME_BANK_MAX_MS", "6000")))
+_search_time_bank: dict[str, int] = {}
+_search_time_bank_lock = threading.Lock()
+
+
+def _deposit_search_time(battle_tag: str, saved_ms: int):
+    if not battle_tag or saved_ms <= 0:
+        return
+    with _search_time_bank_lock:
+        banked = _search_time_bank.get(battle_tag, 0) + int(saved_ms)
+        _search_time_bank[battle_tag] = min(banked, MCTS_TIME_BANK_MAX_MS)
+
+
+def _withdraw_search_time(battle_tag: str, max_ms: int) -> int:
+    if not battle_tag or max_ms <= 0:
+        return 0
+    with _search_time_bank_lock:
+        banked = _search_time_bank.get(battle_tag, 0)
+        withdrawn = min(banked, int(max_ms))
+        if withdrawn:
+            _search_time_bank[battle_tag] = banked - withdrawn
+        return withdrawn
+
+
+def clear_search_time_bank(battle_tag: str):
+    """Drop the banked search time of a finished battle."""
+    with _search_time_bank_lock:
+        _search_time_bank.pop(battle_tag, None)
+
 
 def _get_fallback_move(battle: Battle) -> str:
     """
@@ -5886,11 +6041,13 @@ def _get_fallback_move(battle: Battle) -> str:
     return "splash"
 
 
+@profile_decision
+@with_damage_cache
 def find_best_move(battle: Battle) -> tuple[str, dict]:
     _maybe_hot_reload()
     start_time = time.time()
     if not getattr(battle, "_isolation_copy", False):
-        battle = deepcopy(battle)
+        battle = battle.clone()
     trace = build_trace_base(battle)
     trace["battle_type"] = (
         battle.battle_type.name if hasattr(battle.battle_type, "name") else str(battle.battle_type)
@@ -5915,7 +6072,8 @@ def find_best_move(battle: Battle) -> tuple[str, dict]:
 
     # Detect opponent's abilities before we start sampling
     # (sampling may change the ability, so check the original battle state)
-    ability_state = detect_opponent_abilities(battle)
+    with stage("abilities"):
+        ability_state = detect_opponent_abilities(battle)
     trace["ability_state"] = asdict(ability_state)
 
     # Log detected abilities that will affect move selection
@@ -6074,7 +6232,9 @@ def find_best_move(battle: Battle) -> tuple[str, dict]:
         )
     trace["detected_abilities"] = detected_abilities
 
-    ko_line = find_ko_line(battle)
+    check_cancelled()
+    with stage("ko_line"):
+        ko_line = find_ko_line(battle)
     if ko_line:
         ability_state.ko_line_available = True
         ability_state.ko_line_turns = int(ko_line.get("turns", 0))
@@ -6085,7 +6245,8 @@ def find_best_move(battle: Battle) -> tuple[str, dict]:
     team_plan = getattr(battle.user, "team_plan", None)
     if team_plan is None and battle.user.team_dict:
         try:
-            team_plan = analyze_team(battle.user.team_dict)
+            with stage("team_analysis"):
+                team_plan = analyze_team(battle.user.team_dict)
             battle.user.team_plan = team_plan
         except Exception as e:
             logger.warning(f"Failed to analyze team: {e}")
@@ -6107,11 +6268,13 @@ def find_best_move(battle: Battle) -> tuple[str, dict]:
     # PHASE 4.1: ENDGAME SOLVER
     # =========================================================================
     # Try to solve simple endgames deterministically before MCTS
+    check_cancelled()
     try:
         from fp.search.endgame import is_endgame, solve_endgame
 
         if is_endgame(battle, ENDGAME_MAX_POKEMON):
-            solution = solve_endgame(battle)
+            with stage("endgame"):
+                solution = solve_endgame(battle)
             if solution and solution.is_deterministic and solution.best_move:
                 logger.info(
                     f"ENDGAME SOLVED: {solution.best_move} "
@@ -6123,6 +6286,9 @@ def find_best_move(battle: Battle) -> tuple[str, dict]:
                     "expected_outcome": solution.expected_outcome,
                     "explanation": solution.explanation,
                     "deterministic": True,
+                    "depth": solution.depth_searched,
+                    "nodes": solution.nodes,
+                    "elapsed_ms": solution.elapsed_ms,
                 }
                 trace["choice"] = solution.best_move
                 return solution.best_move, trace
@@ -6138,9 +6304,11 @@ def find_best_move(battle: Battle) -> tuple[str, dict]:
     # FORCED LINE CHECK
     # =========================================================================
     # Check for forced lines BEFORE MCTS (short-circuits when play is obvious)
+    check_cancelled()
     forced = None
     try:
-        forced = detect_forced_line(battle)
+        with stage("forced_line"):
+            forced = detect_forced_line(battle)
         if forced and forced.confidence >= 0.90:
             logger.info(
                 f"FORCED LINE (high confidence {forced.confidence}): "
@@ -6201,8 +6369,13 @@ def find_best_move(battle: Battle) -> tuple[str, dict]:
         est_turns_left = max(5, 50 - turn_num)
         # Budget per turn: divide remaining time, leave 2s for overhead
         turn_budget_s = (game_remaining_s / est_turns_left) - 2.0
+        # Samples run concurrently on the MCTS pool, so wall-clock cost is per
+        # wave of samples rather than per sample. A turn whose budget binds
+        # skips the anytime probe and searches the whole budget instead.
+        sample_waves = mcts_sample_waves(num_battles)
+        anytime = MCTS_ANYTIME_ENABLED and not in_time_pressure
         if turn_budget_s > 0:
-            game_aware_ms = int((turn_budget_s * 1000) / max(num_battles, 1))
+            game_aware_ms = int((turn_budget_s * 1000) / sample_waves)
             game_aware_ms = max(game_aware_ms, 500)  # Floor: never below 500ms
             if game_aware_ms < search_time_per_battle:
                 logger.info(
@@ -6211,7 +6384,9 @@ def find_best_move(battle: Battle) -> tuple[str, dict]:
                     game_aware_ms, game_remaining_s, turn_num,
                     est_turns_left, search_time_per_battle,
                 )
-                search_time_per_battle = game_aware_ms
+            search_time_per_battle, anytime = _capped_search_time(
+                search_time_per_battle, game_aware_ms, anytime
+            )
 
         # Invest more in high-stakes turns (but respect game-aware cap)
         high_stakes = ability_state.opponent_active_is_threat or ability_state.ko_line_available
@@ -6220,16 +6395,66 @@ def find_best_move(battle: Battle) -> tuple[str, dict]:
             boosted = min(boosted, FoulPlayConfig.search_time_ms * 2)
             # Don't let high-stakes boost exceed game-aware budget
             if turn_budget_s > 0:
-                max_high_stakes_ms = int((turn_budget_s * 1000) / max(num_battles, 1))
-                boosted = min(boosted, max_high_stakes_ms)
+                max_high_stakes_ms = int((turn_budget_s * 1000) / sample_waves)
+                boosted, anytime = _capped_search_time(
+                    boosted, max_high_stakes_ms, anytime
+                )
             search_time_per_battle = boosted
 
+            # Spend time banked by earlier early-stopped searches
+            if MCTS_ANYTIME_ENABLED:
+                banked_ms = _withdraw_search_time(
+                    battle.battle_tag, FoulPlayConfig.search_time_ms * sample_waves
+                )
+                if banked_ms:
+                    search_time_per_battle += banked_ms // sample_waves
+                    trace["search_time_bank_ms"] = banked_ms
+
+        # Shorter searches while other battles are queued for a search slot
+        budget_scale = current_search_budget_scale()
+        if budget_scale < 1.0:
+            search_time_per_battle = max(int(search_time_per_battle * budget_scale), 10)
+            trace["search_budget_scale"] = budget_scale
+
+        check_cancelled()
         try:
-            sampled_battles = prepare_fn(battle, num_battles)
+            with stage("sampling"):
+                sampled_battles = prepare_fn(battle, num_battles)
         except Exception as e:
             logger.warning(f"Battle sampling failed, using original: {e}")
             sampled_battles = [(battle, 1.0)]
 
+        # Identical worlds are searched once with their merged weight. The
+        # budget they would have used goes to one more round of sampling for
+        # distinct worlds, and what is still left to deeper search.
+        worlds_sampled = len(sampled_battles)
+        sampled_battles = merge_duplicate_worlds(sampled_battles)
+        if 0 < len(sampled_battles) < num_battles and worlds_sampled == num_battles:
+            try:
+                with stage("sampling"):
+                    extra_battles = prepare_fn(battle, num_battles)
+                worlds_sampled += len(extra_battles)
+                sampled_battles = merge_duplicate_worlds(sampled_battles + extra_battles)
+            except Exception as e:
+                logger.warning(f"Extra battle sampling failed: {e}")
+            sampled_battles = sorted(
+                sampled_battles, key=lambda x: x[1], reverse=True
+            )[:num_battles]
+            total_weight = sum(w for _, w in sampled_battles)
+            if total_weight > 0:
+                sampled_battles = [(b, w / total_weight) for b, w in sampled_battles]
+        unique_waves = mcts_sample_waves(len(sampled_battles))
+        if unique_waves < sample_waves:
+            deeper_ms = int(search_time_per_battle * sample_waves / unique_waves)
+            logger.info(
+                "%d unique of %d sampled worlds: %dms -> %dms per sample",
+                len(sampled_battles),
+                worlds_sampled,
+                search_time_per_battle,
+                deeper_ms,
+            )
+            search_time_per_battle = deeper_ms
+
         # Check time budget
         elapsed = time.time() - start_time
         remaining_budget = time_budget - elapsed - 2.0
@@ -6240,19 +6465,25 @@ def find_best_move(battle: Battle) -> tuple[str, dict]:
         # Cap search time to fit within budget
         if sampled_battles and remaining_budget > 0:
             max_per_battle_ms = int(
-                (remaining_budget * 1000) / max(len(sampled_battles), 1)
+                (remaining_budget * 1000) / mcts_sample_waves(len(sampled_battles))
             )
+            max_per_battle_ms = max(max_per_battle_ms, 10)
             if max_per_battle_ms < search_time_per_battle:
                 logger.info(
                     f"Reducing search time from {search_time_per_battle}ms to "
                     f"{max_per_battle_ms}ms to fit time budget"
                 )
-                search_time_per_battle = max(max_per_battle_ms, 10)
+            search_time_per_battle, anytime = _capped_search_time(
+                search_time_per_battle, max_per_battle_ms, anytime
+            )
 
         trace["search"] = {
             "num_battles": len(sampled_battles),
+            "worlds_sampled": worlds_sampled,
+            "unique_worlds": len(sampled_battles),
             "search_time_ms": search_time_per_battle,
             "time_budget_s": time_budget,
+            "anytime": anytime,
         }
         logger.info(
             "Sampling {} simulated battles (MCTS) at {}ms each".format(
@@ -6263,13 +6494,27 @@ def find_best_move(battle: Battle) -> tuple[str, dict]:
         mcts_policy = {}
         mcts_meta = {}
         if sampled_battles:
-            mcts_policy, mcts_meta = _run_mcts_policy_pass(
-                sampled_battles,
-                per_sample_ms=search_time_per_battle,
-                max_samples=num_battles,
-            )
+            with stage("mcts"):
+                mcts_policy, mcts_meta = _run_mcts_policy_pass(
+                    sampled_battles,
+                    per_sample_ms=search_time_per_battle,
+                    max_samples=num_battles,
+                    anytime=anytime,
+                )
             trace["mcts_meta"] = mcts_meta
+            saved_ms = mcts_meta.get("anytime", {}).get("saved_ms", 0)
+            if saved_ms:
+                logger.info(
+                    "Anytime MCTS converged early: saved %sms/sample (%s)",
+                    saved_ms,
+                    mcts_meta["anytime"]["convergence"],
+                )
+                _deposit_search_time(
+                    battle.battle_tag,
+                    saved_ms * mcts_sample_waves(len(sampled_battles)),
+                )
 
+        check_cancelled()
         if mcts_policy:
             # Apply forced line bias to MCTS policy
             if forced and forced.confidence >= 0.70:
@@ -6288,14 +6533,15 @@ def find_best_move(battle: Battle) -> tuple[str, dict]:
 
             trace["mcts_policy_raw"] = dict(mcts_policy)
 
-            choice = select_move_from_eval_scores(
-                mcts_policy,
-                ability_state=ability_state,
-                battle=battle,
-                playstyle=playstyle,
-                decision_profile=decision_profile,
-                trace=trace,
-            )
+            with stage("select"):
+                choice = select_move_from_eval_scores(
+                    mcts_policy,
+                    ability_state=ability_state,
+                    battle=battle,
+                    playstyle=playstyle,
+                    decision_profile=decision_profile,
+                    trace=trace,
+                )
 
             elapsed_total = time.time() - start_time
             logger.info(f"Choice: {choice} (decided in {elapsed_total:.1f}s)")
@@ -6313,8 +6559,10 @@ def find_best_move(battle: Battle) -> tuple[str, dict]:
         total_weight = 0.0
         eval_samples = sampled_battles if sampled_battles else [(battle, 1.0)]
         for sampled_battle, weight in eval_samples:
+            check_cancelled()
             try:
-                scores = evaluate_position(sampled_battle)
+                with stage("eval_fallback"):
+                    scores = evaluate_position(sampled_battle)
                 for move, score in scores.items():
                     eval_scores[move] = eval_scores.get(move, 0.0) + score * weight
                 total_weight += weight
@@ -6349,14 +6597,15 @@ def find_best_move(battle: Battle) -> tuple[str, dict]:
 
         trace["eval_scores_raw"] = dict(eval_scores)
 
-        choice = select_move_from_eval_scores(
-            eval_scores,
-            ability_state=ability_state,
-            battle=battle,
-            playstyle=playstyle,
-            decision_profile=decision_profile,
-            trace=trace,
-        )
+        with stage("select"):
+            choice = select_move_from_eval_scores(
+                eval_scores,
+                ability_state=ability_state,
+                battle=battle,
+                playstyle=playstyle,
+                decision_profile=decision_profile,
+                trace=trace,
+            )
 
         elapsed_total = time.time() - start_time
         logger.info(f"Choice: {choice} (decided in {elapsed_total:.1f}s)")
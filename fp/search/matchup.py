@@ -0,0 +1,412 @@
+"""
+All-Pairs Matchup Matrix for Fouler-Play
+
+Holds the estimated damage of every (attacker, defender, move) triple on the
+board, for both sides, computed in one vectorized pass with the same formula
+as `fp.search.damage.estimate_damage_ratio`. Heuristic passes that loop over
+our reserve x their reserve x moves read from it instead of calling the
+scalar estimator per triple.
+
+`matchup_matrix(battle)` returns the matrix for the battle's current board.
+Inside a `damage_cache()` scope it is shared for the rest of the decision, and
+each side's per-Pokemon arrays are shared between sampled worlds that only
+differ on the other side.
+"""
+
+import math
+
+import numpy as np
+
+import constants
+from fp.helpers import POKEMON_TYPE_INDICES, TYPE_COUNT
+from fp.search.damage import (
+    _HALF_HP_DAMAGE_MOVES,
+    _boost_value,
+    _decision_cache,
+    _get_effective_types,
+    _normalize_type_name,
+    _sanitize_type_list,
+    _stats_value,
+    defensive_profile,
+    estimate_damage_ratio,
+)
+from data.ids import (
+    PHYSICAL_CATEGORY,
+    STATUS_CATEGORY,
+    UNKNOWN_ID,
+    move_table,
+)
+
+# Base power assumed for an attacker with no revealed moves
+ASSUMED_STAB_BASE_POWER = 85
+
+_OFFENSIVE_STATS = (constants.ATTACK, constants.SPECIAL_ATTACK)
+_DEFENSIVE_STATS = (constants.DEFENSE, constants.SPECIAL_DEFENSE)
+
+
+def _boost_multiplier(boost: int) -> float:
+    if boost > 0:
+        return (2 + boost) / 2
+    if boost < 0:
+        return 2 / (2 - boost)
+    return 1.0
+
+
+def _move_names(pokemon) -> list[str]:
+    return [
+        m.name if hasattr(m, "name") else str(m)
+        for m in getattr(pokemon, "moves", []) or []
+    ]
+
+
+def _side(battler) -> list:
+    active = getattr(battler, "active", None)
+    reserve = [p for p in getattr(battler, "reserve", []) or [] if p is not None]
+    return ([active] if active is not None else []) + reserve
+
+
+def _has_tailwind(battler) -> bool:
+    side_conditions = getattr(battler, "side_conditions", None) or {}
+    try:
+        return bool(side_conditions.get(constants.TAILWIND, 0))
+    except AttributeError:
+        return False
+
+
+def _move_features(move_name: str) -> tuple | None:
+    """
+    (physical, base power, type index, fixed damage, level damage, half HP)
+    for an attacking move, or None for a status move.
+    """
+    moves = move_table()
+    move = moves.ids.id(move_name)
+    if move == UNKNOWN_ID or moves.category[move] == STATUS_CATEGORY:
+        return None
+    return (
+        moves.category[move] == PHYSICAL_CATEGORY,
+        float(moves.base_power[move]),
+        int(moves.type[move]),
+        float(moves.fixed_damage[move]),
+        bool(moves.level_damage[move]),
+        moves.ids.name(move) in _HALF_HP_DAMAGE_MOVES,
+    )
+
+
+class _SideData:
+    """Per-Pokemon and per-move arrays for one side of the board."""
+
+    def __init__(self, pokemon: list, tailwind: bool = False):
+        self.pokemon = pokemon
+        self.index = {id(p): i for i, p in enumerate(pokemon)}
+        self.moves = [_move_names(p) for p in pokemon]
+        self.move_index = [
+            {name: j for j, name in reversed(list(enumerate(names)))}
+            for names in self.moves
+        ]
+
+        self.max_hp = np.array(
+            [max(float(getattr(p, "max_hp", 1) or 1), 1.0) for p in pokemon]
+        )
+        self.hp = np.array([max(float(getattr(p, "hp", 0) or 0), 0.0) for p in pokemon])
+
+        # effectiveness of each attacking type against each Pokemon: (n, types)
+        self.types = [_get_effective_types(p) for p in pokemon]
+        self.type_effectiveness = np.array(
+            [defensive_profile(p) for p in pokemon], dtype=np.float64
+        ).reshape(len(pokemon), TYPE_COUNT)
+
+        stats = _OFFENSIVE_STATS + _DEFENSIVE_STATS
+        self.raw_stats = {
+            stat: np.array([float(_stats_value(p, stat)) for p in pokemon])
+            for stat in stats
+        }
+        self.boosted_stats = {
+            stat: self.raw_stats[stat]
+            * np.array([_boost_multiplier(_boost_value(p, stat)) for p in pokemon])
+            for stat in stats
+        }
+
+        speeds = []
+        for p in pokemon:
+            speed = _stats_value(p, constants.SPEED) * _boost_multiplier(
+                _boost_value(p, constants.SPEED)
+            )
+            if getattr(p, "status", None) == constants.PARALYZED:
+                speed *= 0.5
+            if tailwind:
+                speed *= 2
+            speeds.append(float(speed))
+        self.speed = np.array(speeds)
+
+        self._build_attack_arrays()
+
+    def _build_attack_arrays(self):
+        """(attacker, move) arrays describing every move this side can use."""
+        width = max((len(m) for m in self.moves), default=0)
+        rows = {
+            k: []
+            for k in (
+                "valid",
+                "physical",
+                "base_power",
+                "move_type",
+                "stab",
+                "attack",
+                "fixed",
+                "half_hp",
+            )
+        }
+        for i, pokemon in enumerate(self.pokemon):
+            stab_types = _sanitize_type_list(getattr(pokemon, "types", []) or [])
+            tera = _normalize_type_name(getattr(pokemon, "tera_type", None))
+            if getattr(pokemon, "terastallized", False) and tera:
+                stab_types.append(tera)
+            stab_indices = {POKEMON_TYPE_INDICES[t] for t in stab_types}
+            raw_level = getattr(pokemon, "level", None)
+            level = (
+                float(raw_level)
+                if isinstance(raw_level, (int, float)) and raw_level > 0
+                else 100.0
+            )
+            attack = (
+                self.boosted_stats[constants.ATTACK][i],
+                self.boosted_stats[constants.SPECIAL_ATTACK][i],
+            )
+
+            row = {k: [] for k in rows}
+            for move_name in self.moves[i] + [None] * (width - len(self.moves[i])):
+                features = _move_features(move_name) if move_name else None
+                if features is None:
+                    row["valid"].append(False)
+                    row["physical"].append(False)
+                    row["base_power"].append(0.0)
+                    row["move_type"].append(0)
+                    row["stab"].append(1.0)
+                    row["attack"].append(1.0)
+                    row["fixed"].append(0.0)
+                    row["half_hp"].append(False)
+                    continue
+                physical, base_power, move_type, fixed, level_damage, half_hp = features
+                row["valid"].append(True)
+                row["physical"].append(physical)
+                row["base_power"].append(base_power)
+                row["move_type"].append(move_type)
+                row["stab"].append(1.5 if move_type in stab_indices else 1.0)
+                row["attack"].append(attack[0] if physical else attack[1])
+                row["fixed"].append(level if level_damage else fixed)
+                row["half_hp"].append(half_hp)
+            for k, values in row.items():
+                rows[k].append(values)
+
+        shape = (len(self.pokemon), width)
+        self.attacks = {
+            k: np.array(values).reshape(shape) for k, values in rows.items()
+        }
+        self.attacks["move_type"] = self.attacks["move_type"].astype(np.intp)
+
+
+def _damage_tensor(attackers: _SideData, defenders: _SideData) -> np.ndarray:
+    """Damage ratio for every (attacker, defender, move): shape (A, D, M)."""
+    a = {k: v[:, None, :] for k, v in attackers.attacks.items()}
+    shape = (len(attackers.pokemon), len(defenders.pokemon), a["valid"].shape[2])
+    if 0 in shape:
+        return np.zeros(shape)
+
+    # (A, D, M) gathered from the defenders' (D, types) effectiveness rows
+    effectiveness = defenders.type_effectiveness[
+        :, attackers.attacks["move_type"]
+    ].transpose(1, 0, 2)
+    max_hp = defenders.max_hp[None, :, None]
+    hp = defenders.hp[None, :, None]
+    defense = np.where(
+        a["physical"],
+        defenders.boosted_stats[constants.DEFENSE][None, :, None],
+        defenders.boosted_stats[constants.SPECIAL_DEFENSE][None, :, None],
+    )
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        formula = (
+            (((2 * 100 / 5 + 2) * a["base_power"] * a["attack"] / defense) / 50 + 2)
+            * effectiveness
+            * a["stab"]
+            / max_hp
+        )
+    damage = np.where(a["base_power"] > 0, formula, 0.0)
+    damage = np.where(a["half_hp"], np.minimum(0.5 * hp / max_hp, 1.0), damage)
+    damage = np.where(a["fixed"] > 0, np.minimum(a["fixed"] / max_hp, 1.0), damage)
+    return np.where(a["valid"] & (effectiveness != 0), damage, 0.0)
+
+
+def _best_over_moves(tensor: np.ndarray) -> np.ndarray:
+    """(A, D) best damage over each attacker's moves."""
+    if tensor.shape[2] == 0:
+        return np.zeros(tensor.shape[:2])
+    return tensor.max(axis=2)
+
+
+def _assumed_stab_damage(
+    attackers: _SideData, i: int, defenders: _SideData, k: int
+) -> float:
+    """
+    Best damage from an assumed 85 BP STAB move of either category, using
+    unboosted stats. Used for attackers with no revealed moves.
+    """
+    best = 0.0
+    for atk_stat, def_stat in zip(_OFFENSIVE_STATS, _DEFENSIVE_STATS):
+        atk = attackers.raw_stats[atk_stat][i]
+        defense = max(defenders.raw_stats[def_stat][k], 1)
+        base = ((2 * 100 / 5 + 2) * ASSUMED_STAB_BASE_POWER * atk / defense) / 50 + 2
+        for t in attackers.types[i]:
+            eff = defenders.type_effectiveness[k, POKEMON_TYPE_INDICES[t]]
+            if eff != 0:
+                best = max(best, base * eff * 1.5 / defenders.max_hp[k])
+    return float(best)
+
+
+class MatchupMatrix:
+    """
+    Damage estimates for every (attacker, defender, move) on the board.
+
+    Built from our Pokemon and the opponent's (active first, then reserve).
+    Pairs involving a Pokemon that is not on the board fall back to the
+    scalar estimator.
+    """
+
+    def __init__(
+        self,
+        user_pokemon: list,
+        opponent_pokemon: list,
+        user_tailwind: bool = False,
+        opponent_tailwind: bool = False,
+    ):
+        self._init_sides(
+            _SideData(list(user_pokemon), user_tailwind),
+            _SideData(list(opponent_pokemon), opponent_tailwind),
+        )
+
+    def _init_sides(self, user: _SideData, opponent: _SideData):
+        self.user = user
+        self.opponent = opponent
+        self.user_to_opponent = _damage_tensor(user, opponent)
+        self.opponent_to_user = _damage_tensor(opponent, user)
+        # nested lists for scalar reads; indexing them is much cheaper than
+        # indexing small numpy arrays one element at a time
+        self._directions = tuple(
+            (tensor.tolist(), _best_over_moves(tensor).tolist(), atk_side, def_side)
+            for tensor, atk_side, def_side in (
+                (self.user_to_opponent, user, opponent),
+                (self.opponent_to_user, opponent, user),
+            )
+        )
+
+    @classmethod
+    def from_battle(cls, battle) -> "MatchupMatrix":
+        matrix = cls.__new__(cls)
+        matrix._init_sides(_side_data(battle.user), _side_data(battle.opponent))
+        return matrix
+
+    def _locate(self, attacker, defender):
+        """(damage, best damage, attacker side, defender side, i, k) or None"""
+        a, d = id(attacker), id(defender)
+        for damage, best, atk_side, def_side in self._directions:
+            i = atk_side.index.get(a)
+            k = def_side.index.get(d)
+            if i is not None and k is not None:
+                return damage, best, atk_side, def_side, i, k
+        return None
+
+    def damage(self, attacker, defender, move_name: str) -> float:
+        """Estimated damage of one move as a fraction of the defender's max HP."""
+        found = self._locate(attacker, defender)
+        if found is not None:
+            damage, _, atk_side, _, i, k = found
+            j = atk_side.move_index[i].get(move_name)
+            if j is not None:
+                return damage[i][k][j]
+        return estimate_damage_ratio(attacker, defender, move_name)
+
+    def best_damage(self, attacker, defender, assume_stab: bool = False) -> float:
+        """
+        Best damage over the attacker's known moves. With `assume_stab`, an
+        attacker with no revealed moves is assumed to have an 85 BP STAB move.
+        """
+        found = self._locate(attacker, defender)
+        if found is None:
+            pair = MatchupMatrix([attacker], [defender])
+            return pair.best_damage(attacker, defender, assume_stab)
+
+        _, best, atk_side, def_side, i, k = found
+        if atk_side.moves[i]:
+            return best[i][k]
+        return _assumed_stab_damage(atk_side, i, def_side, k) if assume_stab else 0.0
+
+    def ko_turns(self, attacker, defender, assume_stab: bool = False) -> float:
+        """Hits needed for the attacker's best move to KO; `inf` if it can't."""
+        best = self.best_damage(attacker, defender, assume_stab)
+        if best <= 0:
+            return math.inf
+        hp_ratio = getattr(defender, "hp", 0) / max(getattr(defender, "max_hp", 1), 1)
+        return max(math.ceil(hp_ratio / best - 1e-9), 1)
+
+    def speed(self, pokemon) -> float:
+        """Boosted speed including paralysis and the side's tailwind."""
+        for side in (self.user, self.opponent):
+            i = side.index.get(id(pokemon))
+            if i is not None:
+                return float(side.speed[i])
+        raise KeyError(getattr(pokemon, "name", pokemon))
+
+    def outspeeds(self, pokemon, other) -> bool:
+        return self.speed(pokemon) > self.speed(other)
+
+
+def _side_signature(battler) -> tuple:
+    # the state heuristics can see change between passes of one decision;
+    # species, stats and types are fixed for a given Pokemon object
+    signature = [_has_tailwind(battler)]
+    for p in _side(battler):
+        signature.append(
+            (
+                id(p),
+                getattr(p, "hp", None),
+                tuple((getattr(p, "boosts", None) or {}).values()),
+                getattr(p, "terastallized", None),
+                getattr(p, "status", None),
+                len(getattr(p, "moves", None) or ()),
+            )
+        )
+    return tuple(signature)
+
+
+def _side_data(battler) -> _SideData:
+    cache = _decision_cache.get()
+    if cache is None:
+        return _SideData(_side(battler), _has_tailwind(battler))
+
+    signature = _side_signature(battler)
+    entry = cache.matchups.get(("side", id(battler)))
+    if entry is not None and entry[1] == signature:
+        return entry[2]
+    side = _SideData(_side(battler), _has_tailwind(battler))
+    # hold the battler so its id cannot be reused while the cache lives
+    cache.matchups[("side", id(battler))] = (battler, signature, side)
+    return side
+
+
+def matchup_matrix(battle) -> MatchupMatrix:
+    """
+    Matrix for the battle's current board. Inside a `damage_cache()` scope it
+    is built once per board state and reused by every heuristic pass.
+    """
+    cache = _decision_cache.get()
+    if cache is None:
+        return MatchupMatrix.from_battle(battle)
+
+    user, opponent = _side_data(battle.user), _side_data(battle.opponent)
+    key = ("board", id(user), id(opponent))
+    entry = cache.matchups.get(key)
+    if entry is None:
+        matrix = MatchupMatrix.__new__(MatchupMatrix)
+        matrix._init_sides(user, opponent)
+        entry = cache.matchups[key] = (user, opponent, matrix)
+    return entry[2]
@@ -24,107 +24,16 @@ from typing import Optional
 
 import constants
 from fp.battle import Battle
-from fp.helpers import POKEMON_TYPE_INDICES, normalize_name, type_effectiveness_modifier
-from data import all_move_json
+from fp.helpers import POKEMON_TYPE_INDICES, normalize_name
+from fp.search.damage import _get_effective_types, defensive_profile, estimate_damage_ratio
 
 logger = logging.getLogger(__name__)
 
-_VALID_TYPES = set(POKEMON_TYPE_INDICES)
-
 # Trapping abilities and volatile statuses
 _TRAPPING_VOLATILES = {"partiallytrapped", "trapped", "cantflee"}
 _TRAPPING_ABILITIES = {"shadowtag", "arenatrap", "magnetpull"}
 
 
-def _normalize_type_name(value: object) -> str | None:
-    if not isinstance(value, str):
-        return None
-    normalized = normalize_name(value)
-    if normalized in _VALID_TYPES:
-        return normalized
-    return None
-
-
-def _sanitize_type_list(values) -> list[str]:
-    if not values:
-        return []
-    cleaned: list[str] = []
-    for value in values:
-        normalized = _normalize_type_name(value)
-        if normalized:
-            cleaned.append(normalized)
-    return cleaned
-
-
-def _get_effective_types(pokemon) -> list[str]:
-    base_types = _sanitize_type_list(getattr(pokemon, "types", []) or [])
-    tera_type = _normalize_type_name(getattr(pokemon, "tera_type", None))
-    if getattr(pokemon, "terastallized", False) and tera_type:
-        return [tera_type]
-    return base_types
-
-
-def _estimate_damage_ratio(attacker, defender, move_name: str) -> float:
-    """Estimate damage as fraction of defender's max HP (simplified)."""
-    if attacker is None or defender is None:
-        return 0.0
-
-    move_data = all_move_json.get(move_name, {})
-    base_power = move_data.get(constants.BASE_POWER, 0)
-    category = move_data.get(constants.CATEGORY, "Status")
-    move_type = _normalize_type_name(move_data.get(constants.TYPE, "normal")) or "normal"
-
-    if category not in (constants.PHYSICAL, constants.SPECIAL):
-        return 0.0
-
-    defender_max_hp = max(float(getattr(defender, "max_hp", 1) or 1), 1.0)
-    defender_types = _get_effective_types(defender)
-    effectiveness = type_effectiveness_modifier(move_type, defender_types)
-    if effectiveness == 0:
-        return 0.0
-
-    # Handle fixed-damage moves
-    fixed_damage = move_data.get("damage")
-    if isinstance(fixed_damage, (int, float)) and fixed_damage > 0:
-        return min(float(fixed_damage) / defender_max_hp, 1.0)
-    if isinstance(fixed_damage, str) and normalize_name(fixed_damage) == "level":
-        level = float(getattr(attacker, "level", 100) or 100)
-        return min(level / defender_max_hp, 1.0)
-
-    if base_power == 0:
-        return 0.0
-
-    if category == constants.PHYSICAL:
-        atk = attacker.stats.get(constants.ATTACK, 100) if isinstance(attacker.stats, dict) else 100
-        def_ = defender.stats.get(constants.DEFENSE, 100) if isinstance(defender.stats, dict) else 100
-        atk_boost = (getattr(attacker, "boosts", {}) or {}).get(constants.ATTACK, 0)
-        def_boost = (getattr(defender, "boosts", {}) or {}).get(constants.DEFENSE, 0)
-    else:
-        atk = attacker.stats.get(constants.SPECIAL_ATTACK, 100) if isinstance(attacker.stats, dict) else 100
-        def_ = defender.stats.get(constants.SPECIAL_DEFENSE, 100) if isinstance(defender.stats, dict) else 100
-        atk_boost = (getattr(attacker, "boosts", {}) or {}).get(constants.SPECIAL_ATTACK, 0)
-        def_boost = (getattr(defender, "boosts", {}) or {}).get(constants.SPECIAL_DEFENSE, 0)
-
-    if atk_boost > 0:
-        atk *= (2 + atk_boost) / 2
-    elif atk_boost < 0:
-        atk *= 2 / (2 - atk_boost)
-    if def_boost > 0:
-        def_ *= (2 + def_boost) / 2
-    elif def_boost < 0:
-        def_ *= 2 / (2 - def_boost)
-
-    attacker_types = _sanitize_type_list(getattr(attacker, "types", []) or [])
-    attacker_tera = _normalize_type_name(getattr(attacker, "tera_type", None))
-    if getattr(attacker, "terastallized", False) and attacker_tera:
-        if attacker_tera not in attacker_types:
-            attacker_types.append(attacker_tera)
-    stab = 1.5 if move_type in attacker_types else 1.0
-
-    damage = (((2 * 100 / 5 + 2) * base_power * atk / def_) / 50 + 2) * effectiveness * stab
-    return damage / defender_max_hp
-
-
 def _get_usable_moves(pokemon) -> list[str]:
     if pokemon is None:
         return []
@@ -143,7 +52,7 @@ def _best_damage_to(attacker, defender) -> float:
     """Best damage attacker can deal to defender as fraction of defender's max HP."""
     best = 0.0
     for move_name in _get_usable_moves(attacker):
-        dmg = _estimate_damage_ratio(attacker, defender, move_name)
+        dmg = estimate_damage_ratio(attacker, defender, move_name)
         if dmg > best:
             best = dmg
     return best
@@ -201,7 +110,7 @@ def predict_opponent_action(battle: Battle) -> OpponentAction:
         opp_best_move = None
         opp_best_dmg = 0.0
         for move_name in _get_usable_moves(opp):
-            dmg = _estimate_damage_ratio(opp, our, move_name)
+            dmg = estimate_damage_ratio(opp, our, move_name)
             if dmg > opp_best_dmg:
                 opp_best_dmg = dmg
                 opp_best_move = move_name
@@ -232,7 +141,7 @@ def predict_opponent_action(battle: Battle) -> OpponentAction:
             opp_best_move = None
             opp_best_dmg = 0.0
             for move_name in _get_usable_moves(opp):
-                dmg = _estimate_damage_ratio(opp, our, move_name)
+                dmg = estimate_damage_ratio(opp, our, move_name)
                 if dmg > opp_best_dmg:
                     opp_best_dmg = dmg
                     opp_best_move = move_name
@@ -249,7 +158,7 @@ def predict_opponent_action(battle: Battle) -> OpponentAction:
         opp_best_move = None
         opp_best_dmg = 0.0
         for move_name in _get_usable_moves(opp):
-            dmg = _estimate_damage_ratio(opp, our, move_name)
+            dmg = estimate_damage_ratio(opp, our, move_name)
             if dmg > opp_best_dmg:
                 opp_best_dmg = dmg
                 opp_best_move = move_name
@@ -264,7 +173,7 @@ def predict_opponent_action(battle: Battle) -> OpponentAction:
     opp_best_dmg = 0.0
     opp_best_move = None
     for move_name in _get_usable_moves(opp):
-        dmg = _estimate_damage_ratio(opp, our, move_name)
+        dmg = estimate_damage_ratio(opp, our, move_name)
         if dmg > opp_best_dmg:
             opp_best_dmg = dmg
             opp_best_move = move_name
@@ -288,7 +197,7 @@ def predict_opponent_action(battle: Battle) -> OpponentAction:
     opp_moves = _get_usable_moves(opp)
     if opp_moves:
         all_resisted = all(
-            _estimate_damage_ratio(opp, our, m) < 0.08 for m in opp_moves
+            estimate_damage_ratio(opp, our, m) < 0.08 for m in opp_moves
         )
         if all_resisted:
             switch_score += 0.30
@@ -365,11 +274,11 @@ def _predict_switch_target(battle: Battle) -> Optional[str]:
             continue
 
         score = 0.0
-        p_types = _get_effective_types(p)
+        p_profile = defensive_profile(p)
 
         # Type matchup vs our STAB types
         for our_type in our_types:
-            eff = type_effectiveness_modifier(our_type, p_types)
+            eff = p_profile[POKEMON_TYPE_INDICES[our_type]]
             if eff < 1.0:
                 score += 0.5  # resists our STAB
             elif eff > 1.0:
@@ -386,7 +295,7 @@ def _predict_switch_target(battle: Battle) -> Optional[str]:
         # Can threaten us with revealed moves
         p_moves = _get_usable_moves(p)
         if p_moves:
-            best_dmg = max(_estimate_damage_ratio(p, our, m) for m in p_moves)
+            best_dmg = max(estimate_damage_ratio(p, our, m) for m in p_moves)
             if best_dmg > 0.30:
                 score += 0.3
 
@@ -419,8 +328,7 @@ def _estimate_hazard_cost(pokemon, side_conditions) -> float:
 
     # Stealth Rock
     if sc.get(constants.STEALTH_ROCK, 0) > 0:
-        p_types = _get_effective_types(pokemon)
-        sr_eff = type_effectiveness_modifier("rock", p_types)
+        sr_eff = defensive_profile(pokemon)[POKEMON_TYPE_INDICES["rock"]]
         cost += 0.125 * sr_eff
 
     # Spikes
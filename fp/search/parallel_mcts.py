@@ -0,0 +1,386 @@
+"""
+Persistent worker pool for running MCTS over sampled battles concurrently.
+
+`monte_carlo_tree_search` is CPU-bound Rust code, so sampled worlds are
+searched in separate processes. The pool is created once per bot process,
+pre-warmed (poke-engine imported in every worker) and shared by every
+concurrent battle. States are shipped to workers as poke-engine state
+strings, and results come back as plain tuples so nothing engine-specific
+has to be pickled.
+
+For anytime search a short probe (`anytime_probe_schedule`) runs before the
+real search; `PolicyConvergence` decides after each probe slice whether the
+aggregated policy is settled enough to skip the full-budget search.
+"""
+
+import atexit
+import logging
+import math
+import os
+import threading
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+
+from fp.search.cancellation import CancellationToken, record_cpu_saved
+
+logger = logging.getLogger(__name__)
+
+MCTS_POOL_ENABLED = str(os.getenv("MCTS_POOL_ENABLED", "1")).lower() not in {
+    "0",
+    "false",
+    "no",
+    "off",
+}
+# 0 = size the pool from FoulPlayConfig.parallelism
+MCTS_POOL_WORKERS = max(0, int(os.getenv("MCTS_POOL_WORKERS", "0")))
+# Extra wall-clock allowance on top of the search budget for state parsing/IPC
+MCTS_POOL_TIMEOUT_BUFFER_SEC = max(
+    0.5, float(os.getenv("MCTS_POOL_TIMEOUT_BUFFER_SEC", "5.0"))
+)
+
+# How often a search waiting on the pool checks its cancellation token
+MCTS_CANCEL_POLL_SEC = 0.01
+
+# Anytime search: a probe of MCTS_ANYTIME_PROBE_SHARE of the per-sample budget
+# runs first, in two slices. If its policy has converged the full-budget search
+# is skipped; otherwise the probe is discarded (poke-engine cannot resume a
+# search tree) and one full-budget search runs.
+MCTS_ANYTIME_ENABLED = str(os.getenv("MCTS_ANYTIME_ENABLED", "1")).lower() not in {
+    "0",
+    "false",
+    "no",
+    "off",
+}
+MCTS_ANYTIME_PROBE_SHARE = max(
+    0.0, min(0.5, float(os.getenv("MCTS_ANYTIME_PROBE_SHARE", "0.25")))
+)
+MCTS_ANYTIME_PROBE_SLICES = 2
+MCTS_ANYTIME_MIN_SLICE_MS = max(50, int(os.getenv("MCTS_ANYTIME_MIN_SLICE_MS", "250")))
+MCTS_ANYTIME_MIN_SHARE = max(
+    0.0, min(1.0, float(os.getenv("MCTS_ANYTIME_MIN_SHARE", "0.55")))
+)
+MCTS_ANYTIME_MIN_MARGIN = max(
+    0.0, min(1.0, float(os.getenv("MCTS_ANYTIME_MIN_MARGIN", "0.25")))
+)
+# Largest change in the top move's share between slices that still counts as settled
+MCTS_ANYTIME_MAX_SHIFT = max(
+    0.0, min(1.0, float(os.getenv("MCTS_ANYTIME_MAX_SHIFT", "0.05")))
+)
+# Standard errors the margin must hold across sampled worlds (one-sided 95%)
+MCTS_ANYTIME_Z = max(0.0, float(os.getenv("MCTS_ANYTIME_Z", "1.64")))
+
+
+def _warm_worker() -> int:
+    # Importing poke-engine is the expensive part of a cold worker
+    import poke_engine  # noqa: F401
+
+    return os.getpid()
+
+
+def search_state_string(state_string: str, search_time_ms: int):
+    """
+    Worker entrypoint: rebuild the engine state and run MCTS on it.
+
+    Returns (total_visits, [(move_choice, visits), ...]) for side one.
+    """
+    from poke_engine import State, monte_carlo_tree_search
+
+    state = State.from_string(state_string)
+    result = monte_carlo_tree_search(state, int(search_time_ms))
+    total_visits = int(getattr(result, "total_visits", 0) or 0)
+    options = []
+    for option in getattr(result, "side_one", []) or []:
+        move_choice = str(getattr(option, "move_choice", "") or "")
+        if not move_choice:
+            continue
+        options.append((move_choice, float(getattr(option, "visits", 0) or 0.0)))
+    return total_visits, options
+
+
+def _default_pool_size() -> int:
+    if not MCTS_POOL_ENABLED:
+        return 1
+    if MCTS_POOL_WORKERS > 0:
+        return MCTS_POOL_WORKERS
+    try:
+        from config import FoulPlayConfig
+
+        parallelism = int(getattr(FoulPlayConfig, "parallelism", 1) or 1)
+    except Exception:
+        parallelism = 1
+    return max(1, min(parallelism, os.cpu_count() or 1))
+
+
+class MCTSWorkerPool:
+    """
+    Long-lived executor for MCTS samples.
+
+    Falls back to a thread pool when processes cannot be spawned (restricted
+    sandboxes, frozen executables); search still runs, just without the
+    multi-core speedup.
+    """
+
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        search_fn=None,
+        use_processes: bool = MCTS_POOL_ENABLED,
+    ):
+        self.max_workers = max(1, int(max_workers or _default_pool_size()))
+        self.search_fn = search_fn or search_state_string
+        self.use_processes = bool(use_processes)
+        self._executor = None
+        self._uses_processes = False
+        self._lock = threading.Lock()
+
+    @property
+    def workers(self) -> int:
+        return self.max_workers
+
+    @property
+    def uses_processes(self) -> bool:
+        return self._uses_processes
+
+    def _ensure_executor(self):
+        if self._executor is not None:
+            return self._executor
+        with self._lock:
+            if self._executor is not None:
+                return self._executor
+            executor = None
+            if self.use_processes:
+                try:
+                    executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                    warm = [
+                        executor.submit(_warm_worker) for _ in range(self.max_workers)
+                    ]
+                    for f in warm:
+                        f.result(timeout=60)
+                    self._uses_processes = True
+                    logger.info(
+                        "MCTS worker pool ready: %s processes", self.max_workers
+                    )
+                except Exception as e:
+                    logger.warning(
+                        "MCTS process pool unavailable (%s); using %s threads",
+                        e,
+                        self.max_workers,
+                    )
+                    if executor is not None:
+                        executor.shutdown(wait=False, cancel_futures=True)
+                    executor = None
+            if executor is None:
+                executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="mcts"
+                )
+                self._uses_processes = False
+            self._executor = executor
+            return executor
+
+    def warm(self):
+        self._ensure_executor()
+
+    def submit(self, state_string: str, search_time_ms: int) -> Future:
+        executor = self._ensure_executor()
+        return executor.submit(self.search_fn, state_string, int(search_time_ms))
+
+    def reset(self):
+        """Drop the executor (e.g. after a worker crash); the next submit recreates it."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            try:
+                executor.shutdown(wait=False, cancel_futures=True)
+            except Exception:
+                pass
+
+    def shutdown(self):
+        self.reset()
+
+
+_pool: MCTSWorkerPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_mcts_pool() -> MCTSWorkerPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = MCTSWorkerPool()
+    return _pool
+
+
+def shutdown_mcts_pool():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
+
+
+atexit.register(shutdown_mcts_pool)
+
+
+def mcts_sample_waves(num_samples: int, workers: int | None = None) -> int:
+    """Number of sequential rounds needed to search num_samples on the pool."""
+    if workers is None:
+        workers = get_mcts_pool().workers
+    return max(1, math.ceil(max(1, int(num_samples)) / max(1, int(workers))))
+
+
+def run_mcts_samples(
+    state_strings: list[str],
+    search_time_ms: int,
+    *,
+    pool: MCTSWorkerPool | None = None,
+    timeout_sec: float | None = None,
+    cancel_token: CancellationToken | None = None,
+):
+    """
+    Search every state on the pool and yield (index, result, error) as each
+    sample finishes. Samples still outstanding at the deadline are cancelled
+    and yielded with a TimeoutError.
+
+    Once `cancel_token` is cancelled, samples not yet started are dropped
+    and the generator ends without yielding the outstanding ones; samples
+    already running finish in their worker.
+    """
+    if not state_strings:
+        return
+    pool = pool or get_mcts_pool()
+    if timeout_sec is None:
+        timeout_sec = (
+            mcts_sample_waves(len(state_strings), pool.workers)
+            * (int(search_time_ms) / 1000.0)
+            + MCTS_POOL_TIMEOUT_BUFFER_SEC
+        )
+    deadline = time.monotonic() + float(timeout_sec)
+
+    pending: dict[Future, int] = {}
+    for idx, state_string in enumerate(state_strings):
+        try:
+            pending[pool.submit(state_string, search_time_ms)] = idx
+        except Exception as e:
+            yield idx, None, e
+
+    while pending:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        if cancel_token is not None:
+            if cancel_token.cancelled:
+                dropped = sum(1 for future in pending if future.cancel())
+                record_cpu_saved(dropped * int(search_time_ms) / 1000.0)
+                return
+            remaining = min(remaining, MCTS_CANCEL_POLL_SEC)
+        done, _ = wait(list(pending), timeout=remaining, return_when=FIRST_COMPLETED)
+        for future in done:
+            idx = pending.pop(future)
+            try:
+                yield idx, future.result(), None
+            except Exception as e:
+                if e.__class__.__name__ == "BrokenProcessPool":
+                    pool.reset()
+                yield idx, None, e
+
+    for future, idx in pending.items():
+        future.cancel()
+        yield idx, None, TimeoutError(f"MCTS sample exceeded {timeout_sec:.1f}s")
+
+
+def anytime_probe_schedule(
+    search_time_ms: int, min_slice_ms: int = MCTS_ANYTIME_MIN_SLICE_MS
+) -> list[int]:
+    """
+    Slices of the probe searched before a `search_time_ms` search, adding up
+    to MCTS_ANYTIME_PROBE_SHARE of it. Empty when the probe would need slices
+    shorter than `min_slice_ms`; such budgets are searched without a probe.
+    """
+    probe_ms = int(int(search_time_ms) * MCTS_ANYTIME_PROBE_SHARE)
+    slice_ms = probe_ms // MCTS_ANYTIME_PROBE_SLICES
+    if slice_ms < min_slice_ms:
+        return []
+    return [slice_ms] * MCTS_ANYTIME_PROBE_SLICES
+
+
+def anytime_search_ms(budget_ms: int, anytime: bool = MCTS_ANYTIME_ENABLED) -> int:
+    """
+    Per-sample search time whose probe and, should the probe not converge,
+    full search together fit in `budget_ms`.
+    """
+    if not anytime:
+        return int(budget_ms)
+    return int(budget_ms / (1.0 + MCTS_ANYTIME_PROBE_SHARE))
+
+
+class PolicyConvergence:
+    """
+    Early-stopping rule for anytime search.
+
+    After each probe slice, `update` takes every sampled world's visit
+    policy and its weight. The search has converged when the aggregated top
+    move's share and its margin over the runner-up clear their thresholds,
+    the margin still clears `min_margin` after subtracting `z` standard
+    errors of the per-world margin, and the top move and its share held
+    since the previous slice.
+    """
+
+    def __init__(
+        self,
+        min_share: float = MCTS_ANYTIME_MIN_SHARE,
+        min_margin: float = MCTS_ANYTIME_MIN_MARGIN,
+        max_shift: float = MCTS_ANYTIME_MAX_SHIFT,
+        z: float = MCTS_ANYTIME_Z,
+    ):
+        self.min_share = min_share
+        self.min_margin = min_margin
+        self.max_shift = max_shift
+        self.z = z
+        self.last: dict = {}
+
+    def update(self, sample_policies: list[tuple[dict[str, float], float]]) -> bool:
+        samples = [(p, float(w)) for p, w in sample_policies if p and w > 0]
+        total_weight = sum(w for _, w in samples)
+        if total_weight <= 0:
+            self.last = {}
+            return False
+
+        aggregated: dict[str, float] = {}
+        for policy, weight in samples:
+            for move, share in policy.items():
+                aggregated[move] = aggregated.get(move, 0.0) + share * weight
+        ranked = sorted(aggregated.items(), key=lambda kv: kv[1], reverse=True)
+        top, top_share = ranked[0][0], ranked[0][1] / total_weight
+        runner_up = ranked[1][0] if len(ranked) > 1 else None
+        margin = top_share - (ranked[1][1] / total_weight if runner_up else 0.0)
+
+        # weighted standard error of the per-world margin
+        weights = [w / total_weight for _, w in samples]
+        margins = [
+            p.get(top, 0.0) - (p.get(runner_up, 0.0) if runner_up else 0.0)
+            for p, _ in samples
+        ]
+        variance = sum(w * (m - margin) ** 2 for w, m in zip(weights, margins))
+        effective_n = 1.0 / sum(w * w for w in weights)
+        stderr = math.sqrt(variance / effective_n) if effective_n > 1 else 0.0
+
+        previous = self.last
+        self.last = {
+            "top": top,
+            "share": round(top_share, 4),
+            "margin": round(margin, 4),
+            "stderr": round(stderr, 4),
+        }
+        return (
+            previous.get("top") == top
+            and abs(top_share - previous.get("share", -1.0)) <= self.max_shift
+            and top_share >= self.min_share
+            and margin - self.z * stderr >= self.min_margin
+        )
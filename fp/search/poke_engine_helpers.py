@@ -1,4 +1,6 @@
 import logging
+import threading
+from collections import OrderedDict
 
 import constants
 from data import pokedex
@@ -128,8 +130,15 @@ def _resolve_side_active_and_reserve(battler: Battler):
 
 
 def battler_to_poke_engine_side(
-    battler: Battler, force_switch=False, stayed_in_on_switchout_move=False
+    battler: Battler,
+    force_switch=False,
+    stayed_in_on_switchout_move=False,
+    reserve_pkmn=None,
 ):
+    """
+    `reserve_pkmn` are the already converted reserve Pokemon, for callers
+    building several sides that differ only in the active Pokemon.
+    """
     active, reserve_for_side, synthesized_active = _resolve_side_active_and_reserve(battler)
     if synthesized_active:
         logger.warning(
@@ -224,7 +233,11 @@ def battler_to_poke_engine_side(
         baton_passing=battler.baton_passing,
         shed_tailing=battler.shed_tailing,
         pokemon=[active_pkmn]
-        + [pokemon_to_poke_engine_pkmn(p) for p in reserve_for_side],
+        + (
+            list(reserve_pkmn)
+            if reserve_pkmn is not None
+            else [pokemon_to_poke_engine_pkmn(p) for p in reserve_for_side]
+        ),
         side_conditions=PokeEngineSideConditions(
             aurora_veil=battler.side_conditions[constants.AURORA_VEIL],
             crafty_shield=battler.side_conditions["craftyshield"],
@@ -348,10 +361,14 @@ def replace_return_last_used_move(battler: Battler):
         )
 
 
-def battle_to_poke_engine_state(battle: Battle, swap=False):
-    # Boolean that represents if we have used a switch-out move first (i.e. fast uturn)
-    # this is toggled to True if we did, and signifies to the engine that the opponent has
-    # selected a move and that should be accounted for in the search
+def _prepare_last_used_moves(battle: Battle):
+    """
+    Rewrite last used moves the engine knows under another name.
+
+    Returns True if the user used a switch-out move first (i.e. fast uturn).
+    This signifies to the engine that the opponent has selected a move and
+    that should be accounted for in the search
+    """
     opponent_switchout_move_stayed_in = False
     bot_lum = battle.user.last_used_move
     opp_lum = battle.opponent.last_used_move
@@ -368,17 +385,11 @@ def battle_to_poke_engine_state(battle: Battle, swap=False):
     if battle.user.last_used_move.move == "return":
         replace_return_last_used_move(battle.user)
 
-    side_one = battler_to_poke_engine_side(
-        battle.user, force_switch=battle.force_switch
-    )
-    side_two = battler_to_poke_engine_side(
-        battle.opponent, stayed_in_on_switchout_move=opponent_switchout_move_stayed_in
-    )
+    return opponent_switchout_move_stayed_in
 
-    if swap:
-        side_one, side_two = side_two, side_one
 
-    state = PokeEngineState(
+def _state_from_sides(battle: Battle, side_one, side_two):
+    return PokeEngineState(
         side_one=side_one,
         side_two=side_two,
         weather=get_weather_string(battle.weather),
@@ -390,7 +401,21 @@ def battle_to_poke_engine_state(battle: Battle, swap=False):
         team_preview=battle.team_preview,
     )
 
-    return state
+
+def battle_to_poke_engine_state(battle: Battle, swap=False):
+    opponent_switchout_move_stayed_in = _prepare_last_used_moves(battle)
+
+    side_one = battler_to_poke_engine_side(
+        battle.user, force_switch=battle.force_switch
+    )
+    side_two = battler_to_poke_engine_side(
+        battle.opponent, stayed_in_on_switchout_move=opponent_switchout_move_stayed_in
+    )
+
+    if swap:
+        side_one, side_two = side_two, side_one
+
+    return _state_from_sides(battle, side_one, side_two)
 
 
 def poke_engine_get_damage_rolls(
@@ -427,3 +452,95 @@ def poke_engine_get_damage_rolls(
     )
 
     return s1_rolls, s2_rolls
+
+
+# Damage rolls per (base state, moves, candidate set); see
+# poke_engine_get_damage_rolls_batch
+DAMAGE_ROLL_CACHE_MAX_ENTRIES = 4096
+_damage_roll_cache: OrderedDict[tuple, tuple] = OrderedDict()
+_damage_roll_cache_lock = threading.Lock()
+
+
+def poke_engine_get_damage_rolls_batch(
+    battle: Battle,
+    candidates,
+    side_one_move,
+    side_two_move,
+    side_one_went_first,
+):
+    """
+    Damage rolls of both sides for each candidate set of the opponent's
+    active Pokemon.
+
+    `candidates` are (ability, item, nature, evs) tuples. The user side and
+    the opponent's reserves are converted once; only the opponent's active
+    Pokemon is rebuilt per candidate. Results are memoized on the state
+    string of the battle as given (species, stats, boosts, field, ...) plus
+    the moves and the candidate, so duplicate candidates and repeated checks
+    of an unchanged position skip the engine.
+
+    `battle` is modified in place; pass a copy.
+    """
+    if side_one_move.startswith("switch"):
+        side_one_move = "switch"
+    if side_two_move.startswith("switch"):
+        side_two_move = "switch"
+
+    opponent_switchout_move_stayed_in = _prepare_last_used_moves(battle)
+    side_one = battler_to_poke_engine_side(
+        battle.user, force_switch=battle.force_switch
+    )
+    opponent = battle.opponent
+    reserve_pkmn = [
+        pokemon_to_poke_engine_pkmn(p)
+        for p in _resolve_side_active_and_reserve(opponent)[1]
+    ]
+
+    def build_state():
+        side_two = battler_to_poke_engine_side(
+            opponent,
+            stayed_in_on_switchout_move=opponent_switchout_move_stayed_in,
+            reserve_pkmn=reserve_pkmn,
+        )
+        return _state_from_sides(battle, side_one, side_two)
+
+    base_key = (
+        build_state().to_string(),
+        side_one_move,
+        side_two_move,
+        side_one_went_first,
+    )
+
+    results = []
+    hits = 0
+    for ability, item, nature, evs in candidates:
+        key = (base_key, ability, item, nature, tuple(evs))
+        with _damage_roll_cache_lock:
+            rolls = _damage_roll_cache.get(key)
+            if rolls is not None:
+                _damage_roll_cache.move_to_end(key)
+        if rolls is None:
+            active = opponent.active
+            active.ability = ability
+            active.item = item
+            active.set_spread(nature, list(evs))
+            rolls = calculate_damage(
+                build_state(),
+                side_one_move,
+                side_two_move,
+                side_one_went_first,
+            )
+            with _damage_roll_cache_lock:
+                _damage_roll_cache[key] = rolls
+                while len(_damage_roll_cache) > DAMAGE_ROLL_CACHE_MAX_ENTRIES:
+                    _damage_roll_cache.popitem(last=False)
+        else:
+            hits += 1
+        results.append(rolls)
+
+    logger.debug(
+        "Damage rolls for {} candidates ({} cached), m1: {}, m2: {}".format(
+            len(results), hits, side_one_move, side_two_move
+        )
+    )
+    return results
@@ -0,0 +1,175 @@
+"""
+Decision Stage Profiler
+
+Times the stages of `find_best_move` (ability detection, KO line, endgame,
+forced line, sampling, MCTS, the bias passes of move selection, ...) with
+a monotonic clock. Stages nest: a stage opened inside another is recorded
+as "outer/inner".
+
+A decision is profiled when it runs under `profile_decision`; with
+DECISION_PROFILE_SAMPLE_RATE below 1 only that fraction of decisions is.
+Outside a profiled decision `stage` does nothing. Each profiled decision's
+stage times go into its trace under "stages_ms" and into rolling per-format
+windows (`stage_latency_report`) for p50/p95/p99. scripts/decision_latency_report.py
+builds the same report from decision trace files.
+"""
+
+import os
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from functools import wraps
+from typing import Optional
+
+# Fraction of decisions profiled; 0 turns the profiler off
+DECISION_PROFILE_SAMPLE_RATE = max(
+    0.0, min(1.0, float(os.getenv("DECISION_PROFILE_SAMPLE_RATE", "1.0")))
+)
+# Decisions kept per (format, stage) for the rolling percentiles
+STAGE_LATENCY_WINDOW = 500
+
+TOTAL_STAGE = "total"
+
+_NULL_STAGE = nullcontext()
+
+
+class StageProfile:
+    """Stage times of one decision, in milliseconds."""
+
+    __slots__ = ("stages_ms", "_stack", "_start")
+
+    def __init__(self):
+        self.stages_ms: dict[str, float] = {}
+        self._stack: list[str] = []
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        self._stack.append(name)
+        key = "/".join(self._stack)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000.0
+            self._stack.pop()
+            self.stages_ms[key] = self.stages_ms.get(key, 0.0) + elapsed_ms
+
+    def finish(self) -> dict[str, float]:
+        stages = {k: round(v, 3) for k, v in self.stages_ms.items()}
+        stages[TOTAL_STAGE] = round((time.perf_counter() - self._start) * 1000.0, 3)
+        return stages
+
+
+_current_profile: ContextVar[Optional[StageProfile]] = ContextVar(
+    "decision_profile", default=None
+)
+
+
+def stage(name: str):
+    """Time the block as stage `name` of the running decision, if profiled."""
+    profile = _current_profile.get()
+    if profile is None:
+        return _NULL_STAGE
+    return profile.stage(name)
+
+
+def _percentile(ordered: list, q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class StageLatencies:
+    """
+    Rolling stage times per format, summarized as percentiles. `window`
+    is the number of decisions kept per stage; None keeps every one.
+    """
+
+    def __init__(self, window: int | None = STAGE_LATENCY_WINDOW):
+        self.window = window
+        self._samples: dict[str, dict[str, deque]] = defaultdict(dict)
+        self._lock = threading.Lock()
+
+    def record(self, pokemon_format: str | None, stages_ms: dict[str, float]):
+        pokemon_format = pokemon_format or "unknown"
+        with self._lock:
+            by_stage = self._samples[pokemon_format]
+            for name, ms in stages_ms.items():
+                samples = by_stage.get(name)
+                if samples is None:
+                    samples = by_stage[name] = deque(maxlen=self.window)
+                samples.append(float(ms))
+
+    def report(self) -> dict[str, dict[str, dict]]:
+        """
+        {format: {stage: {count, mean, p50, p95, p99, max}}}, times in ms.
+        Stages are ordered by mean time, slowest first.
+        """
+        with self._lock:
+            snapshot = {
+                fmt: {name: sorted(samples) for name, samples in by_stage.items()}
+                for fmt, by_stage in self._samples.items()
+            }
+        report = {}
+        for fmt, by_stage in snapshot.items():
+            rows = {}
+            for name, ordered in by_stage.items():
+                rows[name] = {
+                    "count": len(ordered),
+                    "mean": round(sum(ordered) / len(ordered), 3),
+                    "p50": round(_percentile(ordered, 0.50), 3),
+                    "p95": round(_percentile(ordered, 0.95), 3),
+                    "p99": round(_percentile(ordered, 0.99), 3),
+                    "max": round(ordered[-1], 3),
+                }
+            report[fmt] = dict(
+                sorted(rows.items(), key=lambda kv: kv[1]["mean"], reverse=True)
+            )
+        return report
+
+
+_latencies = StageLatencies()
+
+
+def stage_latency_report() -> dict[str, dict[str, dict]]:
+    """Rolling per-format stage percentiles of this process's decisions."""
+    return _latencies.report()
+
+
+def profile_decision(fn):
+    """
+    Decorator for `find_best_move`-shaped functions (first argument the
+    battle, returning (choice, trace)): profiles a sample of calls and adds
+    the stage times to the trace.
+    """
+
+    @wraps(fn)
+    def wrapper(battle, *args, **kwargs):
+        if (
+            _current_profile.get() is not None
+            or DECISION_PROFILE_SAMPLE_RATE <= 0
+            or random.random() >= DECISION_PROFILE_SAMPLE_RATE
+        ):
+            return fn(battle, *args, **kwargs)
+
+        profile = StageProfile()
+        token = _current_profile.set(profile)
+        try:
+            result = fn(battle, *args, **kwargs)
+        finally:
+            _current_profile.reset(token)
+        stages_ms = profile.finish()
+        _latencies.record(getattr(battle, "pokemon_format", None), stages_ms)
+        if (
+            isinstance(result, tuple)
+            and len(result) == 2
+            and isinstance(result[1], dict)
+        ):
+            result[1]["stages_ms"] = stages_ms
+        return result
+
+    return wrapper
@@ -1,10 +1,10 @@
 import logging
 import random
-from copy import deepcopy
 
 from constants import BattleType
 from fp.battle import Battle, Pokemon
 from data.pkmn_sets import RandomBattleTeamDatasets, TeamDatasets
+from fp.search.cancellation import check_cancelled
 from fp.search.helpers import populate_pkmn_from_set
 from fp.helpers import (
     POKEMON_TYPE_INDICES,
@@ -39,13 +39,16 @@ def get_all_remaining_sets_for_revealed_pkmn(battle: Battle) -> dict:
 
 
 def prepare_random_battles(battle: Battle, num_battles: int) -> list[(Battle, float)]:
-    revealed_pkmn_sets = get_all_remaining_sets_for_revealed_pkmn(deepcopy(battle))
+    revealed_pkmn_sets = get_all_remaining_sets_for_revealed_pkmn(
+        battle.fork_opponent()
+    )
 
     sampled_battles = []
     weights = []
     for index in range(num_battles):
+        check_cancelled()
         logger.info("Sampling battle {}".format(index))
-        battle_copy = deepcopy(battle)
+        battle_copy = battle.fork_opponent()
 
         active = battle_copy.opponent.active
         if revealed_pkmn_sets[active.name]:
@@ -0,0 +1,304 @@
+"""
+Decision Scheduler
+
+Every concurrent battle's `find_best_move` competes for the same cores (the
+MCTS pool is shared), so decisions run on a dedicated executor with a fixed
+number of slots instead of the event loop's default executor. Waiting
+decisions start earliest-deadline-first: the deadline is the battle's
+Showdown timer, so a battle about to run out of clock is searched before
+one with minutes left.
+
+A decision that starts while others are still queued gets a smaller search
+budget (`current_search_budget_scale`), so a deep queue drains instead of
+every battle waiting for full-length searches. Queue waits are recorded per
+decision and in aggregate (`DecisionScheduler.stats`).
+
+Each decision runs with its own cancellation token (fp.search.cancellation);
+cancelling the decision's future, as the caller's hard timeout does, stops
+the search at its next cancellation check. `ScheduledDecision.result` starts
+that hard timeout when the decision gets its slot, so time spent queued
+behind other battles has its own allowance instead of eating the search's.
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from fp.search.cancellation import (
+    CancellationToken,
+    SearchCancelled,
+    cancellation_scope,
+    cancellation_stats,
+    record_cancelled,
+)
+
+logger = logging.getLogger(__name__)
+
+# Cores decisions may use together; 0 = every core
+DECISION_CPU_BUDGET = max(0, int(os.getenv("DECISION_CPU_BUDGET", "0")))
+# Decisions searched at once; 0 = derive from the CPU budget and the MCTS pool size
+DECISION_SCHEDULER_SLOTS = max(0, int(os.getenv("DECISION_SCHEDULER_SLOTS", "0")))
+# Smallest fraction of the normal search budget a queued-up decision gets
+DECISION_MIN_BUDGET_SCALE = max(
+    0.05, min(1.0, float(os.getenv("DECISION_MIN_BUDGET_SCALE", "0.35")))
+)
+# Deadline used when the battle's timer is off (seconds)
+DECISION_DEFAULT_DEADLINE_SEC = 150.0
+# Queue waits kept for the percentiles in `stats`
+QUEUE_WAIT_WINDOW = 512
+
+_budget_scale: contextvars.ContextVar[float] = contextvars.ContextVar(
+    "search_budget_scale", default=1.0
+)
+
+
+def current_search_budget_scale() -> float:
+    """Fraction of the normal search budget the running decision should use."""
+    return _budget_scale.get()
+
+
+def search_budget_scale(slots: int, waiting: int, min_scale: float) -> float:
+    """Budget fraction for a decision starting with `waiting` others queued."""
+    slots = max(1, int(slots))
+    return max(min_scale, min(1.0, slots / (slots + max(0, int(waiting)))))
+
+
+def decision_slots(cpu_budget: int, cores_per_decision: int) -> int:
+    cpu_budget = cpu_budget or os.cpu_count() or 1
+    return max(1, int(cpu_budget) // max(1, int(cores_per_decision)))
+
+
+def decision_deadline(time_remaining, now: float | None = None) -> float:
+    """Monotonic time by which a battle with `time_remaining` seconds must move."""
+    if now is None:
+        now = time.monotonic()
+    if time_remaining is None:
+        return now + DECISION_DEFAULT_DEADLINE_SEC
+    return now + max(0.0, float(time_remaining))
+
+
+class DecisionQueueTimeout(asyncio.TimeoutError):
+    """The decision was still waiting for a search slot when its allowance ran out."""
+
+
+def _percentile(ordered: list, q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class ScheduledDecision:
+    """One submitted decision; `future` resolves to the function's result."""
+
+    __slots__ = (
+        "fn",
+        "args",
+        "context",
+        "future",
+        "granted",
+        "deadline",
+        "label",
+        "enqueued",
+        "started",
+        "queue_depth",
+        "budget_scale",
+        "token",
+    )
+
+    def __init__(self, fn, args, future, deadline, label):
+        self.fn = fn
+        self.args = args
+        self.context = contextvars.copy_context()
+        self.future = future
+        # resolved when the decision gets a search slot
+        self.granted = future.get_loop().create_future()
+        self.deadline = deadline
+        self.label = label
+        self.enqueued = time.monotonic()
+        self.started = None
+        self.queue_depth = 0
+        self.budget_scale = 1.0
+        self.token = CancellationToken()
+        future.add_done_callback(self._on_done)
+
+    def _on_done(self, future):
+        # the caller gave up (e.g. timed out); stop the search at its next check
+        if future.cancelled():
+            self.token.cancel("abandoned")
+
+    async def result(self, timeout: float | None, queue_timeout: float | None = None):
+        """
+        Wait for the decision's result. `queue_timeout` bounds the wait for a
+        slot (DecisionQueueTimeout) and `timeout` the run once it has one
+        (asyncio.TimeoutError); `None` or 0 waits indefinitely. Either
+        timeout, or cancelling the caller, abandons the decision.
+        """
+        try:
+            if queue_timeout:
+                await asyncio.wait_for(asyncio.shield(self.granted), queue_timeout)
+            else:
+                await asyncio.shield(self.granted)
+        except asyncio.TimeoutError:
+            self.future.cancel()
+            raise DecisionQueueTimeout() from None
+        except asyncio.CancelledError:
+            self.future.cancel()
+            raise
+        if timeout:
+            return await asyncio.wait_for(self.future, timeout)
+        return await self.future
+
+    @property
+    def queue_wait(self) -> float | None:
+        if self.started is None:
+            return None
+        return self.started - self.enqueued
+
+    def metrics(self) -> dict:
+        wait = self.queue_wait
+        return {
+            "queue_wait_ms": None if wait is None else int(wait * 1000),
+            "queue_depth": self.queue_depth,
+            "budget_scale": round(self.budget_scale, 3),
+            "deadline_in_s": round(self.deadline - self.enqueued, 1),
+            "cancelled": self.token.cancelled,
+        }
+
+    def run(self):
+        token = _budget_scale.set(self.budget_scale)
+        try:
+            with cancellation_scope(self.token):
+                return self.fn(*self.args)
+        except SearchCancelled:
+            record_cancelled()
+            logger.info("Decision %s cancelled: %s", self.label, self.token.reason)
+            raise
+        finally:
+            _budget_scale.reset(token)
+
+
+class DecisionScheduler:
+    """
+    Earliest-deadline-first executor for decisions.
+
+    Queue bookkeeping happens on the event loop; only the decisions
+    themselves run in the executor's threads.
+    """
+
+    def __init__(
+        self,
+        slots: int | None = None,
+        min_budget_scale: float = DECISION_MIN_BUDGET_SCALE,
+    ):
+        self.slots = max(1, int(slots or 1))
+        self.min_budget_scale = min_budget_scale
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.slots, thread_name_prefix="decision"
+        )
+        self._queue: list[tuple[float, int, ScheduledDecision]] = []
+        self._seq = itertools.count()
+        self._running = 0
+        self._waits: deque[float] = deque(maxlen=QUEUE_WAIT_WINDOW)
+        self._stats_lock = threading.Lock()
+        self.decisions = 0
+
+    def submit(
+        self, fn, *args, deadline: float | None = None, label: str = ""
+    ) -> ScheduledDecision:
+        """
+        Queue `fn(*args)`; it runs in the caller's context. Cancelling the
+        returned decision's future before it starts drops it from the queue.
+        """
+        loop = asyncio.get_running_loop()
+        if deadline is None:
+            deadline = decision_deadline(None)
+        job = ScheduledDecision(fn, args, loop.create_future(), deadline, label)
+        heapq.heappush(self._queue, (deadline, next(self._seq), job))
+        self._dispatch(loop)
+        return job
+
+    def _waiting(self) -> int:
+        return sum(1 for _, _, job in self._queue if not job.future.done())
+
+    def _dispatch(self, loop):
+        while self._running < self.slots and self._queue:
+            _, _, job = heapq.heappop(self._queue)
+            if job.future.done():
+                continue  # cancelled while queued
+            job.started = time.monotonic()
+            job.queue_depth = self._waiting()
+            job.budget_scale = search_budget_scale(
+                self.slots, job.queue_depth, self.min_budget_scale
+            )
+            with self._stats_lock:
+                self._waits.append(job.queue_wait)
+                self.decisions += 1
+            if job.queue_wait >= 1.0:
+                logger.info(
+                    "Decision %s waited %.1fs for a search slot (%d still queued)",
+                    job.label,
+                    job.queue_wait,
+                    job.queue_depth,
+                )
+            self._running += 1
+            job.granted.set_result(job.queue_wait)
+            running = loop.run_in_executor(self._executor, job.context.run, job.run)
+            running.add_done_callback(lambda f, job=job: self._finished(loop, job, f))
+
+    def _finished(self, loop, job: ScheduledDecision, running: asyncio.Future):
+        self._running -= 1
+        if not job.future.done():
+            if running.cancelled():
+                job.future.cancel()
+            elif running.exception() is not None:
+                job.future.set_exception(running.exception())
+            else:
+                job.future.set_result(running.result())
+        self._dispatch(loop)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            waits = sorted(self._waits)
+            decisions = self.decisions
+        return {
+            "slots": self.slots,
+            "running": self._running,
+            "queued": self._waiting(),
+            "decisions": decisions,
+            "queue_wait_ms": {
+                "mean": int(sum(waits) / len(waits) * 1000) if waits else 0,
+                "p50": int(_percentile(waits, 0.5) * 1000),
+                "p95": int(_percentile(waits, 0.95) * 1000),
+                "max": int(waits[-1] * 1000) if waits else 0,
+            },
+            "cancellation": cancellation_stats(),
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+_scheduler: DecisionScheduler | None = None
+_scheduler_lock = threading.Lock()
+
+
+def get_decision_scheduler() -> DecisionScheduler:
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                slots = DECISION_SCHEDULER_SLOTS
+                if not slots:
+                    from fp.search.parallel_mcts import get_mcts_pool
+
+                    slots = decision_slots(DECISION_CPU_BUDGET, get_mcts_pool().workers)
+                _scheduler = DecisionScheduler(slots=slots)
+                logger.info("Decision scheduler: %d search slot(s)", slots)
+    return _scheduler
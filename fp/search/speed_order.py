@@ -17,8 +17,19 @@ from typing import List
 
 import constants
 from data import pokedex
+from data.ids import UNKNOWN_ID, ability_id, species_table
 from fp.battle import Battle, boost_multiplier_lookup
 from fp.helpers import calculate_stats, normalize_name
+from fp.search.features import (
+    ACTIVE,
+    BOOSTS,
+    FIELD,
+    REVEALS,
+    SIDE_CONDITIONS,
+    STATUS,
+    VOLATILES,
+    battle_feature,
+)
 
 
 @dataclass
@@ -32,12 +43,22 @@ class SpeedOrderAssessment:
     notes: List[str]
 
 
-def _get_species_abilities(pokemon) -> set[str]:
-    name = normalize_name(getattr(pokemon, "name", "") or "")
-    if not name or name not in pokedex:
-        return set()
-    abilities = pokedex[name].get(constants.ABILITIES, {})
-    return {normalize_name(a) for a in abilities.values() if isinstance(a, str)}
+_SWIFT_SWIM = ability_id("swiftswim")
+_CHLOROPHYLL = ability_id("chlorophyll")
+_SAND_RUSH = ability_id("sandrush")
+_SLUSH_RUSH = ability_id("slushrush")
+_SURGE_SURFER = ability_id("surgesurfer")
+_QUICK_FEET = ability_id("quickfeet")
+_UNBURDEN = ability_id("unburden")
+
+
+def _get_species_abilities(pokemon) -> frozenset[int]:
+    """Ability ids the species can have (see `data.ids`)."""
+    species = species_table()
+    i = species.ids.id(getattr(pokemon, "name", "") or "")
+    if i == UNKNOWN_ID:
+        return frozenset()
+    return species.abilities[i]
 
 
 def _safe_int(value, default: int) -> int:
@@ -119,25 +140,25 @@ def _possible_unknown_speed_multiplier(battle: Battle, pokemon) -> tuple[float,
     status = getattr(pokemon, "status", None)
 
     weather_double = False
-    if weather == constants.RAIN and "swiftswim" in abilities:
+    if weather == constants.RAIN and _SWIFT_SWIM in abilities:
         weather_double = True
-    elif weather == constants.SUN and "chlorophyll" in abilities:
+    elif weather == constants.SUN and _CHLOROPHYLL in abilities:
         weather_double = True
-    elif weather == constants.SAND and "sandrush" in abilities:
+    elif weather == constants.SAND and _SAND_RUSH in abilities:
         weather_double = True
-    elif weather in constants.HAIL_OR_SNOW and "slushrush" in abilities:
+    elif weather in constants.HAIL_OR_SNOW and _SLUSH_RUSH in abilities:
         weather_double = True
 
     if weather_double:
         mult *= 2.0
         notes.append("possible_weather_speed_ability")
 
-    if field == constants.ELECTRIC_TERRAIN and "surgesurfer" in abilities:
+    if field == constants.ELECTRIC_TERRAIN and _SURGE_SURFER in abilities:
         mult *= 2.0
         notes.append("possible_surge_surfer")
 
     # If ability is unknown and statused, Quick Feet may overturn baseline assumptions.
-    if "quickfeet" in abilities and status is not None:
+    if _QUICK_FEET in abilities and status is not None:
         if status == constants.PARALYZED:
             # Baseline likely includes para 0.5x; Quick Feet would be 1.5x => 3x uplift.
             mult *= 3.0
@@ -146,13 +167,14 @@ def _possible_unknown_speed_multiplier(battle: Battle, pokemon) -> tuple[float,
         notes.append("possible_quickfeet")
 
     # Unburden is only relevant when item has already been consumed.
-    if item is None and "unburden" in abilities:
+    if item is None and _UNBURDEN in abilities:
         mult *= 2.0
         notes.append("possible_unburden")
 
     return mult, notes
 
 
+@battle_feature(ACTIVE, BOOSTS, STATUS, VOLATILES, SIDE_CONDITIONS, FIELD, REVEALS)
 def assess_speed_order(battle: Battle) -> SpeedOrderAssessment:
     if battle is None or battle.user.active is None or battle.opponent.active is None:
         return SpeedOrderAssessment(
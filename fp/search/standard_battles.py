@@ -1,9 +1,12 @@
 import logging
 import random
-from copy import deepcopy
+import threading
+from collections import OrderedDict
+from itertools import accumulate
 
 import constants
 from data import all_move_json, pokedex
+from fp.search.cancellation import check_cancelled
 from fp.search.helpers import populate_pkmn_from_set
 from fp.helpers import natures, normalize_name
 from fp.battle import Pokemon, Battle, Battler
@@ -134,6 +137,97 @@ def bayesian_set_probabilities(pkmn: Pokemon, battle: Battle = None) -> list:
     return compatible_sets
 
 
+class SetPosterior:
+    """
+    Posterior over one Pokemon's candidate sets, ready to sample from.
+    Cumulative weights and each set's source are computed once.
+    """
+
+    __slots__ = ("sets", "probabilities", "cum_weights", "sources")
+
+    def __init__(self, set_probabilities: list, team_sets: list):
+        self.sets = [s for s, _ in set_probabilities]
+        self.probabilities = [p for _, p in set_probabilities]
+        self.cum_weights = list(accumulate(self.probabilities))
+        self.sources = [
+            "bayesian-teamdatasets" if s in team_sets else "bayesian-smogonsets"
+            for s in self.sets
+        ]
+
+    def sample(self) -> tuple[PredictedPokemonSet, str]:
+        index = random.choices(range(len(self.sets)), cum_weights=self.cum_weights)[0]
+        return self.sets[index], self.sources[index]
+
+
+# Posteriors keyed by a Pokemon's reveal state. Every reveal battle_modifier
+# processes (moves, item, ability, speed range, eliminated items/abilities,
+# tera) changes the key, so a cached posterior is only reused while nothing
+# new is known about the Pokemon.
+_POSTERIOR_CACHE_MAX_ENTRIES = 512
+_posterior_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_posterior_cache_lock = threading.Lock()
+
+
+def _reveal_key(pkmn: Pokemon) -> tuple:
+    return (
+        pkmn.name,
+        pkmn.mega_name,
+        pkmn.level,
+        pkmn.item,
+        pkmn.removed_item,
+        pkmn.ability,
+        pkmn.can_have_choice_item,
+        pkmn.terastallized,
+        pkmn.tera_type,
+        tuple(pkmn.speed_range),
+        tuple(m.name for m in pkmn.moves),
+        frozenset(pkmn.impossible_items),
+        frozenset(pkmn.impossible_abilities),
+        frozenset(pkmn.hidden_power_possibilities),
+    )
+
+
+def set_posterior(pkmn: Pokemon, battle: Battle = None) -> SetPosterior | None:
+    """
+    Cached `bayesian_set_probabilities` for sampling. Computed once per
+    reveal state of the Pokemon and per set-data view.
+    """
+    # the current battle's set views; `initialize`/`add_new_pokemon` replace these dicts
+    datasets = (TeamDatasets.pkmn_sets, SmogonSets.pkmn_sets)
+    try:
+        # reverse damage calcs remove candidates from the lists in place
+        remaining = tuple(
+            len(d.get_pkmn_sets_from_pkmn_name(pkmn) or ())
+            for d in (TeamDatasets, SmogonSets)
+        )
+        key = (_reveal_key(pkmn), id(datasets[0]), id(datasets[1]), remaining)
+    except Exception:
+        key = None
+
+    if key is not None:
+        with _posterior_cache_lock:
+            entry = _posterior_cache.get(key)
+            if entry is not None and all(a is b for a, b in zip(entry[0], datasets)):
+                _posterior_cache.move_to_end(key)
+                return entry[1]
+
+    set_probabilities = bayesian_set_probabilities(pkmn, battle)
+    posterior = None
+    if set_probabilities:
+        posterior = SetPosterior(
+            set_probabilities, TeamDatasets.get_pkmn_sets_from_pkmn_name(pkmn)
+        )
+
+    if key is not None:
+        with _posterior_cache_lock:
+            # hold the set views so their ids cannot be reused while cached
+            _posterior_cache[key] = (datasets, posterior)
+            _posterior_cache.move_to_end(key)
+            while len(_posterior_cache) > _POSTERIOR_CACHE_MAX_ENTRIES:
+                _posterior_cache.popitem(last=False)
+    return posterior
+
+
 TRICKABLE_ITEMS = {
     "choicespecs",
     "choicescarf",
@@ -433,7 +527,7 @@ def sample_pokemon(pkmn: Pokemon, battle: Battle = None):
 
     # the ability of a mega pokemon that has not yet mega-evolved
     # needs to be sampled from its non-mega version
-    pkmn_without_mega = deepcopy(pkmn)
+    pkmn_without_mega = Pokemon.from_state(pkmn.to_state())
     pkmn_without_mega.mega_name = None
     _sample_pokemon(pkmn_without_mega, battle)
     pkmn.ability = pkmn_without_mega.ability
@@ -445,20 +539,11 @@ def _sample_pokemon(pkmn: Pokemon, battle: Battle = None):
     set_most_likely_hidden_power(pkmn)
 
     # Use Bayesian inference to get probability distribution over sets
-    bayesian_probs = bayesian_set_probabilities(pkmn, battle)
-    
-    if bayesian_probs:
+    posterior = set_posterior(pkmn, battle)
+
+    if posterior is not None:
         # Sample from the Bayesian probability distribution
-        sets_list = [s for s, _ in bayesian_probs]
-        probs_list = [p for _, p in bayesian_probs]
-        sampled_set = deepcopy(random.choices(sets_list, weights=probs_list)[0])
-        
-        # Determine source based on where the set came from
-        if sampled_set in TeamDatasets.get_pkmn_sets_from_pkmn_name(pkmn):
-            source = "bayesian-teamdatasets"
-        else:
-            source = "bayesian-smogonsets"
-        
+        sampled_set, source = posterior.sample()
         populate_pkmn_from_set(pkmn, sampled_set, source=source)
         return
 
@@ -471,7 +556,7 @@ def _sample_pokemon(pkmn: Pokemon, battle: Battle = None):
     remaining_team_sets = TeamDatasets.get_all_remaining_sets(pkmn)
     if remaining_team_sets and (not pkmn.moves or random.random() < 0.75):
         weights = [max(1, s.pkmn_set.count) for s in remaining_team_sets]
-        sampled_set = deepcopy(random.choices(remaining_team_sets, weights=weights)[0])
+        sampled_set = random.choices(remaining_team_sets, weights=weights)[0]
         populate_pkmn_from_set(pkmn, sampled_set, source="teamdatasets-full")
         return
 
@@ -484,7 +569,7 @@ def _sample_pokemon(pkmn: Pokemon, battle: Battle = None):
     ]
     if remaining_team_sets:
         weights = [max(1, s.pkmn_set.count) for s in remaining_team_sets]
-        sampled_set = deepcopy(random.choices(remaining_team_sets, weights=weights)[0].pkmn_set)
+        sampled_set = random.choices(remaining_team_sets, weights=weights)[0].pkmn_set
         moves = sample_pokemon_moveset_with_known_pkmn_set(pkmn, sampled_set)
         sampled_set = PredictedPokemonSet(
             pkmn_set=sampled_set,
@@ -498,12 +583,10 @@ def _sample_pokemon(pkmn: Pokemon, battle: Battle = None):
     remaining_smogon_sets = SmogonSets.get_all_remaining_sets(pkmn)
     remaining_smogon_sets = get_filtered_sets(pkmn, remaining_smogon_sets)
     if remaining_smogon_sets:
-        sampled_smogon_set = deepcopy(
-            random.choices(
-                remaining_smogon_sets,
-                weights=[s.count for s in remaining_smogon_sets],
-            )[0]
-        )
+        sampled_smogon_set = random.choices(
+            remaining_smogon_sets,
+            weights=[s.count for s in remaining_smogon_sets],
+        )[0]
         moves = sample_pokemon_moveset_with_known_pkmn_set(pkmn, sampled_smogon_set)
         sampled_set = PredictedPokemonSet(
             pkmn_set=sampled_smogon_set,
@@ -611,11 +694,15 @@ def sample_mega_evolution(battler: Battler, index: int):
 
 
 def prepare_battles(battle: Battle, num_battles: int) -> list[(Battle, float)]:
+    # Sampled worlds only differ in the opponent's side, so each one shares
+    # the observed battle and materializes a private opponent. Sampled sets
+    # are read-only templates and are not copied either.
     sampled_battles = []
     weights = []
     for index in range(num_battles):
+        check_cancelled()
         logger.info("Sampling battle {}".format(index))
-        battle_copy = deepcopy(battle)
+        battle_copy = battle.fork_opponent()
         if battle_copy.mega_evolve_possible():
             sample_mega_evolution(battle_copy.opponent, index)
 
@@ -24,9 +24,14 @@ from pathlib import Path
 SCRIPT_DIR = Path(__file__).resolve().parent
 REPO_DIR = SCRIPT_DIR.parent
 DEPLOY_LOG_PATH = SCRIPT_DIR / "deploy_log.json"
-BATTLE_STATS_PATH = REPO_DIR / "battle_stats.json"
 GUARDRAILS_PATH = SCRIPT_DIR / "guardrails.json"
 
+sys.path.insert(0, str(REPO_DIR))
+
+from fp.results_store import RESULTS_DB_NAME, BattleResultsStore  # noqa: E402
+
+BATTLE_RESULTS_DB = REPO_DIR / RESULTS_DB_NAME
+
 
 def load_json(path: Path):
     """Load a JSON file, returning None if it does not exist or is invalid."""
@@ -40,6 +45,16 @@ def load_json(path: Path):
         return None
 
 
+def load_battles(since=None, limit: int | None = None) -> list | None:
+    """Battles from the results store (after `since`, newest `limit`), oldest first."""
+    try:
+        with BattleResultsStore(BATTLE_RESULTS_DB) as store:
+            return store.battles(since=since, limit=limit)
+    except Exception as e:
+        print(f"WARNING: Could not read battle results: {e}", file=sys.stderr)
+        return None
+
+
 def get_elo_threshold() -> int:
     """Read the max ELO drop threshold from guardrails.json."""
     guardrails = load_json(GUARDRAILS_PATH)
@@ -187,7 +202,6 @@ def check_and_revert() -> bool:
     """
     # Load data
     deploy_log = load_json(DEPLOY_LOG_PATH)
-    battle_stats = load_json(BATTLE_STATS_PATH)
     threshold = get_elo_threshold()
 
     # Get latest deploy
@@ -206,11 +220,15 @@ def check_and_revert() -> bool:
 
     # Get post-deploy ELO
     deploy_timestamp = latest_deploy.get("timestamp")
-    post_deploy_elo = get_post_deploy_elo(battle_stats, deploy_timestamp)
+    post_deploy_elo = None
+    if deploy_timestamp:
+        post_deploy_elo = get_post_deploy_elo(
+            load_battles(since=deploy_timestamp), deploy_timestamp
+        )
 
     if post_deploy_elo is None:
         # Also try the current ELO as a fallback
-        current_elo = get_current_elo(battle_stats)
+        current_elo = get_current_elo(load_battles(limit=1))
         if current_elo is None:
             print("Not enough post-deploy data to evaluate. Skipping.")
             return False
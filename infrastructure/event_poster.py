@@ -22,6 +22,7 @@ from typing import Tuple
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
+from fp.results_store import RESULTS_DB_NAME, BattleResultsStore  # noqa: E402
 from infrastructure.event_queue_lib import (
     get_pending_events,
     mark_posted,
@@ -38,7 +39,7 @@ EXPIRY_SEC = int(os.getenv("EVENT_POSTER_EXPIRY_SEC", "600"))  # 10 min
 CLEANUP_INTERVAL = 300  # Cleanup every 5 minutes
 PID_DIR = PROJECT_ROOT / ".pids"
 BOT_MAIN_PID_FILE = PID_DIR / "bot_main.pid"
-BATTLE_STATS_FILE = PROJECT_ROOT / "battle_stats.json"
+BATTLE_RESULTS_DB = PROJECT_ROOT / RESULTS_DB_NAME
 
 # Logging
 LOG_FILE = Path(os.getenv(
@@ -98,12 +99,10 @@ def bot_is_dead() -> bool:
 
 
 def battle_exists_in_stats() -> bool:
-    """Check if battle_stats.json exists and has battles."""
+    """Check if the battle results store has battles."""
     try:
-        if not BATTLE_STATS_FILE.exists():
-            return False
-        data = json.loads(BATTLE_STATS_FILE.read_text())
-        return len(data.get("battles", [])) > 0
+        with BattleResultsStore(BATTLE_RESULTS_DB) as store:
+            return store.count() > 0
     except Exception:
         return False
 
@@ -216,7 +215,7 @@ def post_to_discord(event: dict) -> bool:
 
 def process_one_event() -> bool:
     """Process the oldest pending event. Returns True if an event was processed."""
-    pending = get_pending_events()
+    pending = get_pending_events(limit=1)
     if not pending:
         return False
 
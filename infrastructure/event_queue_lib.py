@@ -2,8 +2,16 @@
 """
 Event Queue Library for Fouler Play Discord Notifications
 
-Thread-safe event queuing with file-based locking, deduplication,
-and precondition support. All Discord messages flow through this queue.
+Event queuing with deduplication and precondition support. All Discord
+messages flow through this queue.
+
+The queue is an SQLite database in WAL mode (EVENT_QUEUE_DB, by default
+next to EVENT_QUEUE_FILE with a .db suffix). Enqueueing is one indexed
+dedup lookup plus one insert, and acking is a single-row update by event
+id, so neither gets slower as the queue grows. Producers only hold the
+write lock for that one statement pair; the poster's reads do not block
+them. A JSON queue file left by the old storage is imported once when the
+database is created.
 
 Usage:
     from infrastructure.event_queue_lib import queue_event, read_queue, mark_posted, mark_failed
@@ -12,20 +20,24 @@ Usage:
                 precondition_check_fn="bot_is_alive", dedup_window_sec=10)
 """
 
-import fcntl
 import hashlib
 import json
 import logging
 import os
+import sqlite3
+import threading
 import time
 import uuid
 from pathlib import Path
-from typing import Optional, Callable
+from typing import Optional
 
 QUEUE_FILE = Path(os.getenv(
     "EVENT_QUEUE_FILE",
     "/home/ryan/projects/fouler-play/events_queue.json"
 ))
+QUEUE_DB = Path(os.getenv("EVENT_QUEUE_DB", str(QUEUE_FILE.with_suffix(".db"))))
+# How long a producer waits for another process's write lock
+BUSY_TIMEOUT_SEC = 10.0
 
 LOG_DIR = Path("/home/ryan/projects/fouler-play/logs")
 LOG_DIR.mkdir(parents=True, exist_ok=True)
@@ -55,37 +67,118 @@ def _content_hash(event_type: str, channel: str, content: str) -> str:
     return hashlib.md5(raw.encode("utf-8")).hexdigest()
 
 
-def _read_queue_locked(f) -> list:
-    """Read queue from an already-locked file handle."""
-    f.seek(0)
-    raw = f.read().strip()
-    if not raw:
-        return []
-    try:
-        return json.loads(raw)
-    except json.JSONDecodeError:
-        logger.error("Corrupt queue file, resetting")
-        return []
-
-
-def _write_queue_locked(f, events: list):
-    """Write queue to an already-locked file handle."""
-    f.seek(0)
-    f.truncate()
-    json.dump(events, f, indent=2)
-    f.flush()
 
 
-def _with_lock(fn):
-    """Execute fn(file_handle) with exclusive flock on queue file."""
-    QUEUE_FILE.parent.mkdir(parents=True, exist_ok=True)
-    QUEUE_FILE.touch(exist_ok=True)
-    with open(QUEUE_FILE, "r+") as f:
-        fcntl.flock(f, fcntl.LOCK_EX)
-        try:
-            return fn(f)
-        finally:
-            fcntl.flock(f, fcntl.LOCK_UN)
+_SCHEMA_VERSION = 1
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS events (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        id TEXT NOT NULL UNIQUE,
+        timestamp REAL NOT NULL,
+        event_type TEXT NOT NULL,
+        channel TEXT NOT NULL,
+        content TEXT NOT NULL,
+        content_hash TEXT NOT NULL,
+        precondition_check TEXT,
+        suppress_embeds INTEGER NOT NULL DEFAULT 0,
+        status TEXT NOT NULL,
+        retry_count INTEGER NOT NULL DEFAULT 0,
+        created_at TEXT,
+        posted_at TEXT,
+        last_error TEXT
+    )""",
+    # dedup window lookups
+    "CREATE INDEX IF NOT EXISTS events_hash_ts ON events (content_hash, timestamp)",
+    # pending events in order, and expiry of old pending events
+    "CREATE INDEX IF NOT EXISTS events_status_seq ON events (status, seq)",
+    "CREATE INDEX IF NOT EXISTS events_status_ts ON events (status, timestamp)",
+)
+_FIELDS = (
+    "id", "timestamp", "event_type", "channel", "content", "content_hash",
+    "precondition_check", "suppress_embeds", "status", "retry_count",
+    "created_at", "posted_at", "last_error",
+)
+_SELECT = f"SELECT {', '.join(_FIELDS)} FROM events"
+_INSERT = (
+    f"INSERT INTO events ({', '.join(_FIELDS)}) "
+    f"VALUES ({', '.join('?' for _ in _FIELDS)})"
+)
+
+_conn_lock = threading.Lock()
+# (pid, path, connection): one connection per process, shared by its threads
+_conn_state: Optional[tuple] = None
+
+
+def _import_legacy_queue(conn):
+    """Copy the events of the old JSON queue file into a new database."""
+    try:
+        raw = QUEUE_FILE.read_text().strip()
+    except OSError:
+        return
+    try:
+        events = json.loads(raw) if raw else []
+    except json.JSONDecodeError:
+        logger.error(f"Corrupt legacy queue file {QUEUE_FILE}, not imported")
+        return
+    rows = [
+        (
+            ev["id"], ev["timestamp"], ev.get("event_type", ""), ev.get("channel", ""),
+            ev.get("content", ""), ev.get("content_hash", ""), ev.get("precondition_check"),
+            int(bool(ev.get("suppress_embeds"))), ev.get("status", STATUS_PENDING),
+            ev.get("retry_count", 0), ev.get("created_at"), ev.get("posted_at"),
+            ev.get("last_error"),
+        )
+        for ev in events
+        if isinstance(ev, dict) and "id" in ev and "timestamp" in ev
+    ]
+    conn.executemany(_INSERT.replace("INSERT", "INSERT OR IGNORE", 1), rows)
+    if rows:
+        logger.info(f"Imported {len(rows)} events from {QUEUE_FILE}")
+
+
+def _ensure_schema(conn):
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= _SCHEMA_VERSION:
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # another process may have created it while we waited for the lock
+        if conn.execute("PRAGMA user_version").fetchone()[0] < _SCHEMA_VERSION:
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            _import_legacy_queue(conn)
+            conn.execute(f"PRAGMA user_version={_SCHEMA_VERSION}")
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def _connection():
+    """This process's connection to QUEUE_DB. Call with _conn_lock held."""
+    global _conn_state
+    pid = os.getpid()
+    if _conn_state is not None:
+        state_pid, state_path, conn = _conn_state
+        if state_pid == pid and state_path == QUEUE_DB:
+            return conn
+        if state_pid == pid:
+            conn.close()
+        # after a fork the parent's connection is left alone
+    QUEUE_DB.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(
+        str(QUEUE_DB), timeout=BUSY_TIMEOUT_SEC, isolation_level=None, check_same_thread=False
+    )
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    _ensure_schema(conn)
+    _conn_state = (pid, QUEUE_DB, conn)
+    return conn
+
+
+def _row_to_event(row) -> dict:
+    event = dict(zip(_FIELDS, row))
+    event["suppress_embeds"] = bool(event["suppress_embeds"])
+    return event
 
 
 def queue_event(
@@ -115,139 +208,128 @@ def queue_event(
 
     content_md5 = _content_hash(event_type, channel, content)
     now = time.time()
+    event_id = str(uuid.uuid4())[:12]
 
-    def _do_queue(f):
-        events = _read_queue_locked(f)
-
-        # Dedup check: reject if same hash exists within window
-        for ev in events:
-            if (ev.get("content_hash") == content_md5
-                    and ev["status"] in (STATUS_PENDING, STATUS_POSTED)
-                    and (now - ev["timestamp"]) < dedup_window_sec):
-                logger.info(f"Dedup rejected: {event_type} (hash={content_md5[:8]})")
-                return None
-
-        event_id = str(uuid.uuid4())[:12]
-        event = {
-            "id": event_id,
-            "timestamp": now,
-            "event_type": event_type,
-            "channel": channel,
-            "content": content,
-            "content_hash": content_md5,
-            "precondition_check": precondition_check_fn,
-            "suppress_embeds": suppress_embeds,
-            "status": STATUS_PENDING,
-            "retry_count": 0,
-            "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
-            "posted_at": None,
-            "last_error": None,
-        }
-
-        events.append(event)
-        _write_queue_locked(f, events)
-        logger.info(f"Queued: {event_type} id={event_id} channel={channel}")
-        return event_id
-
-    return _with_lock(_do_queue)
+    with _conn_lock:
+        conn = _connection()
+        # the dedup check and the insert must not interleave with another producer
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            duplicate = conn.execute(
+                "SELECT 1 FROM events WHERE content_hash = ? AND timestamp > ?"
+                " AND status IN (?, ?) LIMIT 1",
+                (content_md5, now - dedup_window_sec, STATUS_PENDING, STATUS_POSTED),
+            ).fetchone()
+            if not duplicate:
+                conn.execute(_INSERT, (
+                    event_id, now, event_type, channel, content, content_md5,
+                    precondition_check_fn, int(suppress_embeds), STATUS_PENDING, 0,
+                    time.strftime("%Y-%m-%d %H:%M:%S"), None, None,
+                ))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    if duplicate:
+        logger.info(f"Dedup rejected: {event_type} (hash={content_md5[:8]})")
+        return None
+    logger.info(f"Queued: {event_type} id={event_id} channel={channel}")
+    return event_id
 
 
 def read_queue(status_filter: Optional[str] = None) -> list:
     """Read current queue state. Optionally filter by status."""
-    def _do_read(f):
-        events = _read_queue_locked(f)
-        if status_filter:
-            return [e for e in events if e["status"] == status_filter]
-        return events
+    query, params = _SELECT, ()
+    if status_filter:
+        query, params = f"{_SELECT} WHERE status = ?", (status_filter,)
+    with _conn_lock:
+        rows = _connection().execute(f"{query} ORDER BY seq", params).fetchall()
+    return [_row_to_event(row) for row in rows]
 
-    return _with_lock(_do_read)
 
-
-def get_pending_events() -> list:
-    """Get all pending events, ordered by timestamp (oldest first)."""
-    return read_queue(status_filter=STATUS_PENDING)
+def get_pending_events(limit: Optional[int] = None) -> list:
+    """Get pending events, oldest first. `limit` returns only the oldest `limit`."""
+    if limit is None:
+        return read_queue(status_filter=STATUS_PENDING)
+    with _conn_lock:
+        rows = _connection().execute(
+            f"{_SELECT} WHERE status = ? ORDER BY seq LIMIT ?", (STATUS_PENDING, limit)
+        ).fetchall()
+    return [_row_to_event(row) for row in rows]
 
 
 def mark_posted(event_id: str) -> bool:
     """Mark an event as successfully posted."""
-    def _do_mark(f):
-        events = _read_queue_locked(f)
-        for ev in events:
-            if ev["id"] == event_id:
-                ev["status"] = STATUS_POSTED
-                ev["posted_at"] = time.strftime("%Y-%m-%d %H:%M:%S")
-                _write_queue_locked(f, events)
-                logger.info(f"Posted: {ev['event_type']} id={event_id}")
-                return True
+    with _conn_lock:
+        rows = _connection().execute(
+            "UPDATE events SET status = ?, posted_at = ? WHERE id = ? RETURNING event_type",
+            (STATUS_POSTED, time.strftime("%Y-%m-%d %H:%M:%S"), event_id),
+        ).fetchall()
+    if not rows:
         return False
-
-    return _with_lock(_do_mark)
+    logger.info(f"Posted: {rows[0][0]} id={event_id}")
+    return True
 
 
 def mark_failed(event_id: str, error: str = "") -> bool:
     """Increment retry count. If max retries reached, mark as failed."""
-    def _do_fail(f):
-        events = _read_queue_locked(f)
-        for ev in events:
-            if ev["id"] == event_id:
-                ev["retry_count"] += 1
-                ev["last_error"] = error[:500]
-                if ev["retry_count"] >= MAX_RETRIES:
-                    ev["status"] = STATUS_FAILED
-                    logger.warning(f"Failed permanently: {ev['event_type']} id={event_id} after {MAX_RETRIES} retries")
-                else:
-                    logger.warning(f"Retry {ev['retry_count']}/{MAX_RETRIES}: {ev['event_type']} id={event_id}: {error[:100]}")
-                _write_queue_locked(f, events)
-                return True
+    with _conn_lock:
+        rows = _connection().execute(
+            "UPDATE events SET retry_count = retry_count + 1, last_error = ?,"
+            " status = CASE WHEN retry_count + 1 >= ? THEN ? ELSE status END"
+            " WHERE id = ? RETURNING event_type, retry_count",
+            (error[:500], MAX_RETRIES, STATUS_FAILED, event_id),
+        ).fetchall()
+    if not rows:
         return False
-
-    return _with_lock(_do_fail)
+    event_type, retry_count = rows[0]
+    if retry_count >= MAX_RETRIES:
+        logger.warning(f"Failed permanently: {event_type} id={event_id} after {MAX_RETRIES} retries")
+    else:
+        logger.warning(f"Retry {retry_count}/{MAX_RETRIES}: {event_type} id={event_id}: {error[:100]}")
+    return True
 
 
 def expire_old_events(max_age_sec: int = DEFAULT_EXPIRY_SEC) -> int:
     """Expire pending events older than max_age_sec. Returns count expired."""
     now = time.time()
-
-    def _do_expire(f):
-        events = _read_queue_locked(f)
-        count = 0
-        for ev in events:
-            if ev["status"] == STATUS_PENDING and (now - ev["timestamp"]) > max_age_sec:
-                ev["status"] = STATUS_EXPIRED
-                count += 1
-                logger.info(f"Expired: {ev['event_type']} id={ev['id']} (age={now - ev['timestamp']:.0f}s)")
-        if count:
-            _write_queue_locked(f, events)
-        return count
-
-    return _with_lock(_do_expire)
+    with _conn_lock:
+        rows = _connection().execute(
+            "UPDATE events SET status = ? WHERE status = ? AND timestamp < ?"
+            " RETURNING id, event_type, timestamp",
+            (STATUS_EXPIRED, STATUS_PENDING, now - max_age_sec),
+        ).fetchall()
+    for event_id, event_type, timestamp in rows:
+        logger.info(f"Expired: {event_type} id={event_id} (age={now - timestamp:.0f}s)")
+    return len(rows)
 
 
 def cleanup_queue(keep_last: int = 200) -> int:
     """Remove old posted/failed/expired events, keeping last N."""
-    def _do_cleanup(f):
-        events = _read_queue_locked(f)
-        # Keep all pending, plus last N of completed
-        pending = [e for e in events if e["status"] == STATUS_PENDING]
-        completed = [e for e in events if e["status"] != STATUS_PENDING]
-        trimmed = completed[-keep_last:] if len(completed) > keep_last else completed
-        removed = len(completed) - len(trimmed)
-        if removed > 0:
-            _write_queue_locked(f, pending + trimmed)
-            logger.info(f"Cleanup: removed {removed} old events")
-        return removed
-
-    return _with_lock(_do_cleanup)
+    # Keep all pending, plus last N of completed
+    with _conn_lock:
+        removed = _connection().execute(
+            "DELETE FROM events WHERE status != ? AND seq NOT IN"
+            " (SELECT seq FROM events WHERE status != ? ORDER BY seq DESC LIMIT ?)",
+            (STATUS_PENDING, STATUS_PENDING, max(0, keep_last)),
+        ).rowcount
+    if removed > 0:
+        logger.info(f"Cleanup: removed {removed} old events")
+    return removed
 
 
 def queue_stats() -> dict:
     """Get queue statistics."""
-    events = read_queue()
+    with _conn_lock:
+        counts = dict(
+            _connection().execute("SELECT status, COUNT(*) FROM events GROUP BY status").fetchall()
+        )
     stats = {
-        "total": len(events),
-        "pending": sum(1 for e in events if e["status"] == STATUS_PENDING),
-        "posted": sum(1 for e in events if e["status"] == STATUS_POSTED),
-        "failed": sum(1 for e in events if e["status"] == STATUS_FAILED),
-        "expired": sum(1 for e in events if e["status"] == STATUS_EXPIRED),
+        "total": sum(counts.values()),
+        "pending": counts.get(STATUS_PENDING, 0),
+        "posted": counts.get(STATUS_POSTED, 0),
+        "failed": counts.get(STATUS_FAILED, 0),
+        "expired": counts.get(STATUS_EXPIRED, 0),
     }
     return stats
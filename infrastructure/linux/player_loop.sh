@@ -75,6 +75,7 @@ while true; do
     
     # Push stats and replays
     log "Pushing battle stats and replays..."
+    python scripts/battle_results.py export 2>&1 | tee -a "$LOG_FILE" || true
     git add battle_stats.json replays/ 2>&1 | tee -a "$LOG_FILE" || true
     
     if ! git diff --cached --quiet 2>/dev/null; then
@@ -16,9 +16,11 @@ from collections import Counter, defaultdict
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent.parent))
 
+from fp.results_store import RESULTS_DB_NAME, BattleResultsStore
+
 # Project paths
 PROJECT_ROOT = Path(__file__).parent.parent
-BATTLE_STATS_FILE = PROJECT_ROOT / "battle_stats.json"
+BATTLE_RESULTS_DB = PROJECT_ROOT / RESULTS_DB_NAME
 STATE_FILE = PROJECT_ROOT / "infrastructure" / "replay_analyzer_state.json"
 LOGS_DIR = PROJECT_ROOT / "logs"
 
@@ -43,14 +45,13 @@ class ReplayAnalyzer:
             json.dump(self.state, f, indent=2)
     
     def get_battle_stats(self) -> List[Dict]:
-        """Load battle stats"""
-        if not BATTLE_STATS_FILE.exists():
-            print(f"❌ Battle stats file not found: {BATTLE_STATS_FILE}")
+        """Load battle results, oldest first"""
+        try:
+            with BattleResultsStore(BATTLE_RESULTS_DB) as store:
+                return store.battles()
+        except Exception as e:
+            print(f"❌ Could not read battle results from {BATTLE_RESULTS_DB}: {e}")
             return []
-        
-        with open(BATTLE_STATS_FILE) as f:
-            data = json.load(f)
-            return data.get("battles", [])
     
     def load_local_replay_log(self, battle_id: str) -> Optional[str]:
         """Load replay log from local logs directory"""
@@ -1,8 +1,8 @@
 #!/usr/bin/env python3
 """Integration tests for event queue system."""
 
-import json
 import os
+import sqlite3
 import sys
 import time
 from pathlib import Path
@@ -10,13 +10,23 @@ from pathlib import Path
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
-# Use a test queue file
-TEST_QUEUE = PROJECT_ROOT / "events_queue_test.json"
-os.environ["EVENT_QUEUE_FILE"] = str(TEST_QUEUE)
+# Use a test queue database
+TEST_QUEUE = PROJECT_ROOT / "events_queue_test.db"
+os.environ["EVENT_QUEUE_DB"] = str(TEST_QUEUE)
+
+
+def _remove_test_queue():
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{TEST_QUEUE}{suffix}").unlink(missing_ok=True)
+
+
+def _clear_queue():
+    with sqlite3.connect(TEST_QUEUE) as conn:
+        conn.execute("DELETE FROM events")
+
 
 # Clean slate
-if TEST_QUEUE.exists():
-    TEST_QUEUE.unlink()
+_remove_test_queue()
 
 from infrastructure.event_queue_lib import (
     queue_event, read_queue, get_pending_events, mark_posted,
@@ -64,7 +74,7 @@ def test_retry_and_fail():
 def test_simultaneous_batch_crash():
     """Test 5: Queue batch_complete + process_crash simultaneously."""
     # Clear test queue
-    TEST_QUEUE.write_text("[]")
+    _clear_queue()
     
     eid1 = queue_event("batch_complete", "battles", "📊 Batch report",
                        precondition_check_fn="bot_is_alive")
@@ -86,7 +96,7 @@ def test_simultaneous_batch_crash():
 
 def test_fifo_ordering():
     """Test 6: 10 events queue in order."""
-    TEST_QUEUE.write_text("[]")
+    _clear_queue()
     ids = []
     for i in range(10):
         eid = queue_event(f"order_{i}", "ch", f"Event {i} at {time.time()}")
@@ -101,12 +111,11 @@ def test_fifo_ordering():
 
 def test_expiry():
     """Test 7: Event expiry."""
-    TEST_QUEUE.write_text("[]")
+    _clear_queue()
     eid = queue_event("expire_test", "ch", "Will expire")
     # Manually backdate timestamp
-    events = read_queue()
-    events[0]["timestamp"] = time.time() - 700  # 11+ min ago
-    TEST_QUEUE.write_text(json.dumps(events))
+    with sqlite3.connect(TEST_QUEUE) as conn:
+        conn.execute("UPDATE events SET timestamp = ? WHERE id = ?", (time.time() - 700, eid))  # 11+ min ago
     
     expired = expire_old_events(600)
     assert expired == 1
@@ -133,5 +142,5 @@ if __name__ == "__main__":
     test_stats()
     
     # Cleanup
-    TEST_QUEUE.unlink(missing_ok=True)
+    _remove_test_queue()
     print("\n🎉 ALL TESTS PASSED")
@@ -31,11 +31,12 @@ try:
 except ImportError:
     pass  # python-dotenv not required, but recommended
 
+from fp.results_store import RESULTS_DB_NAME, BattleResultsStore  # noqa: E402
 from replay_analysis.batch_analyzer import BatchAnalyzer
 from infrastructure.event_queue_lib import queue_event
 
 # Configuration
-BATTLE_STATS_FILE = PROJECT_ROOT / "battle_stats.json"
+BATTLE_RESULTS_DB = PROJECT_ROOT / RESULTS_DB_NAME
 STATE_FILE = PROJECT_ROOT / ".pipeline_state"
 BATCH_SIZE = int(os.getenv("FOULER_BATCH_SIZE", "30"))  # 30 battles = 10 per team (3 teams)
 DISCORD_WEBHOOK_URL = os.getenv("DISCORD_WEBHOOK_URL", "")
@@ -81,13 +82,10 @@ class Pipeline:
 
     def get_battle_count(self) -> int:
         """Get current total battle count."""
-        if not BATTLE_STATS_FILE.exists():
-            return 0
         try:
-            with open(BATTLE_STATS_FILE, 'r') as f:
-                data = json.load(f)
-                return len(data.get("battles", []))
-        except:
+            with BattleResultsStore(BATTLE_RESULTS_DB) as store:
+                return store.count()
+        except Exception:
             return 0
 
     def should_analyze(self) -> bool:
@@ -256,15 +254,11 @@ class Pipeline:
         return ""
     
     def _get_recent_battles(self, n: int) -> list:
-        """Get the last N battles from battle_stats.json."""
-        if not BATTLE_STATS_FILE.exists():
-            return []
+        """Get the last N battles from the battle results store."""
         try:
-            with open(BATTLE_STATS_FILE, 'r') as f:
-                data = json.load(f)
-                battles = data.get("battles", [])
-                return battles[-n:] if len(battles) > n else battles
-        except:
+            with BattleResultsStore(BATTLE_RESULTS_DB) as store:
+                return store.recent(n)
+        except Exception:
             return []
     
     def _extract_batch_number(self, content: str) -> str:
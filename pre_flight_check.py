@@ -14,12 +14,15 @@ Import in launch.py:
 """
 
 import argparse
-import json
 import os
 import sys
 from pathlib import Path
 from typing import List, Tuple, Optional
 
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fp.results_store import LEGACY_STATS_NAME, RESULTS_DB_NAME, BattleResultsStore
+
 # Colors for output
 class Colors:
     GREEN = '\033[92m'
@@ -40,7 +43,7 @@ class PreFlightChecker:
     def __init__(self, run_count: int = None, num_workers: int = None):
         self.repo_root = Path(__file__).resolve().parent
         self.env_file = self.repo_root / ".env"
-        self.battle_stats_file = self.repo_root / "battle_stats.json"
+        self.battle_results_db = self.repo_root / RESULTS_DB_NAME
         self.teams_dir = self.repo_root / "teams"
         
         # Load .env
@@ -279,96 +282,84 @@ class PreFlightChecker:
         return all_passed
     
     def check_battle_stats(self) -> bool:
-        """4. Battle Stats - verify battle_stats.json is valid"""
+        """4. Battle Stats - verify the battle results store is readable"""
         print(f"\n{Colors.BOLD}4. BATTLE STATS{Colors.RESET}")
         
-        if not self.battle_stats_file.exists():
-            print(f"  {Colors.YELLOW}⚠️  battle_stats.json does not exist (will be created on first battle){Colors.RESET}")
-            self.warnings.append("battle_stats.json not found - fresh start")
+        if not self.battle_results_db.exists() and not (self.repo_root / LEGACY_STATS_NAME).exists():
+            print(f"  {Colors.YELLOW}⚠️  {RESULTS_DB_NAME} does not exist (will be created on first battle){Colors.RESET}")
+            self.warnings.append(f"{RESULTS_DB_NAME} not found - fresh start")
             return True
         
         all_passed = True
         
-        # Check if parseable
+        # Check if readable and undamaged
         try:
-            with open(self.battle_stats_file, "r") as f:
-                data = json.load(f)
-            print(f"  {check_mark(True)} battle_stats.json is valid JSON")
-        except json.JSONDecodeError as e:
-            print(f"  {check_mark(False)} battle_stats.json is CORRUPTED: {e}")
-            self.failures.append(f"battle_stats.json parse error: {e}")
+            with BattleResultsStore(self.battle_results_db) as store:
+                integrity = store.integrity_check()
+                team_records = store.team_records()
+        except Exception as e:
+            print(f"  {check_mark(False)} {RESULTS_DB_NAME} is unreadable: {e}")
+            self.failures.append(f"{RESULTS_DB_NAME} read error: {e}")
             return False
-        
-        # Verify structure
-        if "battles" not in data:
-            print(f"  {check_mark(False)} battle_stats.json missing 'battles' key")
-            self.failures.append("battle_stats.json has invalid structure")
-            all_passed = False
-        else:
-            battles = data["battles"]
-            if not isinstance(battles, list):
-                print(f"  {check_mark(False)} 'battles' is not a list")
-                self.failures.append("battle_stats.json 'battles' is not a list")
-                all_passed = False
-            else:
-                print(f"  {check_mark(True)} Found {len(battles)} recorded battles")
-                
-                # Calculate totals
-                wins = sum(1 for b in battles if b.get("result") == "win")
-                losses = sum(1 for b in battles if b.get("result") == "loss")
-                
-                print(f"    Total battles: {len(battles)}")
-                print(f"    Wins: {wins}")
-                print(f"    Losses: {losses}")
-                print(f"    Win rate: {wins/(wins+losses)*100:.1f}%" if (wins+losses) > 0 else "    Win rate: N/A")
-                
-                # Per-team breakdown
-                team_stats = {}
-                for battle in battles:
-                    team = battle.get("team_file", "unknown")
-                    result = battle.get("result")
-                    if team not in team_stats:
-                        team_stats[team] = {"wins": 0, "losses": 0}
-                    if result == "win":
-                        team_stats[team]["wins"] += 1
-                    elif result == "loss":
-                        team_stats[team]["losses"] += 1
-                
-                print(f"\n  {Colors.BLUE}Per-Team Stats:{Colors.RESET}")
-                for team, stats in sorted(team_stats.items()):
-                    total = stats["wins"] + stats["losses"]
-                    wr = stats["wins"] / total * 100 if total > 0 else 0
-                    print(f"    {team}: {stats['wins']}W / {stats['losses']}L ({wr:.1f}%)")
+        if integrity != "ok":
+            print(f"  {check_mark(False)} {RESULTS_DB_NAME} is CORRUPTED: {integrity}")
+            self.failures.append(f"{RESULTS_DB_NAME} integrity check: {integrity}")
+            return False
+        print(f"  {check_mark(True)} {RESULTS_DB_NAME} passes the integrity check")
+        
+        # Calculate totals
+        wins = sum(r.get("win", 0) for r in team_records.values())
+        losses = sum(r.get("loss", 0) for r in team_records.values())
+        total_battles = sum(sum(r.values()) for r in team_records.values())
+        print(f"  {check_mark(True)} Found {total_battles} recorded battles")
+        
+        print(f"    Total battles: {total_battles}")
+        print(f"    Wins: {wins}")
+        print(f"    Losses: {losses}")
+        print(f"    Win rate: {wins/(wins+losses)*100:.1f}%" if (wins+losses) > 0 else "    Win rate: N/A")
+        
+        # Per-team breakdown
+        team_stats = {
+            team: {"wins": r.get("win", 0), "losses": r.get("loss", 0)}
+            for team, r in team_records.items()
+        }
+        
+        print(f"\n  {Colors.BLUE}Per-Team Stats:{Colors.RESET}")
+        for team, stats in sorted(team_stats.items()):
+            total = stats["wins"] + stats["losses"]
+            wr = stats["wins"] / total * 100 if total > 0 else 0
+            print(f"    {team}: {stats['wins']}W / {stats['losses']}L ({wr:.1f}%)")
+        
+        # Check for worker quota violations
+        # This is a heuristic: if we have TEAM_NAMES set and per-worker quotas,
+        # we can estimate if any worker ran more battles than expected
+        if self.env.get("TEAM_NAMES") and self.num_workers > 1:
+            team_names = [t.strip() for t in self.env.get("TEAM_NAMES", "").split(",")]
+            if len(team_names) == self.num_workers:
+                print(f"\n  {Colors.BLUE}Worker Quota Check (heuristic):{Colors.RESET}")
                 
-                # Check for worker quota violations
-                # This is a heuristic: if we have TEAM_NAMES set and per-worker quotas,
-                # we can estimate if any worker ran more battles than expected
-                if self.env.get("TEAM_NAMES") and self.num_workers > 1:
-                    team_names = [t.strip() for t in self.env.get("TEAM_NAMES", "").split(",")]
-                    if len(team_names) == self.num_workers:
-                        print(f"\n  {Colors.BLUE}Worker Quota Check (heuristic):{Colors.RESET}")
-                        
-                        # Count battles per team (assuming 1:1 team:worker mapping)
-                        for i, team_name in enumerate(team_names):
-                            team_basename = Path(team_name).name
-                            team_battle_count = sum(
-                                1 for b in battles 
-                                if team_basename in b.get("team_file", "")
-                            )
-                            
-                            quota = self._calculate_quota(self.run_count, self.num_workers)[i]
-                            
-                            if quota > 0 and team_battle_count > quota:
-                                print(f"    {check_mark(False)} Worker {i} ({team_basename}): "
-                                      f"ran {team_battle_count} battles, quota was {quota}")
-                                self.warnings.append(
-                                    f"Worker {i} exceeded quota: {team_battle_count} > {quota}"
-                                )
-                            else:
-                                status = "quota N/A" if quota == 0 else f"quota {quota}"
-                                print(f"    {check_mark(True)} Worker {i} ({team_basename}): "
-                                      f"{team_battle_count} battles ({status})")
-        
+                # Count battles per team (assuming 1:1 team:worker mapping)
+                for i, team_name in enumerate(team_names):
+                    team_basename = Path(team_name).name
+                    team_battle_count = sum(
+                        sum(results.values())
+                        for team, results in team_records.items()
+                        if team_basename in team
+                    )
+                    
+                    quota = self._calculate_quota(self.run_count, self.num_workers)[i]
+                    
+                    if quota > 0 and team_battle_count > quota:
+                        print(f"    {check_mark(False)} Worker {i} ({team_basename}): "
+                              f"ran {team_battle_count} battles, quota was {quota}")
+                        self.warnings.append(
+                            f"Worker {i} exceeded quota: {team_battle_count} > {quota}"
+                        )
+                    else:
+                        status = "quota N/A" if quota == 0 else f"quota {quota}"
+                        print(f"    {check_mark(True)} Worker {i} ({team_basename}): "
+                              f"{team_battle_count} battles ({status})")
+
         return all_passed
     
     def run_all_checks(self) -> bool:
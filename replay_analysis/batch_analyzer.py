@@ -15,6 +15,7 @@ PROJECT_ROOT = Path(__file__).resolve().parent.parent
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
+from fp.results_store import RESULTS_DB_NAME, BattleResultsStore  # noqa: E402
 from replay_analysis.turn_review import TurnReviewer
 
 # Analysis Source: Claude via OpenClaw (Pokemon-competent reasoning)
@@ -22,7 +23,7 @@ from replay_analysis.turn_review import TurnReviewer
 USE_CLAUDE = True
 CLAUDE_MODEL = "anthropic/claude-opus-4-6"  # Use Opus for accurate analysis
 REPORTS_DIR = PROJECT_ROOT / "replay_analysis" / "reports"
-BATTLE_STATS_FILE = PROJECT_ROOT / "battle_stats.json"
+BATTLE_RESULTS_DB = PROJECT_ROOT / RESULTS_DB_NAME
 REPLAY_ANALYSIS_DIR = PROJECT_ROOT / "replay_analysis"
 
 
@@ -33,26 +34,28 @@ class BatchAnalyzer:
         self.reviewer = TurnReviewer(bot_username="BugInTheCode")
         REPORTS_DIR.mkdir(parents=True, exist_ok=True)
 
-    def get_battle_stats(self) -> List[Dict]:
-        """Load all battles from battle_stats.json."""
-        if not BATTLE_STATS_FILE.exists():
-            return []
+    def get_battle_stats(self, limit: Optional[int] = None, until=None) -> List[Dict]:
+        """Load the newest `limit` battles (all by default) before `until`, oldest first."""
         try:
-            with open(BATTLE_STATS_FILE, 'r') as f:
-                data = json.load(f)
-                return data.get("battles", [])
+            with BattleResultsStore(BATTLE_RESULTS_DB) as store:
+                return store.battles(limit=limit, until=until)
         except Exception as e:
-            print(f"Error loading battle_stats.json: {e}")
+            print(f"Error loading battle results: {e}")
             return []
 
+    def count_battles(self, until=None) -> int:
+        try:
+            with BattleResultsStore(BATTLE_RESULTS_DB) as store:
+                return store.count(until=until)
+        except Exception:
+            return 0
+
     def get_unreviewed_replays(self, last_n: int) -> List[Dict]:
         """Get the last N battles that haven't been analyzed yet."""
-        battles = self.get_battle_stats()
-        if not battles:
-            return []
-        
         # Take the last N battles
-        recent_battles = battles[-last_n:] if len(battles) > last_n else battles
+        recent_battles = self.get_battle_stats(limit=last_n)
+        if not recent_battles:
+            return []
         
         # Check which have turn reviews
         unreviewed = []
@@ -153,30 +156,23 @@ class BatchAnalyzer:
         """
         from datetime import datetime, timedelta, timezone
         
-        battles = self.get_battle_stats()
-        if not battles:
-            return [], {"total": 0, "wins": 0, "losses": 0}
-        
         # Filter to battles older than min_age_hours
         cutoff_time = datetime.now(timezone.utc) - timedelta(hours=min_age_hours)
-        old_enough = [
-            b for b in battles 
-            if datetime.fromisoformat(b["timestamp"].replace("Z", "+00:00")) < cutoff_time
-        ]
+        # Take the last N battles from the filtered set
+        recent = self.get_battle_stats(limit=last_n, until=cutoff_time)
         
-        if not old_enough:
+        if not recent:
+            latest = self.get_battle_stats(limit=1)
+            if not latest:
+                return [], {"total": 0, "wins": 0, "losses": 0}
             print(f"⚠ No battles older than {min_age_hours}h found. Replays may not be available yet.")
-            print(f"  Total battles: {len(battles)}")
-            if battles:
-                latest = datetime.fromisoformat(battles[-1]["timestamp"].replace("Z", "+00:00"))
-                age_hours = (datetime.now(timezone.utc) - latest).total_seconds() / 3600
-                print(f"  Latest battle age: {age_hours:.1f}h")
+            print(f"  Total battles: {self.count_battles()}")
+            latest_time = datetime.fromisoformat(latest[-1]["timestamp"].replace("Z", "+00:00"))
+            age_hours = (datetime.now(timezone.utc) - latest_time).total_seconds() / 3600
+            print(f"  Latest battle age: {age_hours:.1f}h")
             return [], {"total": 0, "wins": 0, "losses": 0}
         
-        # Take the last N battles from the filtered set
-        recent = old_enough[-last_n:] if len(old_enough) > last_n else old_enough
-        
-        print(f"✓ Found {len(old_enough)} battles older than {min_age_hours}h, analyzing last {len(recent)}")
+        print(f"✓ Found {self.count_battles(until=cutoff_time)} battles older than {min_age_hours}h, analyzing last {len(recent)}")
         
         # Calculate stats
         stats = {
@@ -420,8 +416,7 @@ Format response as structured improvement report with battle citations.
         local replay JSONs saved, we can still provide value by analyzing win rates,
         team performance, and making recommendations based on aggregate stats.
         """
-        battles = self.get_battle_stats()
-        recent = battles[-last_n:] if len(battles) > last_n else battles
+        recent = self.get_battle_stats(limit=last_n)
         
         # Build stats-focused prompt
         prompt = f"""You are analyzing Pokemon Showdown competitive bot performance data for BugInTheCode.
@@ -9,6 +9,7 @@ from collections import defaultdict
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
+from fp.results_store import RESULTS_DB_NAME, BattleResultsStore  # noqa: E402
 from replay_analysis.turn_review import TurnReviewer
 
 def analyze_replay_for_issues(replay_file: Path, reviewer) -> dict:
@@ -102,16 +103,16 @@ def main():
     replay_dir = Path(__file__).parent
     replay_files = sorted(replay_dir.glob("gen9ou-*.json"))[-30:]  # Last 30 battles
     
-    # Load battle_stats for team info
-    battle_stats_file = PROJECT_ROOT / "battle_stats.json"
+    # Load battle results for team info
     team_map = {}
-    if battle_stats_file.exists():
-        with open(battle_stats_file, 'r') as f:
-            data = json.load(f)
-            for battle in data.get("battles", []):
+    try:
+        with BattleResultsStore(PROJECT_ROOT / RESULTS_DB_NAME) as store:
+            for battle in store.battles():
                 replay_id = battle.get("replay_id", "")
                 team = battle.get("team_file", "unknown")
                 team_map[replay_id] = team
+    except Exception as e:
+        print(f"Could not read battle results: {e}")
     
     # Aggregate results
     stats = {
@@ -2,7 +2,7 @@
 """
 Fouler Play Team Performance Analytics
 =======================================
-Analyzes battle_stats.json and replay files to produce per-team performance
+Analyzes the battle results store and replay files to produce per-team performance
 reports, identify worst matchups, track per-Pokemon KO/faint rates, and
 generate actionable recommendations.
 
@@ -31,7 +31,11 @@ from typing import Any, Dict, List, Optional, Set, Tuple
 # ---------------------------------------------------------------------------
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
-BATTLE_STATS_PATH = PROJECT_ROOT / "battle_stats.json"
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from fp.results_store import RESULTS_DB_NAME, BattleResultsStore  # noqa: E402
+
+BATTLE_RESULTS_DB = PROJECT_ROOT / RESULTS_DB_NAME
 TEAMS_DIR = PROJECT_ROOT / "teams" / "teams"
 REPLAY_ANALYSIS_DIR = PROJECT_ROOT / "replay_analysis"
 LOSSES_DIR = REPLAY_ANALYSIS_DIR / "losses"
@@ -48,7 +52,7 @@ BOT_USERNAME = "ALL CHUNG"
 
 @dataclass
 class BattleRecord:
-    """A single battle entry from battle_stats.json."""
+    """A single battle entry from the battle results store."""
     battle_id: str
     timestamp: str
     team_file: str
@@ -504,20 +508,22 @@ def _bracket_for_rating(rating: int) -> Tuple[str, int, int]:
 # Core analysis engine
 # ---------------------------------------------------------------------------
 
-def load_battle_stats() -> List[BattleRecord]:
-    """Load battle_stats.json and return a list of BattleRecord objects."""
-    if not BATTLE_STATS_PATH.is_file():
-        print(f"[team_performance] battle_stats.json not found at {BATTLE_STATS_PATH}")
-        return []
-
+def load_battle_stats(
+    team_file: Optional[str] = None, since: Optional[datetime] = None
+) -> List[BattleRecord]:
+    """
+    Load battles from the results store (optionally one team's, or those
+    since a time) as BattleRecord objects, oldest first.
+    """
     try:
-        raw = json.loads(BATTLE_STATS_PATH.read_text(encoding="utf-8"))
-    except (OSError, json.JSONDecodeError) as exc:
-        print(f"[team_performance] Failed to read battle_stats.json: {exc}")
+        with BattleResultsStore(BATTLE_RESULTS_DB) as store:
+            battles = store.battles(team_file=team_file, since=since)
+    except Exception as exc:
+        print(f"[team_performance] Failed to read battle results from {BATTLE_RESULTS_DB}: {exc}")
         return []
 
     records: List[BattleRecord] = []
-    for entry in raw.get("battles", []):
+    for entry in battles:
         try:
             records.append(BattleRecord(
                 battle_id=entry["battle_id"],
@@ -533,8 +539,7 @@ def load_battle_stats() -> List[BattleRecord]:
         except (KeyError, ValueError):
             continue
 
-    # Sort by timestamp ascending so windowed stats are computed correctly.
-    records.sort(key=lambda r: r.timestamp)
+    # The store returns them by time, so windowed stats are computed correctly.
     return records
 
 
@@ -31,6 +31,7 @@ from fp.run_battle import (
     cleanup_old_logs,
     _current_worker_id,
 )
+from fp.results_store import BattleResultsStore  # noqa: E402
 from fp.websocket_client import PSWebsocketClient
 
 from data import all_move_json
@@ -110,20 +111,6 @@ def check_dictionaries_are_unmodified(original_pokedex, original_move_json):
         logger.debug("Pokedex JSON unmodified!")
 
 
-BATTLE_STATS_FILE = Path(__file__).resolve().parent / "battle_stats.json"
-
-
-def _battle_stats_max_entries() -> int:
-    raw = os.getenv("BATTLE_STATS_MAX_ENTRIES", "5000").strip()
-    try:
-        return max(100, int(raw))
-    except ValueError:
-        return 5000
-
-
-BATTLE_STATS_MAX_ENTRIES = _battle_stats_max_entries()
-
-
 class BattleStats:
     """Thread-safe battle statistics tracker with per-team persistence"""
     def __init__(self):
@@ -131,45 +118,28 @@ class BattleStats:
         self.losses = 0
         self.battles_run = 0
         self._lock = asyncio.Lock()
-        self._battles = self._load_battles()
+        self._store = self._open_store()
 
-    def _load_battles(self):
+    @staticmethod
+    def _open_store():
         try:
-            if BATTLE_STATS_FILE.exists():
-                data = json.loads(BATTLE_STATS_FILE.read_text(encoding="utf-8"))
-                battles = data.get("battles", [])
-                if not isinstance(battles, list):
-                    return []
-                if len(battles) > BATTLE_STATS_MAX_ENTRIES:
-                    battles = battles[-BATTLE_STATS_MAX_ENTRIES:]
-                return battles
+            return BattleResultsStore()
         except Exception as e:
-            logger.warning("Failed to load battle_stats.json: %s", e)
-        return []
+            logger.warning("Failed to open battle results store: %s", e)
+            return None
 
-    def _save_battles(self):
+    def _record_battle(self, team_file_name, result, battle_tag=None):
+        # a one-row append; battle_stats.json is no longer rewritten
+        if self._store is None:
+            self._store = self._open_store()
+        if self._store is None:
+            return
         try:
-            data = {"battles": self._battles}
-            BATTLE_STATS_FILE.write_text(
-                json.dumps(data, indent=2, ensure_ascii=False),
-                encoding="utf-8",
+            self._store.record(
+                battle_tag or "unknown", team_file_name, result, replay_id=battle_tag or ""
             )
         except Exception as e:
-            logger.warning("Failed to save battle_stats.json: %s", e)
-
-    def _record_battle(self, team_file_name, result, battle_tag=None):
-        from datetime import datetime, timezone
-        entry = {
-            "battle_id": battle_tag or "unknown",
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "team_file": team_file_name or "unknown",
-            "result": result,
-            "replay_id": battle_tag or "",
-        }
-        self._battles.append(entry)
-        if len(self._battles) > BATTLE_STATS_MAX_ENTRIES:
-            del self._battles[:-BATTLE_STATS_MAX_ENTRIES]
-        self._save_battles()
+            logger.warning("Failed to record battle result: %s", e)
 
     async def record_win(self, team_file_name, battle_tag=None):
         async with self._lock:
@@ -520,6 +490,14 @@ async def run_foul_play():
     apply_mods(FoulPlayConfig.pokemon_format)
     validate_constants()
 
+    # Spin up MCTS workers now so the first decision doesn't pay process startup
+    try:
+        from fp.search.parallel_mcts import get_mcts_pool
+
+        await asyncio.get_running_loop().run_in_executor(None, get_mcts_pool().warm)
+    except Exception as e:
+        logger.warning(f"MCTS worker pool warm-up failed: {e}")
+
     original_pokedex = deepcopy(pokedex)
     original_move_json = deepcopy(all_move_json)
 
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Query or export the battle results store (fp/results_store.py).
+
+  count    battles recorded (optionally one team's / result / since a time)
+  teams    wins and losses per team
+  export   write the battle_stats.json snapshot the player machines commit
+
+Usage:
+  python scripts/battle_results.py count --team fat-team-1-stall --since 2026-02-14
+  python scripts/battle_results.py teams
+  python scripts/battle_results.py export
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from fp.results_store import DEFAULT_RESULTS_DB, BattleResultsStore  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("command", choices=("count", "teams", "export"))
+    parser.add_argument(
+        "--db", default=str(DEFAULT_RESULTS_DB), help="results database"
+    )
+    parser.add_argument("--team", default=None, help="only this team file")
+    parser.add_argument("--result", default=None, choices=("win", "loss"))
+    parser.add_argument(
+        "--since", default=None, help="ISO time; only battles from then on"
+    )
+    parser.add_argument(
+        "--out", default=None, help="export path (default: battle_stats.json)"
+    )
+    args = parser.parse_args()
+
+    with BattleResultsStore(args.db) as store:
+        if args.command == "count":
+            print(
+                store.count(team_file=args.team, result=args.result, since=args.since)
+            )
+        elif args.command == "teams":
+            for team, results in sorted(store.team_records(since=args.since).items()):
+                wins, losses = results.get("win", 0), results.get("loss", 0)
+                rate = wins / (wins + losses) if wins + losses else 0.0
+                print(f"{team:<40} {wins:>5}W {losses:>5}L  {rate:6.1%}")
+        else:
+            n = store.export_snapshot(args.out)
+            print(f"Exported {n} battles to {args.out or store.snapshot}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark the copy layer used when sampling opponent worlds.
+
+Compares the previous path (a full `deepcopy` of the battle plus a `deepcopy`
+of every sampled set) with the copy-on-write path used by `prepare_battles`
+(`Battle.fork_opponent` and shared, read-only set templates). Both paths run
+the same per-sample work: every opponent Pokemon is populated from a set and
+the opponent's moves are locked.
+
+Usage:
+  python scripts/bench_battle_sampling.py --samples 32 --rounds 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from copy import deepcopy
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import constants  # noqa: E402
+from data.pkmn_sets import PokemonMoveset, PokemonSet, PredictedPokemonSet  # noqa: E402
+from fp.battle import Battle, LastUsedMove, Pokemon  # noqa: E402
+from fp.search.helpers import populate_pkmn_from_set  # noqa: E402
+
+USER_TEAM = {
+    "garchomp": ["earthquake", "swordsdance", "scaleshot", "stealthrock"],
+    "dragapult": ["shadowball", "dracometeor", "uturn", "flamethrower"],
+    "gholdengo": ["makeitrain", "shadowball", "nastyplot", "recover"],
+    "kingambit": ["kowtowcleave", "suckerpunch", "ironhead", "swordsdance"],
+    "greattusk": ["headlongrush", "closecombat", "rapidspin", "icespinner"],
+    "toxapex": ["scald", "toxic", "recover", "haze"],
+}
+OPPONENT_TEAM = ["landorustherian", "heatran", "corviknight", "rillaboom"]
+OPPONENT_SET = PredictedPokemonSet(
+    pkmn_set=PokemonSet(
+        ability="intimidate",
+        item="leftovers",
+        nature="impish",
+        evs=(252, 0, 252, 0, 4, 0),
+        count=100,
+    ),
+    pkmn_moveset=PokemonMoveset(
+        moves=("earthquake", "uturn", "stealthrock", "protect")
+    ),
+)
+
+
+def build_battle() -> Battle:
+    battle = Battle("battle-gen9ou-bench")
+    battle.pokemon_format = "gen9ou"
+    battle.generation = "gen9"
+    battle.turn = 12
+    battle.weather = constants.SAND
+    battle.weather_turns_remaining = 3
+
+    user = [Pokemon(name, 100) for name in USER_TEAM]
+    for pkmn in user:
+        for mv in USER_TEAM[pkmn.name]:
+            pkmn.add_move(mv)
+    battle.user.active, battle.user.reserve = user[0], user[1:]
+    battle.user.active.boosts[constants.ATTACK] = 2
+    battle.user.side_conditions[constants.STEALTH_ROCK] = 1
+    battle.user.last_used_move = LastUsedMove("garchomp", "swordsdance", 11)
+
+    opponent = [Pokemon(name, 100) for name in OPPONENT_TEAM]
+    battle.opponent.active, battle.opponent.reserve = opponent[0], opponent[1:]
+    battle.opponent.active.add_move("earthquake")
+    battle.opponent.last_used_move = LastUsedMove("landorustherian", "earthquake", 11)
+    battle.msg_list = ["|move|p2a: Landorus|Earthquake|p1a: Garchomp"] * 40
+    battle.request_json = {"side": {"pokemon": [{"ident": n} for n in USER_TEAM]}}
+    return battle
+
+
+def _sample(battle_copy: Battle, copy_set: bool):
+    for pkmn in [battle_copy.opponent.active] + battle_copy.opponent.reserve:
+        pkmn_set = deepcopy(OPPONENT_SET) if copy_set else OPPONENT_SET
+        populate_pkmn_from_set(pkmn, pkmn_set)
+    battle_copy.opponent.lock_moves()
+    return battle_copy
+
+
+def legacy_sampling(battle: Battle, samples: int) -> list[Battle]:
+    return [_sample(deepcopy(battle), copy_set=True) for _ in range(samples)]
+
+
+def cow_sampling(battle: Battle, samples: int) -> list[Battle]:
+    return [_sample(battle.fork_opponent(), copy_set=False) for _ in range(samples)]
+
+
+def _measure(fn, battle: Battle, samples: int, rounds: int) -> tuple[float, int, int]:
+    fn(battle, samples)  # warm-up
+
+    gc.collect()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn(battle, samples)
+    per_round_ms = (time.perf_counter() - start) * 1000 / rounds
+
+    gc.collect()
+    tracemalloc.start()
+    fn(battle, samples)
+    allocated, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return per_round_ms, allocated, peak
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--samples", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    # populate_pkmn_from_set logs every set at INFO
+    import logging
+
+    logging.disable(logging.INFO)
+
+    battle = build_battle()
+    results = {
+        "deepcopy": _measure(legacy_sampling, battle, args.samples, args.rounds),
+        "copy-on-write": _measure(cow_sampling, battle, args.samples, args.rounds),
+    }
+
+    print(f"samples={args.samples} rounds={args.rounds}")
+    print(f"{'path':<14} {'ms/round':>10} {'retained KiB':>14} {'peak KiB':>10}")
+    for name, (ms, allocated, peak) in results.items():
+        print(f"{name:<14} {ms:>10.2f} {allocated / 1024:>14.1f} {peak / 1024:>10.1f}")
+
+    base_ms, base_alloc, _ = results["deepcopy"]
+    cow_ms, cow_alloc, _ = results["copy-on-write"]
+    print(
+        f"speedup {base_ms / max(cow_ms, 1e-9):.2f}x, "
+        f"allocations {100 * (1 - cow_alloc / max(base_alloc, 1)):.0f}% lower"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
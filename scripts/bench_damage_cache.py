@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Benchmark damage-estimate calls per decision with and without the shared cache.
+
+Runs the heuristic work of one decision (`find_ko_line`, `solve_endgame`, then
+`predict_opponent_action`, `detect_forced_line` and `evaluate_position` on
+every sampled opponent world) for a midgame and an endgame position. It counts
+damage-estimate calls and how many of them actually computed a result, first
+without a `damage_cache()` scope (the previous behaviour) and then inside one.
+
+Usage:
+  python scripts/bench_damage_cache.py --worlds 8 --rounds 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import constants  # noqa: E402
+import fp.search.damage as damage  # noqa: E402
+from data.pkmn_sets import PokemonMoveset, PokemonSet, PredictedPokemonSet  # noqa: E402
+from fp.battle import Battle, Pokemon  # noqa: E402
+from fp.search.endgame import solve_endgame  # noqa: E402
+from fp.search.eval import evaluate_position  # noqa: E402
+from fp.search.forced_lines import detect_forced_line  # noqa: E402
+from fp.search.helpers import populate_pkmn_from_set  # noqa: E402
+from fp.search.opponent_predict import predict_opponent_action  # noqa: E402
+
+try:
+    from fp.search.main import find_ko_line
+except ImportError:  # fp.search.main needs poke_engine
+    find_ko_line = None
+
+USER_TEAM = {
+    "garchomp": ["earthquake", "swordsdance", "scaleshot", "stealthrock"],
+    "dragapult": ["shadowball", "dracometeor", "uturn", "flamethrower"],
+    "gholdengo": ["makeitrain", "shadowball", "nastyplot", "recover"],
+    "kingambit": ["kowtowcleave", "suckerpunch", "ironhead", "swordsdance"],
+    "greattusk": ["headlongrush", "closecombat", "rapidspin", "icespinner"],
+    "toxapex": ["scald", "toxic", "recover", "haze"],
+}
+OPPONENT_TEAM = ["landorustherian", "heatran", "corviknight", "rillaboom"]
+OPPONENT_SETS = [
+    PredictedPokemonSet(
+        pkmn_set=PokemonSet(
+            ability="intimidate",
+            item="leftovers",
+            nature="impish",
+            evs=(252, 0, 252, 0, 4, 0),
+            count=100,
+        ),
+        pkmn_moveset=PokemonMoveset(
+            moves=("earthquake", "uturn", "stealthrock", "knockoff")
+        ),
+    ),
+    PredictedPokemonSet(
+        pkmn_set=PokemonSet(
+            ability="intimidate",
+            item="choicescarf",
+            nature="jolly",
+            evs=(0, 252, 0, 0, 4, 252),
+            count=60,
+        ),
+        pkmn_moveset=PokemonMoveset(
+            moves=("earthquake", "uturn", "stoneedge", "bodypress")
+        ),
+    ),
+]
+
+
+def build_battle(user_alive: int, opponent_alive: int) -> Battle:
+    battle = Battle("battle-gen9ou-bench")
+    battle.pokemon_format = "gen9ou"
+    battle.generation = "gen9"
+    battle.turn = 12
+
+    user = [Pokemon(name, 100) for name in list(USER_TEAM)[:user_alive]]
+    for pkmn in user:
+        for mv in USER_TEAM[pkmn.name]:
+            pkmn.add_move(mv)
+    battle.user.active, battle.user.reserve = user[0], user[1:]
+    battle.user.active.boosts[constants.ATTACK] = 1
+
+    opponent = [Pokemon(name, 100) for name in OPPONENT_TEAM[:opponent_alive]]
+    battle.opponent.active, battle.opponent.reserve = opponent[0], opponent[1:]
+    battle.opponent.active.hp = int(battle.opponent.active.max_hp * 0.6)
+    return battle
+
+
+def sample_worlds(battle: Battle, worlds: int) -> list[Battle]:
+    sampled = []
+    for i in range(worlds):
+        world = battle.fork_opponent()
+        for pkmn in [world.opponent.active] + world.opponent.reserve:
+            populate_pkmn_from_set(pkmn, OPPONENT_SETS[i % len(OPPONENT_SETS)])
+        world.opponent.lock_moves()
+        sampled.append(world)
+    return sampled
+
+
+def decide(battle: Battle, worlds: list[Battle]):
+    if find_ko_line is not None:
+        find_ko_line(battle)
+    try:
+        solve_endgame(battle)
+    except Exception:
+        pass  # find_best_move guards the solver the same way
+    for world in worlds:
+        predict_opponent_action(world)
+        detect_forced_line(world)
+        evaluate_position(world)
+
+
+class _Counter:
+    def __init__(self):
+        self.computed = 0
+        self._compute = damage._compute_damage_ratio
+
+    def __call__(self, *args):
+        self.computed += 1
+        return self._compute(*args)
+
+
+def _measure(battle: Battle, worlds: list[Battle], rounds: int, cached: bool):
+    counter = _Counter()
+    damage._compute_damage_ratio = counter
+    try:
+        calls = 0
+        start = time.perf_counter()
+        for _ in range(rounds):
+            if cached:
+                with damage.damage_cache() as cache:
+                    decide(battle, worlds)
+                calls += cache.hits + cache.misses
+            else:
+                decide(battle, worlds)
+        per_decision_ms = (time.perf_counter() - start) * 1000 / rounds
+    finally:
+        damage._compute_damage_ratio = counter._compute
+    if not cached:
+        calls = counter.computed
+    return calls / rounds, counter.computed / rounds, per_decision_ms
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--worlds", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    # the heuristics log every decision at INFO
+    logging.disable(logging.INFO)
+    if find_ko_line is None:
+        print("fp.search.main unavailable (poke_engine missing); skipping find_ko_line")
+
+    print(f"worlds={args.worlds} rounds={args.rounds}")
+    print(
+        f"{'position':<9} {'cache':<6} {'calls':>8} {'computed':>9} {'ms/decision':>12}"
+    )
+    for position, (user_alive, opponent_alive) in {
+        "midgame": (6, 4),
+        "endgame": (2, 1),
+    }.items():
+        battle = build_battle(user_alive, opponent_alive)
+        worlds = sample_worlds(battle, args.worlds)
+        decide(battle, worlds)  # warm-up
+        for cached in (False, True):
+            calls, computed, ms = _measure(battle, worlds, args.rounds, cached)
+            print(
+                f"{position:<9} {'on' if cached else 'off':<6} "
+                f"{calls:>8.0f} {computed:>9.0f} {ms:>12.2f}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark event queue throughput with many producer processes.
+
+Starts --producers processes that each queue --events distinct events as fast
+as they can, while one poster process drains the queue the way
+event_poster.py does (oldest pending event, then mark_posted). The queue is
+first filled with --preload already-posted events, so runs at different
+sizes show whether enqueue and ack cost grows with the queue. Reports
+aggregate enqueue and ack rates and the enqueue latency percentiles.
+
+The queue lives in a temporary directory; the real queue is never touched.
+
+Usage:
+  python scripts/bench_event_queue.py --producers 8 --events 250
+  python scripts/bench_event_queue.py --preload 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import infrastructure.event_queue_lib as eq  # noqa: E402
+
+
+def _use_queue(directory: str):
+    logging.disable(logging.CRITICAL)
+    eq.QUEUE_FILE = Path(directory) / "events_queue.json"
+    eq.QUEUE_DB = Path(directory) / "events_queue.db"
+
+
+def produce(directory: str, worker: int, events: int, start, results):
+    _use_queue(directory)
+    start.wait()
+    latencies = []
+    for i in range(events):
+        begin = time.perf_counter()
+        eq.queue_event(
+            "bench", "battles", f"producer {worker} event {i}", dedup_window_sec=60
+        )
+        latencies.append(time.perf_counter() - begin)
+    results.put(latencies)
+
+
+def post(directory: str, total: int, start, results):
+    _use_queue(directory)
+    start.wait()
+    begin = time.perf_counter()
+    acked = 0
+    while acked < total:
+        pending = eq.get_pending_events(limit=1)
+        if not pending:
+            time.sleep(0.001)
+            continue
+        eq.mark_posted(pending[0]["id"])
+        acked += 1
+    results.put(time.perf_counter() - begin)
+
+
+def preload(directory: str, n: int):
+    _use_queue(directory)
+    for i in range(n):
+        eq.mark_posted(eq.queue_event("bench", "battles", f"preload {i}"))
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--producers", type=int, default=8)
+    parser.add_argument("--events", type=int, default=250, help="events per producer")
+    parser.add_argument(
+        "--preload", type=int, default=0, help="posted events already queued"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        if args.preload:
+            preload(directory, args.preload)
+        total = args.producers * args.events
+        start = multiprocessing.Event()
+        latencies, poster_results = multiprocessing.Queue(), multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(
+                target=produce, args=(directory, worker, args.events, start, latencies)
+            )
+            for worker in range(args.producers)
+        ]
+        processes.append(
+            multiprocessing.Process(
+                target=post, args=(directory, total, start, poster_results)
+            )
+        )
+        for process in processes:
+            process.start()
+        # let every process import and get to the start line
+        time.sleep(1.0)
+        began = time.perf_counter()
+        start.set()
+        enqueue = [t for _ in range(args.producers) for t in latencies.get()]
+        enqueued = time.perf_counter() - began
+        drained = poster_results.get()
+        for process in processes:
+            process.join()
+
+    print(
+        f"{args.producers} producers x {args.events} events, "
+        f"{args.preload} posted events preloaded"
+    )
+    print(
+        f"  enqueue  {total / enqueued:10,.0f} events/s  "
+        f"p50 {percentile(enqueue, 0.5) * 1000:6.2f} ms  "
+        f"p99 {percentile(enqueue, 0.99) * 1000:6.2f} ms"
+    )
+    print(
+        f"  post     {total / drained:10,.0f} events/s  (one poster, concurrent with producers)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark all-pairs damage lookups: scalar estimator vs the matchup matrix.
+
+Sweeps every (attacker, defender) pair on a 6v6 board in both directions and
+takes each attacker's best move, first by calling `estimate_damage_ratio` per
+move and then through `MatchupMatrix` (build time and lookup time reported
+separately). Also times the full heuristic pass of one decision over sampled
+opponent worlds inside a `damage_cache()` scope.
+
+Usage:
+  python scripts/bench_matchup_matrix.py --worlds 8 --rounds 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import timeit
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(PROJECT_ROOT / "scripts"))
+
+import bench_damage_cache as scenario  # noqa: E402
+from fp.search.damage import damage_cache, estimate_damage_ratio  # noqa: E402
+from fp.search.matchup import MatchupMatrix, _side  # noqa: E402
+
+OPPONENT_TEAM = scenario.OPPONENT_TEAM + ["gliscor", "kingambit"]
+
+
+def _pairs(world):
+    user, opponent = _side(world.user), _side(world.opponent)
+    return [(a, d) for a in user for d in opponent] + [
+        (a, d) for a in opponent for d in user
+    ]
+
+
+def scalar_sweep(pairs):
+    return [
+        max((estimate_damage_ratio(a, d, m.name) for m in a.moves), default=0.0)
+        for a, d in pairs
+    ]
+
+
+def matrix_sweep(matrix, pairs):
+    return [matrix.best_damage(a, d) for a, d in pairs]
+
+
+def _best_ms(fn, rounds: int) -> float:
+    return min(timeit.repeat(fn, number=rounds, repeat=5)) * 1000 / rounds
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--worlds", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    scenario.OPPONENT_TEAM = OPPONENT_TEAM
+
+    battle = scenario.build_battle(6, 6)
+    world = scenario.sample_worlds(battle, 1)[0]
+    pairs = _pairs(world)
+    matrix = MatchupMatrix.from_battle(world)
+    assert all(
+        abs(x - y) < 1e-9
+        for x, y in zip(scalar_sweep(pairs), matrix_sweep(matrix, pairs))
+    )
+
+    scalar = _best_ms(lambda: scalar_sweep(pairs), args.rounds)
+    build = _best_ms(lambda: MatchupMatrix.from_battle(world), args.rounds)
+    lookup = _best_ms(lambda: matrix_sweep(matrix, pairs), args.rounds)
+    print(f"all-pairs sweep, 6v6 ({len(pairs)} pairs)")
+    print(f"  scalar estimator   {scalar:8.3f} ms")
+    print(f"  matrix build       {build:8.3f} ms")
+    print(f"  matrix lookups     {lookup:8.3f} ms")
+    print(
+        f"  matrix total       {build + lookup:8.3f} ms  ({scalar / (build + lookup):.1f}x)"
+    )
+
+    worlds = scenario.sample_worlds(battle, args.worlds)
+
+    def decision():
+        with damage_cache():
+            scenario.decide(battle, worlds)
+
+    print(
+        f"heuristic decision, {args.worlds} worlds: {_best_ms(decision, args.rounds // 5 or 1):.2f} ms"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
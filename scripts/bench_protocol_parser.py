@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark protocol processing throughput over saved replay logs.
+
+Replays every log in replay_analysis/*.json through `process_battle_updates`,
+one turn's messages at a time as the bot receives them, with p1 as the user
+side and p2 as the opponent. Reverse damage calc checks are collected but not
+run, so only protocol parsing and battle state updates are timed. Reports
+protocol lines per second (best of --rounds).
+
+Spectator logs carry no request JSON for the user side, so some handlers
+fail on it; those turns are counted and reported, not timed separately.
+
+Usage:
+  python scripts/bench_protocol_parser.py --rounds 5
+  python scripts/bench_protocol_parser.py --replays "replay_analysis/gen9ou-*.json"
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import constants  # noqa: E402
+from fp.battle import Battle, Pokemon  # noqa: E402
+from fp.battle_modifier import process_battle_updates  # noqa: E402
+from fp.helpers import normalize_name  # noqa: E402
+
+
+def load_replays(pattern: str) -> list[dict]:
+    replays = []
+    for path in sorted(glob.glob(pattern)):
+        try:
+            with open(path, encoding="utf-8") as f:
+                replay = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if isinstance(replay, dict) and isinstance(replay.get("log"), str):
+            replays.append(replay)
+    return replays
+
+
+def turn_chunks(log: str) -> list[list[str]]:
+    """The log split into the batches the bot processes: up to each |turn|."""
+    chunks, current = [], []
+    for line in log.split("\n"):
+        current.append(line)
+        if line.startswith("|turn|"):
+            chunks.append(current)
+            current = []
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def build_battle(replay: dict) -> Battle:
+    battle = Battle(replay.get("id", "battle-bench"))
+    battle.user.name = "p1"
+    battle.opponent.name = "p2"
+    formatid = replay.get("formatid") or "gen9ou"
+    battle.pokemon_format = formatid
+    battle.generation = formatid[:4]
+    battle.battle_type = (
+        constants.BattleType.RANDOM_BATTLE
+        if "random" in formatid
+        else constants.BattleType.STANDARD_BATTLE
+    )
+    for line in replay["log"].split("\n"):
+        if line.startswith("|poke|p1|"):
+            species = line.split("|")[3].split(",")[0].replace("-*", "")
+            try:
+                battle.user.reserve.append(Pokemon(normalize_name(species), 100))
+            except KeyError:
+                continue
+    return battle
+
+
+def replay_once(replays: list[dict]) -> tuple[float, int, int]:
+    """Seconds spent in process_battle_updates, lines processed, failed turns."""
+    elapsed, lines, failed = 0.0, 0, 0
+    for replay in replays:
+        battle = build_battle(replay)
+        for chunk in turn_chunks(replay["log"]):
+            battle.msg_list = list(chunk)
+            start = time.perf_counter()
+            try:
+                process_battle_updates(battle, dataset_checks=[])
+            except Exception:
+                failed += 1
+                battle.msg_list.clear()
+            elapsed += time.perf_counter() - start
+            lines += len(chunk)
+    return elapsed, lines, failed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--replays",
+        default=str(PROJECT_ROOT / "replay_analysis" / "*.json"),
+        help="glob of replay JSON files",
+    )
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    # handlers warn about state spectator logs do not carry
+    logging.disable(logging.WARNING)
+    replays = load_replays(args.replays)
+    if not replays:
+        print(f"No replays match {args.replays}")
+        return 1
+
+    best, lines, failed = min(replay_once(replays) for _ in range(args.rounds))
+    print(f"{len(replays)} replays, {lines} protocol lines ({failed} turns failed)")
+    print(
+        f"  process_battle_updates  {best * 1000:9.1f} ms  {lines / best:12,.0f} lines/s"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
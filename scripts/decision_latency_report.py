@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Report per-stage decision latency from decision trace files.
+
+Reads the "stages_ms" recorded by the decision profiler
+(fp/search/profiler.py) in each trace (per-battle JSONL segments, and
+per-turn JSON files from older versions) and prints, per format, the count,
+mean, p50, p95, p99 and max of every stage, slowest stage first. Nested
+stages are shown as "outer/inner" (e.g. "select/switch_penalties").
+
+Usage:
+  python scripts/decision_latency_report.py
+  python scripts/decision_latency_report.py --dir logs/decision_traces --format gen9ou --last 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from fp.decision_trace import read_traces, trace_files  # noqa: E402
+from fp.search.profiler import TOTAL_STAGE, StageLatencies  # noqa: E402
+
+
+def _load_traces(trace_dir: Path) -> list[dict]:
+    """Every trace in trace_dir, oldest file first."""
+    files = [(p.stat().st_mtime, p) for p in trace_dir.glob("*.json")]
+    files += [(p.stat().st_mtime, p) for p in trace_files(trace_dir)]
+    traces = []
+    for _mtime, path in sorted(files):
+        if path.suffix == ".json":
+            try:
+                with open(path, encoding="utf-8") as f:
+                    traces.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        else:
+            records, _offset = read_traces(path)
+            traces.extend(trace for _, trace in records if trace is not None)
+    return traces
+
+
+def load_stage_latencies(
+    trace_dir: Path, pokemon_format: str | None = None, last: int | None = None
+) -> tuple[StageLatencies, int]:
+    latencies = StageLatencies(window=None)
+    profiled = 0
+    traces = _load_traces(trace_dir)
+    if last:
+        traces = traces[-last:]
+    for trace in traces:
+        if not isinstance(trace, dict):
+            continue
+        stages_ms = trace.get("stages_ms")
+        if not isinstance(stages_ms, dict):
+            continue
+        if pokemon_format and trace.get("format") != pokemon_format:
+            continue
+        latencies.record(trace.get("format"), stages_ms)
+        profiled += 1
+    return latencies, profiled
+
+
+def _print_report(report: dict[str, dict[str, dict]]):
+    for fmt in sorted(report):
+        rows = report[fmt]
+        total_mean = rows.get(TOTAL_STAGE, {}).get("mean", 0.0)
+        print(f"\n{fmt} ({rows.get(TOTAL_STAGE, {}).get('count', 0)} decisions)")
+        print(
+            f"  {'stage':<36} {'count':>6} {'mean':>9} {'p50':>9} "
+            f"{'p95':>9} {'p99':>9} {'max':>9} {'share':>6}"
+        )
+        for name, row in rows.items():
+            share = (
+                f"{row['mean'] / total_mean:6.1%}"
+                if total_mean and name != TOTAL_STAGE
+                else ""
+            )
+            print(
+                f"  {name:<36} {row['count']:>6} {row['mean']:>9.1f} "
+                f"{row['p50']:>9.1f} {row['p95']:>9.1f} {row['p99']:>9.1f} "
+                f"{row['max']:>9.1f} {share:>6}"
+            )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--dir",
+        default=os.getenv("DECISION_TRACE_DIR", "logs/decision_traces"),
+        help="decision trace directory",
+    )
+    parser.add_argument("--format", default=None, help="only this format")
+    parser.add_argument(
+        "--last", type=int, default=None, help="only the newest N traces"
+    )
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    trace_dir = Path(args.dir)
+    if not trace_dir.is_dir():
+        print(f"No trace directory at {trace_dir}")
+        return 1
+
+    latencies, profiled = load_stage_latencies(trace_dir, args.format, args.last)
+    if not profiled:
+        print(f"No profiled decisions in {trace_dir}")
+        return 1
+
+    report = latencies.report()
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{profiled} profiled decisions from {trace_dir} (times in ms)")
+        _print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -14,24 +14,24 @@ from typing import Dict, List, Optional
 import re
 import psutil
 
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fp.results_store import RESULTS_DB_NAME, BattleResultsStore
+
 
 class StabilityMonitor:
     def __init__(self, project_root: str = "/home/ryan/projects/fouler-play"):
         self.project_root = Path(project_root)
-        self.battle_stats_file = self.project_root / "battle_stats.json"
+        self.battle_results_db = self.project_root / RESULTS_DB_NAME
         self.stability_report_file = self.project_root / "stability_report.json"
         self.log_dir = self.project_root / "logs"
         self.service_name = "fouler-play.service"
         
-    def load_battle_stats(self) -> List[Dict]:
-        """Load battle statistics from JSON file."""
-        if not self.battle_stats_file.exists():
-            return []
-        
+    def load_battle_stats(self, limit: Optional[int] = None) -> List[Dict]:
+        """Load the newest `limit` battles (all by default) from the results store, oldest first."""
         try:
-            with open(self.battle_stats_file, 'r') as f:
-                data = json.load(f)
-                return data.get('battles', [])
+            with BattleResultsStore(self.battle_results_db) as store:
+                return store.battles(limit=limit)
         except Exception as e:
             print(f"Error loading battle stats: {e}")
             return []
@@ -267,16 +267,15 @@ class StabilityMonitor:
     
     def generate_report(self, recent_count: int = 100) -> Dict:
         """Generate comprehensive stability report."""
-        battles = self.load_battle_stats()
+        recent_battles = self.load_battle_stats(limit=recent_count)
         
-        if not battles:
+        if not recent_battles:
             return {
                 "error": "No battle data found",
                 "timestamp": datetime.now(timezone.utc).isoformat()
             }
         
         # Analyze recent battles
-        recent_battles = battles[-recent_count:] if len(battles) > recent_count else battles
         total_battles = len(recent_battles)
         
         # Count wins/losses
@@ -5,6 +5,10 @@ Hybrid decision dashboard data + route helpers.
 This module is intentionally read-only with respect to gameplay state. It
 parses decision traces, merges stream state files, and serves sanitized
 dashboard payloads.
+
+Traces are read from the per-battle JSONL segments written by
+fp/decision_trace.py, tailed from the last offset read on each refresh, and
+from per-turn JSON files left by older versions.
 """
 
 from __future__ import annotations
@@ -15,13 +19,14 @@ import re
 import threading
 import time
 from collections import Counter
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
 from aiohttp import web
 
+from fp.decision_trace import COMPRESSED_TRACE_SUFFIX, TRACE_SUFFIX, read_traces
 from streaming import state_store
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
@@ -299,11 +304,23 @@ class _TraceFileEntry:
     parse_error: bool
 
 
+@dataclass
+class _TraceStreamEntry:
+    """A JSONL trace segment, read up to `offset`."""
+
+    offset: int = 0
+    size: int = 0
+    records: int = 0
+    turns: list[dict[str, Any]] = field(default_factory=list)
+    parse_errors: int = 0
+
+
 class DecisionTraceCache:
     def __init__(self, trace_dir: Path, *, scan_interval_sec: float = DEFAULT_SCAN_INTERVAL_SEC):
         self.trace_dir = trace_dir
         self.scan_interval_sec = max(0.2, float(scan_interval_sec))
         self._entries: dict[Path, _TraceFileEntry] = {}
+        self._streams: dict[Path, _TraceStreamEntry] = {}
         self._turns: list[dict[str, Any]] = []
         self._parse_errors = 0
         self._last_scan_epoch = 0.0
@@ -334,6 +351,7 @@ class DecisionTraceCache:
     def _refresh_locked(self, now: float) -> None:
         if not self.trace_dir.exists():
             self._entries = {}
+            self._streams = {}
             self._turns = []
             self._parse_errors = 0
             self._last_scan_epoch = now
@@ -346,27 +364,48 @@ class DecisionTraceCache:
         except Exception:
             dir_signature = None
 
-        # Fast path: no directory-level changes since last scan.
+        # The directory only changes when files are added or removed;
+        # appends to the JSONL segments are picked up by _tail_streams.
+        changed = False
         if (
-            dir_signature is not None
-            and self._last_dir_signature == dir_signature
-            and self._entries
+            dir_signature is None
+            or self._last_dir_signature != dir_signature
+            or not (self._entries or self._streams)
         ):
-            self._last_scan_epoch = now
-            return
+            changed = self._scan_files()
+        if self._tail_streams():
+            changed = True
+
+        if changed:
+            self._rebuild_turns()
+        self._last_scan_epoch = now
+        self._last_dir_signature = dir_signature
 
+    def _scan_files(self) -> bool:
+        """Pick up added/removed trace files and re-read changed JSON files."""
         current_signatures: dict[Path, tuple[int, int]] = {}
-        for path in self.trace_dir.glob("*.json"):
+        current_streams: set[Path] = set()
+        for path in self.trace_dir.iterdir():
+            if path.name.endswith((TRACE_SUFFIX, COMPRESSED_TRACE_SUFFIX)):
+                current_streams.add(path)
+                continue
+            if path.suffix != ".json":
+                continue
             try:
                 stat = path.stat()
             except Exception:
                 continue
             current_signatures[path] = (int(stat.st_mtime_ns), int(stat.st_size))
 
-        existing_paths = set(self._entries)
-        current_paths = set(current_signatures)
-        for removed_path in existing_paths - current_paths:
+        changed = False
+        for removed_path in set(self._entries) - set(current_signatures):
             self._entries.pop(removed_path, None)
+            changed = True
+        for removed_path in set(self._streams) - current_streams:
+            self._streams.pop(removed_path, None)
+            changed = True
+        for path in current_streams - set(self._streams):
+            self._streams[path] = _TraceStreamEntry()
 
         for path, signature in current_signatures.items():
             cached = self._entries.get(path)
@@ -378,7 +417,42 @@ class DecisionTraceCache:
                 parsed_turn=parsed_turn,
                 parse_error=parsed_turn is None,
             )
+            changed = True
+        return changed
 
+    def _tail_streams(self) -> bool:
+        """Parse the records appended to each JSONL segment since the last read."""
+        changed = False
+        for path, entry in self._streams.items():
+            try:
+                stat = path.stat()
+            except Exception:
+                continue
+            if stat.st_size == entry.size:
+                continue
+            if stat.st_size < entry.offset:
+                # replaced by a different file: start over
+                entry = self._streams[path] = _TraceStreamEntry()
+                changed = True
+            records, entry.offset = read_traces(path, entry.offset)
+            entry.size = stat.st_size
+            for _offset, payload in records:
+                entry.records += 1
+                parsed_turn = None
+                if payload is not None:
+                    parsed_turn = parse_trace_turn(
+                        payload,
+                        source_name=f"{path.name}:{entry.records}",
+                        fallback_epoch=stat.st_mtime,
+                    )
+                if parsed_turn is None:
+                    entry.parse_errors += 1
+                else:
+                    entry.turns.append(parsed_turn)
+                changed = True
+        return changed
+
+    def _rebuild_turns(self) -> None:
         turns: list[dict[str, Any]] = []
         parse_errors = 0
         for entry in self._entries.values():
@@ -386,6 +460,9 @@ class DecisionTraceCache:
                 parse_errors += 1
             if entry.parsed_turn is not None:
                 turns.append(entry.parsed_turn)
+        for stream in self._streams.values():
+            parse_errors += stream.parse_errors
+            turns.extend(stream.turns)
         turns.sort(
             key=lambda turn: (
                 _safe_float(turn.get("sort_ts"), default=0.0),
@@ -396,8 +473,6 @@ class DecisionTraceCache:
 
         self._turns = turns
         self._parse_errors = parse_errors
-        self._last_scan_epoch = now
-        self._last_dir_signature = dir_signature
 
     def get_turns(self, *, limit: int) -> list[dict[str, Any]]:
         self.refresh()
@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 """Test the watcher notification system without requiring Ollama."""
 
-import json
 import sys
 from datetime import datetime
 from pathlib import Path
@@ -9,10 +8,11 @@ from pathlib import Path
 PROJECT_ROOT = Path(__file__).resolve().parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
+from fp.results_store import BattleResultsStore  # noqa: E402
 from pipeline import Pipeline
 
 def create_test_battle_data():
-    """Create test battle_stats.json for cross-referencing."""
+    """Create a test battle results store for cross-referencing."""
     # Generate 30 test battles with realistic distribution
     test_battles = []
     
@@ -79,9 +79,16 @@ def create_test_battle_data():
         })
     
     # Save to temporary location for test
-    test_stats_file = PROJECT_ROOT / "battle_stats_TEST.json"
-    with open(test_stats_file, 'w') as f:
-        json.dump({"battles": test_battles}, f, indent=2)
+    test_stats_file = PROJECT_ROOT / "battle_results_TEST.db"
+    with BattleResultsStore(test_stats_file, snapshot=test_stats_file.with_suffix(".json")) as store:
+        for battle in test_battles:
+            store.record(
+                battle["battle_id"],
+                battle["team_file"],
+                battle["result"],
+                replay_id=battle["replay_id"],
+                timestamp=datetime.fromisoformat(battle["timestamp"]),
+            )
     
     print(f"✅ Created {len(test_battles)} test battles (14 losses, 16 wins)")
     return test_stats_file
@@ -191,8 +198,8 @@ def main():
     
     # Temporarily swap battle stats file for testing
     import pipeline as pipeline_module
-    original_stats_file = pipeline_module.BATTLE_STATS_FILE
-    pipeline_module.BATTLE_STATS_FILE = test_stats_file
+    original_stats_file = pipeline_module.BATTLE_RESULTS_DB
+    pipeline_module.BATTLE_RESULTS_DB = test_stats_file
     
     try:
         pipeline = Pipeline()
@@ -206,10 +213,10 @@ def main():
         return False
     finally:
         # Restore original stats file
-        pipeline_module.BATTLE_STATS_FILE = original_stats_file
-        # Clean up test file
-        if test_stats_file.exists():
-            test_stats_file.unlink()
+        pipeline_module.BATTLE_RESULTS_DB = original_stats_file
+        # Clean up test database (and its WAL files)
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{test_stats_file}{suffix}").unlink(missing_ok=True)
     
     return True
 
@@ -1,5 +1,9 @@
+import pickle
 import unittest
+from copy import deepcopy
 
+import constants
+from fp.battle import Battle
 from fp.battle import LastUsedMove
 from fp.battle import Battler
 from fp.battle import Pokemon
@@ -176,3 +180,89 @@ class TestBattlerActiveLockedIntoMove(unittest.TestCase):
         self.assertFalse(self.battler.active.get_move("thunderbolt").disabled)
         self.assertFalse(self.battler.active.get_move("agility").disabled)
         self.assertFalse(self.battler.active.get_move("doubleteam").disabled)
+
+
+class TestBattleSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.battle = Battle("battle-gen9ou-1")
+        self.battle.pokemon_format = "gen9ou"
+        self.battle.turn = 7
+        self.battle.weather = constants.RAIN
+        self.battle.user.active = Pokemon("garchomp", 100)
+        self.battle.user.active.add_move("earthquake")
+        self.battle.user.active.add_move("swordsdance")
+        self.battle.user.active.boosts[constants.ATTACK] = 2
+        self.battle.user.active.volatile_statuses.append(constants.SUBSTITUTE)
+        self.battle.user.reserve = [Pokemon("toxapex", 100)]
+        self.battle.user.side_conditions[constants.SPIKES] = 2
+        self.battle.user.last_used_move = LastUsedMove("garchomp", "earthquake", 6)
+        self.battle.opponent.active = Pokemon("gholdengo", 100)
+        self.battle.opponent.active.impossible_items.add("choicescarf")
+        self.battle.opponent.active.opponent_move_uses["makeitrain"] += 2
+        self.battle.opponent.reserve = [Pokemon("kingambit", 100)]
+        self.battle.request_json = {"side": {"pokemon": []}}
+
+    def test_battle_is_picklable(self):
+        restored = pickle.loads(pickle.dumps(self.battle))
+        self.assertEqual(self.battle.snapshot(), restored.snapshot())
+
+    def test_bytes_round_trip(self):
+        restored = Battle.from_bytes(self.battle.to_bytes())
+        self.assertEqual(self.battle.snapshot(), restored.snapshot())
+        self.assertEqual(self.battle.user.last_used_move, restored.user.last_used_move)
+        self.assertEqual({"choicescarf"}, restored.opponent.active.impossible_items)
+        self.assertEqual(2, restored.opponent.active.opponent_move_uses["makeitrain"])
+        self.assertEqual(self.battle.user.active.stats, restored.user.active.stats)
+
+    def test_clone_matches_deepcopy(self):
+        self.assertEqual(
+            deepcopy(self.battle).snapshot(), self.battle.clone().snapshot()
+        )
+
+    def test_clone_does_not_alias_mutable_state(self):
+        clone = self.battle.clone()
+        clone.user.active.boosts[constants.DEFENSE] = 1
+        clone.user.active.moves[0].disabled = True
+        clone.user.active.volatile_statuses.clear()
+        clone.user.side_conditions[constants.STEALTH_ROCK] = 1
+        clone.opponent.reserve.pop()
+        clone.opponent.active.impossible_items.add("leftovers")
+
+        self.assertEqual(0, self.battle.user.active.boosts[constants.DEFENSE])
+        self.assertFalse(self.battle.user.active.moves[0].disabled)
+        self.assertEqual(
+            [constants.SUBSTITUTE], self.battle.user.active.volatile_statuses
+        )
+        self.assertEqual(0, self.battle.user.side_conditions[constants.STEALTH_ROCK])
+        self.assertEqual(1, len(self.battle.opponent.reserve))
+        self.assertNotIn("leftovers", self.battle.opponent.active.impossible_items)
+
+    def test_restored_counters_default_to_zero(self):
+        restored = Battle.from_bytes(self.battle.to_bytes())
+        self.assertEqual(0, restored.user.active.boosts[constants.SPEED])
+        self.assertEqual(0, restored.opponent.side_conditions[constants.REFLECT])
+
+    def test_ad_hoc_attributes_are_preserved(self):
+        self.battle.user.active.index = 3
+        self.battle.gameplan = {"plan": "stall"}
+        restored = Battle.from_bytes(self.battle.to_bytes())
+        self.assertEqual(3, restored.user.active.index)
+        self.assertEqual({"plan": "stall"}, restored.gameplan)
+
+    def test_fork_opponent_shares_user_side(self):
+        fork = self.battle.fork_opponent()
+        self.assertIs(self.battle.user, fork.user)
+        self.assertIs(self.battle.msg_list, fork.msg_list)
+        self.assertEqual(self.battle.snapshot(), fork.snapshot())
+
+    def test_fork_opponent_does_not_alias_opponent(self):
+        fork = self.battle.fork_opponent()
+        fork.opponent.active.item = "leftovers"
+        fork.opponent.active.add_move("shadowball")
+        fork.opponent.reserve.append(Pokemon("greattusk", 100))
+        fork.weather = None
+
+        self.assertNotEqual("leftovers", self.battle.opponent.active.item)
+        self.assertEqual([], self.battle.opponent.active.moves)
+        self.assertEqual(1, len(self.battle.opponent.reserve))
+        self.assertEqual(constants.RAIN, self.battle.weather)
@@ -1,6 +1,7 @@
 import unittest
 import json
 from collections import defaultdict
+from copy import deepcopy
 
 import constants
 from constants import BattleType
@@ -64,8 +65,14 @@ from fp.battle_modifier import get_damage_dealt
 from fp.battle_modifier import singleturn
 from fp.battle_modifier import transform
 from fp.battle_modifier import process_battle_updates
+from fp.search.features import BOOSTS, FIELD, clear_features, get_feature_store
 from fp.battle_modifier import upkeep
 from fp.battle_modifier import inactive
+from fp.battle_modifier import update_dataset_possibilities
+from fp.battle_modifier import prepare_dataset_check
+from fp.battle_modifier import run_dataset_checks
+from fp.search.poke_engine_helpers import poke_engine_get_damage_rolls
+from fp.search.poke_engine_helpers import poke_engine_get_damage_rolls_batch
 
 
 class TestRequestMessage(unittest.TestCase):
@@ -6635,6 +6642,160 @@ class TestInactiveOff(unittest.TestCase):
         self.assertIsNone(self.battle.time_remaining)
 
 
+class TestUpdateDatasetPossibilities(unittest.TestCase):
+    def setUp(self):
+        self.battle = Battle(None)
+        self.battle.battle_type = BattleType.BATTLE_FACTORY
+        self.battle.generation = "gen9"
+        self.battle.user.name = "p1"
+        self.battle.opponent.name = "p2"
+
+        self.battle.user.active = Pokemon("toxapex", 100)
+        self.battle.opponent.active = Pokemon("garchomp", 100)
+        self.battle.user.last_used_move = LastUsedMove("toxapex", "haze", 1)
+        self.battle.user.last_selected_move = LastUsedMove("toxapex", "haze", 1)
+        self.battle.opponent.last_used_move = LastUsedMove("garchomp", "earthquake", 1)
+
+        self.strong_set = PredictedPokemonSet(
+            pkmn_set=PokemonSet(
+                ability="roughskin",
+                item="leftovers",
+                nature="adamant",
+                evs=(0, 252, 0, 0, 4, 252),
+                count=1,
+            ),
+            pkmn_moveset=PokemonMoveset(moves=["earthquake"]),
+        )
+        self.weak_set = PredictedPokemonSet(
+            pkmn_set=PokemonSet(
+                ability="roughskin",
+                item="leftovers",
+                nature="bold",
+                evs=(252, 0, 252, 0, 4, 0),
+                count=1,
+            ),
+            pkmn_moveset=PokemonMoveset(moves=["earthquake"]),
+        )
+        TeamDatasets.pkmn_sets = {"garchomp": [self.strong_set, self.weak_set]}
+
+    def _strong_set_damage_dealt(self):
+        battle_copy = deepcopy(self.battle)
+        battle_copy.opponent.active.ability = "roughskin"
+        battle_copy.opponent.active.item = "leftovers"
+        battle_copy.opponent.active.set_spread("adamant", "0,252,0,0,4,252")
+        _, rolls = poke_engine_get_damage_rolls(battle_copy, "haze", "earthquake", True)
+        return DamageDealt(
+            attacker="garchomp",
+            defender="toxapex",
+            move="earthquake",
+            percent_damage=rolls[0] / self.battle.user.active.max_hp,
+            crit=False,
+        )
+
+    def test_batch_matches_individual_damage_rolls(self):
+        candidates = [
+            ("roughskin", "leftovers", "adamant", (0, 252, 0, 0, 4, 252)),
+            ("roughskin", "leftovers", "bold", (252, 0, 252, 0, 4, 0)),
+            ("roughskin", "leftovers", "adamant", (0, 252, 0, 0, 4, 252)),
+        ]
+        batch = poke_engine_get_damage_rolls_batch(
+            deepcopy(self.battle), candidates, "haze", "earthquake", True
+        )
+        for (ability, item, nature, evs), rolls in zip(candidates, batch):
+            battle_copy = deepcopy(self.battle)
+            battle_copy.opponent.active.ability = ability
+            battle_copy.opponent.active.item = item
+            battle_copy.opponent.active.set_spread(nature, list(evs))
+            self.assertEqual(
+                poke_engine_get_damage_rolls(battle_copy, "haze", "earthquake", True),
+                rolls,
+            )
+
+    def test_set_inconsistent_with_damage_is_removed(self):
+        update_dataset_possibilities(
+            self.battle, self._strong_set_damage_dealt(), "damage_dealt"
+        )
+        self.assertEqual([self.strong_set], TeamDatasets.pkmn_sets["garchomp"])
+
+    def test_prepared_check_runs_against_the_snapshot(self):
+        check = prepare_dataset_check(
+            self.battle, self._strong_set_damage_dealt(), "damage_dealt"
+        )
+        self.assertEqual(2, len(TeamDatasets.pkmn_sets["garchomp"]))
+
+        # the battle moving on does not change what the check sees
+        self.battle.opponent.active.boosts[constants.ATTACK] = 6
+        run_dataset_checks([check])
+        self.assertEqual([self.strong_set], TeamDatasets.pkmn_sets["garchomp"])
+
+    def test_uninformative_damage_prepares_no_check(self):
+        damage_dealt = DamageDealt(
+            attacker="garchomp",
+            defender="toxapex",
+            move="earthquake",
+            percent_damage=0,
+            crit=False,
+        )
+        self.assertIsNone(
+            prepare_dataset_check(self.battle, damage_dealt, "damage_dealt")
+        )
+
+
+class TestRandomBattleDatasetCheck(unittest.TestCase):
+    def setUp(self):
+        RandomBattleTeamDatasets.initialize("gen9")
+        self.battle = Battle(None)
+        self.battle.battle_type = BattleType.RANDOM_BATTLE
+        self.battle.generation = "gen9"
+        self.battle.user.name = "p1"
+        self.battle.opponent.name = "p2"
+
+        sets = RandomBattleTeamDatasets.pkmn_sets["weavile"]
+        self.num_sets = len(sets)
+        level = sets[0].pkmn_set.level
+        self.battle.user.active = Pokemon("garchomp", 100)
+        self.battle.opponent.active = Pokemon("weavile", level)
+        self.battle.user.last_used_move = LastUsedMove("garchomp", "swordsdance", 1)
+        self.battle.user.last_selected_move = LastUsedMove("garchomp", "swordsdance", 1)
+        self.battle.opponent.last_used_move = LastUsedMove("weavile", "iceshard", 1)
+
+    def _choiceband_damage_dealt(self):
+        battle_copy = deepcopy(self.battle)
+        battle_copy.opponent.active.ability = "pickpocket"
+        battle_copy.opponent.active.item = "choiceband"
+        battle_copy.opponent.active.set_spread("serious", "85,85,85,85,85,85")
+        _, rolls = poke_engine_get_damage_rolls(
+            battle_copy, "swordsdance", "iceshard", True
+        )
+        return DamageDealt(
+            attacker="weavile",
+            defender="garchomp",
+            move="iceshard",
+            percent_damage=rolls[0] / self.battle.user.active.max_hp,
+            crit=False,
+        )
+
+    def test_ruled_out_sets_are_removed_from_the_battle_view(self):
+        check = prepare_dataset_check(
+            self.battle, self._choiceband_damage_dealt(), "damage_dealt"
+        )
+        run_dataset_checks([check])
+
+        remaining = RandomBattleTeamDatasets.pkmn_sets["weavile"]
+        self.assertLess(0, len(remaining))
+        self.assertLess(len(remaining), self.num_sets)
+        self.assertEqual({"choiceband"}, {s.pkmn_set.item for s in remaining})
+
+    def test_ruled_out_sets_stay_in_the_shared_store(self):
+        store_len = len(RandomBattleTeamDatasets._load_raw_sets("gen9").sets("weavile"))
+        update_dataset_possibilities(
+            self.battle, self._choiceband_damage_dealt(), "damage_dealt"
+        )
+
+        RandomBattleTeamDatasets.initialize("gen9")
+        self.assertEqual(store_len, len(RandomBattleTeamDatasets.pkmn_sets["weavile"]))
+
+
 class TestGetDamageDealt(unittest.TestCase):
     def setUp(self):
         self.battle = Battle(None)
@@ -7014,3 +7175,25 @@ class TestNoInit(unittest.TestCase):
         process_battle_updates(self.battle)
 
         self.assertEqual(self.battle.battle_tag, new_battle_tag)
+
+
+class TestProcessBattleUpdatesInvalidatesFeatures(unittest.TestCase):
+    def setUp(self):
+        self.battle = Battle("battle-modifier-features")
+        self.battle.user.name = "p1"
+        self.battle.user.active = Pokemon("Caterpie", 100)
+        self.battle.opponent.name = "p2"
+        self.battle.opponent.active = Pokemon("Pikachu", 100)
+        self.addCleanup(clear_features, self.battle.battle_tag)
+        self.store = get_feature_store(self.battle.battle_tag)
+        self.store.bind(self.battle.clone(), self.battle)
+        self.store.entries = {
+            ("weather",): (frozenset({FIELD}), None),
+            ("speed",): (frozenset({BOOSTS}), None),
+        }
+
+    def test_only_features_of_the_changed_groups_are_dropped(self):
+        self.battle.msg_list = ["|-boost|p2a: Pikachu|spe|1"]
+        process_battle_updates(self.battle)
+        self.assertEqual([("weather",)], list(self.store.entries))
+        self.assertIsNone(self.store.owner)
@@ -0,0 +1,122 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from fp.search.cancellation import (
+    CancellationToken,
+    SearchCancelled,
+    cancellation_scope,
+    cancellation_stats,
+    check_cancelled,
+    current_cancel_token,
+)
+from fp.search.parallel_mcts import MCTSWorkerPool, run_mcts_samples
+from fp.search.scheduler import DecisionScheduler
+
+
+def _slow_search(state_string, search_time_ms):
+    time.sleep(0.2)
+    return 10, [(state_string, 10.0)]
+
+
+class TestCancellationToken(unittest.TestCase):
+    def test_check_outside_a_scope_does_nothing(self):
+        self.assertIsNone(current_cancel_token())
+        check_cancelled()
+
+    def test_check_raises_once_cancelled(self):
+        token = CancellationToken()
+        with cancellation_scope(token):
+            check_cancelled()
+            token.cancel("timeout")
+            with self.assertRaises(SearchCancelled):
+                check_cancelled()
+        self.assertEqual("timeout", token.reason)
+        self.assertIsNone(current_cancel_token())
+
+    def test_broad_exception_handlers_do_not_swallow_it(self):
+        token = CancellationToken()
+        token.cancel()
+
+        def guarded():
+            try:
+                token.raise_if_cancelled()
+            except Exception:
+                return "swallowed"
+
+        with self.assertRaises(SearchCancelled):
+            guarded()
+
+
+class TestCancelledSamples(unittest.TestCase):
+    def setUp(self):
+        self.pool = MCTSWorkerPool(
+            max_workers=1, search_fn=_slow_search, use_processes=False
+        )
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_unstarted_samples_are_dropped(self):
+        token = CancellationToken()
+        saved_before = cancellation_stats()["cpu_seconds_saved"]
+        threading.Timer(0.05, token.cancel).start()
+
+        start = time.monotonic()
+        results = list(
+            run_mcts_samples(
+                ["a", "b", "c", "d"],
+                1000,
+                pool=self.pool,
+                timeout_sec=5,
+                cancel_token=token,
+            )
+        )
+        elapsed = time.monotonic() - start
+
+        self.assertEqual([], results)
+        self.assertLess(elapsed, 0.15)
+        # three samples never started, 1000ms each
+        self.assertAlmostEqual(
+            3.0, cancellation_stats()["cpu_seconds_saved"] - saved_before
+        )
+
+
+class TestSchedulerCancellation(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = DecisionScheduler(slots=1)
+        self.addCleanup(self.scheduler.shutdown)
+
+    def test_timed_out_decision_stops_at_its_next_check(self):
+        stopped = threading.Event()
+
+        def search():
+            try:
+                while True:
+                    check_cancelled()
+                    time.sleep(0.001)
+            finally:
+                stopped.set()
+
+        async def run():
+            job = self.scheduler.submit(search)
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(job.future, timeout=0.05)
+            return job
+
+        cancelled_before = cancellation_stats()["cancelled"]
+        job = asyncio.run(run())
+        self.assertTrue(stopped.wait(1.0))
+        self.assertTrue(job.metrics()["cancelled"])
+        deadline = time.monotonic() + 1.0
+        while (
+            cancellation_stats()["cancelled"] == cancelled_before
+            and time.monotonic() < deadline
+        ):
+            time.sleep(0.005)
+        self.assertEqual(cancelled_before + 1, cancellation_stats()["cancelled"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import unittest
+
+import constants
+from fp.battle import Pokemon
+from fp.helpers import POKEMON_TYPE_INDICES
+from fp.search.damage import (
+    damage_cache,
+    defensive_profile,
+    estimate_damage_ratio,
+    max_effectiveness,
+    with_damage_cache,
+)
+
+
+class TestEstimateDamageRatio(unittest.TestCase):
+    def setUp(self):
+        self.attacker = Pokemon("garchomp", 100)
+        self.defender = Pokemon("heatran", 100)
+
+    def test_super_effective_stab_move_beats_resisted_move(self):
+        earthquake = estimate_damage_ratio(self.attacker, self.defender, "earthquake")
+        dragonclaw = estimate_damage_ratio(self.attacker, self.defender, "dragonclaw")
+        self.assertGreater(earthquake, dragonclaw)
+
+    def test_status_move_deals_no_damage(self):
+        self.assertEqual(
+            0.0, estimate_damage_ratio(self.attacker, self.defender, "swordsdance")
+        )
+
+    def test_fixed_damage_move_uses_level(self):
+        self.attacker.level = 50
+        damage = estimate_damage_ratio(self.attacker, self.defender, "seismictoss")
+        self.assertAlmostEqual(50 / self.defender.max_hp, damage)
+
+    def test_tera_changes_defender_effectiveness(self):
+        neutral = estimate_damage_ratio(self.attacker, self.defender, "earthquake")
+        self.defender.tera_type = "flying"
+        self.defender.terastallized = True
+        self.assertEqual(
+            0.0, estimate_damage_ratio(self.attacker, self.defender, "earthquake")
+        )
+        self.assertGreater(neutral, 0.0)
+
+
+class TestDefensiveProfile(unittest.TestCase):
+    def setUp(self):
+        self.pokemon = Pokemon("heatran", 100)
+
+    def test_profile_uses_base_types(self):
+        profile = defensive_profile(self.pokemon)
+        self.assertEqual(4, profile[POKEMON_TYPE_INDICES["ground"]])
+        self.assertEqual(0.25, profile[POKEMON_TYPE_INDICES["grass"]])
+
+    def test_terastallized_profile_uses_tera_type(self):
+        self.pokemon.tera_type = "flying"
+        self.assertEqual(
+            4, defensive_profile(self.pokemon)[POKEMON_TYPE_INDICES["ground"]]
+        )
+        self.pokemon.terastallized = True
+        self.assertEqual(
+            0, defensive_profile(self.pokemon)[POKEMON_TYPE_INDICES["ground"]]
+        )
+
+    def test_max_effectiveness(self):
+        self.assertEqual(4, max_effectiveness(["water", "ground"], self.pokemon))
+        self.assertEqual(1.0, max_effectiveness([], self.pokemon))
+
+
+class TestDamageCache(unittest.TestCase):
+    def setUp(self):
+        self.attacker = Pokemon("garchomp", 100)
+        self.defender = Pokemon("heatran", 100)
+
+    def test_repeated_calls_hit_the_cache(self):
+        with damage_cache() as cache:
+            first = estimate_damage_ratio(self.attacker, self.defender, "earthquake")
+            second = estimate_damage_ratio(self.attacker, self.defender, "earthquake")
+        self.assertEqual(first, second)
+        self.assertEqual(1, cache.misses)
+        self.assertEqual(1, cache.hits)
+
+    def test_equal_pokemon_share_an_entry(self):
+        copy = Pokemon.from_state(self.attacker.to_state())
+        with damage_cache() as cache:
+            estimate_damage_ratio(self.attacker, self.defender, "earthquake")
+            estimate_damage_ratio(copy, self.defender, "earthquake")
+        self.assertEqual(1, cache.hits)
+
+    def test_boost_change_is_a_new_entry(self):
+        with damage_cache() as cache:
+            before = estimate_damage_ratio(self.attacker, self.defender, "earthquake")
+            self.attacker.boosts[constants.ATTACK] = 2
+            after = estimate_damage_ratio(self.attacker, self.defender, "earthquake")
+        self.assertEqual(2, cache.misses)
+        self.assertAlmostEqual(after, before * 2, delta=before * 0.1)
+
+    def test_nested_scopes_share_the_outer_cache(self):
+        @with_damage_cache
+        def inner():
+            return estimate_damage_ratio(self.attacker, self.defender, "earthquake")
+
+        with damage_cache() as cache:
+            inner()
+            inner()
+        self.assertEqual(1, cache.misses)
+        self.assertEqual(1, cache.hits)
+
+    def test_no_memo_outside_a_scope(self):
+        with damage_cache() as cache:
+            pass
+        estimate_damage_ratio(self.attacker, self.defender, "earthquake")
+        self.assertEqual(0, cache.misses)
+        self.assertEqual({}, cache.entries)
+
+
+if __name__ == "__main__":
+    unittest.main()
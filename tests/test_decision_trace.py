@@ -0,0 +1,137 @@
+import gzip
+import json
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from fp.decision_trace import TraceSink, read_traces, trace_files
+
+
+def _trace(turn, tag="battle-gen9ou-1", **extra):
+    return {"battle_tag": tag, "turn": turn, "choice": "shadowball", **extra}
+
+
+class TestTraceSink(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = Path(tmp.name)
+
+    def _sink(self, **kwargs):
+        sink = TraceSink(self.directory, **kwargs)
+        self.addCleanup(sink.close)
+        return sink
+
+    def _turns(self, path):
+        records, _offset = read_traces(path)
+        return [trace["turn"] for _, trace in records]
+
+    def test_traces_are_appended_to_one_file_per_battle(self):
+        sink = self._sink()
+        for turn in range(1, 4):
+            sink.submit(_trace(turn))
+            sink.submit(_trace(turn, tag="battle-gen9ou-2"))
+        self.assertTrue(sink.flush(timeout=5))
+
+        self.assertEqual(
+            ["battle-gen9ou-1.jsonl", "battle-gen9ou-2.jsonl"],
+            sorted(p.name for p in trace_files(self.directory)),
+        )
+        self.assertEqual(
+            [1, 2, 3], self._turns(self.directory / "battle-gen9ou-1.jsonl")
+        )
+        self.assertEqual(6, sink.stats()["written"])
+
+    def test_traces_are_made_json_safe_on_the_writer(self):
+        sink = self._sink()
+        sink.submit(_trace(1, seen={"b", "a"}))
+        sink.flush(timeout=5)
+        line = (self.directory / "battle-gen9ou-1.jsonl").read_text().splitlines()
+        self.assertEqual(["a", "b"], json.loads(line[0])["seen"])
+
+    def test_full_battle_files_continue_in_new_segments(self):
+        sink = self._sink(rotate_bytes=4096, batch_size=1)
+        padding = "x" * 1000
+        for turn in range(10):
+            sink.submit(_trace(turn, padding=padding))
+        sink.flush(timeout=5)
+
+        segments = [p.name for p in trace_files(self.directory)]
+        self.assertIn("battle-gen9ou-1.jsonl", segments)
+        self.assertIn("battle-gen9ou-1.1.jsonl", segments)
+        self.assertEqual(
+            list(range(10)),
+            sorted(t for p in trace_files(self.directory) for t in self._turns(p)),
+        )
+
+    def test_compressed_segments_are_read_back(self):
+        sink = self._sink(compress=True)
+        sink.submit(_trace(1))
+        sink.submit(_trace(2))
+        sink.flush(timeout=5)
+        path = self.directory / "battle-gen9ou-1.jsonl.gz"
+        self.assertEqual([1, 2], self._turns(path))
+        with gzip.open(path, "rt") as f:
+            self.assertEqual(2, len(f.readlines()))
+
+    def test_submit_drops_instead_of_blocking_when_the_queue_is_full(self):
+        release = threading.Event()
+        original = TraceSink._write_batch
+
+        def slow_write(sink, batch):
+            release.wait(5)
+            original(sink, batch)
+
+        with patch.object(TraceSink, "_write_batch", slow_write):
+            sink = self._sink(queue_size=2, batch_size=1)
+            accepted = [sink.submit(_trace(turn)) for turn in range(6)]
+            self.assertFalse(all(accepted))
+            self.assertEqual(accepted.count(False), sink.stats()["dropped"])
+            release.set()
+            self.assertTrue(sink.flush(timeout=5))
+        self.assertEqual(accepted.count(True), sink.stats()["written"])
+
+
+class TestReadTraces(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = Path(tmp.name)
+
+    def test_reads_resume_from_the_returned_offset(self):
+        path = self.directory / "battle.jsonl"
+        path.write_text(json.dumps(_trace(1)) + "\n")
+        first, offset = read_traces(path)
+        with open(path, "a") as f:
+            f.write(json.dumps(_trace(2)) + "\n")
+        second, end = read_traces(path, offset)
+        self.assertEqual([1], [t["turn"] for _, t in first])
+        self.assertEqual([(offset, _trace(2))], second)
+        self.assertEqual(path.stat().st_size, end)
+
+    def test_partial_records_are_left_for_the_next_read(self):
+        path = self.directory / "battle.jsonl"
+        line = json.dumps(_trace(1)) + "\n"
+        path.write_text(line + '{"battle_tag": "batt')
+        records, offset = read_traces(path)
+        self.assertEqual(1, len(records))
+        self.assertEqual(len(line), offset)
+
+        path = self.directory / "battle.jsonl.gz"
+        member = gzip.compress(line.encode())
+        path.write_bytes(member + gzip.compress(line.encode())[:10])
+        records, offset = read_traces(path)
+        self.assertEqual(1, len(records))
+        self.assertEqual(len(member), offset)
+
+    def test_unparsable_lines_are_reported(self):
+        path = self.directory / "battle.jsonl"
+        path.write_text("{not-json\n" + json.dumps(_trace(1)) + "\n")
+        records, _offset = read_traces(path)
+        self.assertEqual([None, _trace(1)], [t for _, t in records])
+
+
+if __name__ == "__main__":
+    unittest.main()
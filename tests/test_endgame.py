@@ -0,0 +1,392 @@
+import unittest
+
+import constants
+from fp.battle import Battle, Pokemon
+from fp.search.endgame import endgame_fully_revealed, solve_endgame
+
+FILLER_MOVES = ["protect", "toxic", "rest", "sleeptalk"]
+
+
+def _pokemon(name, moves, hp=None):
+    pkmn = Pokemon(name, 100)
+    # revealed, and nothing the search leaves out
+    pkmn.item, pkmn.ability = "heavydutyboots", "pressure"
+    for move in moves:
+        pkmn.add_move(move)
+    if hp is not None:
+        pkmn.hp = hp
+    return pkmn
+
+
+def _battle(user_team, opp_team):
+    """Teams as [(name, moves, hp)], active first; the opponent is padded to six."""
+    battle = Battle("battle-endgame-test")
+    user = [_pokemon(*spec) for spec in user_team]
+    opponent = [_pokemon(*spec) for spec in opp_team]
+    for name in ["blissey", "chansey", "clefable", "skarmory", "ferrothorn", "toxapex"]:
+        if len(opponent) >= 6:
+            break
+        opponent.append(_pokemon(name, FILLER_MOVES, hp=0))
+    battle.user.active, battle.user.reserve = user[0], user[1:]
+    battle.opponent.active, battle.opponent.reserve = opponent[0], opponent[1:]
+    return battle
+
+
+def _damage_rolls(table):
+    """Fake damage calc: {(attacker, move, defender): rolls}, zero otherwise."""
+
+    def damage_rolls(battle, our_move, opp_move, we_went_first):
+        ours, theirs = battle.user.active.name, battle.opponent.active.name
+        return (
+            table.get((ours, our_move, theirs), [0]),
+            table.get((theirs, opp_move, ours), [0]),
+        )
+
+    return damage_rolls
+
+
+class TestSolveEndgame(unittest.TestCase):
+    def test_faster_ohko_is_a_proven_win(self):
+        battle = _battle(
+            [("dragapult", ["dracometeor", "uturn", "shadowball", "willowisp"], None)],
+            [("garchomp", ["earthquake", "scaleshot", "stoneedge", "firefang"], None)],
+        )
+        result = solve_endgame(
+            battle,
+            damage_rolls=_damage_rolls(
+                {("dragapult", "shadowball", "garchomp"): [900]}
+            ),
+        )
+        self.assertTrue(result.is_deterministic)
+        self.assertEqual(1.0, result.expected_outcome)
+        self.assertEqual("shadowball", result.best_move)
+
+    def test_sure_ko_beats_an_inaccurate_one(self):
+        battle = _battle(
+            [
+                (
+                    "garchomp",
+                    ["stoneedge", "earthquake", "swordsdance", "stealthrock"],
+                    None,
+                )
+            ],
+            [
+                (
+                    "heatran",
+                    ["magmastorm", "heavyslam", "eruption", "solarbeam"],
+                    None,
+                )
+            ],
+        )
+        result = solve_endgame(
+            battle,
+            damage_rolls=_damage_rolls(
+                {
+                    ("garchomp", "stoneedge", "heatran"): [900],
+                    ("garchomp", "earthquake", "heatran"): [900],
+                    ("heatran", "magmastorm", "garchomp"): [900],
+                }
+            ),
+        )
+        self.assertEqual("earthquake", result.best_move)
+        self.assertTrue(result.is_deterministic)
+
+    def test_roll_that_always_kos_beats_one_that_sometimes_does(self):
+        battle = _battle(
+            [
+                (
+                    "garchomp",
+                    ["earthquake", "dragonclaw", "swordsdance", "stealthrock"],
+                    None,
+                )
+            ],
+            [("heatran", ["magmastorm", "heavyslam", "eruption", "taunt"], None)],
+        )
+        hp = battle.opponent.active.hp
+        result = solve_endgame(
+            battle,
+            damage_rolls=_damage_rolls(
+                {
+                    ("garchomp", "dragonclaw", "heatran"): [hp - 50, hp + 10],
+                    ("garchomp", "earthquake", "heatran"): [hp, hp + 10],
+                    ("heatran", "magmastorm", "garchomp"): [900],
+                }
+            ),
+        )
+        self.assertEqual("earthquake", result.best_move)
+
+    def test_losing_position_is_not_played_without_mcts(self):
+        battle = _battle(
+            [
+                (
+                    "garchomp",
+                    ["earthquake", "dragonclaw", "swordsdance", "stealthrock"],
+                    None,
+                )
+            ],
+            [("dragapult", ["dracometeor", "uturn", "shadowball", "willowisp"], None)],
+        )
+        result = solve_endgame(
+            battle,
+            damage_rolls=_damage_rolls(
+                {("dragapult", "shadowball", "garchomp"): [900]}
+            ),
+        )
+        self.assertEqual(0.0, result.expected_outcome)
+        self.assertFalse(result.is_deterministic)
+
+    def test_switches_to_the_pokemon_that_wins(self):
+        battle = _battle(
+            [
+                (
+                    "garchomp",
+                    ["earthquake", "dragonclaw", "swordsdance", "stealthrock"],
+                    None,
+                ),
+                (
+                    "dragapult",
+                    ["dracometeor", "uturn", "shadowball", "willowisp"],
+                    None,
+                ),
+            ],
+            [
+                (
+                    "gholdengo",
+                    ["makeitrain", "hex", "psyshock", "recover"],
+                    None,
+                )
+            ],
+        )
+        battle.user.active.hp = 0
+        battle.force_switch = True
+        result = solve_endgame(
+            battle,
+            damage_rolls=_damage_rolls(
+                {
+                    ("dragapult", "shadowball", "gholdengo"): [900],
+                    ("gholdengo", "hex", "dragapult"): [900],
+                }
+            ),
+        )
+        self.assertEqual("switch dragapult", result.best_move)
+        self.assertTrue(result.is_deterministic)
+
+    def test_ko_needing_two_high_rolls_is_not_ruled_out(self):
+        # they move first; two max rolls in a row KO us before our second hit
+        battle = _battle(
+            [("garchomp", ["earthquake", "dragonclaw", "stoneedge", "firefang"], 100)],
+            [("dragapult", ["dracometeor", "uturn", "hex", "hydropump"], 100)],
+        )
+        for pkmn in (battle.user.active, battle.opponent.active):
+            pkmn.max_hp = 100
+        result = solve_endgame(
+            battle,
+            damage_rolls=_damage_rolls(
+                {
+                    ("garchomp", "earthquake", "dragapult"): list(range(50, 61)),
+                    ("dragapult", "hex", "garchomp"): list(range(40, 51)),
+                }
+            ),
+        )
+        self.assertAlmostEqual(1 - 1 / 121, result.expected_outcome)
+        self.assertFalse(result.is_deterministic)
+
+    def test_unmodelled_replies_are_not_a_proven_win(self):
+        rolls = _damage_rolls({("dragapult", "shadowball", "garchomp"): [900]})
+        battle = _battle(
+            [("dragapult", ["dracometeor", "uturn", "shadowball", "willowisp"], None)],
+            [("garchomp", ["earthquake", "scaleshot", "protect", "stealthrock"], None)],
+        )
+        result = solve_endgame(battle, damage_rolls=rolls)
+        self.assertEqual(1.0, result.expected_outcome)
+        self.assertFalse(result.is_deterministic)
+        self.assertIn("move protect", result.explanation)
+
+        battle = _battle(
+            [("dragapult", ["dracometeor", "uturn", "shadowball", "willowisp"], None)],
+            [("garchomp", ["earthquake", "scaleshot", "stoneedge", "firefang"], None)],
+        )
+        battle.opponent.active.item = "focussash"
+        battle.opponent.active.ability = None
+        result = solve_endgame(battle, damage_rolls=rolls)
+        self.assertFalse(result.is_deterministic)
+        self.assertIn("item focussash", result.explanation)
+        self.assertIn("ability unknown", result.explanation)
+
+    def test_our_residual_damage_is_not_a_proven_win(self):
+        rolls = _damage_rolls(
+            {
+                ("garchomp", "earthquake", "heatran"): [400],
+                ("garchomp", "doubleedge", "heatran"): [400],
+            }
+        )
+        cases = {
+            "status psn": lambda battle: setattr(
+                battle.user.active, "status", constants.POISON
+            ),
+            "status brn": lambda battle: setattr(
+                battle.user.active, "status", constants.BURN
+            ),
+            "status tox": lambda battle: setattr(
+                battle.user.active, "status", constants.TOXIC
+            ),
+            "item lifeorb": lambda battle: setattr(
+                battle.user.active, "item", "lifeorb"
+            ),
+            "move doubleedge": lambda battle: battle.user.active.add_move("doubleedge"),
+            "weather sandstorm": lambda battle: setattr(
+                battle, "weather", constants.SAND
+            ),
+            "weather hail": lambda battle: setattr(battle, "weather", constants.HAIL),
+        }
+        for unmodelled, apply in cases.items():
+            with self.subTest(unmodelled):
+                battle = _battle(
+                    [("garchomp", ["earthquake", "swordsdance", "stealthrock"], 10)],
+                    [
+                        (
+                            "heatran",
+                            ["magmastorm", "heavyslam", "eruption", "solarbeam"],
+                            672,
+                        )
+                    ],
+                )
+                battle.opponent.active.max_hp = 672
+                result = solve_endgame(battle, damage_rolls=rolls)
+                self.assertTrue(result.is_deterministic)
+
+                apply(battle)
+                result = solve_endgame(battle, damage_rolls=rolls)
+                self.assertEqual(1.0, result.expected_outcome)
+                self.assertFalse(result.is_deterministic)
+                self.assertIn(unmodelled, result.explanation)
+
+    def test_self_stat_drops_are_not_assumed_away(self):
+        for move in ("dracometeor", "closecombat"):
+            with self.subTest(move):
+                # two full-power hits win; the second would be weakened
+                battle = _battle(
+                    [("garchomp", [move, "swordsdance", "stealthrock"], None)],
+                    [
+                        (
+                            "heatran",
+                            ["magmastorm", "heavyslam", "eruption", "solarbeam"],
+                            672,
+                        )
+                    ],
+                )
+                battle.opponent.active.max_hp = 672
+                result = solve_endgame(
+                    battle,
+                    damage_rolls=_damage_rolls({("garchomp", move, "heatran"): [400]}),
+                )
+                self.assertLess(result.expected_outcome, 1.0)
+                self.assertFalse(result.is_deterministic)
+
+    def test_conditional_moves_are_not_played(self):
+        for move in ("suckerpunch", "fakeout", "focuspunch"):
+            with self.subTest(move):
+                # sucker punch fails against recover; fake out only works
+                # on the first turn; focus punch fails if we are hit
+                battle = _battle(
+                    [("garchomp", [move, "swordsdance", "stealthrock"], None)],
+                    [
+                        (
+                            "heatran",
+                            ["magmastorm", "heavyslam", "eruption", "recover"],
+                            None,
+                        )
+                    ],
+                )
+                result = solve_endgame(
+                    battle,
+                    damage_rolls=_damage_rolls({("garchomp", move, "heatran"): [900]}),
+                )
+                self.assertNotEqual(move, result.best_move)
+                self.assertFalse(result.is_deterministic)
+
+        battle = _battle(
+            [("garchomp", ["earthquake", "swordsdance", "stealthrock"], None)],
+            [("heatran", ["magmastorm", "heavyslam", "eruption", "recover"], None)],
+        )
+        result = solve_endgame(
+            battle,
+            damage_rolls=_damage_rolls({("garchomp", "earthquake", "heatran"): [900]}),
+        )
+        self.assertTrue(result.is_deterministic)
+
+    def test_our_choice_lock_is_not_a_proven_win(self):
+        rolls = _damage_rolls({("garchomp", "earthquake", "heatran"): [900]})
+        battle = _battle(
+            [("garchomp", ["earthquake", "swordsdance", "stealthrock"], None)],
+            [("heatran", ["magmastorm", "heavyslam", "eruption", "solarbeam"], None)],
+        )
+        battle.user.active.item = "choiceband"
+        result = solve_endgame(battle, damage_rolls=rolls)
+        self.assertEqual(1.0, result.expected_outcome)
+        self.assertFalse(result.is_deterministic)
+        self.assertIn("our garchomp item choiceband", result.explanation)
+
+    def test_opponent_drain_and_secondary_effects_are_not_a_proven_win(self):
+        rolls = _damage_rolls({("garchomp", "earthquake", "heatran"): [900]})
+        for move in ("drainpunch", "gigadrain", "scald", "ironhead", "fakeout"):
+            with self.subTest(move):
+                battle = _battle(
+                    [("garchomp", ["earthquake", "swordsdance", "stealthrock"], None)],
+                    [("heatran", ["magmastorm", "heavyslam", "eruption", move], None)],
+                )
+                result = solve_endgame(battle, damage_rolls=rolls)
+                self.assertEqual(1.0, result.expected_outcome)
+                self.assertFalse(result.is_deterministic)
+                self.assertIn(f"move {move}", result.explanation)
+
+    def test_three_on_three_returns_within_the_time_cap(self):
+        moves = ["earthquake", "dragonclaw", "stoneedge", "firefang"]
+        battle = _battle(
+            [
+                ("garchomp", moves, None),
+                ("dragonite", moves, None),
+                ("salamence", moves, None),
+            ],
+            [
+                ("tyranitar", moves, None),
+                ("hippowdon", moves, None),
+                ("krookodile", moves, None),
+            ],
+        )
+        chip = {
+            (a, m, d): [20, 30]
+            for a in (
+                "garchomp",
+                "dragonite",
+                "salamence",
+                "tyranitar",
+                "hippowdon",
+                "krookodile",
+            )
+            for d in (
+                "garchomp",
+                "dragonite",
+                "salamence",
+                "tyranitar",
+                "hippowdon",
+                "krookodile",
+            )
+            for m in moves
+        }
+        result = solve_endgame(battle, time_cap_ms=50, damage_rolls=_damage_rolls(chip))
+        self.assertGreaterEqual(result.depth_searched, 1)
+        self.assertFalse(result.is_deterministic)
+        self.assertLess(result.elapsed_ms, 500)
+
+    def test_unrevealed_moves_are_not_searched(self):
+        battle = _battle(
+            [("dragapult", ["dracometeor", "uturn", "shadowball", "willowisp"], None)],
+            [("garchomp", ["earthquake"], None)],
+        )
+        self.assertFalse(endgame_fully_revealed(battle))
+        self.assertIsNone(solve_endgame(battle, damage_rolls=_damage_rolls({})))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -318,7 +318,8 @@ class TestEvaluatePosition(unittest.TestCase):
 
     def test_seismic_toss_fixed_damage_is_scored_as_real_damage(self):
         """Seismic Toss should score based on fixed damage, not as a status move."""
-        from fp.search.eval import _estimate_damage_ratio, evaluate_position
+        from fp.search.damage import estimate_damage_ratio
+        from fp.search.eval import evaluate_position
 
         our = _make_pokemon(
             name="blissey",
@@ -336,7 +337,7 @@ class TestEvaluatePosition(unittest.TestCase):
         )
         battle = _make_battle(user_active=our, opp_active=opp)
 
-        toss_ratio = _estimate_damage_ratio(our, opp, "seismictoss")
+        toss_ratio = estimate_damage_ratio(our, opp, "seismictoss")
         scores = evaluate_position(battle)
 
         self.assertGreater(toss_ratio, 0.25)
@@ -0,0 +1,124 @@
+import json
+import multiprocessing
+import sqlite3
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import infrastructure.event_queue_lib as eq
+
+
+def _produce(results, content):
+    results.put(
+        eq.queue_event("batch_complete", "battles", content, dedup_window_sec=60)
+    )
+
+
+class TestEventQueue(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = Path(tmp.name)
+        for target, value in (
+            ("QUEUE_FILE", self.directory / "events_queue.json"),
+            ("QUEUE_DB", self.directory / "events_queue.db"),
+        ):
+            patcher = patch.object(eq, target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_status_transitions(self):
+        posted = eq.queue_event(
+            "bot_started", "battles", "started", suppress_embeds=True
+        )
+        failed = eq.queue_event("process_crash", "project", "crashed")
+        self.assertTrue(eq.mark_posted(posted))
+        for _ in range(eq.MAX_RETRIES):
+            self.assertTrue(eq.mark_failed(failed, "post_failed"))
+        self.assertFalse(eq.mark_posted("missing"))
+
+        events = {e["id"]: e for e in eq.read_queue()}
+        self.assertEqual(eq.STATUS_POSTED, events[posted]["status"])
+        self.assertIs(True, events[posted]["suppress_embeds"])
+        self.assertEqual(eq.STATUS_FAILED, events[failed]["status"])
+        self.assertEqual(eq.MAX_RETRIES, events[failed]["retry_count"])
+
+    def test_dedup_window(self):
+        first = eq.queue_event(
+            "batch_complete", "battles", "report", dedup_window_sec=60
+        )
+        self.assertIsNone(
+            eq.queue_event("batch_complete", "battles", "report", dedup_window_sec=60)
+        )
+        self.assertIsNotNone(
+            eq.queue_event("batch_complete", "project", "report", dedup_window_sec=60)
+        )
+        # failed events do not block a retry of the same content
+        for _ in range(eq.MAX_RETRIES):
+            eq.mark_failed(first)
+        self.assertIsNotNone(
+            eq.queue_event("batch_complete", "battles", "report", dedup_window_sec=60)
+        )
+
+    def test_pending_are_oldest_first_and_expire(self):
+        ids = [eq.queue_event("turn_review", "battles", f"turn {i}") for i in range(3)]
+        self.assertEqual(ids, [e["id"] for e in eq.get_pending_events()])
+        self.assertEqual(ids[:1], [e["id"] for e in eq.get_pending_events(limit=1)])
+
+        with sqlite3.connect(eq.QUEUE_DB) as conn:
+            conn.execute(
+                "UPDATE events SET timestamp = ? WHERE id = ?",
+                (time.time() - 700, ids[0]),
+            )
+        self.assertEqual(1, eq.expire_old_events(600))
+        self.assertEqual(ids[1:], [e["id"] for e in eq.get_pending_events()])
+        self.assertEqual(
+            {"total": 3, "pending": 2, "posted": 0, "failed": 0, "expired": 1},
+            eq.queue_stats(),
+        )
+
+    def test_cleanup_keeps_pending_and_newest_completed(self):
+        ids = [eq.queue_event("turn_review", "battles", f"turn {i}") for i in range(5)]
+        for event_id in ids[:4]:
+            eq.mark_posted(event_id)
+        self.assertEqual(2, eq.cleanup_queue(keep_last=2))
+        self.assertEqual(ids[2:], [e["id"] for e in eq.read_queue()])
+
+    def test_legacy_json_queue_is_imported(self):
+        legacy = {
+            "id": "legacy-1",
+            "timestamp": time.time(),
+            "event_type": "batch_complete",
+            "channel": "battles",
+            "content": "report",
+            "content_hash": "abc",
+            "precondition_check": "bot_is_alive",
+            "suppress_embeds": False,
+            "status": eq.STATUS_PENDING,
+            "retry_count": 1,
+            "created_at": "2026-02-15 14:30:00",
+            "posted_at": None,
+            "last_error": "post_failed",
+        }
+        eq.QUEUE_FILE.write_text(json.dumps([legacy], indent=2))
+        self.assertEqual([legacy], eq.get_pending_events())
+
+    def test_concurrent_producers_dedup_across_processes(self):
+        ctx = multiprocessing.get_context("fork")
+        results = ctx.Queue()
+        producers = [
+            ctx.Process(target=_produce, args=(results, "report")) for _ in range(6)
+        ]
+        for p in producers:
+            p.start()
+        for p in producers:
+            p.join(10)
+        ids = [results.get(timeout=1) for _ in producers]
+        self.assertEqual(1, sum(event_id is not None for event_id in ids))
+        self.assertEqual(1, eq.queue_stats()["pending"])
+
+
+if __name__ == "__main__":
+    unittest.main()
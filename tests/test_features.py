@@ -0,0 +1,125 @@
+import unittest
+
+from fp.battle import Battle
+from fp.search.features import (
+    ALL_GROUPS,
+    BOOSTS,
+    FIELD,
+    HP,
+    REVEALS,
+    SIDE_CONDITIONS,
+    battle_feature,
+    bind_features,
+    clear_features,
+    get_feature_store,
+    invalidate_features,
+    protocol_invalidations,
+)
+
+
+class TestProtocolInvalidations(unittest.TestCase):
+    def test_groups_of_a_turn_are_merged(self):
+        self.assertEqual(
+            frozenset({HP, REVEALS, BOOSTS}),
+            protocol_invalidations(["-damage", "-boost", "upkeep"]),
+        )
+
+    def test_cosmetic_lines_invalidate_nothing(self):
+        self.assertEqual(
+            frozenset(), protocol_invalidations(["", "c", "-crit", "timer"])
+        )
+
+    def test_unknown_actions_invalidate_everything(self):
+        self.assertEqual(
+            ALL_GROUPS, protocol_invalidations(["-sidestart", "-newthing"])
+        )
+
+
+class TestFeatureStore(unittest.TestCase):
+    def setUp(self):
+        self.live = Battle("battle-features-test")
+        self.addCleanup(clear_features, self.live.battle_tag)
+        self.calls = {"field": 0, "hazards": 0}
+
+        @battle_feature(FIELD)
+        def field_feature(battle):
+            self.calls["field"] += 1
+            return battle.weather
+
+        @battle_feature(SIDE_CONDITIONS)
+        def hazard_feature(battle, side):
+            self.calls["hazards"] += 1
+            return side
+
+        self.field_feature = field_feature
+        self.hazard_feature = hazard_feature
+
+    def _decision_copy(self):
+        copy = self.live.clone()
+        bind_features(copy, self.live)
+        return copy
+
+    def test_feature_is_computed_once_per_decision(self):
+        copy = self._decision_copy()
+        for _ in range(3):
+            self.field_feature(copy)
+        self.assertEqual(1, self.calls["field"])
+        stats = get_feature_store(copy.battle_tag).stats()
+        self.assertEqual(2, stats["hits"])
+        self.assertEqual(1, stats["misses"])
+
+    def test_arguments_are_part_of_the_key(self):
+        copy = self._decision_copy()
+        self.hazard_feature(copy, "user")
+        self.hazard_feature(copy, "opponent")
+        self.hazard_feature(copy, "user")
+        self.assertEqual(2, self.calls["hazards"])
+
+    def test_other_copies_compute_directly(self):
+        copy = self._decision_copy()
+        self.field_feature(copy)
+        self.field_feature(copy.fork_opponent())
+        self.field_feature(self.live)
+        self.assertEqual(3, self.calls["field"])
+
+    def test_unchanged_features_carry_over_to_the_next_decision(self):
+        copy = self._decision_copy()
+        self.field_feature(copy)
+        self.hazard_feature(copy, "user")
+        invalidate_features(self.live, protocol_invalidations(["-sidestart"]))
+
+        copy = self._decision_copy()
+        self.field_feature(copy)
+        self.hazard_feature(copy, "user")
+        self.assertEqual(1, self.calls["field"])
+        self.assertEqual(2, self.calls["hazards"])
+        self.assertEqual(1, get_feature_store(copy.battle_tag).stats()["carried_over"])
+
+    def test_invalidation_unbinds_the_running_decision(self):
+        copy = self._decision_copy()
+        invalidate_features(self.live, frozenset())
+        self.field_feature(copy)
+        self.field_feature(copy)
+        self.assertEqual(2, self.calls["field"])
+
+    def test_decisions_without_protocol_updates_start_empty(self):
+        copy = self._decision_copy()
+        self.field_feature(copy)
+        copy = self._decision_copy()
+        self.field_feature(copy)
+        self.assertEqual(2, self.calls["field"])
+
+    def test_another_live_battle_with_the_same_tag_starts_empty(self):
+        copy = self._decision_copy()
+        self.field_feature(copy)
+        invalidate_features(self.live, frozenset())
+
+        other = Battle(self.live.battle_tag)
+        other_copy = other.clone()
+        bind_features(other_copy, other)
+        self.field_feature(other_copy)
+        self.assertEqual(2, self.calls["field"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,163 @@
+import asyncio
+import json
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import fp.gameplan_integration as integration
+import fp.matchup_analyzer as analyzer
+from fp.battle import Battle, Pokemon
+from fp.matchup_analyzer import GameplanCache, analyze_matchup
+
+OUR_TEAM = [
+    {
+        "species": "Corviknight",
+        "moves": ["Brave Bird", "Defog", "Roost", "U-turn"],
+        "item": "Rocky Helmet",
+        "ability": "Pressure",
+    },
+    {
+        "species": "Kyurem",
+        "moves": ["Freeze-Dry", "Earth Power", "Substitute", "Protect"],
+        "item": "Leftovers",
+        "ability": "Pressure",
+    },
+]
+
+LLM_GAMEPLAN = {
+    "opponent_win_condition": "Great Tusk breaks through after hazards",
+    "opponent_weaknesses": ["Weak to Freeze-Dry"],
+    "our_strategy": "Keep hazards off with Corviknight, then sweep",
+    "key_pivot_triggers": ["Go to Corviknight on Stealth Rock"],
+    "win_condition": "Kyurem sweep",
+}
+
+
+class _StubOllama(BaseHTTPRequestHandler):
+    delay = 0.0
+    requests = 0
+
+    def do_POST(self):
+        type(self).requests += 1
+        self.rfile.read(int(self.headers["Content-Length"]))
+        time.sleep(self.delay)
+        body = json.dumps({"response": json.dumps(LLM_GAMEPLAN)}).encode()
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except OSError:
+            pass  # the client gave up
+
+    def log_message(self, *args):
+        pass
+
+
+def _battle(tag="battle-gen9ou-gameplan"):
+    battle = Battle(tag)
+    battle.user.team_dict = OUR_TEAM
+    battle.opponent.reserve = [Pokemon("greattusk", 100), Pokemon("gholdengo", 100)]
+    return battle
+
+
+class GameplanServerTestCase(unittest.TestCase):
+    delay = 0.0
+
+    def setUp(self):
+        handler = type("Handler", (_StubOllama,), {"delay": self.delay, "requests": 0})
+        self.handler = handler
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        for target, value in (
+            ("OLLAMA_API_URL", f"http://127.0.0.1:{server.server_port}"),
+            ("_gameplan_cache", GameplanCache(tmp.name)),
+        ):
+            patcher = patch.object(analyzer, target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+
+class TestAnalyzeMatchup(GameplanServerTestCase):
+    def test_gameplan_comes_from_the_llm_and_is_cached(self):
+        opponent = [{"species": "Great Tusk", "moves": ["Rapid Spin"]}]
+        first = analyze_matchup(OUR_TEAM, opponent)
+        second = analyze_matchup(OUR_TEAM, opponent)
+        self.assertEqual("Kyurem sweep", first.win_condition)
+        self.assertEqual(first, second)
+        self.assertEqual(1, self.handler.requests)
+
+
+class TestBackgroundGameplan(GameplanServerTestCase):
+    delay = 0.3
+
+    def test_loop_keeps_running_while_the_gameplan_is_generated(self):
+        async def scenario():
+            battle = _battle()
+            task = integration.start_gameplan_generation(battle.battle_tag, battle)
+            self.addCleanup(integration.clear_gameplan, battle.battle_tag)
+            ticks = 0
+            while not task.done():
+                ticks += 1
+                await asyncio.sleep(0.01)
+            return battle, await task, ticks
+
+        battle, gameplan, ticks = asyncio.run(scenario())
+        self.assertGreater(ticks, 5)
+        self.assertEqual("Kyurem sweep", gameplan.win_condition)
+        self.assertIs(gameplan, battle.gameplan)
+        self.assertIs(gameplan, integration.get_gameplan(battle.battle_tag))
+
+    def test_decisions_before_arrival_see_no_gameplan(self):
+        async def scenario():
+            battle = _battle()
+            task = integration.start_gameplan_generation(battle.battle_tag, battle)
+            self.addCleanup(integration.clear_gameplan, battle.battle_tag)
+            before = battle.clone().gameplan
+            await task
+            return before, battle.clone().gameplan
+
+        before, after = asyncio.run(scenario())
+        self.assertIsNone(before)
+        self.assertEqual("Kyurem sweep", after.win_condition)
+
+    def test_deadline_gives_up_without_a_gameplan(self):
+        async def scenario():
+            battle = _battle()
+            with patch.object(integration, "GAMEPLAN_DEADLINE_SEC", 0.05):
+                started = time.perf_counter()
+                gameplan = await integration.start_gameplan_generation(
+                    battle.battle_tag, battle
+                )
+            return battle, gameplan, time.perf_counter() - started
+
+        battle, gameplan, elapsed = asyncio.run(scenario())
+        self.assertIsNone(gameplan)
+        self.assertIsNone(battle.gameplan)
+        self.assertLess(elapsed, 0.25)
+
+    def test_clearing_the_battle_cancels_the_generation(self):
+        async def scenario():
+            battle = _battle()
+            task = integration.start_gameplan_generation(battle.battle_tag, battle)
+            integration.clear_gameplan(battle.battle_tag)
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            return battle
+
+        battle = asyncio.run(scenario())
+        self.assertIsNone(battle.gameplan)
+        self.assertIsNone(integration.get_gameplan(battle.battle_tag))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,6 +3,9 @@ import unittest
 from data.pkmn_sets import spreads_are_alike
 from fp.helpers import get_pokemon_info_from_condition
 from fp.helpers import normalize_name
+from fp.helpers import POKEMON_TYPE_INDICES
+from fp.helpers import defensive_type_profile
+from fp.helpers import type_effectiveness_modifier
 
 
 class TestSpreadsAreAlike(unittest.TestCase):
@@ -69,3 +72,28 @@ class TestGetPokemonInfoFromCondition(unittest.TestCase):
         condition_string = "0/100 fnt"
 
         self.assertEqual(0, get_pokemon_info_from_condition(condition_string)[0])
+
+
+class TestTypeEffectiveness(unittest.TestCase):
+    def test_dual_type(self):
+        self.assertEqual(4, type_effectiveness_modifier("ground", ["fire", "steel"]))
+        self.assertEqual(0, type_effectiveness_modifier("ground", ["water", "flying"]))
+
+    def test_mono_type(self):
+        self.assertEqual(0.5, type_effectiveness_modifier("fire", ["water"]))
+
+    def test_no_types_is_neutral(self):
+        self.assertEqual(1, type_effectiveness_modifier("fire", []))
+
+    def test_three_types(self):
+        self.assertEqual(
+            8, type_effectiveness_modifier("fire", ["grass", "steel", "bug"])
+        )
+
+    def test_profile_covers_every_attacking_type(self):
+        profile = defensive_type_profile(("fire", "steel"))
+        for attacking_type, index in POKEMON_TYPE_INDICES.items():
+            self.assertEqual(
+                type_effectiveness_modifier(attacking_type, ["fire", "steel"]),
+                profile[index],
+            )
@@ -1,10 +1,12 @@
 import asyncio
 import json
 from pathlib import Path
+from unittest.mock import patch
 
 from aiohttp import web
 from aiohttp.test_utils import TestClient, TestServer
 
+from fp.decision_trace import read_traces
 from streaming.hybrid_dashboard import (
     DashboardDataProvider,
     parse_trace_turn,
@@ -263,3 +265,54 @@ def test_trace_reason_redacts_project_key():
     assert parsed is not None
     assert "[redacted]" in parsed["reason"]
     assert "sk-proj-" not in parsed["reason"]
+
+
+def _append_jsonl(path: Path, payloads: list[dict]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        for payload in payloads:
+            f.write(json.dumps(payload) + "\n")
+
+
+def test_jsonl_segments_are_tailed_incrementally(tmp_path):
+    trace_dir = tmp_path / "decision_traces"
+    segment = trace_dir / "battle-gen9ou-5.jsonl"
+
+    def turn(n):
+        return {
+            "battle_tag": "battle-gen9ou-5",
+            "turn": n,
+            "timestamp": f"2026-02-10T23:00:0{n}Z",
+            "decision_mode": "eval",
+            "choice": "shadowball",
+        }
+
+    _append_jsonl(segment, [turn(1), turn(2)])
+    provider = DashboardDataProvider(
+        trace_dir=trace_dir,
+        state_module=_FakeStateStore(),
+        scan_interval_sec=0.0,
+    )
+    cache = provider.trace_cache
+    assert [t["turn"] for t in cache.get_all_turns()] == [2, 1]
+    offset = cache._streams[segment].offset
+    assert offset == segment.stat().st_size
+
+    # a record still being written is not counted until it is complete
+    with open(segment, "a", encoding="utf-8") as f:
+        f.write(json.dumps(turn(3)) + "\n" + "{not-json\n" + '{"battle_tag": "battle-')
+    with patch("streaming.hybrid_dashboard.read_traces", wraps=read_traces) as reader:
+        cache.refresh(force=True)
+    reader.assert_called_once_with(segment, offset)
+    assert [t["turn"] for t in cache.get_all_turns()] == [3, 2, 1]
+    assert cache.health()["parse_errors"] == 1
+
+    with open(segment, "a", encoding="utf-8") as f:
+        f.write(json.dumps(turn(4))[len('{"battle_tag": "battle-'):] + "\n")
+    # no appends: the segment is not read again
+    cache.refresh(force=True)
+    with patch("streaming.hybrid_dashboard.read_traces", wraps=read_traces) as reader:
+        cache.refresh(force=True)
+    reader.assert_not_called()
+    assert [t["turn"] for t in cache.get_all_turns()] == [4, 3, 2, 1]
+    assert len({t["trace_id"] for t in cache.get_all_turns()}) == 4
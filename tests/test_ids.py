@@ -0,0 +1,101 @@
+import unittest
+
+import constants
+from data import all_move_json, pokedex
+from data.ids import (
+    PHYSICAL_CATEGORY,
+    STATUS_CATEGORY,
+    TYPE_NAMES,
+    TYPELESS_ID,
+    UNKNOWN_ID,
+    Interner,
+    ability_id,
+    ability_name,
+    item_id,
+    move_id,
+    move_table,
+    reset_tables,
+    species_id,
+    species_table,
+)
+from fp.helpers import POKEMON_TYPE_INDICES
+
+
+class TestInterner(unittest.TestCase):
+    def test_ids_are_dense_and_names_normalized(self):
+        interner = Interner()
+        self.assertEqual(0, interner.id("Choice Scarf"))
+        self.assertEqual(1, interner.id("Leftovers"))
+        self.assertEqual(0, interner.id("choicescarf"))
+        self.assertEqual("choicescarf", interner.name(0))
+        self.assertEqual(2, len(interner))
+
+    def test_frozen_interner_does_not_grow(self):
+        interner = Interner(["tackle"], frozen=True)
+        self.assertEqual(UNKNOWN_ID, interner.id("notamove"))
+        self.assertEqual(1, len(interner))
+
+    def test_empty_names_are_unknown(self):
+        self.assertEqual(UNKNOWN_ID, item_id(""))
+        self.assertEqual(UNKNOWN_ID, item_id(None))
+
+    def test_items_and_abilities_get_ids_on_first_sight(self):
+        self.assertEqual(item_id("Heavy-Duty Boots"), item_id("heavydutyboots"))
+        self.assertEqual("regenerator", ability_name(ability_id("Regenerator")))
+
+
+class TestMoveTable(unittest.TestCase):
+    def test_rows_match_the_move_data(self):
+        moves = move_table()
+        i = move_id("Close Combat")
+        data = all_move_json["closecombat"]
+        self.assertEqual(data[constants.BASE_POWER], moves.base_power[i])
+        self.assertEqual(PHYSICAL_CATEGORY, moves.category[i])
+        self.assertEqual("fighting", TYPE_NAMES[moves.type[i]])
+        self.assertTrue(moves.has_flag(i, "contact"))
+        self.assertFalse(moves.has_flag(i, "sound"))
+
+    def test_accuracy_priority_and_fixed_damage(self):
+        moves = move_table()
+        self.assertAlmostEqual(0.9, moves.accuracy[move_id("dracometeor")])
+        self.assertTrue(moves.never_misses[move_id("aerialace")])
+        self.assertEqual(2, moves.priority[move_id("extremespeed")])
+        self.assertTrue(moves.level_damage[move_id("seismictoss")])
+        self.assertEqual(STATUS_CATEGORY, moves.category[move_id("toxic")])
+
+    def test_unknown_moves(self):
+        self.assertEqual(UNKNOWN_ID, move_id("notamove"))
+        self.assertFalse(move_table().has_flag(UNKNOWN_ID, "contact"))
+
+
+class TestSpeciesTable(unittest.TestCase):
+    def test_rows_match_the_pokedex(self):
+        species = species_table()
+        i = species_id("Garchomp")
+        self.assertEqual(
+            pokedex["garchomp"][constants.BASESTATS][constants.SPEED],
+            species.stat(i, constants.SPEED),
+        )
+        self.assertEqual(POKEMON_TYPE_INDICES["dragon"], species.types[i, 0])
+        self.assertEqual(POKEMON_TYPE_INDICES["ground"], species.types[i, 1])
+        self.assertIn(ability_id("roughskin"), species.abilities[i])
+
+    def test_mono_types_are_padded_with_typeless(self):
+        self.assertEqual(TYPELESS_ID, species_table().types[species_id("blissey"), 1])
+
+    def test_tables_are_rebuilt_after_data_mods(self):
+        i = move_id("tackle")
+        original = all_move_json["tackle"][constants.BASE_POWER]
+        self.addCleanup(reset_tables)
+        self.addCleanup(
+            all_move_json["tackle"].__setitem__, constants.BASE_POWER, original
+        )
+
+        all_move_json["tackle"][constants.BASE_POWER] = 35
+        self.assertEqual(original, move_table().base_power[i])
+        reset_tables()
+        self.assertEqual(35, move_table().base_power[i])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import math
+import unittest
+
+import constants
+from fp.battle import Battle, Pokemon
+from fp.search.damage import damage_cache, estimate_damage_ratio
+from fp.search.matchup import MatchupMatrix, matchup_matrix
+
+
+def _pokemon(name, moves=()):
+    pkmn = Pokemon(name, 100)
+    for move in moves:
+        pkmn.add_move(move)
+    return pkmn
+
+
+class TestMatchupMatrix(unittest.TestCase):
+    def setUp(self):
+        self.garchomp = _pokemon(
+            "garchomp", ["earthquake", "dragonclaw", "swordsdance", "seismictoss"]
+        )
+        self.gholdengo = _pokemon("gholdengo", ["makeitrain", "shadowball"])
+        self.heatran = _pokemon("heatran", ["magmastorm", "earthpower"])
+        self.corviknight = _pokemon("corviknight")
+        self.garchomp.boosts[constants.ATTACK] = 2
+        self.heatran.hp = int(self.heatran.max_hp * 0.4)
+        self.matrix = MatchupMatrix(
+            [self.garchomp, self.gholdengo], [self.heatran, self.corviknight]
+        )
+
+    def test_damage_matches_scalar_estimate(self):
+        for attacker, defenders in (
+            (self.garchomp, [self.heatran, self.corviknight]),
+            (self.gholdengo, [self.heatran, self.corviknight]),
+            (self.heatran, [self.garchomp, self.gholdengo]),
+        ):
+            for defender in defenders:
+                for move in attacker.moves:
+                    self.assertAlmostEqual(
+                        estimate_damage_ratio(attacker, defender, move.name),
+                        self.matrix.damage(attacker, defender, move.name),
+                    )
+
+    def test_best_damage_is_the_max_over_known_moves(self):
+        expected = max(
+            estimate_damage_ratio(self.garchomp, self.heatran, m.name)
+            for m in self.garchomp.moves
+        )
+        self.assertAlmostEqual(
+            expected, self.matrix.best_damage(self.garchomp, self.heatran)
+        )
+
+    def test_no_revealed_moves_assumes_stab_only_when_asked(self):
+        self.assertEqual(0.0, self.matrix.best_damage(self.corviknight, self.garchomp))
+        self.assertGreater(
+            self.matrix.best_damage(self.corviknight, self.garchomp, assume_stab=True),
+            0.0,
+        )
+
+    def test_ko_turns(self):
+        best = self.matrix.best_damage(self.garchomp, self.heatran)
+        expected = max(math.ceil(0.4 / best - 1e-9), 1) if best > 0 else math.inf
+        self.assertEqual(
+            expected,
+            self.matrix.ko_turns(self.garchomp, self.heatran),
+        )
+        self.assertEqual(
+            math.inf, self.matrix.ko_turns(self.corviknight, self.garchomp)
+        )
+
+    def test_paralysis_changes_speed_order(self):
+        self.assertTrue(self.matrix.outspeeds(self.garchomp, self.heatran))
+        self.garchomp.status = constants.PARALYZED
+        matrix = MatchupMatrix(
+            [self.garchomp, self.gholdengo], [self.heatran, self.corviknight]
+        )
+        self.assertFalse(matrix.outspeeds(self.garchomp, self.heatran))
+
+    def test_pokemon_off_the_board_fall_back(self):
+        outsider = _pokemon("greattusk", ["headlongrush"])
+        self.assertAlmostEqual(
+            estimate_damage_ratio(outsider, self.heatran, "headlongrush"),
+            self.matrix.damage(outsider, self.heatran, "headlongrush"),
+        )
+        self.assertAlmostEqual(
+            estimate_damage_ratio(outsider, self.heatran, "headlongrush"),
+            self.matrix.best_damage(outsider, self.heatran),
+        )
+
+
+class TestMatchupMatrixCache(unittest.TestCase):
+    def setUp(self):
+        self.battle = Battle("battle-gen9ou-test")
+        self.battle.user.active = _pokemon("garchomp", ["earthquake"])
+        self.battle.user.reserve = [_pokemon("gholdengo", ["makeitrain"])]
+        self.battle.opponent.active = _pokemon("heatran", ["magmastorm"])
+        self.battle.opponent.reserve = [_pokemon("corviknight")]
+
+    def test_matrix_is_reused_within_a_decision(self):
+        with damage_cache():
+            first = matchup_matrix(self.battle)
+            second = matchup_matrix(self.battle)
+        self.assertIs(first, second)
+
+    def test_state_change_rebuilds_the_matrix(self):
+        with damage_cache():
+            before = matchup_matrix(self.battle)
+            self.battle.user.active.boosts[constants.ATTACK] = 2
+            after = matchup_matrix(self.battle)
+        self.assertIsNot(before, after)
+        self.assertGreater(
+            after.damage(
+                self.battle.user.active, self.battle.opponent.active, "earthquake"
+            ),
+            before.damage(
+                self.battle.user.active, self.battle.opponent.active, "earthquake"
+            ),
+        )
+
+    def test_forked_worlds_share_the_user_side(self):
+        worlds = [self.battle.fork_opponent() for _ in range(2)]
+        with damage_cache():
+            matrices = [matchup_matrix(world) for world in worlds]
+        self.assertIsNot(matrices[0], matrices[1])
+        self.assertIs(matrices[0].user, matrices[1].user)
+
+    def test_no_reuse_outside_a_scope(self):
+        self.assertIsNot(matchup_matrix(self.battle), matchup_matrix(self.battle))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from fp.matchup_analyzer import GAMEPLAN_INDEX_NAME, Gameplan, GameplanCache
+
+
+def _gameplan(win_condition="Kyurem sweep"):
+    return Gameplan(
+        opponent_win_condition="Hazard stack",
+        opponent_weaknesses=["No hazard removal"],
+        our_strategy="Remove hazards, then sweep",
+        key_pivot_triggers=["Switch to Corviknight on Stealth Rock"],
+        win_condition=win_condition,
+    )
+
+
+class TestGameplanCache(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = Path(tmp.name)
+
+    def test_round_trip_through_the_index(self):
+        GameplanCache(self.directory).put("aaa", "bbb", _gameplan())
+        reloaded = GameplanCache(self.directory)
+        self.assertEqual(_gameplan(), reloaded.get("aaa", "bbb"))
+        self.assertIsNone(reloaded.get("aaa", "ccc"))
+
+    def test_pairs_share_one_index_file(self):
+        cache = GameplanCache(self.directory)
+        cache.put("aaa", "bbb", _gameplan())
+        cache.put("aaa", "ccc", _gameplan("Dondozo sweep"))
+        self.assertEqual(
+            [GAMEPLAN_INDEX_NAME], [p.name for p in self.directory.iterdir()]
+        )
+
+    def test_latest_record_of_a_pair_wins(self):
+        cache = GameplanCache(self.directory)
+        cache.put("aaa", "bbb", _gameplan())
+        cache.put("aaa", "bbb", _gameplan("Dondozo sweep"))
+        self.assertEqual(
+            "Dondozo sweep",
+            GameplanCache(self.directory).get("aaa", "bbb").win_condition,
+        )
+
+    def test_evicted_gameplans_are_read_back_from_disk(self):
+        cache = GameplanCache(self.directory, lru_size=1)
+        cache.put("aaa", "bbb", _gameplan())
+        cache.put("aaa", "ccc", _gameplan("Dondozo sweep"))
+        self.assertEqual(1, len(cache._lru))
+        self.assertEqual("Kyurem sweep", cache.get("aaa", "bbb").win_condition)
+
+    def test_in_memory_only_gameplans_are_not_written(self):
+        GameplanCache(self.directory).put("aaa", "bbb", _gameplan(), persist=False)
+        self.assertIsNone(GameplanCache(self.directory).get("aaa", "bbb"))
+
+    def test_torn_lines_are_skipped(self):
+        cache = GameplanCache(self.directory)
+        cache.put("aaa", "bbb", _gameplan())
+        with open(self.directory / GAMEPLAN_INDEX_NAME, "a") as f:
+            f.write('{"key": "aaa_vs_c')
+        self.assertEqual(_gameplan(), GameplanCache(self.directory).get("aaa", "bbb"))
+
+    def test_record_after_a_torn_line_survives_a_rescan(self):
+        cache = GameplanCache(self.directory)
+        cache.put("aaa", "bbb", _gameplan())
+        with open(self.directory / GAMEPLAN_INDEX_NAME, "a") as f:
+            f.write('{"key": "aaa_vs_c')
+        GameplanCache(self.directory).put("aaa", "ccc", _gameplan("Dondozo sweep"))
+        reloaded = GameplanCache(self.directory)
+        self.assertEqual("Dondozo sweep", reloaded.get("aaa", "ccc").win_condition)
+        self.assertEqual(_gameplan(), reloaded.get("aaa", "bbb"))
+
+    def test_per_pair_files_are_migrated_into_the_index(self):
+        with open(self.directory / "aaa_vs_bbb.json", "w") as f:
+            json.dump(_gameplan().to_dict(), f)
+        self.assertEqual(_gameplan(), GameplanCache(self.directory).get("aaa", "bbb"))
+        (self.directory / "aaa_vs_bbb.json").unlink()
+        self.assertEqual(_gameplan(), GameplanCache(self.directory).get("aaa", "bbb"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import fp.search.main as search_main
+from fp.search.parallel_mcts import MCTSWorkerPool
+
+POLICIES = {
+    "clear": [("a", 90.0), ("b", 10.0)],
+    "contested": [("a", 52.0), ("b", 48.0)],
+}
+
+
+class TestAnytimePolicyPass(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        lock = threading.Lock()
+
+        def search(state_string, search_time_ms):
+            with lock:
+                self.calls.append(search_time_ms)
+            return search_time_ms, [
+                (move, share * search_time_ms / 100)
+                for move, share in POLICIES[state_string]
+            ]
+
+        pool = MCTSWorkerPool(max_workers=2, search_fn=search, use_processes=False)
+        self.addCleanup(pool.shutdown)
+        for target, value in (
+            ("get_mcts_pool", lambda: pool),
+            (
+                "battle_to_poke_engine_state",
+                lambda b: SimpleNamespace(to_string=lambda: b),
+            ),
+        ):
+            patcher = patch.object(search_main, target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def run_pass(self, world):
+        return search_main._run_mcts_policy_pass(
+            [(world, 0.5), (world, 0.5)],
+            per_sample_ms=2000,
+            max_samples=2,
+            anytime=True,
+        )
+
+    def test_converged_probe_skips_the_full_search(self):
+        policy, meta = self.run_pass("clear")
+        self.assertEqual([250] * 4, self.calls)
+        self.assertTrue(meta["anytime"]["stopped_early"])
+        self.assertEqual(1500, meta["anytime"]["saved_ms"])
+        self.assertGreater(policy["a"], policy["b"])
+
+    def test_unconverged_turn_gets_one_full_budget_search(self):
+        policy, meta = self.run_pass("contested")
+        self.assertEqual([250] * 4 + [2000] * 2, self.calls)
+        self.assertFalse(meta["anytime"]["stopped_early"])
+        # only the full search's visits count
+        self.assertEqual(2 * 2000, meta["total_visits"])
+        self.assertAlmostEqual(0.52, policy["a"])
+
+    def test_capped_unconverged_turn_searches_the_whole_cap(self):
+        search_ms, anytime = search_main._capped_search_time(3000, 1200, True)
+        self.assertEqual((1200, False), (search_ms, anytime))
+
+        _, meta = search_main._run_mcts_policy_pass(
+            [("contested", 0.5), ("contested", 0.5)],
+            per_sample_ms=search_ms,
+            max_samples=2,
+            anytime=anytime,
+        )
+        self.assertEqual([1200] * 2, self.calls)
+        self.assertEqual(2 * 1200, meta["total_visits"])
+
+    def test_probe_runs_only_when_it_fits_under_the_cap(self):
+        self.assertEqual(
+            (2000, True), search_main._capped_search_time(2000, 3000, True)
+        )
+        self.assertEqual(
+            (2800, False), search_main._capped_search_time(2800, 3000, True)
+        )
+        self.assertEqual(
+            (2000, False), search_main._capped_search_time(2000, 3000, False)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
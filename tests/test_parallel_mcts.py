@@ -0,0 +1,141 @@
+import time
+import unittest
+
+from fp.search.parallel_mcts import (
+    MCTSWorkerPool,
+    PolicyConvergence,
+    anytime_probe_schedule,
+    anytime_search_ms,
+    mcts_sample_waves,
+    run_mcts_samples,
+)
+
+
+def _fake_search(state_string, search_time_ms):
+    if state_string == "boom":
+        raise ValueError("bad state")
+    if state_string == "slow":
+        time.sleep(0.5)
+    return 10, [(state_string, 7.0), ("switch x", 3.0)]
+
+
+class TestMCTSSampleWaves(unittest.TestCase):
+    def test_waves_round_up(self):
+        self.assertEqual(1, mcts_sample_waves(4, workers=4))
+        self.assertEqual(2, mcts_sample_waves(5, workers=4))
+        self.assertEqual(8, mcts_sample_waves(8, workers=1))
+
+    def test_waves_never_below_one(self):
+        self.assertEqual(1, mcts_sample_waves(0, workers=8))
+
+
+class TestRunMCTSSamples(unittest.TestCase):
+    def setUp(self):
+        self.pool = MCTSWorkerPool(
+            max_workers=4, search_fn=_fake_search, use_processes=False
+        )
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_all_samples_yield_results(self):
+        results = list(
+            run_mcts_samples(["a", "b", "c"], 10, pool=self.pool, timeout_sec=5)
+        )
+        self.assertEqual([0, 1, 2], sorted(idx for idx, _, _ in results))
+        for idx, result, error in results:
+            self.assertIsNone(error)
+            self.assertEqual(10, result[0])
+            self.assertEqual(["a", "b", "c"][idx], result[1][0][0])
+
+    def test_failed_sample_is_reported_without_stopping_others(self):
+        results = {
+            idx: (result, error)
+            for idx, result, error in run_mcts_samples(
+                ["a", "boom", "c"], 10, pool=self.pool, timeout_sec=5
+            )
+        }
+        self.assertIsInstance(results[1][1], ValueError)
+        self.assertIsNone(results[0][1])
+        self.assertIsNone(results[2][1])
+
+    def test_samples_past_deadline_time_out(self):
+        results = {
+            idx: (result, error)
+            for idx, result, error in run_mcts_samples(
+                ["a", "slow"], 10, pool=self.pool, timeout_sec=0.1
+            )
+        }
+        self.assertIsNone(results[0][1])
+        self.assertIsInstance(results[1][1], TimeoutError)
+
+    def test_samples_run_concurrently(self):
+        start = time.monotonic()
+        list(
+            run_mcts_samples(
+                ["slow", "slow", "slow", "slow"], 10, pool=self.pool, timeout_sec=5
+            )
+        )
+        self.assertLess(time.monotonic() - start, 1.5)
+
+    def test_pool_is_reused_between_calls(self):
+        list(run_mcts_samples(["a"], 10, pool=self.pool, timeout_sec=5))
+        executor = self.pool._executor
+        list(run_mcts_samples(["b"], 10, pool=self.pool, timeout_sec=5))
+        self.assertIs(executor, self.pool._executor)
+
+
+class TestAnytimeProbeSchedule(unittest.TestCase):
+    def test_probe_is_a_quarter_of_the_budget_in_two_slices(self):
+        self.assertEqual([375, 375], anytime_probe_schedule(3000, min_slice_ms=250))
+
+    def test_small_budget_has_no_probe(self):
+        self.assertEqual([], anytime_probe_schedule(1200, min_slice_ms=250))
+
+
+class TestAnytimeSearchMs(unittest.TestCase):
+    def test_probe_and_full_search_fit_the_turn_budget(self):
+        for budget_ms in (500, 1200, 3000, 4999, 12000):
+            search_ms = anytime_search_ms(budget_ms, anytime=True)
+            probe_ms = sum(anytime_probe_schedule(search_ms, min_slice_ms=50))
+            self.assertGreater(probe_ms, 0)
+            self.assertLessEqual(probe_ms + search_ms, budget_ms)
+
+    def test_without_anytime_the_search_gets_the_whole_budget(self):
+        self.assertEqual(3000, anytime_search_ms(3000, anytime=False))
+
+
+class TestPolicyConvergence(unittest.TestCase):
+    def setUp(self):
+        self.convergence = PolicyConvergence(
+            min_share=0.55, min_margin=0.25, max_shift=0.05, z=1.64
+        )
+
+    def test_needs_two_agreeing_slices(self):
+        samples = [({"a": 0.8, "b": 0.2}, 1.0), ({"a": 0.75, "b": 0.25}, 1.0)]
+        self.assertFalse(self.convergence.update(samples))
+        self.assertTrue(self.convergence.update(samples))
+        self.assertEqual("a", self.convergence.last["top"])
+
+    def test_shifting_share_does_not_converge(self):
+        self.convergence.update([({"a": 0.6, "b": 0.4}, 1.0)])
+        self.assertFalse(self.convergence.update([({"a": 0.9, "b": 0.1}, 1.0)]))
+
+    def test_contested_policy_does_not_converge(self):
+        samples = [({"a": 0.55, "b": 0.45}, 1.0)]
+        self.convergence.update(samples)
+        self.assertFalse(self.convergence.update(samples))
+
+    def test_worlds_that_disagree_do_not_converge(self):
+        # strong aggregate margin, but the worlds split on the best move
+        samples = [
+            ({"a": 1.0}, 1.0),
+            ({"a": 1.0}, 1.0),
+            ({"a": 1.0}, 1.0),
+            ({"b": 1.0}, 1.0),
+        ]
+        self.convergence.update(samples)
+        self.assertFalse(self.convergence.update(samples))
+
+    def test_no_samples(self):
+        self.assertFalse(self.convergence.update([]))
@@ -1,11 +1,20 @@
+import contextvars
+import os
+import tempfile
 import unittest
+from unittest import mock
 
 from data.pkmn_sets import (
     TeamDatasets,
+    RandomBattleTeamDatasets,
     SmogonSets,
     PredictedPokemonSet,
     PokemonSet,
     PokemonMoveset,
+    MappedSetStore,
+    clear_set_stores,
+    compile_set_store,
+    get_set_store,
 )
 from fp.battle import Pokemon, Move
 
@@ -96,6 +105,135 @@ class TestSmogonDatasets(unittest.TestCase):
         self.assertEqual(len_after_pop, len(SmogonSets.pkmn_sets["dragonite"]))
 
 
+class TestSetStore(unittest.TestCase):
+    def setUp(self):
+        clear_set_stores()
+        TeamDatasets.__init__()
+        SmogonSets.__init__()
+
+    def test_store_is_loaded_once(self):
+        calls = []
+
+        def load():
+            calls.append(1)
+            return {"dragonite": {"a": 1}}
+
+        first = get_set_store("test:load-once", load)
+        second = get_set_store("test:load-once", load)
+        self.assertIs(first, second)
+        self.assertEqual(1, len(calls))
+
+    def test_reinitializing_reuses_store_version(self):
+        TeamDatasets.initialize("gen5ou", {"dragonite"})
+        version = TeamDatasets._sets_store().version
+        TeamDatasets.initialize("gen5ou", {"azelf"})
+        self.assertEqual(version, TeamDatasets._sets_store().version)
+
+    def test_view_changes_do_not_reach_store(self):
+        TeamDatasets.initialize("gen5ou", {"dragonite"})
+        store_len = len(TeamDatasets._sets_store().sets("dragonite"))
+        TeamDatasets.pkmn_sets["dragonite"].pop(-1)
+        TeamDatasets.initialize("gen5ou", {"dragonite"})
+        self.assertEqual(store_len, len(TeamDatasets.pkmn_sets["dragonite"]))
+
+    def test_random_battle_view_changes_do_not_reach_store(self):
+        RandomBattleTeamDatasets.initialize("gen9")
+        store_len = len(RandomBattleTeamDatasets._load_raw_sets("gen9").sets("weavile"))
+        RandomBattleTeamDatasets.pkmn_sets["weavile"].pop(-1)
+        self.assertEqual(
+            store_len - 1, len(RandomBattleTeamDatasets.pkmn_sets["weavile"])
+        )
+        RandomBattleTeamDatasets.initialize("gen9")
+        self.assertEqual(store_len, len(RandomBattleTeamDatasets.pkmn_sets["weavile"]))
+
+    def test_initialize_in_another_battle_does_not_clobber_view(self):
+        TeamDatasets.initialize("gen5ou", {"dragonite"})
+        SmogonSets.initialize("gen4ou", {"dragonite"})
+
+        def other_battle():
+            TeamDatasets.initialize("gen5ou", {"azelf"})
+            SmogonSets.initialize("gen4ou", {"azelf"})
+            return set(TeamDatasets.pkmn_sets), set(SmogonSets.pkmn_sets)
+
+        other_team, other_smogon = contextvars.copy_context().run(other_battle)
+        self.assertIn("azelf", other_team)
+        self.assertIn("azelf", other_smogon)
+        self.assertEqual({"dragonite"}, set(TeamDatasets.pkmn_sets))
+        self.assertNotIn("azelf", SmogonSets.pkmn_sets)
+        self.assertIn("dragonite", SmogonSets.pkmn_sets)
+
+    def test_add_new_pokemon_does_not_reload_files(self):
+        TeamDatasets.initialize("gen5ou", {"dragonite"})
+        SmogonSets.initialize("gen4ou", {"dragonite"})
+        with mock.patch(
+            "data.pkmn_sets.get_sets_file", side_effect=AssertionError
+        ), mock.patch.object(
+            SmogonSets, "_get_smogon_stats_json", side_effect=AssertionError
+        ):
+            TeamDatasets.add_new_pokemon("azelf")
+            SmogonSets.add_new_pokemon("azelf")
+        self.assertIn("azelf", TeamDatasets.pkmn_sets)
+        self.assertIn("azelf", SmogonSets.pkmn_sets)
+
+    def test_similar_species_match_prefixes_both_ways(self):
+        SmogonSets.initialize("gen4ou", {"dragonite"})
+        store = SmogonSets._stats_store(SmogonSets.current_pkmn_sets_url)
+        similar = SmogonSets._similar_species(store, {"gastrodoneast", "rotom"})
+        self.assertIn("gastrodon", similar)
+        self.assertIn("rotomwash", similar)
+        self.assertNotIn("gastrodoneast", similar)
+
+
+class TestCompiledSetStore(unittest.TestCase):
+    def setUp(self):
+        clear_set_stores()
+        TeamDatasets.__init__()
+        SmogonSets.__init__()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        patcher = mock.patch(
+            "data.pkmn_sets.compiled_cache_path",
+            side_effect=lambda key: os.path.join(self.tmp.name, f"{len(key)}.bin"),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(clear_set_stores)
+
+    def _compile_and_reopen(self, spec):
+        json_store = get_set_store(**spec)
+        compile_set_store(**spec)
+        clear_set_stores()
+        return json_store, get_set_store(**spec)
+
+    def test_compiled_team_sets_match_json(self):
+        TeamDatasets.pkmn_mode = "gen5ou"
+        json_store, mapped = self._compile_and_reopen(TeamDatasets._sets_store_spec())
+        self.assertIsInstance(mapped, MappedSetStore)
+        self.assertEqual(json_store.sorted_species, mapped.sorted_species)
+        for species in ("dragonite", "azelf"):
+            self.assertEqual(json_store.sets(species), mapped.sets(species))
+
+    def test_compiled_smogon_stats_match_json(self):
+        SmogonSets.initialize("gen4ou", {"dragonite"})
+        spec = SmogonSets._stats_store_spec(SmogonSets.current_pkmn_sets_url)
+        json_store, mapped = self._compile_and_reopen(spec)
+        self.assertIsInstance(mapped, MappedSetStore)
+        self.assertEqual(json_store.summary("dragonite"), mapped.summary("dragonite"))
+        self.assertEqual(
+            json_store.meta["all_pkmn_counts"]["dragonite"],
+            mapped.meta["all_pkmn_counts"]["dragonite"],
+        )
+
+    def test_stale_compiled_cache_falls_back_to_json(self):
+        TeamDatasets.pkmn_mode = "gen5ou"
+        spec = TeamDatasets._sets_store_spec()
+        compile_set_store(**spec)
+        with mock.patch("data.pkmn_sets.source_fingerprint", return_value=b"\0" * 16):
+            store = get_set_store(**spec)
+        self.assertNotIsInstance(store, MappedSetStore)
+        self.assertTrue(store.sets("dragonite"))
+
+
 class TestPredictSet(unittest.TestCase):
     def setUp(self):
         TeamDatasets.__init__()
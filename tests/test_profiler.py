@@ -0,0 +1,96 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import fp.search.profiler as profiler
+from fp.search.profiler import (
+    TOTAL_STAGE,
+    StageLatencies,
+    profile_decision,
+    stage,
+)
+
+
+def _decide(battle, stages=("ko_line",)):
+    for name in stages:
+        with stage(name):
+            pass
+    return "move tackle", {"choice": "move tackle"}
+
+
+class TestStageProfile(unittest.TestCase):
+    def setUp(self):
+        latencies = patch.object(profiler, "_latencies", StageLatencies())
+        latencies.start()
+        self.addCleanup(latencies.stop)
+
+    def test_stage_outside_a_decision_is_a_no_op(self):
+        with stage("ko_line"):
+            pass
+        self.assertEqual({}, profiler.stage_latency_report())
+
+    def test_stages_are_written_to_the_trace(self):
+        find_move = profile_decision(_decide)
+        choice, trace = find_move(SimpleNamespace(pokemon_format="gen9ou"))
+        self.assertEqual("move tackle", choice)
+        self.assertEqual({"ko_line", TOTAL_STAGE}, set(trace["stages_ms"]))
+        self.assertGreaterEqual(
+            trace["stages_ms"][TOTAL_STAGE], trace["stages_ms"]["ko_line"]
+        )
+
+    def test_nested_stages_are_prefixed_with_their_parent(self):
+        def decide(battle):
+            with stage("select"):
+                with stage("heuristic_bias"):
+                    pass
+                with stage("heuristic_bias"):
+                    pass
+            return "move tackle", {}
+
+        _, trace = profile_decision(decide)(SimpleNamespace(pokemon_format="gen9ou"))
+        self.assertIn("select", trace["stages_ms"])
+        self.assertIn("select/heuristic_bias", trace["stages_ms"])
+        self.assertNotIn("heuristic_bias", trace["stages_ms"])
+
+    def test_unsampled_decisions_are_not_profiled(self):
+        with patch.object(profiler, "DECISION_PROFILE_SAMPLE_RATE", 0.0):
+            _, trace = profile_decision(_decide)(
+                SimpleNamespace(pokemon_format="gen9ou")
+            )
+        self.assertNotIn("stages_ms", trace)
+        self.assertEqual({}, profiler.stage_latency_report())
+
+    def test_report_is_per_format(self):
+        find_move = profile_decision(_decide)
+        for _ in range(3):
+            find_move(SimpleNamespace(pokemon_format="gen9ou"))
+        find_move(SimpleNamespace(pokemon_format="gen9randombattle"), stages=("mcts",))
+        report = profiler.stage_latency_report()
+        self.assertEqual(3, report["gen9ou"]["ko_line"]["count"])
+        self.assertNotIn("mcts", report["gen9ou"])
+        self.assertEqual(1, report["gen9randombattle"]["mcts"]["count"])
+
+
+class TestStageLatencies(unittest.TestCase):
+    def test_percentiles(self):
+        latencies = StageLatencies()
+        for ms in range(1, 101):
+            latencies.record("gen9ou", {"mcts": float(ms)})
+        row = latencies.report()["gen9ou"]["mcts"]
+        self.assertEqual(100, row["count"])
+        self.assertEqual(51.0, row["p50"])
+        self.assertEqual(96.0, row["p95"])
+        self.assertEqual(100.0, row["p99"])
+        self.assertEqual(100.0, row["max"])
+
+    def test_window_keeps_the_most_recent_decisions(self):
+        latencies = StageLatencies(window=2)
+        for ms in (500.0, 1.0, 2.0):
+            latencies.record("gen9ou", {"mcts": ms})
+        row = latencies.report()["gen9ou"]["mcts"]
+        self.assertEqual(2, row["count"])
+        self.assertEqual(2.0, row["max"])
+
+
+if __name__ == "__main__":
+    unittest.main()
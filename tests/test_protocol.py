@@ -0,0 +1,66 @@
+import unittest
+
+from fp.protocol import ProtocolEvent, TurnEvents, turn_events
+
+TURN = [
+    "|",
+    "|t:|1770176193",
+    "|switch|p2a: Gliscor|Gliscor, M|100/100",
+    "|-damage|p2a: Gliscor|88/100|[from] Stealth Rock",
+    "|move|p1a: Hatterene|Calm Mind|p1a: Hatterene",
+    "|-boost|p1a: Hatterene|spa|1",
+    "|-enditem|p2a: Gliscor|Toxic Orb",
+    "|-damage|p2a: Gliscor|76/100|[from] psn",
+    "|upkeep",
+    "|turn|2",
+]
+
+
+class TestTurnEvents(unittest.TestCase):
+    def setUp(self):
+        self.events = TurnEvents(TURN)
+
+    def test_lines_are_split_once(self):
+        event = self.events[2]
+        self.assertEqual(ProtocolEvent(2, TURN[2], TURN[2].split("|"), "switch"), event)
+        self.assertEqual(len(TURN), len(self.events))
+
+    def test_lines_without_an_action(self):
+        events = TurnEvents(["", "|move|p1a: Hatterene|Calm Mind"])
+        self.assertIsNone(events[0].action)
+        self.assertEqual({"move"}, events.actions())
+
+    def test_events_are_indexed_by_action(self):
+        self.assertEqual([3, 7], [e.index for e in self.events.of("-damage")])
+        self.assertEqual([], self.events.of("-heal"))
+        self.assertTrue(self.events.has("upkeep"))
+        self.assertFalse(self.events.has("cant"))
+
+    def test_after_is_a_view_of_the_following_lines(self):
+        after = self.events.after(4)
+        self.assertEqual(5, len(after))
+        self.assertEqual(5, after[0].index)
+        self.assertEqual([7], [e.index for e in after.of("-damage")])
+        self.assertFalse(after.has("switch"))
+        self.assertEqual(
+            {"-boost", "-enditem", "-damage", "upkeep", "turn"}, after.actions()
+        )
+        self.assertEqual([e.index for e in after], list(range(5, len(TURN))))
+
+    def test_mentions_matches_verbatim_or_normalized(self):
+        self.assertTrue(self.events.mentions("Toxic Orb"))
+        self.assertTrue(
+            TurnEvents(["|-activate|p2a: Ursaring|item: quickclaw"]).mentions(
+                "Quick Claw"
+            )
+        )
+        self.assertFalse(self.events.mentions("Quick Claw", "Quick Draw"))
+        self.assertFalse(self.events.after(6).mentions("Stealth Rock"))
+
+    def test_turn_events_parses_strings_and_passes_events_through(self):
+        self.assertIs(self.events, turn_events(self.events))
+        self.assertEqual(TURN[4], turn_events(TURN)[4].line)
+
+
+if __name__ == "__main__":
+    unittest.main()
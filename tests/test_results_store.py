@@ -0,0 +1,132 @@
+import json
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+from fp.results_store import LEGACY_STATS_NAME, RESULTS_DB_NAME, BattleResultsStore
+
+START = datetime(2026, 2, 14, 10, tzinfo=timezone.utc)
+
+
+def _legacy_battle(n, team="fat-team-1-stall", result="win"):
+    return {
+        "battle_id": f"battle-gen9ou-{n}",
+        "timestamp": (START + timedelta(hours=n)).isoformat(),
+        "team_file": team,
+        "result": result,
+        "replay_id": f"battle-gen9ou-{n}",
+    }
+
+
+class ResultsStoreTestCase(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = Path(tmp.name)
+        self.db = self.directory / RESULTS_DB_NAME
+        self.snapshot = self.directory / LEGACY_STATS_NAME
+
+    def _store(self):
+        store = BattleResultsStore(self.db)
+        self.addCleanup(store.close)
+        return store
+
+    def _write_snapshot(self, battles):
+        self.snapshot.write_text(json.dumps({"battles": battles}), encoding="utf-8")
+
+
+class TestBattleResultsStore(ResultsStoreTestCase):
+    def setUp(self):
+        super().setUp()
+        self.store = self._store()
+        for n, (team, result) in enumerate(
+            [("stall", "win"), ("pivot", "loss"), ("stall", "loss"), ("stall", "win")]
+        ):
+            self.store.record(
+                f"battle-gen9ou-{n}", team, result, timestamp=START + timedelta(hours=n)
+            )
+
+    def test_recorded_battles_read_back_in_the_snapshot_format(self):
+        battle = self.store.record("battle-gen9ou-9", "dondozo", "win", elo=1500)
+        self.assertEqual(
+            {"battle_id", "timestamp", "team_file", "result", "replay_id", "elo"},
+            set(battle),
+        )
+        self.assertEqual(battle, self.store.recent(1)[0])
+        self.assertEqual("battle-gen9ou-9", battle["replay_id"])
+
+    def test_battles_are_oldest_first_and_limit_keeps_the_newest(self):
+        ids = [b["battle_id"] for b in self.store.battles()]
+        self.assertEqual([f"battle-gen9ou-{n}" for n in range(4)], ids)
+        self.assertEqual(
+            ids[-2:], [b["battle_id"] for b in self.store.battles(limit=2)]
+        )
+
+    def test_queries_by_team_result_and_time_window(self):
+        self.assertEqual(3, self.store.count(team_file="stall"))
+        self.assertEqual(2, self.store.count(team_file="stall", result="win"))
+        window = self.store.battles(
+            since=START + timedelta(hours=1),
+            until=(START + timedelta(hours=3)).isoformat(),
+        )
+        self.assertEqual(
+            ["battle-gen9ou-1", "battle-gen9ou-2"], [b["battle_id"] for b in window]
+        )
+        self.assertEqual(
+            {"stall": {"win": 2, "loss": 1}, "pivot": {"loss": 1}},
+            self.store.team_records(),
+        )
+        with self.assertRaises(ValueError):
+            self.store.count(since="last tuesday")
+
+    def test_other_connections_see_appends(self):
+        reader = self._store()
+        self.store.record("battle-gen9ou-5", "stall", "win")
+        self.assertEqual(5, reader.count())
+
+    def test_recording_the_same_battle_twice_keeps_one_row(self):
+        self.store.record("battle-gen9ou-0", "stall", "win", timestamp=START)
+        self.assertEqual(4, self.store.count())
+
+
+class TestSnapshots(ResultsStoreTestCase):
+    def test_snapshot_is_merged_when_the_store_is_created(self):
+        self._write_snapshot([_legacy_battle(0), _legacy_battle(1, result="loss")])
+        self.assertEqual(
+            [_legacy_battle(0), _legacy_battle(1, result="loss")],
+            self._store().battles(),
+        )
+        self.assertEqual(2, self._store().count())
+
+    def test_changed_snapshot_merges_only_new_battles(self):
+        self._write_snapshot([_legacy_battle(0)])
+        self._store().record("battle-gen9ou-local", "pivot", "win")
+        self._write_snapshot([_legacy_battle(0), _legacy_battle(1)])
+        store = self._store()
+        self.assertEqual(3, store.count())
+        self.assertEqual(1, store.count(team_file="pivot"))
+
+    def test_unchanged_snapshot_is_not_read_again(self):
+        self._write_snapshot([_legacy_battle(0)])
+        self._store()
+        with patch.object(Path, "read_text", side_effect=AssertionError("re-read")):
+            self.assertEqual(1, self._store().count())
+
+    def test_export_writes_the_snapshot_without_merging_it_back(self):
+        store = self._store()
+        store.record("battle-gen9ou-1", "stall", "win", timestamp=START)
+        self.assertEqual(1, store.export_snapshot())
+        exported = json.loads(self.snapshot.read_text(encoding="utf-8"))
+        self.assertEqual(store.battles(), exported["battles"])
+        with patch.object(Path, "read_text", side_effect=AssertionError("re-read")):
+            self.assertEqual(1, self._store().count())
+
+    def test_unreadable_snapshot_is_skipped(self):
+        self.snapshot.write_text("{not-json", encoding="utf-8")
+        self.assertEqual(0, self._store().count())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+import asyncio
+import threading
+import unittest
+
+from fp.search.scheduler import (
+    DecisionQueueTimeout,
+    DecisionScheduler,
+    current_search_budget_scale,
+    decision_deadline,
+    decision_slots,
+    search_budget_scale,
+)
+
+
+class TestSearchBudgetScale(unittest.TestCase):
+    def test_empty_queue_keeps_the_full_budget(self):
+        self.assertEqual(1.0, search_budget_scale(2, 0, 0.35))
+
+    def test_budget_shrinks_with_queue_depth(self):
+        self.assertEqual(0.5, search_budget_scale(2, 2, 0.1))
+        self.assertLess(search_budget_scale(2, 4, 0.1), search_budget_scale(2, 2, 0.1))
+
+    def test_budget_never_below_the_floor(self):
+        self.assertEqual(0.35, search_budget_scale(1, 50, 0.35))
+
+    def test_slots_from_cpu_budget(self):
+        self.assertEqual(2, decision_slots(8, 4))
+        self.assertEqual(1, decision_slots(2, 4))
+
+    def test_deadline_follows_the_timer(self):
+        self.assertEqual(130.0, decision_deadline(30, now=100.0))
+        self.assertLess(
+            decision_deadline(30, now=100.0), decision_deadline(None, now=100.0)
+        )
+
+
+class TestDecisionScheduler(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = DecisionScheduler(slots=1, min_budget_scale=0.1)
+        self.addCleanup(self.scheduler.shutdown)
+
+    def test_queued_decisions_run_earliest_deadline_first(self):
+        order = []
+        gate = threading.Event()
+
+        async def run():
+            blocker = self.scheduler.submit(gate.wait, deadline=0.0)
+            jobs = [
+                self.scheduler.submit(order.append, label, deadline=deadline)
+                for label, deadline in (
+                    ("late", 300.0),
+                    ("urgent", 10.0),
+                    ("mid", 60.0),
+                )
+            ]
+            gate.set()
+            await asyncio.gather(blocker.future, *(j.future for j in jobs))
+
+        asyncio.run(run())
+        self.assertEqual(["urgent", "mid", "late"], order)
+
+    def test_budget_scale_is_visible_to_the_decision(self):
+        gate = threading.Event()
+
+        async def run():
+            blocker = self.scheduler.submit(gate.wait, deadline=0.0)
+            first = self.scheduler.submit(current_search_budget_scale, deadline=1.0)
+            second = self.scheduler.submit(current_search_budget_scale, deadline=2.0)
+            gate.set()
+            await blocker.future
+            return await first.future, await second.future
+
+        first, second = asyncio.run(run())
+        self.assertEqual(0.5, first)
+        self.assertEqual(1.0, second)
+        self.assertEqual(1.0, current_search_budget_scale())
+
+    def test_cancelled_queued_decision_never_runs(self):
+        ran = []
+        gate = threading.Event()
+
+        async def run():
+            blocker = self.scheduler.submit(gate.wait, deadline=0.0)
+            dropped = self.scheduler.submit(ran.append, "dropped", deadline=1.0)
+            kept = self.scheduler.submit(ran.append, "kept", deadline=2.0)
+            dropped.future.cancel()
+            gate.set()
+            await asyncio.gather(blocker.future, kept.future)
+
+        asyncio.run(run())
+        self.assertEqual(["kept"], ran)
+
+    def test_exceptions_reach_the_caller(self):
+        def fail():
+            raise ValueError("boom")
+
+        async def run():
+            await self.scheduler.submit(fail).future
+
+        with self.assertRaises(ValueError):
+            asyncio.run(run())
+
+    def test_hard_timeout_starts_when_the_slot_is_granted(self):
+        gate = threading.Event()
+
+        async def run():
+            blocker = self.scheduler.submit(gate.wait, deadline=0.0)
+            queued = self.scheduler.submit(lambda: "move", deadline=1.0)
+            asyncio.get_running_loop().call_later(0.2, gate.set)
+            # queued for 0.2s: longer than the 0.1s run timeout, within the allowance
+            return await queued.result(timeout=0.1, queue_timeout=1.0), blocker
+
+        result, blocker = asyncio.run(run())
+        self.assertEqual("move", result)
+        self.assertTrue(blocker.future.done())
+
+    def test_queue_timeout_abandons_the_queued_decision(self):
+        ran = []
+        gate = threading.Event()
+
+        async def run():
+            blocker = self.scheduler.submit(gate.wait, deadline=0.0)
+            queued = self.scheduler.submit(ran.append, "queued", deadline=1.0)
+            with self.assertRaises(DecisionQueueTimeout):
+                await queued.result(timeout=5.0, queue_timeout=0.05)
+            gate.set()
+            await blocker.future
+            await asyncio.sleep(0.05)
+            return queued
+
+        queued = asyncio.run(run())
+        self.assertTrue(queued.future.cancelled())
+        self.assertEqual([], ran)
+
+    def test_queue_wait_is_recorded(self):
+        gate = threading.Event()
+
+        async def run():
+            blocker = self.scheduler.submit(gate.wait, deadline=0.0)
+            waiting = self.scheduler.submit(lambda: None, deadline=1.0)
+            await asyncio.sleep(0.05)
+            gate.set()
+            await asyncio.gather(blocker.future, waiting.future)
+            return waiting
+
+        waiting = asyncio.run(run())
+        self.assertGreaterEqual(waiting.metrics()["queue_wait_ms"], 40)
+        stats = self.scheduler.stats()
+        self.assertEqual(2, stats["decisions"])
+        self.assertEqual(0, stats["queued"])
+        self.assertGreaterEqual(stats["queue_wait_ms"]["max"], 40)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+
+from data.pkmn_sets import PokemonMoveset, PokemonSet, PredictedPokemonSet
+from fp.battle import Battle, Pokemon
+from fp.search.helpers import (
+    merge_duplicate_worlds,
+    populate_pkmn_from_set,
+    world_fingerprint,
+)
+
+
+def _predicted_set(item, moves):
+    return PredictedPokemonSet(
+        pkmn_set=PokemonSet(
+            ability="intimidate",
+            item=item,
+            nature="impish",
+            evs=(252, 0, 252, 0, 4, 0),
+            count=10,
+        ),
+        pkmn_moveset=PokemonMoveset(moves=moves),
+    )
+
+
+LEFTOVERS_SET = _predicted_set("leftovers", ("earthquake", "uturn"))
+SCARF_SET = _predicted_set("choicescarf", ("earthquake", "uturn"))
+
+
+class TestMergeDuplicateWorlds(unittest.TestCase):
+    def setUp(self):
+        self.battle = Battle("battle-gen9ou-test")
+        self.battle.user.active = Pokemon("garchomp", 100)
+        self.battle.opponent.active = Pokemon("landorustherian", 100)
+        self.battle.opponent.reserve = [Pokemon("heatran", 100)]
+
+    def _world(self, predicted_set):
+        world = self.battle.fork_opponent()
+        populate_pkmn_from_set(world.opponent.active, predicted_set)
+        return world
+
+    def test_identical_worlds_share_a_fingerprint(self):
+        self.assertEqual(
+            world_fingerprint(self._world(LEFTOVERS_SET)),
+            world_fingerprint(self._world(LEFTOVERS_SET)),
+        )
+        self.assertNotEqual(
+            world_fingerprint(self._world(LEFTOVERS_SET)),
+            world_fingerprint(self._world(SCARF_SET)),
+        )
+
+    def test_duplicates_merge_their_weights(self):
+        first = self._world(LEFTOVERS_SET)
+        sampled = [
+            (first, 0.25),
+            (self._world(SCARF_SET), 0.25),
+            (self._world(LEFTOVERS_SET), 0.25),
+            (self._world(LEFTOVERS_SET), 0.25),
+        ]
+        merged = merge_duplicate_worlds(sampled)
+        self.assertEqual(2, len(merged))
+        self.assertIs(first, merged[0][0])
+        self.assertAlmostEqual(0.75, merged[0][1])
+        self.assertAlmostEqual(0.25, merged[1][1])
+
+    def test_move_pp_distinguishes_worlds(self):
+        world = self._world(LEFTOVERS_SET)
+        other = self._world(LEFTOVERS_SET)
+        other.opponent.active.moves[0].current_pp -= 1
+        self.assertEqual(2, len(merge_duplicate_worlds([(world, 0.5), (other, 0.5)])))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+from unittest.mock import patch
+
+import fp.search.standard_battles as standard_battles
+from data.pkmn_sets import SmogonSets, TeamDatasets
+from fp.battle import Pokemon, StatRange
+from fp.search.standard_battles import set_posterior
+
+
+class TestSetPosterior(unittest.TestCase):
+    def setUp(self):
+        TeamDatasets.__init__()
+        TeamDatasets.initialize("gen9ou", {"garchomp"})
+        # SmogonSets stays empty; it needs a network download
+        SmogonSets.__init__()
+        standard_battles._posterior_cache.clear()
+        self.calls = 0
+        original = standard_battles.bayesian_set_probabilities
+
+        def counted(*args):
+            self.calls += 1
+            return original(*args)
+
+        patcher = patch.object(standard_battles, "bayesian_set_probabilities", counted)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_posterior_matches_bayesian_probabilities(self):
+        pkmn = Pokemon("garchomp", 100)
+        posterior = set_posterior(pkmn)
+        self.assertIsNotNone(posterior)
+        expected = standard_battles.bayesian_set_probabilities(pkmn)
+        self.assertEqual([s for s, _ in expected], posterior.sets)
+        self.assertAlmostEqual(1.0, posterior.cum_weights[-1])
+
+    def test_posterior_is_computed_once_per_reveal_state(self):
+        first = set_posterior(Pokemon("garchomp", 100))
+        second = set_posterior(Pokemon("garchomp", 100))
+        self.assertIs(first, second)
+        self.assertEqual(1, self.calls)
+
+    def test_reveals_invalidate_the_posterior(self):
+        pkmn = Pokemon("garchomp", 100)
+        set_posterior(pkmn)
+        pkmn.add_move("earthquake")
+        set_posterior(pkmn)
+        pkmn.speed_range = StatRange(min=300, max=float("inf"))
+        set_posterior(pkmn)
+        pkmn.impossible_items.add("choicescarf")
+        set_posterior(pkmn)
+        self.assertEqual(4, self.calls)
+
+    def test_new_set_view_invalidates_the_posterior(self):
+        set_posterior(Pokemon("garchomp", 100))
+        TeamDatasets.initialize("gen9ou", {"garchomp"})
+        set_posterior(Pokemon("garchomp", 100))
+        self.assertEqual(2, self.calls)
+
+    def test_eliminated_candidate_invalidates_the_posterior(self):
+        pkmn = Pokemon("garchomp", 100)
+        set_posterior(pkmn)
+        TeamDatasets.get_pkmn_sets_from_pkmn_name(pkmn).pop()
+        set_posterior(pkmn)
+        self.assertEqual(2, self.calls)
+
+    def test_samples_come_from_the_posterior(self):
+        posterior = set_posterior(Pokemon("garchomp", 100))
+        for _ in range(20):
+            sampled_set, source = posterior.sample()
+            self.assertIn(sampled_set, posterior.sets)
+            self.assertEqual("bayesian-teamdatasets", source)
+
+
+if __name__ == "__main__":
+    unittest.main()